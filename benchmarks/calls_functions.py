@@ -0,0 +1,16 @@
+# Tight loop over tiny helpers: call overhead dominates.
+
+def square(x):
+    return x * x
+
+def clamp(v, lo=0, hi=1000):
+    return min(max(v, lo), hi)
+
+def mix(a, b, t):
+    return a + (b - a) * t
+
+
+total = 0
+for i in range(2000000):
+    total += clamp(square(i % 50) - i % 7) + mix(i, i + 4, 2)
+print(total)
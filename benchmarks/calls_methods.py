@@ -0,0 +1,21 @@
+# Method-heavy vector arithmetic: small accessors called on self.
+
+class Vec:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+    def dot(self, ox, oy):
+        return self.x * ox + self.y * oy
+
+    def norm2(self):
+        return self.dot(self.x, self.y)
+
+    def step(self, n):
+        acc = 0
+        for i in range(n):
+            acc += self.norm2() + self.dot(i, 1)
+        return acc
+
+
+print(Vec(3, 4).step(5000000))
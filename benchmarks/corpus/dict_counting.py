@@ -0,0 +1,38 @@
+# Word frequencies: every word is looked up in a dict of counters.
+
+class Counter:
+    def __init__(self):
+        self.n = 0
+
+
+def corpus(n):
+    words = []
+    seed = 12345
+    for _ in range(n):
+        seed = (seed * 75 + 74) % 65537
+        words.append("k" + str(seed % 1000))
+    return words
+
+
+def count(words, vocab):
+    counters = {w: Counter() for w in vocab}
+    for w in words:
+        counters[w].n += 1
+    return counters
+
+
+def top(counters, k):
+    pairs = [(c.n, w) for w, c in counters.items()]
+    pairs.sort(reverse=True)
+    return pairs[:k]
+
+
+words = corpus(600000)
+vocab = ["k" + str(i) for i in range(1000)]
+best = []
+for _ in range(5):
+    counters = count(words, vocab)
+    best = top(counters, 3)
+for n, w in best:
+    print(w, n)
+print(counters.get("k7").n, "k1000" in counters)
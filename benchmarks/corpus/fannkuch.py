@@ -0,0 +1,42 @@
+# Fannkuch-redux: flip prefixes of every permutation of 1..n. Lists are rebuilt with slices.
+
+def fannkuch(n):
+    perm1 = [i for i in range(n)]
+    count = [0] * n
+    max_flips = 0
+    checksum = 0
+    permutations = 0
+    r = n
+    while True:
+        while r != 1:
+            count = count[:r - 1] + [r] + count[r:]
+            r -= 1
+        perm = perm1
+        flips = 0
+        k = perm[0]
+        while k:
+            perm = perm[k::-1] + perm[k + 1:]
+            flips += 1
+            k = perm[0]
+        if flips > max_flips:
+            max_flips = flips
+        if permutations % 2 == 0:
+            checksum += flips
+        else:
+            checksum -= flips
+        permutations += 1
+        # next permutation: rotate the first r + 1 items until a counter is left
+        while True:
+            if r == n:
+                return checksum, max_flips
+            perm1 = perm1[1:r + 1] + [perm1[0]] + perm1[r + 1:]
+            left = count[r] - 1
+            count = count[:r] + [left] + count[r + 1:]
+            if left > 0:
+                break
+            r += 1
+
+
+checksum, flips = fannkuch(9)
+print(checksum)
+print(f"Pfannkuchen(9) = {flips}")
@@ -0,0 +1,298 @@
+# Martin Richards' operating-system simulation: a scheduler, tasks and packets as objects.
+# Adapted to the supported subset: task and packet slots are rebuilt instead of assigned
+# by index, and the idle task's `^ 0xd008` is computed with arithmetic.
+
+I_IDLE = 1
+I_WORK = 2
+I_HANDLERA = 3
+I_HANDLERB = 4
+I_DEVA = 5
+I_DEVB = 6
+
+K_DEV = 1000
+K_WORK = 1001
+
+BUFSIZE = 4
+TASKTABSIZE = 10
+
+
+class Packet:
+    def __init__(self, link, ident, kind):
+        self.link = link
+        self.ident = ident
+        self.kind = kind
+        self.datum = 0
+        self.data = [0] * BUFSIZE
+
+    def append_to(self, lst):
+        self.link = None
+        if lst is None:
+            return self
+        p = lst
+        nxt = p.link
+        while nxt is not None:
+            p = nxt
+            nxt = p.link
+        p.link = self
+        return lst
+
+
+class DeviceTaskRec:
+    def __init__(self):
+        self.pending = None
+
+
+class IdleTaskRec:
+    def __init__(self):
+        self.control = 1
+        self.count = 10000
+
+
+class HandlerTaskRec:
+    def __init__(self):
+        self.work_in = None
+        self.device_in = None
+
+    def work_in_add(self, p):
+        self.work_in = p.append_to(self.work_in)
+        return self.work_in
+
+    def device_in_add(self, p):
+        self.device_in = p.append_to(self.device_in)
+        return self.device_in
+
+
+class WorkerTaskRec:
+    def __init__(self):
+        self.destination = I_HANDLERA
+        self.count = 0
+
+
+class TaskState:
+    def __init__(self):
+        self.packet_pending = True
+        self.task_waiting = False
+        self.task_holding = False
+
+    def packet_pending_state(self):
+        self.packet_pending = True
+        self.task_waiting = False
+        self.task_holding = False
+        return self
+
+    def waiting(self):
+        self.packet_pending = False
+        self.task_waiting = True
+        self.task_holding = False
+        return self
+
+    def running(self):
+        self.packet_pending = False
+        self.task_waiting = False
+        self.task_holding = False
+        return self
+
+    def waiting_with_packet(self):
+        self.packet_pending = True
+        self.task_waiting = True
+        self.task_holding = False
+        return self
+
+    def is_task_holding_or_waiting(self):
+        return self.task_holding or (not self.packet_pending and self.task_waiting)
+
+    def is_waiting_with_packet(self):
+        return self.packet_pending and self.task_waiting and not self.task_holding
+
+
+class TaskWorkArea:
+    def __init__(self):
+        self.task_tab = [None] * TASKTABSIZE
+        self.task_list = None
+        self.hold_count = 0
+        self.qpkt_count = 0
+
+
+area = TaskWorkArea()
+
+
+class Task(TaskState):
+    def __init__(self, ident, priority, work, state, handle):
+        super().__init__()
+        self.link = area.task_list
+        self.ident = ident
+        self.priority = priority
+        self.input = work
+        self.packet_pending = state.packet_pending
+        self.task_waiting = state.task_waiting
+        self.task_holding = state.task_holding
+        self.handle = handle
+        area.task_list = self
+        area.task_tab = area.task_tab[:ident] + [self] + area.task_tab[ident + 1:]
+
+    def fn(self, pkt, handle):
+        raise NotImplementedError("fn")
+
+    def add_packet(self, p, old):
+        if self.input is None:
+            self.input = p
+            self.packet_pending = True
+            if self.priority > old.priority:
+                return self
+        else:
+            p.append_to(self.input)
+        return old
+
+    def run_task(self):
+        if self.is_waiting_with_packet():
+            msg = self.input
+            self.input = msg.link
+            if self.input is None:
+                self.running()
+            else:
+                self.packet_pending_state()
+        else:
+            msg = None
+        return self.fn(msg, self.handle)
+
+    def wait_task(self):
+        self.task_waiting = True
+        return self
+
+    def hold(self):
+        area.hold_count += 1
+        self.task_holding = True
+        return self.link
+
+    def release(self, ident):
+        t = self.find_tcb(ident)
+        t.task_holding = False
+        if t.priority > self.priority:
+            return t
+        return self
+
+    def qpkt(self, pkt):
+        t = self.find_tcb(pkt.ident)
+        area.qpkt_count += 1
+        pkt.link = None
+        pkt.ident = self.ident
+        return t.add_packet(pkt, self)
+
+    def find_tcb(self, ident):
+        t = area.task_tab[ident]
+        if t is None:
+            raise ValueError(f"bad task id {ident}")
+        return t
+
+
+class DeviceTask(Task):
+    def fn(self, pkt, handle):
+        if pkt is None:
+            pkt = handle.pending
+            if pkt is None:
+                return self.wait_task()
+            handle.pending = None
+            return self.qpkt(pkt)
+        handle.pending = pkt
+        return self.hold()
+
+
+class HandlerTask(Task):
+    def fn(self, pkt, handle):
+        if pkt is not None:
+            if pkt.kind == K_WORK:
+                handle.work_in_add(pkt)
+            else:
+                handle.device_in_add(pkt)
+        work = handle.work_in
+        if work is None:
+            return self.wait_task()
+        count = work.datum
+        if count >= BUFSIZE:
+            handle.work_in = work.link
+            return self.qpkt(work)
+        dev = handle.device_in
+        if dev is None:
+            return self.wait_task()
+        handle.device_in = dev.link
+        dev.datum = work.data[count]
+        work.datum = count + 1
+        return self.qpkt(dev)
+
+
+def xor_d008(x):
+    for bit in (8, 4096, 16384, 32768):
+        if x // bit % 2:
+            x -= bit
+        else:
+            x += bit
+    return x
+
+
+class IdleTask(Task):
+    def fn(self, pkt, handle):
+        handle.count -= 1
+        if handle.count == 0:
+            return self.hold()
+        if handle.control % 2 == 0:
+            handle.control //= 2
+            return self.release(I_DEVA)
+        handle.control = xor_d008(handle.control // 2)
+        return self.release(I_DEVB)
+
+
+class WorkTask(Task):
+    def fn(self, pkt, handle):
+        if pkt is None:
+            return self.wait_task()
+        if handle.destination == I_HANDLERA:
+            dest = I_HANDLERB
+        else:
+            dest = I_HANDLERA
+        handle.destination = dest
+        pkt.ident = dest
+        pkt.datum = 0
+        data = []
+        for _ in range(BUFSIZE):
+            handle.count += 1
+            if handle.count > 26:
+                handle.count = 1
+            data.append(64 + handle.count)
+        pkt.data = data
+        return self.qpkt(pkt)
+
+
+def schedule():
+    t = area.task_list
+    while t is not None:
+        if t.is_task_holding_or_waiting():
+            t = t.link
+        else:
+            t = t.run_task()
+
+
+def richards(iterations):
+    for _ in range(iterations):
+        area.hold_count = 0
+        area.qpkt_count = 0
+        area.task_list = None
+        IdleTask(I_IDLE, 0, None, TaskState().running(), IdleTaskRec())
+        wkq = Packet(None, 0, K_WORK)
+        wkq = Packet(wkq, 0, K_WORK)
+        WorkTask(I_WORK, 1000, wkq, TaskState().waiting_with_packet(), WorkerTaskRec())
+        wkq = Packet(None, I_DEVA, K_DEV)
+        wkq = Packet(wkq, I_DEVA, K_DEV)
+        wkq = Packet(wkq, I_DEVA, K_DEV)
+        HandlerTask(I_HANDLERA, 2000, wkq, TaskState().waiting_with_packet(), HandlerTaskRec())
+        wkq = Packet(None, I_DEVB, K_DEV)
+        wkq = Packet(wkq, I_DEVB, K_DEV)
+        wkq = Packet(wkq, I_DEVB, K_DEV)
+        HandlerTask(I_HANDLERB, 3000, wkq, TaskState().waiting_with_packet(), HandlerTaskRec())
+        DeviceTask(I_DEVA, 4000, None, TaskState().waiting(), DeviceTaskRec())
+        DeviceTask(I_DEVB, 5000, None, TaskState().waiting(), DeviceTaskRec())
+        schedule()
+    return area.hold_count, area.qpkt_count
+
+
+holds, packets = richards(20)
+print(holds, packets, holds == 9297 and packets == 23246)
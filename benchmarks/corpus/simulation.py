@@ -0,0 +1,117 @@
+# A class-heavy simulation: agents of several kinds move on a torus, eat and age,
+# with dataclass positions, overridden methods, super() calls and exceptions.
+from dataclasses import dataclass
+
+SIZE = 64
+
+
+@dataclass
+class Pos:
+    x: int
+    y: int
+
+    def moved(self, dx, dy):
+        return Pos((self.x + dx) % SIZE, (self.y + dy) % SIZE)
+
+
+class Starved(Exception):
+    pass
+
+
+class Agent:
+    speed = 1
+
+    def __init__(self, ident, pos):
+        self.ident = ident
+        self.pos = pos
+        self.energy = 20
+        self.age = 0
+
+    def direction(self, tick):
+        k = (self.ident * 7 + tick * 3) % 4
+        if k == 0:
+            return 1, 0
+        if k == 1:
+            return 0, 1
+        if k == 2:
+            return -1, 0
+        return 0, -1
+
+    def step(self, tick):
+        dx, dy = self.direction(tick)
+        self.pos = self.pos.moved(dx * self.speed, dy * self.speed)
+        self.age += 1
+        self.energy -= self.cost()
+        if self.energy <= 0:
+            raise Starved(self.ident)
+
+    def cost(self):
+        return 1
+
+    def feed(self, amount):
+        self.energy += amount
+
+
+class Grazer(Agent):
+    def step(self, tick):
+        super().step(tick)
+        if (self.pos.x + self.pos.y) % 3 == 0:
+            self.feed(2)
+
+
+class Hunter(Agent):
+    speed = 2
+
+    def cost(self):
+        return 2
+
+    def direction(self, tick):
+        dx, dy = super().direction(tick)
+        return dy, dx
+
+
+class Elder(Grazer):
+    def cost(self):
+        if self.age > 50:
+            return 2
+        return 1
+
+
+def make_agents(n):
+    agents = []
+    for i in range(n):
+        pos = Pos(i * 5 % SIZE, i * 11 % SIZE)
+        kind = i % 3
+        if kind == 0:
+            agents.append(Grazer(i, pos))
+        elif kind == 1:
+            agents.append(Hunter(i, pos))
+        else:
+            agents.append(Elder(i, pos))
+    return agents
+
+
+def run(n, ticks):
+    agents = make_agents(n)
+    starved = 0
+    for tick in range(ticks):
+        alive = []
+        for a in agents:
+            try:
+                a.step(tick)
+                alive.append(a)
+            except Starved:
+                starved += 1
+        for a in alive:
+            if a.pos.x == a.pos.y:
+                a.feed(5)
+        agents = alive
+        if len(agents) < n // 2:
+            agents = agents + make_agents(n - len(agents))
+    checksum = 0
+    for a in agents:
+        checksum += a.pos.x * 3 + a.pos.y + a.energy
+    return len(agents), starved, checksum
+
+
+print(run(400, 2000))
@@ -0,0 +1,35 @@
+# Spectral norm of the infinite matrix A(i, j) = 1 / ((i + j)(i + j + 1) / 2 + i + 1).
+
+def a(i, j):
+    return 1.0 / ((i + j) * (i + j + 1) // 2 + i + 1)
+
+
+def times(u):
+    n = len(u)
+    return [sum([a(i, j) * u[j] for j in range(n)]) for i in range(n)]
+
+
+def times_transposed(u):
+    n = len(u)
+    return [sum([a(j, i) * u[j] for j in range(n)]) for i in range(n)]
+
+
+def times_ata(u):
+    return times_transposed(times(u))
+
+
+def spectral_norm(n):
+    u = [1.0] * n
+    v = u
+    for _ in range(10):
+        v = times_ata(u)
+        u = times_ata(v)
+    vbv = 0.0
+    vv = 0.0
+    for i in range(n):
+        vbv += u[i] * v[i]
+        vv += v[i] * v[i]
+    return (vbv / vv) ** 0.5
+
+
+print(f"{spectral_norm(250):.9f}")
@@ -0,0 +1,43 @@
+# Building strings piece by piece: concatenation in loops, f-strings, join and split.
+
+def csv_rows(n):
+    out = ""
+    for i in range(n):
+        out += f"{i},{i * i},{i % 7}\n"
+    return out
+
+
+def parse(text):
+    total = 0
+    for line in text.split("\n"):
+        if line:
+            fields = line.split(",")
+            total += len(fields[1]) * len(fields[0]) - len(fields[2])
+    return total
+
+
+def words(n):
+    parts = []
+    for i in range(n):
+        parts.append("w" + str(i % 97))
+    return " ".join(parts)
+
+
+def shout(text):
+    out = ""
+    for w in text.split(" "):
+        if w.endswith("7"):
+            out += w.upper()
+        else:
+            out += w
+        out += "."
+    return out
+
+
+total = 0
+size = 0
+for _ in range(5):
+    text = csv_rows(100000)
+    total += parse(text)
+    size += len(shout(words(100000)))
+print(total, size)
@@ -0,0 +1,35 @@
+# Exceptions used for control flow: missing dict keys and rejected tokens.
+
+class ParseError(ValueError):
+    pass
+
+
+def lookup(d, k):
+    try:
+        return d[k]
+    except KeyError:
+        return None
+
+
+def check(tok):
+    if not tok.startswith("#"):
+        raise ParseError(tok)
+    return len(tok)
+
+
+def parse_all(tokens):
+    n = 0
+    for tok in tokens:
+        try:
+            n += check(tok)
+        except ValueError:
+            n -= 1
+    return n
+
+
+d = {"a": 1}
+misses = 0
+for i in range(200000):
+    if lookup(d, "b") is None:
+        misses += 1
+print(misses, parse_all(["x", "#y"] * 100000))
@@ -0,0 +1,33 @@
+# Integer loop arithmetic that stays below 2**53: the int mode must not slow it down.
+
+def mix(n):
+    h = 0
+    for i in range(n):
+        h = (h * 31 + i) % 1000000007
+    return h
+
+
+def digit_sum(n):
+    total = 0
+    for i in range(n):
+        x = i
+        while x:
+            total += x % 10
+            x //= 10
+    return total
+
+
+def collatz_steps(limit):
+    steps = 0
+    for start in range(1, limit):
+        n = start
+        while n != 1:
+            if n % 2 == 0:
+                n //= 2
+            else:
+                n = 3 * n + 1
+            steps += 1
+    return steps
+
+
+print(mix(3000000), digit_sum(300000), collatz_steps(30000))
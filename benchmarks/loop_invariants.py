@@ -0,0 +1,30 @@
+# len() in while tests and self.attr loads in loop bodies.
+
+class Scaler:
+    def __init__(self, scale, offset):
+        self.scale = scale
+        self.offset = offset
+
+    def apply(self, xs):
+        total = 0
+        for x in xs:
+            total += self.scale * x + self.offset
+        return total
+
+
+def scan(items):
+    hits = 0
+    i = 0
+    while i < len(items):
+        if items[i] % 3 == 0:
+            hits += 1
+        i += 1
+    return hits
+
+
+data = [i % 97 for i in range(200000)]
+s = Scaler(3, 1)
+total = 0
+for _ in range(20):
+    total += scan(data) + s.apply(data)
+print(total)
@@ -0,0 +1,22 @@
+# Swaps and unpacked (quotient, remainder) pairs in a tight loop.
+
+def step(a, b):
+    if b == 0:
+        return a, 1
+    return b, a % b
+
+
+def gcd_steps(a, b):
+    n = 0
+    while b:
+        a, b = step(a, b)
+        n += 1
+    return n
+
+
+total = 0
+x, y = 1, 2
+for i in range(1, 300000):
+    x, y = y, x
+    total += gcd_steps(i * 7919, i + 13)
+print(total, x, y)
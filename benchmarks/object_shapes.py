@@ -0,0 +1,32 @@
+# Hot field access on objects whose attributes are first assigned in data-dependent order.
+
+class Particle:
+    def __init__(self, i):
+        if i % 2 == 0:
+            self.x = i
+            self.y = 0
+        else:
+            self.y = 0
+            self.x = i
+        if i % 3 == 0:
+            self.charge = 1
+        if i % 5 == 0:
+            self.mass = 2
+        self.vx = 1
+        self.vy = 2
+
+    def step(self):
+        self.x += self.vx
+        self.y += self.vy
+        if self.x > 1000:
+            self.flipped = True
+            self.vx = -self.vx
+
+
+particles = [Particle(i) for i in range(600)]
+total = 0
+for t in range(10000):
+    for p in particles:
+        p.step()
+        total += p.x + p.y
+print(total)
@@ -0,0 +1,40 @@
+# Calls into runtime helpers (py_add, py_getitem, py_truth, py_len, ...) on values of unknown type.
+
+def weave(xs, ys):
+    out = 0
+    for i in range(len(xs)):
+        a = xs[i]
+        b = ys[i]
+        if a and b:
+            out = out + a * b - (a - b)
+        elif a:
+            out = out + a
+    return out
+
+
+def matches(words, seen):
+    hits = 0
+    for w in words:
+        if w in seen and len(w) > 2:
+            hits = hits + 1
+    return hits
+
+
+def joined(parts, rounds):
+    size = 0
+    for _ in range(rounds):
+        s = ""
+        for p in parts:
+            s = s + p
+        size = size + len(s)
+    return size
+
+
+xs = [i % 7 for i in range(2000)]
+ys = [i % 5 for i in range(2000)]
+total = 0
+for _ in range(1500):
+    total = total + weave(xs, ys)
+words = ["w" + str(i % 50) for i in range(400000)]
+seen = {"w1": 1, "w17": 2, "w42": 3}
+print(total, matches(words, seen), joined(["ab", "cd", "ef"], 600000))
@@ -0,0 +1,58 @@
+# A domain-model hierarchy whose constructors and methods chain through super().
+
+class Entity:
+    def __init__(self, ident):
+        self.ident = ident
+
+    def weight(self):
+        return 1
+
+    def label(self):
+        return "e"
+
+    def describe(self):
+        return self.label()
+
+    def validate(self):
+        return self.ident >= 0
+
+
+class Account(Entity):
+    def __init__(self, ident, owner):
+        super().__init__(ident)
+        self.owner = owner
+
+    def weight(self):
+        return super().weight() + 1
+
+    def validate(self):
+        return super().validate() and self.owner != ""
+
+
+class Savings(Account):
+    def __init__(self, ident, owner, rate):
+        super().__init__(ident, owner)
+        self.rate = rate
+
+    def weight(self):
+        return super().weight() * 2
+
+    def validate(self):
+        return super().validate() and self.rate > 0
+
+
+class Bonus(Savings):
+    def __init__(self, ident, owner, rate, bonus):
+        super().__init__(ident, owner, rate)
+        self.bonus = bonus
+
+    def weight(self):
+        return super().weight() + self.bonus
+
+
+total = 0
+for i in range(300000):
+    b = Bonus(i, "ann", 2, i % 3)
+    if b.validate():
+        total += b.weight()
+print(total)
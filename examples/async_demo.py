@@ -0,0 +1,119 @@
+import asyncio
+
+
+async def fetch(name, delay):
+    await asyncio.sleep(delay)
+    return name + " done"
+
+
+async def worker(queue, results):
+    while True:
+        item = await queue.get()
+        if item is None:
+            queue.task_done()
+            break
+        results.append(item * item)
+        queue.task_done()
+
+
+class Ticker:
+    def __init__(self, n):
+        self.n = n
+        self.i = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.i >= self.n:
+            raise StopAsyncIteration
+        self.i += 1
+        await asyncio.sleep(0)
+        return self.i
+
+
+class Resource:
+    def __init__(self, name):
+        self.name = name
+
+    async def __aenter__(self):
+        print("open", self.name)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        print("close", self.name)
+
+
+async def limited(sem, i, active):
+    async with sem:
+        active.append(i)
+        peak = len(active)
+        await asyncio.sleep(0.01)
+        active.pop()
+        return peak
+
+
+async def countdown(n):
+    while n > 0:
+        yield n
+        n -= 1
+
+
+async def either(a, b):
+    return await fetch(a, 0) or await fetch(b, 0)
+
+
+async def in_range(delay):
+    return 0 < await slow_value(delay) < 0.05
+
+
+async def slow_value(delay):
+    await asyncio.sleep(delay)
+    return delay
+
+
+async def main():
+    results = await asyncio.gather(fetch("a", 0.03), fetch("b", 0.01), fetch("c", 0.02))
+    print(results)
+
+    task = asyncio.create_task(fetch("task", 0.01))
+    print(task.done())
+    print(await task, task.done(), task.result())
+
+    try:
+        await asyncio.wait_for(fetch("slow", 1), 0.01)
+    except TimeoutError:
+        print("timed out")
+    print(await asyncio.wait_for(fetch("fast", 0), 1))
+
+    queue = asyncio.Queue()
+    squares = []
+    workers = [asyncio.create_task(worker(queue, squares)) for _ in range(2)]
+    for n in range(1, 6):
+        await queue.put(n)
+    for _ in workers:
+        await queue.put(None)
+    await queue.join()
+    await asyncio.gather(*workers)
+    squares.sort()
+    print(squares, queue.empty())
+
+    async for t in Ticker(3):
+        print("tick", t)
+    async for n in countdown(2):
+        print("countdown", n)
+
+    async with Resource("db") as r:
+        print("using", r.name)
+
+    sem = asyncio.Semaphore(2)
+    active = []
+    peaks = await asyncio.gather(*[limited(sem, i, active) for i in range(5)])
+    print(max(peaks) <= 2)
+    print(await either("x", "y"), await in_range(0.01), await in_range(0.1))
+    return "finished"
+
+
+if __name__ == "__main__":
+    print(asyncio.run(main()))
+    print("after run")
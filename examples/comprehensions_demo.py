@@ -0,0 +1,54 @@
+xs = [3, 1, 4, 1, 5, 9, 2, 6]
+print([x * 2 for x in xs if x > 2])
+print({x % 3 for x in xs})
+print([(i, j) for i in range(3) for j in range(i)])
+print(sum(x for x in xs), sum((x for x in xs), 10), any(x > 8 for x in xs), all(x > 0 for x in xs))
+print(min(x - 5 for x in xs), max(len(w) for w in ["a", "abc"]))
+print("-".join(str(x) for x in xs))
+g = (x * x for x in xs)
+print(next(g), next(g))
+x = [1, 2]
+print([x for x in x], x)
+
+class Grid:
+    def __init__(self, n):
+        self.n = n
+        self.rows = [[r * n + c for c in range(n)] for r in range(n)]
+
+    def total(self):
+        return sum(sum(v for v in row) for row in self.rows)
+
+    def cells(self):
+        return (self.n * v for row in self.rows for v in row if v % 2 == 0)
+
+g = Grid(3)
+print(g.rows, g.total())
+print(", ".join(str(c) for c in g.cells()))
+
+def squares(limit):
+    out = [n * n for n in range(limit)]
+    return out
+
+print(squares(5), len({c for c in "mississippi"}), "s" in {c for c in "mississippi"})
+words = ["apple", "kiwi", "fig"]
+print({w: len(w) for w in words})
+print(min((len(w), w) for w in words), any(w == "fig" for w in words))
+print([w for w in words if len(w) > 3 if w[0] == "a"])
+
+# a generator expression takes its iterable when it is created
+source = [1, 2, 3]
+doubled = (x * 2 for x in source)
+source = [10, 20]
+print([d for d in doubled])
+n = 3
+lazy_squares = (i * i for i in range(n))
+n = 10
+print(sum(lazy_squares))
+try:
+    never = (c for c in 5)
+except TypeError:
+    print("not iterable")
+g = (x * 10 for x in [1, 2, 3])
+for v in g:
+    break
+print(v, next(g), [y for y in g])
@@ -0,0 +1,45 @@
+# Constant expressions, module constants and dead branches.
+DEBUG = False
+SECONDS_PER_DAY = 60 * 60 * 24
+GREETING = "hi" + "!" * 3
+LIMIT = 10
+
+
+def debug_dump(x):
+    print("debug", x)
+
+
+def unused_helper(n):
+    return n * SECONDS_PER_DAY
+
+
+class Unused:
+    def ping(self):
+        return "pong"
+
+
+def days(seconds):
+    return seconds // SECONDS_PER_DAY
+
+
+def first_over(xs):
+    for x in xs:
+        if x > LIMIT:
+            return x
+            print("unreachable")
+    return None
+
+
+print(SECONDS_PER_DAY, GREETING)
+print(17 // 5, 17 % 5, 7.5 // 2, 2 - 5, 1 / 4, "ab" * 2)
+print(3 < 4 <= 4, "a" < "b", "ell" in "hello", not "")
+print(0 and 1, 2 or LIMIT, None or "x")
+if DEBUG:
+    debug_dump(SECONDS_PER_DAY)
+else:
+    print("release")
+while False:
+    print("never")
+else:
+    print("loop skipped")
+print(days(200000), first_over([3, 12, 40]))
@@ -0,0 +1,49 @@
+from dataclasses import dataclass, field
+
+
+@dataclass
+class Item:
+    name: str
+    price: int
+    qty: int = 1
+    tags: list = field(default_factory=list)
+
+    def total(self):
+        return self.price * self.qty
+
+
+@dataclass
+class Discounted(Item):
+    percent: int = 10
+
+    def __post_init__(self):
+        self.tags.append("sale")
+
+    def total(self):
+        return super().total() * (100 - self.percent) // 100
+
+
+class Cart:
+    __slots__ = ("items", "count", "last")
+    currency = "EUR"     # class attribute, shared by every cart
+
+    def __init__(self):
+        self.items = []
+        self.count = 0
+
+    def add(self, item):
+        self.items.append(item)
+        self.count += item.qty
+        self.last = item.name
+
+    def total(self):
+        return sum(i.total() for i in self.items)
+
+
+cart = Cart()
+cart.add(Item("pen", 3, qty=4))
+cart.add(Discounted("book", 20, percent=25))
+print(cart.items)
+print(cart.count, cart.last, cart.total(), cart.currency)
+Cart.currency = "USD"
+print(cart.currency, Item("a", 1) == Item("a", 1), Item("a", 1) == Item("a", 2))
@@ -0,0 +1,91 @@
+class AppError(Exception):
+    """Base class for this demo's errors."""
+
+
+class ParseError(AppError):
+    def __init__(self, msg, line):
+        super().__init__(msg)
+        self.line = line
+
+
+class MissingField(KeyError):
+    pass
+
+
+def parse(tok, line):
+    if tok == "?":
+        raise ParseError("unexpected token", line)
+    if tok == "":
+        raise MissingField("name")
+    return tok.upper()
+
+
+for line, tok in enumerate(["a", "?", ""]):
+    try:
+        print(parse(tok, line))
+    except AppError as e:
+        print("AppError on line", e.line)
+    except LookupError:
+        print("LookupError")
+
+config = {"debug": True}
+try:
+    print(config["verbose"])
+except LookupError:
+    print("no such key")
+
+try:
+    [1, 2][3]
+except IndexError:
+    print("index out of range")
+
+try:
+    1 // 0
+except ArithmeticError:
+    print("ArithmeticError")
+
+try:
+    try:
+        raise ParseError("bad", 7)
+    except ParseError:
+        print("cleaning up")
+        raise
+except Exception as e:
+    print("re-raised to line", e.line)
+
+
+class MissingKey(AppError, KeyError):
+    pass
+
+
+try:
+    raise MissingKey("id")
+except KeyError:
+    print("MissingKey caught as KeyError")
+
+try:
+    raise MissingKey("id")
+except AppError:
+    print("MissingKey caught as AppError")
+
+
+class CodeError(AppError):
+    def __init__(self, code, msg="x"):
+        self.code = code
+
+
+class MultiError(AppError):
+    def __init__(self, *parts):
+        self.parts = parts
+
+
+class KwError(AppError):
+    def __init__(self, n, **where):
+        self.where = where
+
+
+for err in [CodeError(5), CodeError(5, 6), MultiError(1, 2, 3), MultiError(), KwError(7, where="here")]:
+    try:
+        raise err
+    except AppError as e:
+        print(e.args, len(e.args))
@@ -0,0 +1,20 @@
+name = "py2js"
+pi = 3.14159265
+n = 42
+items = ["a", "b"]
+
+print(f"hello {name}!")
+print(f"{pi:.2f} {pi:10.3f}| {pi:<10.1f}| {pi:e}")
+print(f"[{n:>8}] [{n:<8}] [{n:^8}] [{n:*^9}] [{n:08}]")
+print(f"{n:+d} {-n:d} {n:x} {n:#x} {n:#o} {n:b} {255:X}")
+print(f"{1234567:,} {1234567.891:,.2f} {0.256:.1%} {1e-7:g} {123456789.0:g}")
+print(f"{items!r} {name!r} {name:>8} {name:.2}")
+width = 6
+print(f"{n:>{width}} {pi:.{width}f}")
+print(f"{n=} {'`quoted` ${x}'}")
+print(f"{{literal braces}} {n * 2}")
+print(f"{0.5:.0f} {2.5:.0f} {0.125:.2f} {-2.5:.0f} {-0.0:.1f} {25.0:.0e} {0.125:.2g} {0.125:.1%}")
+try:
+    print(f"{n:.2}")
+except ValueError as e:
+    print(e)
@@ -0,0 +1,102 @@
+def count_up(start, stop=None, step=1):
+    if stop is None:
+        start, stop = 0, start
+    n = start
+    while n < stop:
+        yield n
+        n += step
+
+
+def read_records(n):
+    for i in range(n):
+        yield {"id": i, "value": i * 3 % 7}
+
+
+def only_odd(records):
+    for r in records:
+        if r["value"] % 2 == 1:
+            yield r
+
+
+def values(records):
+    for r in records:
+        yield r["value"]
+
+
+print(sum(values(only_odd(read_records(10)))))
+print([n for n in count_up(5)], [n for n in count_up(2, 10, 3)])
+
+
+def chain(*iterables):
+    for it in iterables:
+        yield from it
+
+
+print(", ".join(str(x) for x in chain([1, 2], "ab", count_up(2))))
+
+
+def averager():
+    total = 0
+    count = 0
+    average = None
+    while True:
+        value = yield average
+        if value is None:
+            break
+        total += value
+        count += 1
+        average = total / count
+    return count
+
+
+avg = averager()
+print(next(avg))
+print(avg.send(10), avg.send(20), avg.send(60))
+try:
+    avg.send(None)
+except StopIteration as e:
+    print("done after", e.value)
+
+
+def delegate():
+    result = yield from averager()
+    yield "inner returned " + str(result)
+
+
+d = delegate()
+next(d)
+d.send(4)
+print(d.send(None))
+
+def defaults():
+    name = (yield "name?") or "anon"
+    ok = 0 <= (yield "age?") < 150
+    yield name + " " + str(ok)
+
+
+q = defaults()
+print(next(q), q.send(""), q.send(42))
+
+g = count_up(10)
+for x in g:
+    if x == 2:
+        break
+print(next(g), next(g))
+g.close()
+print(next(g, "closed"))
+
+
+class Tree:
+    def __init__(self, label, children):
+        self.label = label
+        self.children = children
+
+    def walk(self):
+        yield self.label
+        for c in self.children:
+            yield from c.walk()
+
+
+t = Tree("root", [Tree("a", [Tree("a1", [])]), Tree("b", [])])
+print(" ".join(t.walk()))
+print(min(count_up(3, 9)), max(count_up(3, 9)), any(x > 7 for x in count_up(9)))
@@ -0,0 +1,64 @@
+# Small helpers that -O1 inlines at their call sites.
+
+def square(x):
+    return x * x
+
+def clamp(v, lo=0, hi=10):
+    """Limit v to [lo, hi]."""
+    return min(max(v, lo), hi)
+
+def count(*items):
+    return len(items)
+
+calls = []
+
+def noisy(v):
+    calls.append(v)
+    return v
+
+def dist2(ax, ay, bx, by):
+    return square(ax - bx) + square(ay - by)
+
+
+class Vec:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+    def dot(self, other):
+        return self.x * other.x + self.y * other.y
+
+    def norm2(self):
+        return self.dot(self)
+
+
+class Vec3(Vec):
+    def __init__(self, x, y, z):
+        super().__init__(x, y)
+        self.z = z
+
+    def norm2_3(self):
+        return self.norm2() + self.z * self.z
+
+
+def fact(n):
+    return n and n * fact(n - 1) or 1
+
+
+total = 0
+for i in range(5):
+    total += square(i) + clamp(i * 4)
+print(total)
+print(square(noisy(3)), calls)
+print(clamp(-5), clamp(50, hi=20), clamp(7, 1, 5))
+print(count(), count(1, 2, 3))
+print(dist2(0, 0, 3, 4))
+print(Vec(1, 2).norm2(), Vec3(1, 2, 2).norm2_3())
+print(fact(5))
+
+def shadowed():
+    square = lambda x: -x
+    return square(3)
+
+print(shadowed())
+print([square(k) for k in range(4)])
@@ -0,0 +1,25 @@
+# Python's floor division, modulo and power, including negative operands.
+print(-7 // 2, 7 // -2, -7 % 3, 7 % -3, -7.5 % 2)
+print(divmod(17, 5), divmod(-17, 5))
+q, r = divmod(2 ** 40 + 3, 1000)
+print(q, r)
+print(2 ** 10, 2 ** -2, (-3) ** 3, 0 ** 0)
+
+def digits(n):
+    out = []
+    while n:
+        n, d = divmod(n, 10)
+        out.append(d)
+    return out
+
+print(digits(9876543210))
+
+for a, b in [(1, 0), (1.5, 0)]:
+    try:
+        print(a % b)
+    except ZeroDivisionError:
+        print("ZeroDivisionError")
+try:
+    print(0 ** -1)
+except ZeroDivisionError:
+    print("ZeroDivisionError")
@@ -0,0 +1,67 @@
+class Countdown:
+    def __init__(self, start):
+        self.n = start
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.n <= 0:
+            raise StopIteration
+        self.n = self.n - 1
+        return self.n + 1
+
+
+class StepIter:
+    def __init__(self, n):
+        self.i = 0
+        self.n = n
+
+    def __next__(self):
+        if self.i >= self.n:
+            raise StopIteration
+        self.i = self.i + 1
+        return self.i
+
+
+class Steps:
+    def __init__(self, n):
+        self.n = n
+
+    def __iter__(self):
+        return StepIter(self.n)
+
+
+for i in Countdown(3):
+    print(i)
+
+print(sum(Countdown(4)), max(Countdown(5)), min(Countdown(2)))
+print(sorted(Countdown(3)))
+for i in Steps(2):
+    print("step", i)
+print([i * 10 for i in Steps(3)], sum(Steps(4)))
+
+word = "héllo😀"
+chars = []
+for ch in word:
+    chars.append(ch)
+print(len(chars), chars[-1])
+
+ages = {"ann": 31, "bob": 27}
+for name in ages:
+    print(name, ages[name])
+
+it = iter([10, 20])
+print(next(it), next(it), next(it, "done"))
+
+for pair in zip([1, 2, 3], Countdown(5)):
+    print(pair)
+
+z = zip([1, 2, 3], [4, 5, 6])
+for pair in z:
+    break
+print(next(z))
+keys = iter({"a": 1, "b": 2})
+for k in keys:
+    break
+print(next(keys), next(keys, "end"))
@@ -0,0 +1,86 @@
+# Loop-invariant len() and self.attr loads, next to loops where mutation or aliasing blocks hoisting.
+class Scaler:
+    def __init__(self, scale):
+        self.scale = scale
+        self.calls = 0
+
+    def apply(self, xs):
+        total = 0
+        for x in xs:
+            total += self.scale * x
+        return total
+
+    def bump(self, xs):
+        total = 0
+        for x in xs:
+            total += self.scale
+            self.scale += 1
+        return total
+
+    def bump_alias(self, xs):
+        other = self
+        total = 0
+        for x in xs:
+            total += self.scale
+            other.scale = x
+        return total
+
+    def via_method(self, xs):
+        total = 0
+        for x in xs:
+            total += self.scale
+            self.reset()
+        return total
+
+    def reset(self):
+        self.scale = 0
+
+    def count(self, xs):
+        i = 0
+        while i < len(xs) and self.scale > 0:
+            i += 1
+        return i
+
+
+def drain(items):
+    out = []
+    i = 0
+    while i < len(items):
+        out.append(items[i] * 2)
+        i += 1
+    return out
+
+
+def drain_alias(items):
+    alias = items
+    i = 0
+    while i < len(items):
+        if i < 3:
+            alias.append(i)
+        i += 1
+    return i
+
+
+def extend_from(src, dst):
+    i = 0
+    while i < len(src):
+        dst.append(src[i])
+        i += 1
+        if i > 5:
+            break
+    return i
+
+
+def grow(n):
+    acc = []
+    while len(acc) < n:
+        acc.append(len(acc))
+    return acc
+
+
+s = Scaler(2)
+print(s.apply([1, 2, 3]), s.bump([1, 1, 1]), s.count([1, 2]))
+print(s.bump_alias([7, 8, 9]), s.via_method([1, 2]))
+print(drain([1, 2, 3]), drain_alias([0]), grow(4))
+same = [1, 2]
+print(extend_from(same, same), same)
@@ -0,0 +1,87 @@
+fruits = ["apple", "banana", "cherry"]
+prices = [1.25, 0.5, 3.0]
+stock = {"apple": 3, "banana": 0, "cherry": 12}
+
+for i, name in enumerate(fruits):
+    print(i, name)
+for i, name in enumerate(fruits, start=1):
+    print(i, name)
+
+for name, price in zip(fruits, prices):
+    print(name, price)
+for a, b, c in zip("abc", [1, 2], fruits):
+    print(a, b, c)
+
+for k, v in stock.items():
+    if v == 0:
+        continue
+    print(k, v)
+for k in stock.keys():
+    print(k, stock.get(k), stock.get("kiwi"), stock.get("kiwi", -1))
+print(sum(stock.values()), len(stock.items()))
+
+pairs = [(1, "one"), (2, "two")]
+for n, word in pairs:
+    print(n, word)
+for i, (n, word) in enumerate(pairs):
+    print(i, n, word)
+
+for i in range(10, 0, -3):
+    print(i)
+for i in range(3):
+    i = i * 10
+print(i)
+
+for x, y in zip([1, 2, 3], [4, 5, 6]):
+    if x == 2:
+        break
+else:
+    print("not reached")
+print(x, y)
+
+for i, ch in enumerate("hi"):
+    for j in range(2):
+        if j == 1:
+            break
+else:
+    print("outer else runs")
+
+e = enumerate("ab")
+print(next(e), next(e), next(e, None))
+e = enumerate("abc")
+for pair in e:
+    break
+print(next(e))
+
+try:
+    for a, b in [(1, 2), (3,)]:
+        print(a, b)
+except ValueError as e:
+    print(e)
+
+
+class Registry:
+    def keys(self):
+        return ["x", "y"]
+
+    def values(self):
+        return [10, 20]
+
+    def items(self):
+        return [(1, "one"), (2, "two")]
+
+
+reg = Registry()
+for name in reg.keys():
+    print(name, end=" ")
+for value in reg.values():
+    print(value, end=" ")
+for n, word in reg.items():
+    print(n + 1, word, end=" ")
+print()
+
+step = -2
+for i in range(5, 0, step):
+    print(i, end=" ")
+window = range(2, 5)
+print(len(window), sum(window))
@@ -0,0 +1,71 @@
+# Parallel assignment and unpacked multiple return values.
+
+def fib(n):
+    a, b = 0, 1
+    for _ in range(n):
+        a, b = b, a + b
+    return a
+
+
+def divmod2(n, d):
+    if d == 0:
+        raise ZeroDivisionError("division by zero")
+    return n // d, n % d
+
+
+def minmax(xs):
+    lo, hi = xs[0], xs[0]
+    for x in xs:
+        if x < lo:
+            lo = x
+        if x > hi:
+            hi = x
+    return lo, hi
+
+
+def pair(x):
+    return x, x * 2
+
+
+def bounds(xs):
+    return min(xs), max(xs)
+
+
+def guarded(n):
+    try:
+        return n, n + 1
+    finally:
+        scratch, _ = divmod2(n * 10, 3)
+
+
+class Point:
+    def __init__(self, x, y):
+        self.x, self.y = x, y
+
+    def swap(self):
+        self.x, self.y = self.y, self.x
+
+
+x, y, z = 1, 2, 3
+x, y, z = z, x, y
+print(x, y, z)
+print(fib(10), fib(50))
+q, r = divmod2(17, 5)
+print(q, r)
+lo, hi = minmax([4, -2, 9, 3])
+print(lo, hi)
+a, b = pair(3)
+print(a, b)
+kept = bounds([5, 1, 7])
+print(kept, bounds([2]))
+p = Point(1, 2)
+p.swap()
+print(p.x, p.y)
+first, second = [p.y, p.x]
+print(first, second)
+try:
+    q, r = divmod2(1, 0)
+except ZeroDivisionError as e:
+    print("caught", e, q, r)
+a, b = guarded(1)
+print(a, b)
@@ -0,0 +1,31 @@
+import sys
+
+print("a", "b", "c", sep="-")
+print("no newline", end="")
+print(" ... continued")
+print(*[1, 2, 3], sep=", ")
+print([1, [2, 3], (4,)], (5,), ())
+print(repr("it's"), repr(['x', "y"]), repr("tab\there"))
+
+loop = [1, 2]
+loop.append(loop)
+print(loop)
+
+sys.stdout.write("written directly\n")
+sys.stdout.flush()
+print("to stderr", file=sys.stderr, flush=True)
+
+for i in range(3):
+    print(i, end=" ")
+print()
+
+
+class Point:
+    def __str__(self):
+        return "point"
+
+    def __repr__(self):
+        return "Point()"
+
+
+print(Point(), [Point()], (Point(), 1))
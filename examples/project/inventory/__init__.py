@@ -0,0 +1 @@
+CURRENCY = "EUR"
@@ -0,0 +1,10 @@
+class InventoryError(Exception):
+    pass
+
+
+class OutOfStock(InventoryError):
+    pass
+
+
+class UnknownItem(InventoryError):
+    pass
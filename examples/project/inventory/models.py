@@ -0,0 +1,31 @@
+from dataclasses import dataclass
+
+from .errors import OutOfStock
+
+
+@dataclass
+class Item:
+    name: str
+    price: int
+    qty: int = 1
+
+    def unit_price(self):
+        return self.price
+
+    def take(self, n):
+        if n > self.qty:
+            raise OutOfStock(f"only {self.qty} {self.name} left")
+        self.qty -= n
+
+
+class Bundle(Item):
+    def __init__(self, name, price, qty=1, parts=2):
+        super().__init__(name, price, qty)
+        self.parts = parts
+
+    def unit_price(self):
+        return self.price * self.parts
+
+
+def restock(item, n):
+    item.qty += n
@@ -0,0 +1,10 @@
+def line_total(item):
+    return item.unit_price() * item.qty
+
+
+def with_tax(amount, rate=20):
+    return amount * (100 + rate) // 100
+
+
+def discount(amount, percent):
+    return amount - amount * percent // 100
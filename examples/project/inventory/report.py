@@ -0,0 +1,11 @@
+from . import CURRENCY
+from .pricing import line_total
+
+
+def summary(items):
+    total = sum(line_total(i) for i in items)
+    return f"{len(items)} lines, {total} {CURRENCY}"
+
+
+def header():
+    return "name price total"
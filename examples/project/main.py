@@ -0,0 +1,39 @@
+# A multi-module project: build with `py2js build examples/project/main.py -o dist`.
+from dataclasses import dataclass
+
+import inventory.report
+from inventory import pricing
+from inventory.errors import OutOfStock as Unavailable
+from inventory.models import Item, Bundle
+
+
+@dataclass
+class Perishable(Item):
+    days_left: int = 7
+
+
+class Clearance(Bundle):
+    def unit_price(self):
+        return super().unit_price() // 2
+
+
+def main():
+    stock = [
+        Item("pen", 2, qty=10),
+        Perishable("milk", 3, qty=2, days_left=1),
+        Bundle("kit", 4, qty=5, parts=3),
+        Clearance("old kit", 4, qty=1, parts=2),
+    ]
+    for item in stock:
+        print(item.name, item.unit_price(), pricing.line_total(item))
+    print(inventory.report.summary(stock))
+    print(stock[1])
+    try:
+        stock[1].take(5)
+    except Unavailable as e:
+        print("unavailable:", e.args[0])
+    print(pricing.with_tax(100, rate=50))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import math
+from math import fsum
+
+words = ["pear", "fig", "banana", "kiwi"]
+print(min(words), max(words))
+print(min(words, key=len), max(words, key=len))
+print(min(3, 1, 2), max(3, 1, 2, key=lambda n: -n))
+print(min([], default="none"), max([], key=len, default=0))
+print(max([(1, "b"), (2, "a"), (2, "c")]))
+print(min(iter([4, -1, 3])), max("hello"))
+
+print(sum([1, 2, 3]), sum([1, 2, 3], 10), sum([0.5, 0.25], start=1))
+print(sum([True, True, False]))
+print(sum([[1], [2, 3]], []))
+
+xs = [0.1] * 10
+print(sum(xs), fsum(xs))
+print(math.fsum([1e100, 1.0, -1e100, 1e-100, 1e50, -1.0, -1e50]))
+
+try:
+    min([])
+except ValueError as e:
+    print(e)
+try:
+    sum(["a", "b"], "")
+except TypeError as e:
+    print(e)
+try:
+    min([1, "a"])
+except TypeError as e:
+    print(e)
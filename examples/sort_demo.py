@@ -0,0 +1,24 @@
+def by_age(person):
+    return person[1]
+
+
+people = [("ann", 31), ("bob", 27), ("cid", 31), ("dee", 19)]
+print(sorted(people, key=by_age))
+print(sorted(people, key=by_age, reverse=True))
+print(sorted(people))
+print(sorted([3, 1, 2], reverse=True), sorted([2.5, -1, 10]))
+
+words = ["pear", "fig", "banana", "kiwi"]
+print(sorted(words), sorted(words, key=len))
+words.sort(key=lambda w: (len(w), w), reverse=True)
+print(words)
+
+nums = [5, 3, 8, 1]
+nums.sort()
+print(nums)
+print(sorted({"b": 1, "a": 2}), sorted("hello"))
+
+try:
+    sorted([1, "a"])
+except TypeError:
+    print("mixed types rejected")
@@ -0,0 +1,40 @@
+def csv_row(values):
+    out = ""
+    for v in values:
+        out += str(v)
+        out += ","
+    return out
+
+
+def first_long(words, limit):
+    acc = ""
+    for w in words:
+        acc += w
+        if len(w) > limit:
+            return acc
+    return acc
+
+
+print(csv_row([1, 2, 3]))
+print(first_long(["ab", "cde", "fghij", "k"], 3))
+
+report = "items:"
+for i in range(4):
+    report += f" {i * i}"
+else:
+    report += " end"
+print(report)
+
+label = ""
+n = 0
+while n < 3:
+    label = label + "x"
+    n += 1
+print(label, len(label))
+
+try:
+    bad = ""
+    for piece in ["a", 1]:
+        bad += piece
+except TypeError:
+    print("TypeError raised")
@@ -0,0 +1,56 @@
+class Shape:
+    def __init__(self, name, scale=1):
+        self.name = name
+        self.scale = scale
+
+    def area(self):
+        return 0
+
+    def describe(self, prefix="", **extra):
+        keys = ",".join(sorted(extra.keys()))
+        return prefix + self.name + " " + str(self.area()) + " " + keys
+
+    def parts(self):
+        yield self.name
+
+
+class Rect(Shape):
+    def __init__(self, w, h, **kw):
+        super().__init__("rect", **kw)   # scale=... binds by name
+        self.w = w
+        self.h = h
+
+    def area(self):
+        return self.w * self.h * self.scale
+
+    def parts(self):
+        yield from super().parts()
+        yield "w=" + str(self.w)
+
+
+class Square(Rect):
+    def __init__(self, side, *rest, **kw):
+        super().__init__(side, side, *rest, **kw)
+
+    def parts(self):
+        for p in super().parts():
+            yield p.upper()
+
+
+class Tagged(Square):
+    # no __init__: Square's constructor is inherited
+
+    def area(self):
+        return super(Rect, self).area() + 1   # Shape.area, skipping Rect's
+
+    def describe(self, prefix="", **extra):
+        return "[" + super().describe(prefix, color=1, **extra) + "]"
+
+
+r = Rect(2, 5, scale=3)
+print(r.area(), r.describe())
+s = Square(3)
+print(s.area(), " ".join(s.parts()))
+t = Tagged(2, scale=2)
+print(t.area(), t.describe("> "))
+print(" ".join(t.parts()))
@@ -1,27 +1,210 @@
 import argparse
+import json
+import os
+import sys
+import time
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 from .lowering import lower
-from .emit_js import Emitter
+from .emit_js import Emitter, INT_MODES, EXCEPTION_MODES
+from .lexical import RUNTIME_SCOPES, lexical_bundle, lexical_runtime
+from .minify import TEMPORARIES, minify_js, minify_runtime
+from .modules import build
+from .passes import PassManager, OPT_LEVELS, shorten_locals
+from .server import RunServer, WorkerPool
+from .snapshot import build_snapshot, snapshot_entry
 
 
-def transpile(py_src: str) -> str:
+def transpile(py_src: str, opt_level: int = 1, timings: Optional[List[Tuple[str, float]]] = None,
+              int_mode: str = "fast", exceptions: str = "cheap", minify: bool = False,
+              name_map: Optional[Dict[str, Dict[str, str]]] = None, runtime_scope: str = "global",
+              runtime: bool = True) -> str:
+    """Lower, optimize and emit `py_src`; (phase, seconds) pairs are appended to `timings` if given.
+    Without `runtime` only the program is returned, for a context where pyrt.js is already loaded.
+
+    With `minify`, `name_map` receives the original of every shortened name: {function: {short: name}}
+    for locals and {"<temporaries>": {short: name}} for emitter and pass temporaries.
+    """
+    t0 = time.perf_counter()
     mod = lower(py_src)
-    js_body = Emitter().emit_module(mod)
+    t1 = time.perf_counter()
+    pm = PassManager.for_level(opt_level)
+    mod = pm.run(mod)
+    names: Dict[str, Dict[str, str]] = name_map if name_map is not None else {}
+    if minify:
+        mod = shorten_locals(mod, names)
+    t2 = time.perf_counter()
+    js_body = Emitter(int_mode=int_mode, exceptions=exceptions).emit_module(mod)
+    if minify:
+        temporaries: Dict[str, str] = {}
+        js_body = minify_js(js_body, temporaries)
+        if temporaries:
+            names[TEMPORARIES] = temporaries
+    if timings is not None:
+        timings.append(("lower", t1 - t0))
+        timings.extend(pm.timings)
+        timings.append(("emit", time.perf_counter() - t2))
+    if not runtime:
+        return js_body
     runtime_path = Path(__file__).parent / "runtime" / "pyrt.js"
-    runtime = runtime_path.read_text(encoding="utf-8")
+    runtime_js = runtime_path.read_text(encoding="utf-8")
+    if runtime_scope == "lexical":
+        runtime_js = lexical_runtime(runtime_js)
+    if minify:
+        runtime_js = minify_runtime(runtime_js)
     # bundle runtime + body
-    return runtime + "\n\n" + js_body
+    if runtime_scope == "lexical":
+        return lexical_bundle(runtime_js, js_body)
+    return runtime_js + ("\n" if minify else "\n\n") + js_body
+
+
+def _report_timings(timings: List[Tuple[str, float]]) -> None:
+    total = sum(dt for _, dt in timings)
+    for name, dt in timings + [("total", total)]:
+        print(f"{name:<16}{dt * 1000:>9.3f} ms", file=sys.stderr)
+
+
+def _add_codegen_options(ap: argparse.ArgumentParser, minify: bool = True) -> None:
+    ap.add_argument("-O", dest="opt_level", type=int, choices=OPT_LEVELS, default=1,
+                    help="Optimization level: 0 = no IR passes, 1 = default, 2 = -O1 plus a second inlining round")
+    ap.add_argument("--int-mode", choices=INT_MODES, default="fast",
+                    help="fast = ints are JS numbers (exact up to 2**53); "
+                         "exact = promote ints that overflow to BigInt")
+    ap.add_argument("--exceptions", choices=EXCEPTION_MODES, default="cheap",
+                    help="cheap = no stack trace for exceptions the innermost try will catch; "
+                         "traced = capture a stack trace for every exception")
+    if minify:
+        ap.add_argument("--minify", action="store_true",
+                        help="Shorten local and temporary names and drop whitespace and comments")
+
+
+def _add_runtime_scope_option(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("--runtime-scope", choices=RUNTIME_SCOPES, default="global",
+                    help="global = runtime helpers are globalThis properties; "
+                         "lexical = wrap the runtime and the program in a function with const helpers")
+
+
+def _write_name_map(path: Path, name_map: object) -> None:
+    path.write_text(json.dumps(name_map, indent=1, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def build_main(argv: List[str]) -> None:
+    ap = argparse.ArgumentParser(
+        prog="py2js build",
+        description="Compile a multi-module project to one ES module per Python module.")
+    ap.add_argument("entry", help="Entry-point .py file")
+    ap.add_argument("-o", "--out-dir", default="dist", help="Output directory (default: dist)")
+    ap.add_argument("--root", help="Project root that module names are relative to "
+                                   "(defaults to the entry point's directory)")
+    ap.add_argument("--whole-program", action="store_true",
+                    help="Export only the names other modules import and drop unused definitions")
+    _add_codegen_options(ap)
+    args = ap.parse_args(argv)
+    written = build(Path(args.entry), Path(args.out_dir), root=Path(args.root) if args.root else None,
+                    opt_level=args.opt_level, whole_program=args.whole_program,
+                    int_mode=args.int_mode, exceptions=args.exceptions, minify=args.minify)
+    for path in written:
+        print(path, file=sys.stderr)
+
+
+def snapshot_main(argv: List[str]) -> None:
+    ap = argparse.ArgumentParser(
+        prog="py2js snapshot",
+        description="Build a Node startup snapshot of a program; run it with `node --snapshot-blob BLOB`.")
+    ap.add_argument("input", help="Input .py file")
+    ap.add_argument("-o", "--out", help="Output blob (default: INPUT with a .blob suffix)")
+    ap.add_argument("--runtime-only", action="store_true",
+                    help="Snapshot only the runtime, not the program's leading definitions")
+    ap.add_argument("--entry", help="Also write the entry script the snapshot is built from to this file")
+    ap.add_argument("--node", default="node", help="Node binary to build with; the blob only runs on it")
+    _add_codegen_options(ap)
+    _add_runtime_scope_option(ap)
+    args = ap.parse_args(argv)
+    src = Path(args.input).read_text(encoding="utf-8")
+    entry_js = snapshot_entry(src, args.opt_level, int_mode=args.int_mode, exceptions=args.exceptions,
+                              definitions=not args.runtime_only, minify=args.minify,
+                              runtime_scope=args.runtime_scope)
+    if args.entry:
+        Path(args.entry).write_text(entry_js, encoding="utf-8")
+    blob = Path(args.out) if args.out else Path(args.input).with_suffix(".blob")
+    try:
+        build_snapshot(entry_js, blob, node=args.node)
+    except RuntimeError as e:
+        sys.exit(str(e))
+    print(blob, file=sys.stderr)
+
+
+def run_server_main(argv: List[str]) -> None:
+    ap = argparse.ArgumentParser(
+        prog="py2js run-server",
+        description="Run Python programs sent over a local socket in a pool of warm Node workers.")
+    ap.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    ap.add_argument("--port", type=int, default=8765, help="TCP port (default: 8765)")
+    ap.add_argument("--unix", metavar="PATH", help="Listen on a Unix domain socket instead of TCP")
+    ap.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1,
+                    help="Node worker processes (default: CPU count)")
+    ap.add_argument("--timeout", type=float, default=5.0,
+                    help="Longest a job may run, in seconds; requests may ask for less (default: 5)")
+    ap.add_argument("--memory", type=int, default=128, help="Heap limit of each worker in MB (default: 128)")
+    ap.add_argument("--node", default="node", help="Node binary to run the workers with")
+    _add_codegen_options(ap, minify=False)
+    args = ap.parse_args(argv)
+    options = dict(opt_level=args.opt_level, int_mode=args.int_mode, exceptions=args.exceptions,
+                   timeout=args.timeout)
+    with WorkerPool(args.workers, args.memory, node=args.node) as pool:
+        if args.unix:
+            from .server import UnixRunServer
+            server: RunServer = UnixRunServer(args.unix, pool, **options)
+        else:
+            server = RunServer((args.host, args.port), pool, **options)
+        where = args.unix or "%s:%d" % server.server_address[:2]
+        print(f"py2js run-server: listening on {where} with {pool.workers} workers", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            if args.unix:
+                os.unlink(args.unix)
 
 
-def main():
+def main(argv: Optional[List[str]] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["build"]:
+        build_main(argv[1:])
+        return
+    if argv[:1] == ["snapshot"]:
+        snapshot_main(argv[1:])
+        return
+    if argv[:1] == ["run-server"]:
+        run_server_main(argv[1:])
+        return
     ap = argparse.ArgumentParser(
-        description="Transpile a tiny Python subset to JavaScript.")
+        description="Transpile a tiny Python subset to JavaScript. "
+                    "Use `py2js build ENTRY` for multi-module projects, "
+                    "`py2js snapshot INPUT` for a Node startup snapshot and "
+                    "`py2js run-server` to run programs in warm Node workers.")
     ap.add_argument("input", help="Input .py file")
     ap.add_argument("-o", "--out", help="Output .js file (defaults to stdout)")
-    args = ap.parse_args()
+    _add_codegen_options(ap)
+    _add_runtime_scope_option(ap)
+    ap.add_argument("--time-passes", action="store_true",
+                    help="Print the time spent in lowering, each pass and emission to stderr")
+    ap.add_argument("--name-map", help="With --minify, write the original of each shortened name to this "
+                                       "JSON file (default: OUT.names.json when -o is given)")
+    args = ap.parse_args(argv)
 
     src = Path(args.input).read_text(encoding="utf-8")
-    out_js = transpile(src)
+    timings: Optional[List[Tuple[str, float]]] = [] if args.time_passes else None
+    name_map: Dict[str, Dict[str, str]] = {}
+    out_js = transpile(src, args.opt_level, timings, int_mode=args.int_mode, exceptions=args.exceptions,
+                       minify=args.minify, name_map=name_map, runtime_scope=args.runtime_scope)
+    if timings is not None:
+        _report_timings(timings)
+    map_path = args.name_map or (args.out + ".names.json" if args.out else None)
+    if args.minify and map_path:
+        _write_name_map(Path(map_path), name_map)
 
     if args.out:
         Path(args.out).write_text(out_js, encoding="utf-8")
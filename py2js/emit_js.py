@@ -1,11 +1,16 @@
-from typing import List
+from typing import Callable, List, Optional, Tuple
+from .lowering import BUILTIN_EXCEPTIONS
+from .passes.strbuilder import is_str_expr
+from .passes.visit import bound_names, children, loaded_names, target_names, walk, walk_stmts
 from .ir import (
     Module, Stmt, Expr,
-    Assign, AssignAttr, UnpackAssign, ImportFrom, ExprStmt, If, For, While, Break, Continue, Pass,
+    Assign, AssignAttr, UnpackAssign, Import, ImportFrom, ExprStmt, If, For, While, Break, Continue, Pass,
     Block, Function, ClassDef, With, WithItem, Return, Raise, Try, ExceptHandler,
-    Name, Const, Undef, BinOp, BoolOp, UnaryNot, Call, Starred, KwargPairs, KwargExp,
-    Compare, CompareChain, ListLit, TupleLit, DictLit, Subscript, Slice,
-    Attribute, MethodCall, New
+    StrBuilderInit, StrBuilderAppend, StrBuilderValue, MultiReturn, ReturnSlot,
+    Name, Const, Undef, BinOp, BoolOp, UnaryNot, Call, Starred, KwargPairs, KwargExp, KwargBind,
+    Compare, CompareChain, ListLit, TupleLit, DictLit, FString, FormattedValue, Subscript, Slice,
+    Attribute, MethodCall, New, Lambda, InlineLet,
+    Comprehension, ListComp, SetComp, DictComp, GeneratorExp, Yield, YieldFrom, Await,
 )
 
 _MATH_EXPORTS = {
@@ -14,25 +19,168 @@ _MATH_EXPORTS = {
     "sqrt":  "py_math_sqrt",
     "pow":   "py_math_pow",
     "abs":   "py_math_abs",
+    "fsum":  "py_math_fsum",
 }
 
+_RUNTIME_MODULES = {
+    "sys": "py_sys",
+    "asyncio": "py_asyncio",
+    "math": "py_math",
+}
+
+_CONVERSIONS = {"s": "py_str", "r": "py_repr", "a": "py_ascii"}
+
+def _js_template_text(text: str) -> str:
+    out = []
+    for i, ch in enumerate(text):
+        if ch in "\\`":
+            out.append("\\" + ch)
+        elif ch == "$" and text[i + 1:i + 2] == "{":
+            out.append("\\$")
+        elif ch == "\n":
+            out.append("\\n")
+        elif ch == "\t":
+            out.append("\\t")
+        elif ord(ch) < 0x20 or ch in "\u2028\u2029":
+            out.append(f"\\u{ord(ch):04x}")
+        else:
+            out.append(ch)
+    return "".join(out)
+
+def _const_int(e: Expr) -> int:
+    """Value of an integer literal (including a negated one), else 0."""
+    if isinstance(e, Const) and type(e.value) is int:
+        return e.value
+    if (isinstance(e, BinOp) and e.op == "-" and isinstance(e.left, Const) and e.left.value == 0
+            and isinstance(e.right, Const) and type(e.right.value) is int):
+        return -e.right.value
+    return 0
+
+# "fast": ints are JS numbers and lose precision past 2**53.
+# "exact": overflowing ints are promoted to BigInt (see py_int_overflow in the runtime).
+INT_MODES = ("fast", "exact")
+# "cheap": exceptions certain to be caught by the innermost running try skip the stack trace.
+# "traced": every exception captures one.
+EXCEPTION_MODES = ("cheap", "traced")
+_MAX_SAFE_INT = 2 ** 53 - 1
+
+def _can_suspend(body: List[Stmt]) -> bool:
+    return any(isinstance(n, (Yield, YieldFrom, Await)) or (isinstance(n, (For, With)) and n.is_async)
+               for n in walk_stmts(body, into_functions=False))
+
+
+def _contains_await(e: Expr) -> bool:
+    return any(isinstance(n, Await) for n in walk(e, into_functions=False))
+
+def _suspends(e: Expr) -> bool:
+    """Whether evaluating `e` can await or yield, which an arrow IIFE cannot do for its caller."""
+    return any(isinstance(n, (Await, Yield, YieldFrom)) for n in walk(e, into_functions=False))
+
+def _calls_super_init(fn: Function) -> bool:
+    return any(isinstance(n, MethodCall) and n.method == "__init__" and isinstance(n.obj, Call) and n.obj.func == "super"
+               for n in walk_stmts(fn.body, into_functions=False))
+
+def _super_init_index(fn: Function) -> Optional[int]:
+    for i, st in enumerate(fn.body):
+        if (isinstance(st, ExprStmt) and isinstance(st.expr, MethodCall) and st.expr.method == "__init__"
+                and isinstance(st.expr.obj, Call) and st.expr.obj.func == "super"):
+            return i
+    return None
+
+def _assigned_up_front(fn: Function, start: int) -> List[str]:
+    """Attributes of self assigned by the run of `self.attr = value` statements at `start`.
+
+    The run ends at the first other statement, or at a value that could reach self other
+    than through its attributes, so these stores always happen in this order.
+    """
+    me = fn.params[0]
+    out: List[str] = []
+    for st in fn.body[start:]:
+        if not (isinstance(st, AssignAttr) and isinstance(st.obj, Name) and st.obj.id == me):
+            break
+        uses = list(walk(st.value))
+        escapes = {id(a.value) for a in uses if isinstance(a, Attribute)}
+        if any(isinstance(n, (MethodCall, Lambda, Yield, YieldFrom, Await)) for n in uses) or any(
+                isinstance(n, Name) and n.id == me and id(n) not in escapes for n in uses):
+            break
+        out.append(st.attr)
+    return out
+
 def _is_boolean_expr(e: Expr) -> bool:
     return isinstance(e, (Compare, CompareChain, UnaryNot))
 
 class Emitter:
-    def __init__(self):
+    def __init__(self, int_mode: str = "fast", exceptions: str = "cheap", esm: bool = False,
+                 module_name: str = "__main__"):
+        if int_mode not in INT_MODES:
+            raise ValueError(f"unknown int mode: {int_mode!r}")
+        if exceptions not in EXCEPTION_MODES:
+            raise ValueError(f"unknown exception mode: {exceptions!r}")
+        self.int_mode = int_mode
+        self.exceptions = exceptions
+        self.esm = esm                  # output is an ES module: top-level await is allowed
+        self.module_name = module_name  # value of `__name__`
         self.lines: List[str] = []
         self.indent = 0
         self._tmp_counter = 0
         self._scopes: List[set[str]] = [set()]
-        self._break_flag_stack: List[str] = []
+        self._break_flag_stack: List[Optional[str]] = []
         self._self_stack: List[str] = []
-        self._base_stack: List[str] = []
+        self._class_stack: List[str] = []
+        self._super_native: List[Optional[str]] = [None]  # method whose body can use native `super`
+        self._coroutine: List[Optional[str]] = ["null"]  # record an await resumes, per function
+        self._hoisted: List[str] = []
+        self._expr_temps: List[List[str]] = [[]]  # temporaries of inline expressions, per function
+        self._format_specs: dict[str, str] = {}
+        self._catch_lists: dict[tuple, str] = {}
+        self._handler_errs: List[str] = []  # caught error of each enclosing except block
+        self._exc_classes: set[str] = set()  # user classes deriving from an exception
+        self._class_fields: dict[str, set[str]] = {}  # class -> instance attributes, with inherited ones
+        self._class_attrs: dict[str, set[str]] = {}   # class -> class attributes, with inherited ones
+        self._ctor_calls_methods: dict[str, bool] = {}  # construction may run a method of the instance
+        self._modules: dict[str, str] = {}  # local name -> runtime module, from `import`
+        self._type_names: dict[str, str] = {}  # imported class -> its Python type name
+        self._async_main = False            # module body awaits asyncio.run()
+
+    def adopt(self, local: str, other: "Emitter", name: str) -> None:
+        """Make what `other` learned emitting class `name` known here, for the import `local`."""
+        if name in other._exc_classes:
+            self._exc_classes.add(local)
+        self._type_names[local] = other._type_names.get(name, name)
+        for table, theirs in ((self._class_fields, other._class_fields), (self._class_attrs, other._class_attrs),
+                              (self._ctor_calls_methods, other._ctor_calls_methods)):
+            if name in theirs:
+                table[local] = theirs[name]  # type: ignore[index]
+
+    def module_bindings(self) -> set[str]:
+        """Variables declared at module level so far (functions and classes aside)."""
+        return set(self._scopes[0])
 
     def _tmp(self, prefix: str) -> str:
         self._tmp_counter += 1
         return f"__py_{prefix}_{self._tmp_counter}"
 
+    def _await(self, js: str) -> str:
+        """`await js`, resuming through the coroutine's record so a cancelled task is stopped."""
+        return f"py_co_resume({self._coroutine[-1]}, await {js})"
+
+    def _co_restore(self, body: List[Stmt]) -> None:
+        """An await that rejects does not resume through py_co_resume; code reached from it
+        makes the coroutine's record current again before it can start other coroutines."""
+        if self._coroutine[-1] not in (None, "null") and _can_suspend(body):
+            self.writeln(f"py_co_state.current = {self._coroutine[-1]};")
+
+    def _expr_tmp(self, prefix: str) -> str:
+        """A temporary assigned inside an expression; declared at the top of the enclosing function."""
+        name = self._tmp(prefix)
+        self._expr_temps[-1].append(name)
+        return name
+
+    def _declare_expr_temps(self, lines: List[str], at: int, indent: int) -> None:
+        names = self._expr_temps.pop()
+        if names:
+            lines.insert(at, "  " * indent + f"let {', '.join(names)};")
+
     def writeln(self, s: str = "") -> None:
         self.lines.append("  " * self.indent + s)
 
@@ -45,6 +193,31 @@ class Emitter:
     def _declare(self, name: str) -> None:
         self._scopes[-1].add(name)
 
+    def _declare_locals(self, names: set[str]) -> None:
+        # Python scopes are per function while JS `let` is per block, so locals that
+        # would otherwise first be declared inside a nested block are declared up front.
+        names = {n for n in names if n not in self._scopes[-1]}
+        if names:
+            self.writeln(f"let {', '.join(sorted(names))};")
+            self._scopes[-1].update(names)
+
+    @staticmethod
+    def _compare_op(op: str, left: str, right: str) -> str:
+        """One link of a comparison chain over already-emitted operands."""
+        if op == "in":
+            return f"py_in({left}, {right})"
+        if op == "not in":
+            return f"!py_in({left}, {right})"
+        if op == "==":
+            return f"py_eq({left}, {right})"
+        if op == "!=":
+            return f"!py_eq({left}, {right})"
+        if op == "is":
+            return f"({left} === {right})"
+        if op == "is not":
+            return f"({left} !== {right})"
+        return f"({left} {op} {right})"
+
     def _emit_condition(self, test: Expr) -> str:
         js = self.emit_expr(test)
         if _is_boolean_expr(test):
@@ -52,14 +225,49 @@ class Emitter:
         return f"py_truth({js})"
 
     def emit_module(self, mod: Module) -> str:
+        return "\n".join(part for part in self.emit_module_split(mod, 0) if part)
+
+    def emit_module_split(self, mod: Module, split: int) -> Tuple[str, str]:
+        """(setup, main): `mod.body[:split]` and the prologue go to setup, the rest to main.
+        Every module-level name main assigns is declared in setup, so main can run inside a
+        function later (see snapshot.py)."""
+        seen: set[str] = set()
+        nested: set[str] = set()
         for s in mod.body:
+            if isinstance(s, (If, While, For, Try, With)):
+                inner = [c for c in children(s) if isinstance(c, (Stmt, ExceptHandler))]
+                nested |= bound_names(inner) - seen
+            seen |= bound_names([s])
+        top = [s for s in mod.body if not isinstance(s, (Function, ClassDef))]
+        nested |= {name for n in walk_stmts(top, into_functions=False)
+                   if isinstance(n, InlineLet) for name, _ in n.bindings}
+        if split:
+            nested |= bound_names(mod.body[split:])
+        self._declare_locals(nested)
+        at = len(self.lines)
+        for s in mod.body[:split]:
+            self.emit_stmt(s)
+        setup, self.lines = self.lines, []
+        for s in mod.body[split:]:
             self.emit_stmt(s)
-        return "\n".join(self.lines)
+        lines = self.lines
+        self._declare_expr_temps(setup, at, 0)
+        self._expr_temps.append([])
+        if self._async_main and not self.esm:
+            # asyncio.run() blocks in Python; run the module body in an async function so
+            # the statements after it wait for the event loop to finish the coroutine.
+            lines = ["(async () => {"] + ["  " + l for l in lines] + ["})();"]
+        prologue = ["py_set_int_exact(true);"] if self.int_mode == "exact" else []
+        return "\n".join(prologue + self._hoisted + setup), "\n".join(lines)
 
-    def _emit_method_body(self, func: "Function", skip_self: bool = True) -> None:
+    def _emit_method_body(self, func: "Function", skip_self: bool = True,
+                          field_inits: Optional[List[str]] = None, inits_after: int = -1) -> None:
         base_params_count = (len(func.params) - 1) if skip_self else len(func.params)
         defaults_slice = func.defaults[1:] if skip_self else func.defaults
         params_slice = func.params[1:] if skip_self else func.params
+        for p in params_slice + [func.vararg, func.kwarg]:
+            if p:
+                self._declare(p)
 
         for idx, d in enumerate(defaults_slice):
             if d is not None:
@@ -68,6 +276,10 @@ class Emitter:
                 self.writeln(f"if (arguments.length <= {idx} || {p} === undefined) {p} = {expr_js};")
         if func.vararg:
             if func.kwarg:
+                # the keywords object comes after however many extra positional arguments there
+                # are; read it before the vararg parameter (an alias of arguments[i]) is rebound
+                self.writeln(f"let {func.kwarg} = arguments.length > {base_params_count} && "
+                             f"arguments[arguments.length - 1] != null ? arguments[arguments.length - 1] : {{}};")
                 self.writeln(
                     f"{func.vararg} = py_tuple_from_array("
                     f"Array.prototype.slice.call(arguments, {base_params_count}, "
@@ -78,28 +290,80 @@ class Emitter:
                     f"{func.vararg} = py_tuple_from_array("
                     f"Array.prototype.slice.call(arguments, {base_params_count}));"
                 )
-        if func.kwarg:
-            kw_param = "__kwargs__" if skip_self else "__kwargs__"
-            self.writeln(f"let {func.kwarg} = ({kw_param} === undefined || {kw_param} === null) ? {{}} : {kw_param};")
-        for b in func.body:
+        if func.kwarg and not func.vararg:
+            self.writeln(f"let {func.kwarg} = (__kwargs__ === undefined || __kwargs__ === null) ? {{}} : __kwargs__;")
+        if func.is_generator:
+            self._super_native.append(None)
+        self._coroutine.append("__py_co" if func.is_async else None)
+        if func.is_async:
+            self.writeln("const __py_co = py_co_enter();")
+        if func.is_generator and func.is_async:
+            self.writeln("return py_co_start(__py_co, (async function* () {")
+            self.indent += 1
+        elif func.is_generator:
+            # arguments are bound eagerly; the body runs on the first next()
+            self.writeln("return py_generator((function* () {")
+            self.indent += 1
+        elif func.is_async:
+            self.writeln("return py_co_start(__py_co, (async () => {")
+            self.indent += 1
+        self._declare_locals(bound_names(func.body))
+        temps_at = len(self.lines)
+        self._expr_temps.append([])
+        if field_inits and inits_after < 0:
+            for line in field_inits:
+                self.writeln(line)
+        for i, b in enumerate(func.body):
             self.emit_stmt(b)
+            if field_inits and i == inits_after:
+                for line in field_inits:
+                    self.writeln(line)
+        self._declare_expr_temps(self.lines, temps_at, self.indent)
+        if func.is_generator and func.is_async:
+            self.indent -= 1
+            self.writeln("}).call(this));")
+        elif func.is_generator:
+            self.indent -= 1
+            self.writeln(f"}}).call(this), {func.name!r});")
+        elif func.is_async:
+            self.indent -= 1
+            self.writeln("})());")
+        self._coroutine.pop()
+        if func.is_generator:
+            self._super_native.pop()
 
     # -----------------------------
     # Statements
     # -----------------------------
     def emit_stmt(self, s: Stmt) -> None:
+        if isinstance(s, Import):
+            for name, asname in zip(s.names, s.asnames or [None] * len(s.names)):
+                target = _RUNTIME_MODULES.get(name)
+                if not target:
+                    self.writeln(f"// import {name} (no-op)")
+                    continue
+                local = asname or name
+                self._modules[local] = target
+                if not self._is_declared(local):
+                    self._declare(local)
+                    self.writeln(f"let {local} = {target};")
+            return
+
         if isinstance(s, ImportFrom):
-            if s.module == "math":
-                for name in s.names:
+            if not s.names:
+                return  # every name was bound by an ES import
+            if s.module == "math" and not s.level:
+                for name, asname in zip(s.names, s.asnames or [None] * len(s.names)):
                     target = _MATH_EXPORTS.get(name)
                     if not target:
                         self.writeln(f"// from math import {name} (unsupported)")
                         continue
-                    if not self._is_declared(name):
-                        self._declare(name)
-                        self.writeln(f"let {name} = {target};")
+                    local = asname or name
+                    if not self._is_declared(local):
+                        self._declare(local)
+                        self.writeln(f"let {local} = {target};")
             else:
-                self.writeln(f"// import from {s.module} (no-op)")
+                self.writeln(f"// import from {'.' * s.level}{s.module} (no-op)")
             return
 
         if isinstance(s, Assign):
@@ -112,6 +376,18 @@ class Emitter:
                 self.writeln(f"let {target} = {expr};")
             return
 
+        if isinstance(s, StrBuilderInit):
+            self._declare(s.builder)
+            self.writeln(f"let {s.builder} = [{self.emit_expr(s.value)}];")
+            return
+
+        if isinstance(s, StrBuilderAppend):
+            if s.checked:
+                self.writeln(f"py_sb_push({s.builder}, {self.emit_expr(s.value)});")
+            else:
+                self.writeln(f"{s.builder}.push({self.emit_expr(s.value)});")
+            return
+
         if isinstance(s, AssignAttr):
             obj = self.emit_expr(s.obj)
             val = self.emit_expr(s.value)
@@ -159,7 +435,10 @@ class Emitter:
             return
 
         if isinstance(s, ExprStmt):
-            self.writeln(self.emit_expr(s.expr) + ";")
+            js = self.emit_expr(s.expr)
+            if isinstance(s.expr, (Yield, YieldFrom)):
+                js = js[1:-1]
+            self.writeln(js + ";")
             return
 
         if isinstance(s, If):
@@ -202,28 +481,17 @@ class Emitter:
             return
 
         if isinstance(s, For):
-            if not self._is_declared(s.target):
-                self._declare(s.target)
-                self.writeln(f"let {s.target};")
-            use_range = isinstance(s.iter, Call) and s.iter.func == "range"
-            iter_src = (
-                f"py_range({', '.join(self.emit_expr(a) for a in s.iter.args)})"
-                if use_range else
-                f"py_iter({self.emit_expr(s.iter)})"
-            )
+            for name in target_names(s.target):
+                if not self._is_declared(name):
+                    self._declare(name)
+                    self.writeln(f"let {name};")
             if s.orelse:
                 brk_flag = self._tmp("broke")
                 self.writeln("{")
                 self.indent += 1
                 self.writeln(f"let {brk_flag} = false;")
                 self._break_flag_stack.append(brk_flag)
-                self.writeln(f"for (const __it of {iter_src}) {{")
-                self.indent += 1
-                self.writeln(f"{s.target} = __it;")
-                for b in s.body:
-                    self.emit_stmt(b)
-                self.indent -= 1
-                self.writeln("}")
+                self._emit_for_loop(s)
                 self._break_flag_stack.pop()
                 self.writeln(f"if (!{brk_flag}) {{")
                 self.indent += 1
@@ -234,13 +502,9 @@ class Emitter:
                 self.indent -= 1
                 self.writeln("}")
             else:
-                self.writeln(f"for (const __it of {iter_src}) {{")
-                self.indent += 1
-                self.writeln(f"{s.target} = __it;")
-                for b in s.body:
-                    self.emit_stmt(b)
-                self.indent -= 1
-                self.writeln("}")
+                self._break_flag_stack.append(None)
+                self._emit_for_loop(s)
+                self._break_flag_stack.pop()
             return
 
         if isinstance(s, While):
@@ -266,16 +530,18 @@ class Emitter:
                 self.indent -= 1
                 self.writeln("}")
             else:
+                self._break_flag_stack.append(None)
                 self.writeln(f"while ({self._emit_condition(s.test)}) {{")
                 self.indent += 1
                 for b in s.body:
                     self.emit_stmt(b)
                 self.indent -= 1
                 self.writeln("}")
+                self._break_flag_stack.pop()
             return
 
         if isinstance(s, Break):
-            if self._break_flag_stack:
+            if self._break_flag_stack and self._break_flag_stack[-1]:
                 self.writeln(f"{self._break_flag_stack[-1]} = true;")
             self.writeln("break;")
             return
@@ -296,23 +562,35 @@ class Emitter:
                 params_js = ", ".join(params)
             self.writeln(f"function {s.name}({params_js}) {{")
             self._scopes.append(set())
+            self._super_native.append(None)
             self.indent += 1
             self._emit_method_body(s, skip_self=False)
             self.indent -= 1
             self.writeln("}")
+            self._super_native.pop()
             self._scopes.pop()
             return
 
         if isinstance(s, ClassDef):
             base = s.bases[0] if s.bases else None
-            if base:
+            is_exc = base is not None and (base in self._exc_classes or base in BUILTIN_EXCEPTIONS)
+            if not is_exc and any(b in self._exc_classes or b in BUILTIN_EXCEPTIONS for b in s.bases[1:]):
+                raise NotImplementedError("An exception class must list an exception as its first base")
+            if is_exc:
+                self._exc_classes.add(s.name)
+                js_base = base if base in self._exc_classes else f"py_exc_class({base!r})"
+                self.writeln(f"class {s.name} extends {js_base} " + "{")
+            elif base:
                 self.writeln(f"class {s.name} extends {base} " + "{")
             else:
                 self.writeln(f"class {s.name} " + "{")
             self.indent += 1
-            self._base_stack.append(base)
+            self._class_stack.append(s.name)
+            for name, value in s.class_attrs:
+                self.writeln(f"static {name} = {self.emit_expr(value)};")
 
             init = next((m for m in s.methods if m.name == "__init__"), None)
+            field_inits, inits_after = self._field_inits(s, base, init, is_exc)
             if init:
                 ctor_params = init.params[1:] + ([init.vararg] if init.vararg else [])
                 if init.kwarg:
@@ -320,14 +598,35 @@ class Emitter:
                 self.writeln(f"constructor({', '.join(ctor_params)}) " + "{")
                 self.indent += 1
                 self._self_stack.append(init.params[0])
+                self._super_native.append("__init__")
                 self._scopes.append(set())
-                self._emit_method_body(init, skip_self=True)
+                if is_exc and not _calls_super_init(init):
+                    # BaseException.__new__ keeps the positional arguments the caller passed, even
+                    # when __init__ ignores them; the keywords object is not one of them
+                    n = len(init.params) - 1
+                    if not init.kwarg:
+                        self.writeln("super(...arguments);")
+                    elif init.vararg:
+                        self.writeln(f"super(...Array.prototype.slice.call(arguments, 0, Math.max({n}, arguments.length - 1)));")
+                    else:
+                        self.writeln(f"super(...Array.prototype.slice.call(arguments, 0, {n}));")
+                self._emit_method_body(init, skip_self=True, field_inits=field_inits, inits_after=inits_after)
                 self._scopes.pop()
+                self._super_native.pop()
                 self._self_stack.pop()
                 self.indent -= 1
                 self.writeln("}")
-            else:
+            elif base is None and not field_inits:
                 self.writeln("constructor() {}")
+            elif field_inits:
+                self.writeln("constructor() {" if base is None else "constructor(...args) {")
+                self.indent += 1
+                if base is not None:
+                    self.writeln("super(...args);")
+                for line in field_inits:
+                    self.writeln(line)
+                self.indent -= 1
+                self.writeln("}")
 
             for m in s.methods:
                 if m.name == "__init__":
@@ -338,15 +637,23 @@ class Emitter:
                 self.writeln(f"{m.name}({', '.join(meth_params)}) " + "{")
                 self.indent += 1
                 self._self_stack.append(m.params[0])
+                self._super_native.append(m.name)
                 self._scopes.append(set())
                 self._emit_method_body(m, skip_self=True)
                 self._scopes.pop()
+                self._super_native.pop()
                 self._self_stack.pop()
                 self.indent -= 1
                 self.writeln("}")
-            self._base_stack.pop()
+            self._class_stack.pop()
             self.indent -= 1
             self.writeln("}")
+            if is_exc:
+                # the JS class extends the first base; the others only join its ancestors
+                bases = ", ".join(repr(self._type_names.get(b, b)) for b in s.bases)
+                self.writeln(f"py_exc_register({s.name}, {s.name!r}, {bases});")
+            if s.class_attrs:
+                self.writeln(f"py_class_attrs({s.name}, [{', '.join(repr(n) for n, _ in s.class_attrs)}]);")
             return
 
         if isinstance(s, With):
@@ -355,7 +662,10 @@ class Emitter:
                 mgr = self._tmp("mgr")
                 val = self._tmp("val")
                 self.writeln(f"const {mgr} = {self.emit_expr(it.context_expr)};")
-                self.writeln(f"const {val} = py_with_enter({mgr});")
+                if s.is_async:
+                    self.writeln(f"const {val} = {self._await(f'py_with_aenter({mgr})')};")
+                else:
+                    self.writeln(f"const {val} = py_with_enter({mgr});")
                 exits.append(mgr)
                 if it.optional_vars:
                     if not self._is_declared(it.optional_vars):
@@ -370,8 +680,9 @@ class Emitter:
             self.indent -= 1
             self.writeln("} finally {")
             self.indent += 1
+            self._co_restore(s.body)
             for mgr in reversed(exits):
-                self.writeln(f"py_with_exit({mgr});")
+                self.writeln(f"{self._await(f'py_with_aexit({mgr})')};" if s.is_async else f"py_with_exit({mgr});")
             self.indent -= 1
             self.writeln("}")
             return
@@ -383,8 +694,19 @@ class Emitter:
                 self.writeln(f"return {self.emit_expr(s.value)};")
             return
 
+        if isinstance(s, MultiReturn):
+            self.writeln(f"return py_mret({', '.join(self.emit_expr(v) for v in s.values)});")
+            return
+
         if isinstance(s, Raise):
-            if s.message is None:
+            if s.value is not None:
+                self.writeln(f"throw {self.emit_expr(s.value)};")
+            elif s.exc_type is None:
+                if self._handler_errs:
+                    self.writeln(f"throw {self._handler_errs[-1]};")
+                else:
+                    self.writeln("py_raise('RuntimeError', 'No active exception to reraise');")
+            elif s.message is None:
                 self.writeln(f"py_raise({repr(s.exc_type)});")
             else:
                 self.writeln(f"py_raise({repr(s.exc_type)}, {self.emit_expr(s.message)});")
@@ -402,6 +724,11 @@ class Emitter:
             self.writeln("{")
             self.indent += 1
             self.writeln(f"let {ok} = false;")
+            depth = None
+            catching = self._catch_list(s)
+            if catching is not None:
+                depth = self._tmp("depth")
+                self.writeln(f"const {depth} = py_catch_enter({catching});")
             self.writeln("try {")
             self.indent += 1
             for b in s.body:
@@ -410,6 +737,9 @@ class Emitter:
             self.indent -= 1
             self.writeln(f"}} catch ({caught}) {{")
             self.indent += 1
+            if depth:
+                self.writeln(f"py_catching.length = {depth};")
+            self._co_restore(s.body)
             self.writeln(f"const {err} = py_wrap_error({caught});")
             if s.handlers:
                 for i, h in enumerate(s.handlers):
@@ -418,8 +748,10 @@ class Emitter:
                     self.indent += 1
                     if h.varname:
                         self.writeln(f"let {h.varname} = {err};")
+                    self._handler_errs.append(err)
                     for b in h.body:
                         self.emit_stmt(b)
+                    self._handler_errs.pop()
                     self.indent -= 1
                     self.writeln("}")
                 self.writeln("else { throw " + err + "; }")
@@ -428,6 +760,8 @@ class Emitter:
             self.indent -= 1
             self.writeln("} finally {")
             self.indent += 1
+            if depth:
+                self.writeln(f"py_catching.length = {depth};")
             for b in s.finalbody:
                 self.emit_stmt(b)
             self.indent -= 1
@@ -445,6 +779,45 @@ class Emitter:
 
         raise NotImplementedError(f"Stmt not handled: {type(s).__name__}")
 
+    def _field_inits(self, s: ClassDef, base: Optional[str], init: Optional[Function],
+                     is_exc: bool) -> Tuple[List[str], int]:
+        """Constructor lines that create every instance attribute up front, and the index of the
+        `__init__` statement to emit them after (-1: before the body).
+
+        Adding all attributes in one order gives every instance one hidden class. When `__init__`
+        starts by assigning the first attributes in that order, those stores stay and the rest
+        are created right after them.
+        """
+        inherited = self._class_fields.get(base or "", set())
+        class_attrs = self._class_attrs.get(base or "", set()) | {n for n, _ in s.class_attrs}
+        self._class_attrs[s.name] = class_attrs
+        fields = [f for f in s.fields if f not in inherited and f not in class_attrs]
+        self._class_fields[s.name] = inherited | set(fields)
+        calls_methods = self._ctor_calls_methods.get(base or "", False)
+        if init is not None:
+            me = init.params[0] if init.params else None
+            calls_methods = calls_methods or any(isinstance(n, MethodCall) and isinstance(n.obj, Name)
+                                                 and n.obj.id == me for n in walk_stmts(init.body))
+        self._ctor_calls_methods[s.name] = calls_methods
+        after = -1
+        if init is not None and base is not None and not (is_exc and not _calls_super_init(init)):
+            index = _super_init_index(init)
+            if index is None:
+                return [], -1  # `this` is unusable until an arbitrary later super() call
+            after = index
+        if init is not None:
+            # leading stores that already add attributes in layout order stay as they are
+            run = _assigned_up_front(init, after + 1)
+            k = 0
+            while k < len(run) and k < len(fields) and run[k] == fields[k]:
+                k += 1
+            fields = fields[k:]
+            after += k
+        # A base constructor that calls methods may already have set a subclass's attribute.
+        guarded = base is not None and calls_methods
+        return [f'if (!("{f}" in this)) this.{f} = undefined;' if guarded else f"this.{f} = undefined;"
+                for f in fields], after
+
     def _emit_elif_chain(self, node: If) -> None:
         cond_js = self._emit_condition(node.test)
         self.writeln(f"}} else if ({cond_js}) {{")
@@ -465,6 +838,326 @@ class Emitter:
         else:
             self.writeln("}")
 
+    def _emit_print(self, e: Call) -> str:
+        segs = []
+        kw_segs = []
+        for a in e.args:
+            if isinstance(a, Starred):
+                segs.append(f"...py_to_array({self.emit_expr(a.value)})")
+            elif isinstance(a, KwargPairs):
+                for k, v in a.pairs:
+                    if k not in ("sep", "end", "file", "flush"):
+                        raise NotImplementedError(f"print() got an unexpected keyword argument '{k}'")
+                    kw_segs.append(f"{k}: {self.emit_expr(v)}")
+            elif isinstance(a, KwargExp):
+                kw_segs.append(f"...{self.emit_expr(a.value)}")
+            else:
+                segs.append(self.emit_expr(a))
+        if kw_segs:
+            return f"py_print_kw({{{', '.join(kw_segs)}}}{''.join(', ' + x for x in segs)})"
+        return f"py_print({', '.join(segs)})"
+
+    def _emit_minmax(self, e: Call) -> str:
+        name = "py_min" if e.func == "__min__" else "py_max"
+        segs = []
+        kw_segs = []
+        for a in e.args:
+            if isinstance(a, Starred):
+                segs.append(f"...py_to_array({self.emit_expr(a.value)})")
+            elif isinstance(a, KwargPairs):
+                kw_segs.extend(f"{k}: {self.emit_expr(v)}" for k, v in a.pairs)
+            else:
+                segs.append(self.emit_expr(a))
+        if kw_segs:
+            return f"{name}_kw({{{', '.join(kw_segs)}}}{''.join(', ' + x for x in segs)})"
+        return f"{name}({', '.join(segs)})"
+
+    def _emit_fstring(self, e: FString) -> str:
+        chunks = []
+        for part in e.parts:
+            if isinstance(part, str):
+                chunks.append(_js_template_text(part))
+                continue
+            assert isinstance(part, FormattedValue)
+            value = self.emit_expr(part.value)
+            if part.conversion:
+                value = f"{_CONVERSIONS[part.conversion]}({value})"
+            if part.spec is None:
+                chunks.append("${" + (value if part.conversion else f"py_str({value})") + "}")
+            elif isinstance(part.spec, Const):
+                chunks.append("${" + f"py_format({value}, {self._format_spec_const(part.spec.value)})" + "}")
+            else:
+                chunks.append("${" + f"py_format({value}, py_format_spec({self.emit_expr(part.spec)}))" + "}")
+        return "`" + "".join(chunks) + "`"
+
+    def _catch_list(self, s: Try) -> Optional[str]:
+        """JS for the exception types `s` swallows ("null" if a handler may re-raise), or None
+        when the try is not tracked: no handlers, traced mode, or a body that can suspend
+        (a suspended generator or coroutine would leave its entry on py_catching)."""
+        if not s.handlers or self.exceptions != "cheap" or _can_suspend(s.body):
+            return None
+        for h in s.handlers:
+            for n in walk_stmts(h.body, into_functions=False):
+                if isinstance(n, Raise) and n.exc_type is None and (
+                        n.value is None or (isinstance(n.value, Name) and n.value.id == h.varname)):
+                    return "null"
+        types = tuple(dict.fromkeys(h.type_name or "BaseException" for h in s.handlers))
+        name = self._catch_lists.get(types)
+        if name is None:
+            name = self._tmp("catch")
+            self._catch_lists[types] = name
+            self._hoisted.append(f"const {name} = [{', '.join(repr(t) for t in types)}];")
+        return name
+
+    def _format_spec_const(self, spec: str) -> str:
+        # one compiled spec per distinct literal, hoisted to the top of the module
+        name = self._format_specs.get(spec)
+        if name is None:
+            name = self._tmp("fmt")
+            self._format_specs[spec] = name
+            self._hoisted.append(f"const {name} = py_format_spec({spec!r});")
+        return name
+
+    # -----------------------------
+    # Loops
+    # -----------------------------
+    def _emit_for_loop(self, s: For, body: Optional[Callable[[], None]] = None) -> None:
+        # Common shapes compile to counting, iterator or for-in loops that bind the
+        # targets directly; no tuple is built per iteration.
+        it = s.iter
+        target = s.target
+        if s.is_async:
+            item = self._tmp("it")
+            self.writeln(f"for await (const {item} of py_aiter({self.emit_expr(it)})) {{")
+            self._emit_loop_body(s, [(target, f"py_co_resume({self._coroutine[-1]}, {item})")], body)
+            return
+        pair = isinstance(target, list) and len(target) == 2
+        if isinstance(it, Call) and it.func == "range" and isinstance(target, str) and self._range_loop(s, body):
+            return
+        if isinstance(it, Call) and it.func == "__enumerate__" and pair:
+            counter = self._tmp("n")
+            start = self.emit_expr(it.args[1]) if len(it.args) > 1 else "0"
+            item = self._tmp("it")
+            self.writeln(f"let {counter} = {start};")
+            self.writeln(f"for (const {item} of py_iter({self.emit_expr(it.args[0])})) {{")
+            self._emit_loop_body(s, [(target[0], f"{counter}++"), (target[1], item)], body)
+            return
+        if (isinstance(it, Call) and it.func == "__zip__" and isinstance(target, list)
+                and len(target) == len(it.args) and not any(isinstance(a, Starred) for a in it.args)):
+            iters = []
+            for a in it.args:
+                iters.append(self._tmp("z"))
+                self.writeln(f"const {iters[-1]} = py_iterator({self.emit_expr(a)});")
+            self.writeln("for (;;) {")
+            self.indent += 1
+            steps = []
+            for z in iters:
+                steps.append(self._tmp("r"))
+                self.writeln(f"const {steps[-1]} = {z}.next();")
+                self.writeln(f"if ({steps[-1]}.done) break;")
+            self.indent -= 1
+            self._emit_loop_body(s, [(t, f"{r}.value") for t, r in zip(target, steps)], body)
+            return
+        if isinstance(it, Call) and it.func == "__dict_items__" and len(it.args) == 1 and pair:
+            # a dict is walked by key without a tuple per item; anything else iterates its own items()
+            d = self._tmp("d")
+            keys = self._tmp("keys")
+            item = self._tmp("it")
+            self.writeln(f"const {d} = {self.emit_expr(it.args[0])};")
+            self.writeln(f"const {keys} = py_is_dict({d}) ? Object.keys({d}) : null;")
+            self.writeln(f"for (const {item} of {keys} || py_iter(py_dict_items({d}))) {{")
+            binds = [(target[0], f"{keys} ? {item} : py_unpack({item}, 2)[0]"),
+                     (target[1], f"{keys} ? {d}[{item}] : py_unpack({item}, 2)[1]")]
+            self._emit_loop_body(s, binds, body)
+            return
+        item = self._tmp("it")
+        self.writeln(f"for (const {item} of py_iter({self.emit_expr(it)})) {{")
+        self._emit_loop_body(s, [(target, item)], body)
+
+    def _range_loop(self, s: For, body: Optional[Callable[[], None]]) -> bool:
+        args = s.iter.args
+        if not 1 <= len(args) <= 3 or any(isinstance(a, Starred) for a in args):
+            return False
+        step = 1
+        if len(args) == 3:
+            step = _const_int(args[2])
+            if not step:
+                return False
+        def bound(e: Expr) -> str:
+            if isinstance(e, Const) and type(e.value) is int:
+                return str(e.value)
+            return f"py_index({self.emit_expr(e)})"
+        start = bound(args[0]) if len(args) > 1 else "0"
+        stop = bound(args[1] if len(args) > 1 else args[0])
+        i = self._tmp("i")
+        end = self._tmp("stop")
+        cmp = "<" if step > 0 else ">"
+        inc = f"{i}++" if step == 1 else f"{i} += {step}" if step > 0 else f"{i} -= {-step}"
+        self.writeln(f"for (let {i} = {start}, {end} = {stop}; {i} {cmp} {end}; {inc}) {{")
+        self._emit_loop_body(s, [(s.target, i)], body)
+        return True
+
+    def _emit_loop_body(self, s: For, binds: list, body: Optional[Callable[[], None]]) -> None:
+        self.indent += 1
+        for target, src in binds:
+            self._bind_target(target, src)
+        if body is not None:
+            body()
+        for b in s.body:
+            self.emit_stmt(b)
+        self.indent -= 1
+        self.writeln("}")
+
+    def _bind_target(self, target, src: str) -> None:
+        if isinstance(target, str):
+            self.writeln(f"{target} = {src};")
+            return
+        parts = self._tmp("unpack")
+        self.writeln(f"const {parts} = py_unpack({src}, {len(target)});")
+        for i, t in enumerate(target):
+            self._bind_target(t, f"{parts}[{i}]")
+
+    # -----------------------------
+    # Comprehensions
+    # -----------------------------
+    # A comprehension becomes an arrow IIFE (a generator function for generator
+    # expressions) whose nested loops write straight into the result. Consumers of a
+    # generator expression (sum, any, all, min, max, str.join) get the reduction
+    # inlined into the innermost loop instead.
+    def _emit_comprehension(self, gens: List[Comprehension], prologue: List[str],
+                            sink: Callable[[], None], epilogue: List[str], generator: bool = False,
+                            awaits: bool = False) -> str:
+        names: List[str] = []
+        for g in gens:
+            names.extend(n for n in target_names(g.target) if n not in names)
+        first = gens[0]
+        param, arg = "", ""
+        if (generator and isinstance(first.iter, Call) and first.iter.func == "range"
+                and not any(isinstance(a, Starred) for a in first.iter.args)):
+            # a generator expression evaluates range()'s arguments when it is created and still counts lazily
+            params = [self._tmp("src") for _ in first.iter.args]
+            param, arg = ", ".join(params), ", ".join(self.emit_expr(a) for a in first.iter.args)
+            bounds: List[Expr] = [Name(p) for p in params]
+            gens = [Comprehension(target=first.target, iter=Call(func="range", args=bounds), ifs=first.ifs)] + gens[1:]
+        elif generator or loaded_names(first.iter) & set(names):
+            # the outermost iterable is evaluated in the enclosing scope; a generator
+            # expression gets its iterator when it is created, as in Python
+            param = self._tmp("src")
+            arg = f"py_iter({self.emit_expr(first.iter)})" if generator else self.emit_expr(first.iter)
+            gens = [Comprehension(target=first.target, iter=Name(param), ifs=first.ifs)] + gens[1:]
+
+        saved_lines, saved_indent = self.lines, self.indent
+        self.lines = []
+        self.indent += 1
+        self._scopes.append(set(names))
+        if generator:
+            self._super_native.append(None)
+        self._break_flag_stack.append(None)
+        try:
+            for line in prologue:
+                self.writeln(line)
+            if names:
+                self.writeln(f"let {', '.join(names)};")
+            self._emit_comp_loops(gens, sink)
+            for line in epilogue:
+                self.writeln(line)
+            body = self.lines
+        finally:
+            if generator:
+                self._super_native.pop()
+            self._break_flag_stack.pop()
+            self._scopes.pop()
+            self.lines, self.indent = saved_lines, saved_indent
+        # a generator expression is a PyGenerator, so a for loop that breaks out of it leaves it resumable
+        head = f"py_generator((function* ({param}) {{" if generator else f"(({param}) => {{"
+        tail = f"}}).call(this{', ' + arg if arg else ''}), '<genexpr>')" if generator else f"}})({arg})"
+        if awaits:
+            head, tail = f"py_co_resume({self._coroutine[-1]}, await (async" + head[1:], tail + ")"
+        return "\n".join([head] + body + ["  " * self.indent + tail])
+
+    def _emit_comp_loops(self, gens: List[Comprehension], sink: Callable[[], None]) -> None:
+        g = gens[0]
+
+        def body() -> None:
+            for cond in g.ifs:
+                self.writeln(f"if (!({self._emit_condition(cond)})) continue;")
+            if len(gens) > 1:
+                self._emit_comp_loops(gens[1:], sink)
+            else:
+                sink()
+        self._emit_for_loop(For(target=g.target, iter=g.iter, body=[], orelse=[]), body)
+
+    def _emit_collection_comp(self, e: Expr) -> str:
+        out = self._tmp("out")
+        awaits = _contains_await(e)
+        if isinstance(e, DictComp):
+            return self._emit_comprehension(
+                e.generators, [f"const {out} = {{}};"],
+                lambda: self.writeln(f"{out}[{self.emit_expr(e.key)}] = {self.emit_expr(e.value)};"),
+                [f"return {out};"], awaits=awaits)
+        if isinstance(e, SetComp):
+            return self._emit_comprehension(
+                e.generators, [f"const {out} = new Set();"],
+                lambda: self.writeln(f"py_set_add({out}, {self.emit_expr(e.elt)});"),
+                [f"return {out};"], awaits=awaits)
+        if isinstance(e, GeneratorExp):
+            if awaits:
+                raise NotImplementedError("await inside a generator expression not supported")
+            return self._emit_comprehension(
+                e.generators, [], lambda: self.writeln(f"yield {self.emit_expr(e.elt)};"), [], generator=True)
+        return self._emit_comprehension(
+            e.generators, [f"const {out} = [];"],
+            lambda: self.writeln(f"{out}.push({self.emit_expr(e.elt)});"),
+            [f"return {out};"], awaits=awaits)
+
+    def _emit_fused(self, func: str, gen: GeneratorExp, extra: List[Expr]) -> str:
+        awaits = _contains_await(gen)
+        if func in ("__any__", "__all__"):
+            hit, miss = ("true", "false") if func == "__any__" else ("false", "true")
+            neg = "" if func == "__any__" else "!"
+            return self._emit_comprehension(
+                gen.generators, [],
+                lambda: self.writeln(f"if ({neg}({self._emit_condition(gen.elt)})) return {hit};"),
+                [f"return {miss};"], awaits=awaits)
+        acc = self._tmp("acc")
+        v = self._tmp("v")
+        if func == "__sum__":
+            start = f"py_sum([], {self.emit_expr(extra[0])})" if extra else "0"
+
+            def sink() -> None:
+                self.writeln(f"const {v} = {self.emit_expr(gen.elt)};")
+                if self.int_mode == "exact":
+                    self.writeln(f"{acc} = py_sum_add({acc}, {v});")
+                else:
+                    self.writeln(f"{acc} = (typeof {acc} === \"number\" && typeof {v} === \"number\") ? {acc} + {v} : py_sum_add({acc}, {v});")
+            return self._emit_comprehension(
+                gen.generators, [f"let {acc} = {start};"], sink, [f"return {acc};"], awaits=awaits)
+        if func in ("__min__", "__max__"):
+            name, op = ("min", "<") if func == "__min__" else ("max", ">")
+            empty = self._tmp("empty")
+
+            def sink() -> None:
+                self.writeln(f"const {v} = {self.emit_expr(gen.elt)};")
+                self.writeln(f"if ({empty} || ((typeof {v} === \"number\" && typeof {acc} === \"number\") ? {v} {op} {acc} : py_cmp({v}, {acc}) {op} 0)) {{")
+                self.writeln(f"  {acc} = {v};")
+                self.writeln(f"  {empty} = false;")
+                self.writeln("}")
+            return self._emit_comprehension(
+                gen.generators, [f"let {acc}, {empty} = true;"], sink,
+                [f"if ({empty}) throw new PyError(\"ValueError\", \"{name}() arg is an empty sequence\");", f"return {acc};"], awaits=awaits)
+        assert func == "__str_join__"
+        sep = self._tmp("sep")
+        prologue = [f"const {sep} = {self.emit_expr(extra[0])};"]
+        first = self._tmp("first")
+        prologue.append(f"let {acc} = \"\", {first} = true;")
+
+        def sink() -> None:
+            self.writeln(f"const {v} = {self.emit_expr(gen.elt)};")
+            self.writeln(f"if (!{first}) {acc} += {sep};")
+            self.writeln(f"{first} = false;")
+            self.writeln(f"{acc} += typeof {v} === \"string\" ? {v} : py_str({v});")
+        return self._emit_comprehension(gen.generators, prologue, sink, [f"return {acc};"], awaits=awaits)
+
     # -----------------------------
     # Expressions
     # -----------------------------
@@ -472,6 +1165,8 @@ class Emitter:
         if isinstance(e, Name):
             if self._self_stack and e.id == self._self_stack[-1]:
                 return "this"
+            if e.id == "__name__" and not self._is_declared(e.id):
+                return repr(self.module_name)
             return e.id
 
         if isinstance(e, Const):
@@ -480,6 +1175,8 @@ class Emitter:
             if v is False: return "false"
             if v is None:  return "null"
             if isinstance(v, str): return repr(v)
+            if type(v) is int and abs(v) > _MAX_SAFE_INT and self.int_mode == "exact":
+                return f"{v}n"
             return repr(v)
 
         if isinstance(e, Undef):
@@ -492,8 +1189,29 @@ class Emitter:
                 return f"py_add({self.emit_expr(e.left)}, {self.emit_expr(e.right)})"
             if e.op == "*":
                 return f"py_mul({self.emit_expr(e.left)}, {self.emit_expr(e.right)})"
+            if e.op == "%":
+                left, right = self.emit_expr(e.left), self.emit_expr(e.right)
+                if isinstance(e.left, Name) and 0 < _const_int(e.right) <= _MAX_SAFE_INT:
+                    # JS % already agrees with Python for a non-negative number and positive divisor
+                    return f"(typeof {left} === \"number\" && {left} >= 0 ? {left} % {right} : py_mod({left}, {right}))"
+                return f"py_mod({left}, {right})"
+            if e.op == "**":
+                return f"py_pow({self.emit_expr(e.left)}, {self.emit_expr(e.right)})"
+            if self.int_mode == "exact" and e.op in ("-", "/"):
+                name = "py_sub" if e.op == "-" else "py_truediv"
+                return f"{name}({self.emit_expr(e.left)}, {self.emit_expr(e.right)})"
             return f"({self.emit_expr(e.left)} {e.op} {self.emit_expr(e.right)})"
 
+        if isinstance(e, BoolOp) and _suspends(e):
+            # inline, so an await or yield in an operand stays in the enclosing function
+            temps = [self._expr_tmp("bool") for _ in e.values[:-1]]
+            parts = [self.emit_expr(v) for v in e.values]
+            out = parts[-1]
+            for t, v in reversed(list(zip(temps, parts))):
+                rest, stop = (out, t) if e.op == "and" else (t, out)
+                out = f"({t} = {v}, py_truth({t}) ? {rest} : {stop})"
+            return out
+
         if isinstance(e, BoolOp):
             lines = []
             t = self._tmp("bool")
@@ -514,11 +1232,26 @@ class Emitter:
                     lines.append(f"const {cur} = {self.emit_expr(v)};")
                     prev = cur
                 lines.append(f"return {prev};")
-            return f"(function(){{\n" + "\n".join(lines) + "\n})()"
+            return f"(() => {{\n" + "\n".join(lines) + "\n})()"
 
         if isinstance(e, UnaryNot):
             return f"(!py_truth({self.emit_expr(e.value)}))"
 
+        if isinstance(e, CompareChain) and _suspends(e):
+            # inline, so an await or yield in an operand stays in the enclosing function;
+            # each middle operand is stored once and compared twice
+            left = self.emit_expr(e.left)
+            conds = []
+            for i, (op, comp) in enumerate(zip(e.ops, e.comparators)):
+                right = self.emit_expr(comp)
+                if i < len(e.ops) - 1:
+                    t = self._expr_tmp("cmp")
+                    conds.append(self._compare_op(op, left, f"({t} = {right})"))
+                    left = t
+                else:
+                    conds.append(self._compare_op(op, left, right))
+            return f"({' && '.join(conds)})"
+
         if isinstance(e, CompareChain):
             lines = []
             t_prev = self._tmp("cmp")
@@ -526,24 +1259,10 @@ class Emitter:
             for op, comp in zip(e.ops, e.comparators):
                 t_cur = self._tmp("cmp")
                 lines.append(f"const {t_cur} = {self.emit_expr(comp)};")
-                if op == "in":
-                    cond = f"py_in({t_prev}, {t_cur})"
-                elif op == "not in":
-                    cond = f"!py_in({t_prev}, {t_cur})"
-                elif op == "==":
-                    cond = f"py_eq({t_prev}, {t_cur})"
-                elif op == "!=":
-                    cond = f"!py_eq({t_prev}, {t_cur})"
-                elif op == "is":
-                    cond = f"({t_prev} === {t_cur})"
-                elif op == "is not":
-                    cond = f"({t_prev} !== {t_cur})"
-                else:
-                    cond = f"({t_prev} {op} {t_cur})"
-                lines.append(f"if (!{cond}) return false;")
+                lines.append(f"if (!{self._compare_op(op, t_prev, t_cur)}) return false;")
                 t_prev = t_cur
             lines.append("return true;")
-            return f"(function(){{\n" + "\n".join(lines) + "\n})()"
+            return f"(() => {{\n" + "\n".join(lines) + "\n})()"
 
         if isinstance(e, Compare):
             if e.op == "in":
@@ -572,6 +1291,15 @@ class Emitter:
                 pairs.append(f"{self.emit_expr(k)}: {self.emit_expr(v)}")
             return "({" + ", ".join(pairs) + "})"
 
+        if isinstance(e, FString):
+            return self._emit_fstring(e)
+
+        if isinstance(e, ReturnSlot):
+            return f"py_mret_buf[{e.index}]"
+
+        if isinstance(e, StrBuilderValue):
+            return f"py_sb_value({e.builder})"
+
         if isinstance(e, Subscript):
             return f"py_getitem({self.emit_expr(e.value)}, {self.emit_expr(e.index)})"
 
@@ -585,22 +1313,12 @@ class Emitter:
             return f"{self.emit_expr(e.value)}.{e.attr}"
 
         if isinstance(e, MethodCall):
+            if (isinstance(e.obj, Name) and self._modules.get(e.obj.id) == "py_asyncio"
+                    and e.method == "run" and len(self._scopes) == 1):
+                self._async_main = True
+                return self._await(f"{e.obj.id}.run({', '.join(self.emit_expr(a) for a in e.args)})")
             if isinstance(e.obj, Call) and e.obj.func == "super":
-                base = self._base_stack[-1] if self._base_stack else None
-                segs = []
-                for a in e.args:
-                    if isinstance(a, Starred):
-                        segs.append(f"...py_to_array({self.emit_expr(a.value)})")
-                    elif isinstance(a, Undef):
-                        segs.append("undefined")
-                    else:
-                        segs.append(self.emit_expr(a))
-                if e.method == "__init__":
-                    return f"super({', '.join(segs)})"
-                else:
-                    if not base:
-                        raise RuntimeError("super() call but no base class")
-                    return f"py_super(this, {base}).{e.method}({', '.join(segs)})"
+                return self._emit_super_call(e)
 
             segs = []
             for a in e.args:
@@ -612,75 +1330,141 @@ class Emitter:
                     segs.append(self.emit_expr(a))
             return f"{self.emit_expr(e.obj)}.{e.method}({', '.join(segs)})"
 
+        if isinstance(e, Await):
+            return self._await(self.emit_expr(e.value))
+
+        if isinstance(e, Yield):
+            return f"(yield {'null' if e.value is None else self.emit_expr(e.value)})"
+
+        if isinstance(e, YieldFrom):
+            return f"(yield* py_yield_from({self.emit_expr(e.value)}))"
+
+        if isinstance(e, (ListComp, SetComp, DictComp, GeneratorExp)):
+            return self._emit_collection_comp(e)
+
+        if isinstance(e, Lambda):
+            params = []
+            for p, d in zip(e.params, e.defaults):
+                params.append(p if d is None else f"{p} = {self.emit_expr(d)}")
+            return f"(({', '.join(params)}) => {self.emit_expr(e.body)})"
+
+        if isinstance(e, InlineLet):
+            if not e.bindings:
+                return self.emit_expr(e.body)
+            parts = [f"{name} = {self.emit_expr(v)}" for name, v in e.bindings]
+            return f"({', '.join(parts)}, {self.emit_expr(e.body)})"
+
         if isinstance(e, New):
-            segs = []
-            for a in e.args:
-                if isinstance(a, Starred):
-                    segs.append(f"...py_to_array({self.emit_expr(a.value)})")
-                elif isinstance(a, Undef):
-                    segs.append("undefined")
-                else:
-                    segs.append(self.emit_expr(a))
-            return f"new {e.class_name}({', '.join(segs)})"
+            return f"new {e.class_name}({', '.join(self._emit_call_args(e.args))})"
 
         if isinstance(e, Call):
             if e.func == "print":
-                args_js = ", ".join(self.emit_expr(a) for a in e.args)
-                return f"py_print({args_js})"
+                return self._emit_print(e)
+            if e.func in ("__sum__", "__any__", "__all__", "__min__", "__max__") and e.args and isinstance(e.args[0], GeneratorExp):
+                if e.func not in ("__min__", "__max__") or len(e.args) == 1:
+                    return self._emit_fused(e.func, e.args[0], e.args[1:])
+            if (e.func == "__str_join__" and len(e.args) == 2 and isinstance(e.args[1], GeneratorExp)
+                    and is_str_expr(e.args[0])):
+                # any other receiver may be an object with its own join(), which py_str_join calls
+                return self._emit_fused(e.func, e.args[1], e.args[:1])
+            if e.func == "__any__":
+                return f"py_any({self.emit_expr(e.args[0])})"
+            if e.func == "__all__":
+                return f"py_all({self.emit_expr(e.args[0])})"
             if e.func == "__len__":
                 return f"py_len({self.emit_expr(e.args[0])})"
             if e.func == "__str__":
                 return f"py_str({self.emit_expr(e.args[0])})"
+            if e.func == "__repr__":
+                return f"py_repr({self.emit_expr(e.args[0])})"
             if e.func == "__sorted__":
-                return f"py_sorted({self.emit_expr(e.args[0])})"
+                return f"py_sorted({', '.join(self.emit_expr(a) for a in e.args)})"
+            if e.func == "__divmod__":
+                return f"py_divmod({self.emit_expr(e.args[0])}, {self.emit_expr(e.args[1])})"
             if e.func == "__sum__":
-                return f"py_sum({self.emit_expr(e.args[0])})"
-            if e.func == "__min__":
-                args_js = ", ".join(self.emit_expr(a) for a in e.args)
-                return f"py_min({args_js})"
-            if e.func == "__max__":
-                args_js = ", ".join(self.emit_expr(a) for a in e.args)
-                return f"py_max({args_js})"
+                return f"py_sum({', '.join(self.emit_expr(a) for a in e.args)})"
+            if e.func in ("__min__", "__max__"):
+                return self._emit_minmax(e)
             if e.func == "__zip__":
                 args_js = ", ".join(self.emit_expr(a) for a in e.args)
                 return f"py_zip({args_js})"
+            if e.func == "__iter__":
+                return f"py_iterator({self.emit_expr(e.args[0])})"
+            if e.func == "__next__":
+                args_js = ", ".join(self.emit_expr(a) for a in e.args)
+                return f"py_next({args_js})"
             if e.func == "__str_upper__":      return f"py_str_upper({self.emit_expr(e.args[0])})"
             if e.func == "__str_lower__":      return f"py_str_lower({self.emit_expr(e.args[0])})"
             if e.func == "__str_split__":
                 base = self.emit_expr(e.args[0])
                 sep  = (self.emit_expr(e.args[1]) if len(e.args) > 1 else "null")
                 return f"py_str_split({base}, {sep})"
-            if e.func == "__str_join__":       return f"py_str_join({self.emit_expr(e.args[0])}, {self.emit_expr(e.args[1])})"
+            if e.func == "__str_join__":       return f"py_str_join({', '.join(self.emit_expr(a) for a in e.args)})"
             if e.func == "__str_startswith__": return f"py_str_startswith({self.emit_expr(e.args[0])}, {self.emit_expr(e.args[1])})"
             if e.func == "__str_endswith__":   return f"py_str_endswith({self.emit_expr(e.args[0])}, {self.emit_expr(e.args[1])})"
             if e.func == "__str_replace__":    return f"py_str_replace({self.emit_expr(e.args[0])}, {self.emit_expr(e.args[1])}, {self.emit_expr(e.args[2])})"
             if e.func == "__str_find__":       return f"py_str_find({self.emit_expr(e.args[0])}, {self.emit_expr(e.args[1])})"
-            if e.func == "__list_append__":    return f"py_list_append({self.emit_expr(e.args[0])}, {self.emit_expr(e.args[1])})"
-            if e.func == "__list_pop__":       return f"py_list_pop({self.emit_expr(e.args[0])})"
+            if e.func == "__list_append__":    return f"py_list_append({', '.join(self.emit_expr(a) for a in e.args)})"
+            if e.func == "__list_pop__":       return f"py_list_pop({', '.join(self.emit_expr(a) for a in e.args)})"
+            if e.func == "__dict_items__":     return f"py_dict_items({self.emit_expr(e.args[0])})"
+            if e.func == "__dict_keys__":      return f"py_dict_keys({self.emit_expr(e.args[0])})"
+            if e.func == "__dict_values__":    return f"py_dict_values({self.emit_expr(e.args[0])})"
+            if e.func == "__dict_get__":       return f"py_dict_get({', '.join(self.emit_expr(a) for a in e.args)})"
+            if e.func == "__enumerate__":      return f"py_enumerate({', '.join(self.emit_expr(a) for a in e.args)})"
+            if e.func == "range":              return f"py_range({', '.join(self.emit_expr(a) for a in e.args)})"
+            if e.func == "__list_sort__":      return f"py_list_sort({', '.join(self.emit_expr(a) for a in e.args)})"
 
-            parts_js = []
-            kwargs_obj = self._tmp("kwargs")
-            have_kwargs = False
-            for a in e.args:
-                if isinstance(a, Starred):
-                    parts_js.append(f"...py_to_array({self.emit_expr(a.value)})")
-                elif isinstance(a, KwargPairs):
-                    if not have_kwargs:
-                        have_kwargs = True
-                        self.writeln(f"const {kwargs_obj} = {{}};")
-                    for k, v in a.pairs:
-                        self.writeln(f"{kwargs_obj}[{repr(k)}] = {self.emit_expr(v)};")
-                elif isinstance(a, KwargExp):
-                    if not have_kwargs:
-                        have_kwargs = True
-                        self.writeln(f"const {kwargs_obj} = {{}};")
-                    self.writeln(f"py_kwargs_merge({kwargs_obj}, {self.emit_expr(a.value)});")
-                else:
-                    parts_js.append(self.emit_expr(a))
-            if have_kwargs:
-                call_args_str = ", ".join(parts_js + [kwargs_obj])
-            else:
-                call_args_str = ", ".join(parts_js)
-            return f"{e.func}({call_args_str})"
+            return f"{e.func}({', '.join(self._emit_call_args(e.args))})"
 
         raise NotImplementedError(f"Expr not handled: {type(e).__name__}")
+
+    def _emit_call_args(self, args: List[Expr]) -> List[str]:
+        """JS arguments for a user function call; keyword arguments are collected into one object."""
+        parts_js = []
+        kwargs_obj = self._tmp("kwargs")
+        have_kwargs = False
+        for a in args:
+            if isinstance(a, KwargBind):
+                keywords = [x for x in a.args if isinstance(x, (KwargPairs, KwargExp))]
+                positional = self._emit_call_args([x for x in a.args if x not in keywords])
+                kw = self._emit_call_args(keywords)
+                params = "[" + ", ".join(repr(p) for p in a.params) + "]"
+                parts_js.append(f"...py_bind_kwargs([{', '.join(positional)}], {kw[0] if kw else '{}'}, "
+                                f"{params}, {'true' if a.kwarg else 'false'})")
+            elif isinstance(a, Starred):
+                parts_js.append(f"...py_to_array({self.emit_expr(a.value)})")
+            elif isinstance(a, KwargPairs):
+                if not have_kwargs:
+                    have_kwargs = True
+                    self.writeln(f"const {kwargs_obj} = {{}};")
+                for k, v in a.pairs:
+                    self.writeln(f"{kwargs_obj}[{repr(k)}] = {self.emit_expr(v)};")
+            elif isinstance(a, KwargExp):
+                if not have_kwargs:
+                    have_kwargs = True
+                    self.writeln(f"const {kwargs_obj} = {{}};")
+                self.writeln(f"py_kwargs_merge({kwargs_obj}, {self.emit_expr(a.value)});")
+            else:
+                parts_js.append(self.emit_expr(a))
+        if have_kwargs:
+            parts_js.append(kwargs_obj)
+        return parts_js
+
+    def _emit_super_call(self, e: MethodCall) -> str:
+        # Native `super` resolves through the prototype chain of the method's class, so it
+        # needs no per-call allocation; it is only valid directly in a method or arrow function.
+        if not self._class_stack:
+            raise RuntimeError("super() call outside a class method")
+        cls = self._class_stack[-1]
+        sup = e.obj
+        assert isinstance(sup, Call)
+        start = sup.args[0].id if sup.args and isinstance(sup.args[0], Name) else cls
+        args = self._emit_call_args(e.args)
+        native = self._super_native[-1] is not None and start == cls
+        if e.method == "__init__":
+            if not (native and self._super_native[-1] == "__init__"):
+                raise NotImplementedError("super().__init__() must be called directly in __init__")
+            return f"super({', '.join(args)})"
+        if native:
+            return f"super.{e.method}({', '.join(args)})"
+        return f"py_super_method({start}, {e.method!r}).call({', '.join(['this'] + args)})"
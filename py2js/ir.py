@@ -1,10 +1,11 @@
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import List, Optional, Union
 
 # ===== Modules =====
 @dataclass
 class Module:
     body: List["Stmt"]
+    exports: List[str] = field(default_factory=list)  # names other modules import; always kept
 
 # ===== Base nodes =====
 class Stmt: ...
@@ -29,10 +30,17 @@ class UnpackAssign(Stmt):
     value: "Expr"
     starred_name: Optional[str]
 
+@dataclass
+class Import(Stmt):
+    names: List[str]  # dotted module names
+    asnames: List[Optional[str]] = field(default_factory=list)  # `as` names, parallel to `names` when given
+
 @dataclass
 class ImportFrom(Stmt):
     module: str
     names: List[str]  # only simple names
+    asnames: List[Optional[str]] = field(default_factory=list)
+    level: int = 0  # leading dots of a relative import
 
 @dataclass
 class ExprStmt(Stmt):
@@ -46,10 +54,11 @@ class If(Stmt):
 
 @dataclass
 class For(Stmt):
-    target: str
+    target: Union[str, list]  # a name, or nested lists of names for tuple targets
     iter: "Expr"
     body: List[Stmt]
     orelse: List[Stmt]
+    is_async: bool = False  # async for
 
 @dataclass
 class While(Stmt):
@@ -73,12 +82,16 @@ class Function(Stmt):
     defaults: List[Optional["Expr"]]  # align with params
     vararg: Optional[str] = None      # *args name
     kwarg: Optional[str] = None       # **kwargs name
+    is_generator: bool = False        # body contains yield
+    is_async: bool = False            # async def
 
 @dataclass
 class ClassDef(Stmt):
     name: str
-    bases: List[str]                  # single name base supported
+    bases: List[str]                  # the first one is the JS superclass
     methods: List["Function"]
+    fields: List[str] = field(default_factory=list)  # instance attributes, in layout order
+    class_attrs: List[tuple[str, "Expr"]] = field(default_factory=list)
 
 @dataclass
 class WithItem:
@@ -89,6 +102,7 @@ class WithItem:
 class With(Stmt):
     items: List[WithItem]
     body: List[Stmt]
+    is_async: bool = False  # async with
 
 @dataclass
 class Return(Stmt):
@@ -96,8 +110,9 @@ class Return(Stmt):
 
 @dataclass
 class Raise(Stmt):
-    exc_type: str
+    exc_type: Optional[str]            # builtin exception name; None with `value`, or to re-raise
     message: Optional["Expr"]
+    value: Optional["Expr"] = None     # exception object, e.g. an instance of a user exception class
 
 @dataclass
 class ExceptHandler:
@@ -112,6 +127,21 @@ class Try(Stmt):
     orelse: List[Stmt]
     finalbody: List[Stmt]
 
+@dataclass
+class StrBuilderInit(Stmt):
+    builder: str   # array-backed builder seeded with the current value
+    value: "Expr"
+
+@dataclass
+class MultiReturn(Stmt):
+    values: List["Expr"]  # returned through the shared py_mret buffer instead of a tuple
+
+@dataclass
+class StrBuilderAppend(Stmt):
+    builder: str
+    value: "Expr"
+    checked: bool  # value is not statically known to be a str
+
 # ===== Expressions =====
 @dataclass
 class Name(Expr):
@@ -169,6 +199,12 @@ class KwargPairs(Expr):
 class KwargExp(Expr):
     value: Expr  # for **mapping expansion at call sites
 
+@dataclass
+class KwargBind(Expr):
+    args: List[Expr]   # the call's arguments, including KwargPairs and KwargExp
+    params: List[str]  # callee parameters that keyword arguments are bound to at run time
+    kwarg: bool        # callee takes **kwargs
+
 @dataclass
 class ListLit(Expr):
     elts: List[Expr]
@@ -182,6 +218,63 @@ class DictLit(Expr):
     keys: List[Expr]
     values: List[Expr]
 
+@dataclass
+class Yield(Expr):
+    value: Optional[Expr]
+
+@dataclass
+class YieldFrom(Expr):
+    value: Expr
+
+@dataclass
+class Await(Expr):
+    value: Expr
+
+@dataclass
+class Comprehension:
+    target: Union[str, list]  # same shape as For.target
+    iter: Expr
+    ifs: List[Expr]
+
+@dataclass
+class ListComp(Expr):
+    elt: Expr
+    generators: List[Comprehension]
+
+@dataclass
+class SetComp(Expr):
+    elt: Expr
+    generators: List[Comprehension]
+
+@dataclass
+class DictComp(Expr):
+    key: Expr
+    value: Expr
+    generators: List[Comprehension]
+
+@dataclass
+class GeneratorExp(Expr):
+    elt: Expr
+    generators: List[Comprehension]
+
+@dataclass
+class FormattedValue:
+    value: Expr
+    conversion: Optional[str]  # "s", "r", "a" or None
+    spec: Optional[Expr]       # Const str, or FString for nested replacement fields
+
+@dataclass
+class FString(Expr):
+    parts: List[object]  # literal str pieces and FormattedValue placeholders
+
+@dataclass
+class StrBuilderValue(Expr):
+    builder: str  # joined contents of a StrBuilderInit builder
+
+@dataclass
+class ReturnSlot(Expr):
+    index: int  # value `index` of the MultiReturn that just ran
+
 @dataclass
 class Subscript(Expr):
     value: Expr
@@ -205,6 +298,17 @@ class MethodCall(Expr):
     method: str
     args: List[Expr]
 
+@dataclass
+class Lambda(Expr):
+    params: List[str]
+    defaults: List[Optional[Expr]]  # align with params
+    body: Expr
+
+@dataclass
+class InlineLet(Expr):
+    bindings: List[tuple[str, Expr]]  # temporaries assigned in order, then body is evaluated
+    body: Expr
+
 @dataclass
 class New(Expr):
     class_name: str
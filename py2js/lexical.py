@@ -0,0 +1,72 @@
+"""Lexically scoped runtime bindings (`--runtime-scope lexical`).
+
+    __reg("py_add", function (a, b) {      (function () {
+      ...                             =>   const py_add = function (a, b) {
+    });                                      ...
+    py_print(py_add(1, 2));                };
+                                           (function () {
+                                           py_print(py_add(1, 2));
+                                           })();
+                                           })();
+
+By default the runtime registers its helpers as properties of `globalThis`,
+where other code can see or replace them, and a second bundle in the same
+process reuses the first one's runtime state. In lexical mode each top-level
+`__reg("name", value)` of the runtime becomes a `const` and the runtime and
+the program are wrapped in functions, so nothing is left on `globalThis` and
+every bundle has its own runtime. The program gets its own function scope,
+so its module-level names may still shadow runtime names. This buys
+isolation only: V8 already treats unchanged globals as constants, so helper
+calls are no faster.
+"""
+from functools import lru_cache
+from typing import List, Tuple
+
+from .minify import tokenize
+
+RUNTIME_SCOPES = ("global", "lexical")
+
+_OPEN, _CLOSE = "([{", ")]}"
+
+
+@lru_cache(maxsize=None)
+def lexical_runtime(src: str) -> str:
+    """`src` with every top-level `__reg("name", value);` turned into `const name = value;`."""
+    tokens = tokenize(src)
+    edits: List[Tuple[int, int, str]] = []
+    depth, i = 0, 0
+    while i < len(tokens):
+        tok = tokens[i]
+        if depth == 0 and tok.text == "__reg" and tokens[i + 1].text == "(" and tokens[i + 2].kind == "string" \
+                and tokens[i + 3].text == ",":
+            edits.append((tok.start, tokens[i + 3].start + 1, f"const {tokens[i + 2].text[1:-1]} ="))
+            j, level = i + 1, 0
+            while True:
+                if tokens[j].text in _OPEN:
+                    level += 1
+                elif tokens[j].text in _CLOSE:
+                    level -= 1
+                    if level == 0:
+                        break
+                j += 1
+            edits.append((tokens[j].start, tokens[j].start + 1, ""))
+            i = j + 1
+            continue
+        if tok.kind == "punct" and tok.text in _OPEN:
+            depth += 1
+        elif tok.kind == "punct" and tok.text in _CLOSE:
+            depth -= 1
+        i += 1
+    out = []
+    pos = 0
+    for start, end, text in edits:
+        out.append(src[pos:start])
+        out.append(text)
+        pos = end
+    out.append(src[pos:])
+    return "".join(out)
+
+
+def lexical_bundle(runtime: str, program: str) -> str:
+    """Wrap the lexical `runtime` and `program` so that the program runs in a scope of its own."""
+    return f"(function () {{\n{runtime}\n(function () {{\n{program}\n}})();\n}})();\n"
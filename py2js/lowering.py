@@ -1,13 +1,16 @@
 import ast
-from typing import List, Optional, Dict, Tuple
+import copy
+from typing import List, Optional, Dict, Sequence, Tuple
 from .ir import (
     Module, Stmt, Expr,
-    Assign, AssignAttr, UnpackAssign, ImportFrom, ExprStmt, If, For, While, Break, Continue, Pass,
+    Assign, AssignAttr, UnpackAssign, Import, ImportFrom, ExprStmt, If, For, While, Break, Continue, Pass,
     Block, Function, ClassDef, With, WithItem, Return, Raise, Try, ExceptHandler,
-    Name, Const, Undef, BinOp, BoolOp, UnaryNot, Call, Starred, KwargPairs, KwargExp,
-    Compare, CompareChain, ListLit, TupleLit, DictLit, Subscript, Slice,
-    Attribute, MethodCall, New,
+    Name, Const, Undef, BinOp, BoolOp, UnaryNot, Call, Starred, KwargPairs, KwargExp, KwargBind,
+    Compare, CompareChain, ListLit, TupleLit, DictLit, FString, FormattedValue, Subscript, Slice,
+    Attribute, MethodCall, New, Lambda,
+    Comprehension, ListComp, SetComp, DictComp, GeneratorExp, Yield, YieldFrom, Await,
 )
+from .passes.visit import walk
 
 SUPPORTED_BINOPS = {
     ast.Add: "+",
@@ -16,6 +19,7 @@ SUPPORTED_BINOPS = {
     ast.Div: "/",
     ast.FloorDiv: "//",
     ast.Mod: "%",
+    ast.Pow: "**",
 }
 
 SUPPORTED_CMPOPS = {
@@ -35,22 +39,116 @@ _BUILTIN_METHODS = {
     "upper": "__str_upper__", "lower": "__str_lower__", "split": "__str_split__",
     "join": "__str_join__", "startswith": "__str_startswith__", "endswith": "__str_endswith__",
     "replace": "__str_replace__", "find": "__str_find__",
-    "append": "__list_append__", "pop": "__list_pop__",
+    "append": "__list_append__", "pop": "__list_pop__", "sort": "__list_sort__",
+    "items": "__dict_items__", "keys": "__dict_keys__", "values": "__dict_values__", "get": "__dict_get__",
 }
 
+# keyword-only arguments accepted by builtins, in emitted argument order
+_BUILTIN_KEYWORDS = {
+    "__sorted__": ["key", "reverse"],
+    "__list_sort__": ["key", "reverse"],
+}
+
+# builtins that may be passed around as values, e.g. sorted(words, key=len)
+_BUILTIN_VALUES = {"len": "py_len", "str": "py_str", "repr": "py_repr"}
+
 _SINGLE_ARG_BUILTINS = {
     "len": "__len__",
+    "any": "__any__",
+    "all": "__all__",
     "str": "__str__",
-    "sorted": "__sorted__",
-    "sum": "__sum__",
+    "repr": "__repr__",
+    "iter": "__iter__",
+}
+
+# builtin exception classes and their bases, as in py_exc_bases in the runtime
+BUILTIN_EXCEPTIONS: Dict[str, Optional[str]] = {
+    "BaseException": None, "SystemExit": "BaseException", "KeyboardInterrupt": "BaseException",
+    "GeneratorExit": "BaseException", "Exception": "BaseException",
+    "ArithmeticError": "Exception", "FloatingPointError": "ArithmeticError", "OverflowError": "ArithmeticError",
+    "ZeroDivisionError": "ArithmeticError", "AssertionError": "Exception", "AttributeError": "Exception",
+    "BufferError": "Exception", "EOFError": "Exception", "ImportError": "Exception",
+    "ModuleNotFoundError": "ImportError", "LookupError": "Exception", "IndexError": "LookupError",
+    "KeyError": "LookupError", "MemoryError": "Exception", "NameError": "Exception",
+    "UnboundLocalError": "NameError", "OSError": "Exception", "FileExistsError": "OSError",
+    "FileNotFoundError": "OSError", "PermissionError": "OSError", "TimeoutError": "OSError",
+    "ReferenceError": "Exception", "RuntimeError": "Exception", "NotImplementedError": "RuntimeError",
+    "RecursionError": "RuntimeError", "StopIteration": "Exception", "StopAsyncIteration": "Exception",
+    "SyntaxError": "Exception", "SystemError": "Exception", "TypeError": "Exception", "ValueError": "Exception",
+    "UnicodeError": "ValueError", "Warning": "Exception",
 }
 
-_VARIADIC_BUILTINS = {"min": "__min__", "max": "__max__", "zip": "__zip__"}
+# exception classes of asyncio; asyncio.TimeoutError is the builtin TimeoutError
+_ASYNCIO_EXCEPTIONS = {
+    "CancelledError": "CancelledError", "TimeoutError": "TimeoutError", "InvalidStateError": "InvalidStateError",
+    "QueueEmpty": "QueueEmpty", "QueueFull": "QueueFull",
+}
+
+_VARIADIC_BUILTINS = {"min": "__min__", "max": "__max__", "zip": "__zip__", "next": "__next__"}
 
 class _LowerCtx:
-    def __init__(self, func_params: Dict[str, List[str]], class_names: set[str]):
+    def __init__(self, func_params: Dict[str, List[str]], class_names: set[str],
+                 func_kwargs: Optional[set[str]] = None,
+                 class_bases: Optional[Dict[str, List[str]]] = None,
+                 methods: Optional[Dict[str, Dict[str, Tuple[List[str], bool]]]] = None):
         self.func_params = func_params
         self.class_names = class_names
+        self.func_kwargs = func_kwargs or set()  # functions that take **kwargs
+        self.class_bases = class_bases or {}
+        self.methods = methods or {}  # class -> method -> (parameters after self, takes **kwargs)
+        self.class_stack: List[str] = []
+        self.dataclass_fields: Dict[str, List[Tuple[str, Optional[Expr]]]] = {}  # class -> (field, default)
+        self.class_slots: Dict[str, List[str]] = {}  # class without a __dict__ -> its slots, with inherited ones
+        self.namespaces: set[str] = set()  # local (dotted) names bound to project modules
+        self.type_names: Dict[str, str] = {}  # imported class -> its Python type name
+        self.asyncio_names: set[str] = set()  # local names bound to the asyncio module
+        self.local_scopes: List[set[str]] = []  # names bound in each enclosing function, innermost last
+
+    def adopt(self, local: str, other: "_LowerCtx", name: Optional[str]) -> None:
+        """Make `other`'s definition `name` known here as `local`; a None name binds the whole module."""
+        if name is None:
+            self.namespaces.add(local)
+            for n in list(other.func_params) + sorted(other.class_names):
+                self.adopt(f"{local}.{n}", other, n)
+            return
+        if name in other.func_params:
+            self.func_params[local] = other.func_params[name]
+            if name in other.func_kwargs:
+                self.func_kwargs.add(local)
+        if name not in other.class_names:
+            return
+        self.class_names.add(local)
+        self.type_names[local] = other.type_names.get(name, name)
+        # the base chain keeps the names the defining module gives it
+        cls, target = name, local
+        while True:
+            self.methods[target] = other.methods.get(cls, {})
+            self.class_bases[target] = other.class_bases.get(cls, [])
+            if cls in other.dataclass_fields:
+                self.dataclass_fields[target] = other.dataclass_fields[cls]
+            if cls in other.class_slots:
+                self.class_slots[target] = other.class_slots[cls]
+            bases = other.class_bases.get(cls)
+            if not bases or bases[0] in self.methods:
+                return
+            cls = target = bases[0]
+
+    def signature(self, cls: str, method: str) -> Optional[Tuple[List[str], bool]]:
+        """Signature of `cls.method` if it resolves to a user-defined method."""
+        seen: set[str] = set()
+        while cls in self.methods and cls not in seen:
+            seen.add(cls)
+            if method in self.methods[cls]:
+                return self.methods[cls][method]
+            bases = self.class_bases.get(cls)
+            if not bases:
+                return None
+            cls = bases[0]
+        return None
+
+    def super_signature(self, start: str, method: str) -> Optional[Tuple[List[str], bool]]:
+        bases = self.class_bases.get(start)
+        return self.signature(bases[0], method) if bases else None
 
 
 def _lower_func_args(
@@ -77,30 +175,291 @@ def _lower_args(ctx: _LowerCtx, args: list[ast.expr]) -> List[Expr]:
     return result
 
 
+def _lower_call_args(ctx: _LowerCtx, node: ast.Call, signature: Optional[Tuple[List[str], bool]]) -> List[Expr]:
+    """Positional arguments, with keywords naming one of the callee's parameters moved into their slot."""
+    params = signature[0] if signature else []
+    if signature and node.keywords and (any(kw.arg is None for kw in node.keywords)
+                                        or any(isinstance(a, ast.Starred) for a in node.args)):
+        # which parameters the keywords fill depends on the run-time argument count and mapping keys
+        return [KwargBind(args=_lower_call_args(ctx, node, None), params=params, kwarg=signature[1])]
+    final_args = _lower_args(ctx, node.args)
+    kw_pairs: List[Tuple[str, Expr]] = []
+    kw_exps: List[Expr] = []
+    for kw in node.keywords:
+        if kw.arg is None:
+            kw_exps.append(_lower_expr(ctx, kw.value))
+        elif kw.arg in params:
+            idx = params.index(kw.arg)
+            while len(final_args) <= idx:
+                final_args.append(Undef())
+            if not isinstance(final_args[idx], Undef):
+                raise NotImplementedError(f"Multiple values for argument '{kw.arg}'")
+            final_args[idx] = _lower_expr(ctx, kw.value)
+        else:
+            kw_pairs.append((kw.arg, _lower_expr(ctx, kw.value)))
+    while final_args and isinstance(final_args[-1], Undef):
+        final_args.pop()
+    if (kw_pairs or kw_exps) and not any(isinstance(a, Starred) for a in final_args):
+        final_args.extend(Undef() for _ in range(len(params) - len(final_args)))  # keywords go after the parameters
+    if kw_pairs:
+        final_args.append(KwargPairs(pairs=kw_pairs))
+    for ex in kw_exps:
+        final_args.append(KwargExp(value=ex))
+    if signature and signature[1] and not (kw_pairs or kw_exps):
+        # a callee taking **kwargs always gets a keywords object, so with *args it can tell
+        # the last positional argument from the keywords
+        if any(isinstance(a, Starred) for a in final_args):
+            return [KwargBind(args=final_args, params=params, kwarg=True)]
+        final_args.extend(Undef() for _ in range(len(params) - len(final_args)))
+        final_args.append(DictLit(keys=[], values=[]))
+    return final_args
+
+
+def _lower_super_call(ctx: _LowerCtx, sup: Call, method: str, node: ast.Call) -> MethodCall:
+    if not ctx.class_stack:
+        raise NotImplementedError("super() is only supported inside class methods")
+    if sup.args and not (len(sup.args) == 2 and isinstance(sup.args[0], Name)):
+        raise NotImplementedError("super() takes no arguments or (Class, self)")
+    start = sup.args[0].id if sup.args else ctx.class_stack[-1]  # type: ignore[attr-defined]
+    signature = ctx.super_signature(start, method)
+    if signature is None and node.keywords:
+        raise NotImplementedError(f"Keyword arguments to super().{method}() need a user-defined base method")
+    return MethodCall(obj=sup, method=method, args=_lower_call_args(ctx, node, signature))
+
+
+def _slot_names(value: ast.expr) -> List[str]:
+    items = value.elts if isinstance(value, (ast.Tuple, ast.List)) else [value]
+    if not all(isinstance(x, ast.Constant) and isinstance(x.value, str) for x in items):
+        raise NotImplementedError("__slots__ must be a string or a tuple or list of strings")
+    return [x.value for x in items]  # type: ignore[attr-defined]
+
+
+def _instance_fields(declared: List[str], methods: List[Function]) -> List[str]:
+    """`declared` followed by every other attribute a method assigns on its `self`, in order."""
+    fields = list(dict.fromkeys(declared))
+    for m in methods:
+        if not m.params:
+            continue
+        for n in walk(m):
+            if (isinstance(n, AssignAttr) and isinstance(n.obj, Name) and n.obj.id == m.params[0]
+                    and n.attr not in fields):
+                fields.append(n.attr)
+    return fields
+
+
+_DATACLASS_OPTIONS = ("init", "repr")
+# options accepted only with the value whose behavior the generated class already has
+_DATACLASS_FIXED = {"eq": True, "slots": False}
+
+
+def _dataclass_options(node: ast.ClassDef) -> Optional[Dict[str, bool]]:
+    """The options of a `@dataclass` decorator on `node`, or None if it has none."""
+    options: Optional[Dict[str, bool]] = None
+    for d in node.decorator_list:
+        target = d.func if isinstance(d, ast.Call) else d
+        if not (isinstance(target, ast.Name) and target.id == "dataclass"
+                or isinstance(target, ast.Attribute) and target.attr == "dataclass"):
+            raise NotImplementedError("Only @dataclass is supported as a class decorator")
+        options = {"init": True, "repr": True}
+        for kw in d.keywords if isinstance(d, ast.Call) else []:
+            if not isinstance(kw.value, ast.Constant):
+                raise NotImplementedError(f"Unsupported dataclass option: {kw.arg}")
+            if kw.arg in _DATACLASS_FIXED and bool(kw.value.value) == _DATACLASS_FIXED[kw.arg]:
+                continue
+            if kw.arg not in _DATACLASS_OPTIONS:
+                raise NotImplementedError(f"Unsupported dataclass option: {kw.arg}={kw.value.value!r}")
+            options[kw.arg] = bool(kw.value.value)
+    return options
+
+
+def _is_classvar(annotation: ast.expr) -> bool:
+    target = annotation.value if isinstance(annotation, ast.Subscript) else annotation
+    return (isinstance(target, ast.Name) and target.id == "ClassVar"
+            or isinstance(target, ast.Attribute) and target.attr == "ClassVar")
+
+
+def _dataclass_fields(node: ast.ClassDef) -> List[Tuple[str, Optional[ast.expr]]]:
+    """(name, default) of each field a dataclass declares itself."""
+    return [(b.target.id, b.value) for b in node.body
+            if isinstance(b, ast.AnnAssign) and isinstance(b.target, ast.Name) and not _is_classvar(b.annotation)]
+
+
+def _lower_field_default(ctx: _LowerCtx, value: Optional[ast.expr]) -> Optional[Expr]:
+    # Parameter defaults are evaluated on every call, so a default_factory becomes the default itself.
+    if value is None:
+        return None
+    if not (isinstance(value, ast.Call) and (isinstance(value.func, ast.Name) and value.func.id == "field"
+                                             or isinstance(value.func, ast.Attribute) and value.func.attr == "field")):
+        return _lower_expr(ctx, value)
+    options = {kw.arg: kw.value for kw in value.keywords}
+    if value.args or set(options) - {"default", "default_factory"}:
+        raise NotImplementedError("field() supports only default and default_factory")
+    if "default" in options:
+        return _lower_expr(ctx, options["default"])
+    factory = options.get("default_factory")
+    if factory is None:
+        return None
+    if isinstance(factory, ast.Name) and factory.id in ("list", "dict"):
+        return ListLit(elts=[]) if factory.id == "list" else DictLit(keys=[], values=[])
+    if isinstance(factory, ast.Lambda) and not factory.args.args:
+        return _lower_expr(ctx, factory.body)
+    return _lower_expr(ctx, ast.Call(func=factory, args=[], keywords=[]))
+
+
+def _dataclass_methods(cls: str, options: Dict[str, bool], inherited: List[Tuple[str, Optional[Expr]]],
+                       own: List[Tuple[str, Optional[Expr]]], defined: set[str]) -> List[Function]:
+    """The `__init__` and `__repr__` that @dataclass generates, unless the class defines them."""
+    fields = inherited + own
+    out: List[Function] = []
+    if options["init"] and "__init__" not in defined:
+        body: List[Stmt] = []
+        if inherited:
+            body.append(ExprStmt(expr=MethodCall(obj=Call(func="super"), method="__init__",
+                                                 args=[Name(f) for f, _ in inherited])))
+        body += [AssignAttr(obj=Name("self"), attr=f, value=Name(f)) for f, _ in own]
+        if "__post_init__" in defined:
+            body.append(ExprStmt(expr=MethodCall(obj=Name("self"), method="__post_init__", args=[])))
+        out.append(Function(name="__init__", params=["self"] + [f for f, _ in fields], body=body,
+                            defaults=[None] + [copy.deepcopy(d) for _, d in fields]))
+    if options["repr"] and "__repr__" not in defined:
+        parts: List[object] = [f"{cls}("]
+        for i, (f, _) in enumerate(fields):
+            parts.append(f"{', ' if i else ''}{f}=")
+            parts.append(FormattedValue(value=Attribute(value=Name("self"), attr=f), conversion="r", spec=None))
+        parts.append(")")
+        value: Expr = FString(parts=parts) if fields else Const(f"{cls}()")
+        out.append(Function(name="__repr__", params=["self"], body=[Return(value=value)], defaults=[None]))
+    return out
+
+
+def _with_builtin_keywords(ctx: _LowerCtx, func: str, args: List[Expr], keywords: list[ast.keyword]) -> List[Expr]:
+    names = _BUILTIN_KEYWORDS.get(func, [])
+    extra: List[Expr] = [Undef() for _ in names]
+    for kw in keywords:
+        if kw.arg is None or kw.arg not in names:
+            raise NotImplementedError(f"Unsupported keyword argument for builtin: {kw.arg or '**'}")
+        extra[names.index(kw.arg)] = _lower_expr(ctx, kw.value)
+    out = args + extra
+    while out and isinstance(out[-1], Undef):
+        out.pop()
+    return out
+
+
+def _is_generator(func: ast.FunctionDef) -> bool:
+    todo: list[ast.AST] = list(func.body)
+    while todo:
+        n = todo.pop()
+        if isinstance(n, (ast.Yield, ast.YieldFrom)):
+            return True
+        if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef)):
+            continue
+        todo.extend(ast.iter_child_nodes(n))
+    return False
+
+
+def _local_names(args: ast.arguments, body: List[ast.AST]) -> set[str]:
+    """Names a function binds: its parameters and every name stored in its body outside nested scopes."""
+    params = args.posonlyargs + args.args + args.kwonlyargs + [a for a in (args.vararg, args.kwarg) if a]
+    names = {a.arg for a in params}
+    declared_global: set[str] = set()
+    todo: list[ast.AST] = list(body)
+    while todo:
+        n = todo.pop()
+        if isinstance(n, ast.Name) and isinstance(n.ctx, (ast.Store, ast.Del)):
+            names.add(n.id)
+        elif isinstance(n, ast.ExceptHandler) and n.name:
+            names.add(n.name)
+        elif isinstance(n, (ast.Import, ast.ImportFrom)):
+            names.update((a.asname or a.name).split(".")[0] for a in n.names)
+        elif isinstance(n, ast.Global):
+            declared_global.update(n.names)
+        if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(n.name)
+            continue
+        if isinstance(n, ast.Lambda):
+            continue
+        todo.extend(ast.iter_child_nodes(n))
+    return names - declared_global
+
+
+def _dotted(node: ast.expr) -> Optional[str]:
+    """`a.b.c` for a chain of attribute loads on a name, else None."""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        prefix = _dotted(node.value)
+        return f"{prefix}.{node.attr}" if prefix else None
+    return None
+
+
+def _lower_for_target(target: ast.expr):
+    if isinstance(target, ast.Name):
+        return target.id
+    if isinstance(target, (ast.Tuple, ast.List)):
+        return [_lower_for_target(t) for t in target.elts]
+    raise NotImplementedError("For-loop target must be a name or a tuple of names")
+
+
+def _lower_comprehensions(ctx: _LowerCtx, generators: list[ast.comprehension]) -> List[Comprehension]:
+    out: List[Comprehension] = []
+    for g in generators:
+        if g.is_async:
+            raise NotImplementedError("Async comprehensions not supported")
+        out.append(Comprehension(
+            target=_lower_for_target(g.target),
+            iter=_lower_expr(ctx, g.iter),
+            ifs=[_lower_expr(ctx, c) for c in g.ifs],
+        ))
+    return out
+
+
 def lower(py_src: str) -> Module:
+    return lower_module(py_src)[0]
+
+
+def lower_module(py_src: str, imports: Sequence[Tuple[str, _LowerCtx, Optional[str]]] = ()
+                 ) -> Tuple[Module, _LowerCtx]:
+    """Lower one module of a project. `imports` are (local name, context of the defining module,
+    name there) for each definition imported from an already lowered module; a None name binds
+    the whole module."""
     tree = ast.parse(py_src)
+    ctx = _LowerCtx(func_params={}, class_names=set())
+    for local, other, name in imports:
+        ctx.adopt(local, other, name)
 
-    func_params: Dict[str, List[str]] = {}
-    class_names: set[str] = set()
+    dataclass_names: Dict[str, List[str]] = {}
     for node in tree.body:
-        if isinstance(node, ast.FunctionDef):
-            func_params[node.name] = [a.arg for a in node.args.args]
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            ctx.func_params[node.name] = [a.arg for a in node.args.args]
+            if node.args.kwarg:
+                ctx.func_kwargs.add(node.name)
         if isinstance(node, ast.ClassDef):
-            class_names.add(node.name)
-
-    ctx = _LowerCtx(func_params=func_params, class_names=class_names)
-    return Module(body=[_lower_stmt(ctx, s) for s in tree.body])
+            ctx.class_names.add(node.name)
+            ctx.class_bases[node.name] = [b for b in map(_dotted, node.bases) if b]
+            ctx.methods[node.name] = {
+                b.name: ([a.arg for a in b.args.args[1:]], b.args.kwarg is not None)
+                for b in node.body if isinstance(b, (ast.FunctionDef, ast.AsyncFunctionDef))}
+            options = _dataclass_options(node)
+            if options is not None:
+                base = ctx.class_bases[node.name][0] if ctx.class_bases[node.name] else None
+                inherited = (dataclass_names[base] if base in dataclass_names
+                             else [f for f, _ in ctx.dataclass_fields.get(base or "", [])])
+                dataclass_names[node.name] = inherited + [f for f, _ in _dataclass_fields(node)]
+                if options["init"] and "__init__" not in ctx.methods[node.name]:
+                    ctx.methods[node.name]["__init__"] = (dataclass_names[node.name], False)
+
+    return Module(body=[_lower_stmt(ctx, s) for s in tree.body]), ctx
 
 def _lower_stmt(ctx: _LowerCtx, node: ast.stmt) -> Stmt:
+    if isinstance(node, ast.Import):
+        ctx.asyncio_names.update(a.asname or a.name for a in node.names if a.name == "asyncio")
+        return Import(names=[a.name for a in node.names], asnames=[a.asname for a in node.names])
+
     if isinstance(node, ast.ImportFrom):
-        if node.module is None:
-            raise NotImplementedError("Relative imports not supported")
-        names = []
-        for alias in node.names:
-            if alias.asname:
-                raise NotImplementedError("No aliases yet")
-            names.append(alias.name)
-        return ImportFrom(module=node.module, names=names)
+        if any(a.name == "*" for a in node.names):
+            raise NotImplementedError("'from ... import *' not supported")
+        return ImportFrom(module=node.module or "", names=[a.name for a in node.names],
+                          asnames=[a.asname for a in node.names], level=node.level)
 
     if isinstance(node, ast.Assign):
         if len(node.targets) != 1:
@@ -186,15 +545,14 @@ def _lower_stmt(ctx: _LowerCtx, node: ast.stmt) -> Stmt:
             orelse=[_lower_stmt(ctx, s) for s in node.orelse],
         )
 
-    if isinstance(node, ast.For):
-        if not isinstance(node.target, ast.Name):
-            raise NotImplementedError("For-loop target must be a simple name")
+    if isinstance(node, (ast.For, ast.AsyncFor)):
         it = _lower_expr(ctx, node.iter)
         return For(
-            target=node.target.id,
+            target=_lower_for_target(node.target),
             iter=it,
             body=[_lower_stmt(ctx, s) for s in node.body],
             orelse=[_lower_stmt(ctx, s) for s in node.orelse],
+            is_async=isinstance(node, ast.AsyncFor),
         )
 
     if isinstance(node, ast.While):
@@ -208,60 +566,123 @@ def _lower_stmt(ctx: _LowerCtx, node: ast.stmt) -> Stmt:
     if isinstance(node, ast.Continue): return Continue()
     if isinstance(node, ast.Pass): return Pass()
 
-    if isinstance(node, ast.FunctionDef):
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
         params, defaults, vararg, kwarg = _lower_func_args(ctx, node.args)
+        ctx.local_scopes.append(_local_names(node.args, node.body))
+        body = [_lower_stmt(ctx, s) for s in node.body]
+        ctx.local_scopes.pop()
         return Function(
             name=node.name,
             params=params,
-            body=[_lower_stmt(ctx, s) for s in node.body],
+            body=body,
             defaults=defaults,
             vararg=vararg,
             kwarg=kwarg,
+            is_generator=_is_generator(node),
+            is_async=isinstance(node, ast.AsyncFunctionDef),
         )
 
     if isinstance(node, ast.ClassDef):
         methods: List[Function] = []
+        options = _dataclass_options(node)
+        slots: List[str] = []
+        has_slots = False
+        declared: List[str] = []  # annotated without a value
+        class_attrs: List[Tuple[str, Expr]] = []
+        ctx.class_stack.append(node.name)
         for b in node.body:
-            if isinstance(b, ast.FunctionDef):
+            if isinstance(b, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                if isinstance(b, ast.AsyncFunctionDef) and b.name == "__init__":
+                    raise NotImplementedError("__init__ cannot be async")
                 params, defaults, vararg, kwarg = _lower_func_args(ctx, b.args)
+                ctx.local_scopes.append(_local_names(b.args, b.body))
+                body = [_lower_stmt(ctx, s) for s in b.body]
+                ctx.local_scopes.pop()
                 methods.append(Function(
                     name=b.name,
                     params=params,
-                    body=[_lower_stmt(ctx, s) for s in b.body],
+                    body=body,
                     defaults=defaults,
                     vararg=vararg,
                     kwarg=kwarg,
+                    is_generator=_is_generator(b),
+                    is_async=isinstance(b, ast.AsyncFunctionDef),
                 ))
+            elif isinstance(b, ast.Pass) or (isinstance(b, ast.Expr) and isinstance(b.value, ast.Constant)
+                                             and isinstance(b.value.value, str)):
+                continue  # `pass` and docstrings
+            elif isinstance(b, ast.Assign) and len(b.targets) == 1 and isinstance(b.targets[0], ast.Name):
+                if b.targets[0].id == "__slots__":
+                    slots, has_slots = _slot_names(b.value), True
+                else:
+                    class_attrs.append((b.targets[0].id, _lower_expr(ctx, b.value)))
+            elif isinstance(b, ast.AnnAssign) and isinstance(b.target, ast.Name):
+                if options is not None and not _is_classvar(b.annotation):
+                    continue  # a dataclass field
+                if b.value is not None:
+                    class_attrs.append((b.target.id, _lower_expr(ctx, b.value)))
+                elif not _is_classvar(b.annotation):
+                    declared.append(b.target.id)
             else:
-                raise NotImplementedError("Only methods supported inside class")
+                raise NotImplementedError("Only methods, attributes and __slots__ supported inside class")
         bases = []
         for base in node.bases:
-            if isinstance(base, ast.Name):
-                bases.append(base.id)
+            if isinstance(base, ast.Name) or _dotted(base) in ctx.class_names:
+                bases.append(_dotted(base) or "")
             else:
                 raise NotImplementedError("Only simple base names supported")
-        return ClassDef(name=node.name, bases=bases, methods=methods)
-
-    if isinstance(node, ast.With):
+        if has_slots and all(b == "object" or b in ctx.class_slots for b in bases):
+            # every class in the chain declares __slots__, so instances have no __dict__
+            allowed = slots + [a for b in bases for a in ctx.class_slots.get(b, [])]
+            for attr in _instance_fields([], methods):
+                if attr not in allowed:
+                    raise NotImplementedError(f"'{node.name}' object attribute '{attr}' is not in __slots__")
+            ctx.class_slots[node.name] = allowed
+        own_fields: List[str] = []
+        if options is not None:
+            inherited = ctx.dataclass_fields.get(bases[0], []) if bases else []
+            if bases and bases[0] not in ctx.dataclass_fields:
+                raise NotImplementedError("A dataclass can only derive from another dataclass")
+            own = [(f, _lower_field_default(ctx, v)) for f, v in _dataclass_fields(node)]
+            ctx.dataclass_fields[node.name] = inherited + own
+            defined = {m.name for m in methods}
+            methods = _dataclass_methods(node.name, options, inherited, own, defined) + methods
+            own_fields = [f for f, _ in own]
+        ctx.class_stack.pop()
+        return ClassDef(name=node.name, bases=bases, methods=methods,
+                        fields=_instance_fields(slots + own_fields + declared, methods),
+                        class_attrs=class_attrs)
+
+    if isinstance(node, (ast.With, ast.AsyncWith)):
         items: List[WithItem] = []
         for it in node.items:
             if it.optional_vars is not None and not isinstance(it.optional_vars, ast.Name):
                 raise NotImplementedError("with only supports 'as name'")
             items.append(WithItem(context_expr=_lower_expr(ctx, it.context_expr),
                                   optional_vars=(it.optional_vars.id if it.optional_vars else None)))
-        return With(items=items, body=[_lower_stmt(ctx, s) for s in node.body])
+        return With(items=items, body=[_lower_stmt(ctx, s) for s in node.body], is_async=isinstance(node, ast.AsyncWith))
 
     if isinstance(node, ast.Return):
         return Return(value=_lower_expr(ctx, node.value) if node.value else None)
 
     if isinstance(node, ast.Raise):
         if node.exc is None:
-            raise NotImplementedError("raise without exception not supported in v1")
+            return Raise(exc_type=None, message=None)  # re-raise the exception being handled
+        if isinstance(node.exc, ast.Attribute) and _dotted(node.exc) in ctx.class_names:
+            return Raise(exc_type=None, message=None, value=New(class_name=_dotted(node.exc) or "", args=[]))
+        if isinstance(node.exc, ast.Call) and _dotted(node.exc.func) in ctx.class_names:
+            return Raise(exc_type=None, message=None, value=_lower_expr(ctx, node.exc))
         if isinstance(node.exc, ast.Call) and isinstance(node.exc.func, ast.Name):
             etype = node.exc.func.id
+            if etype in ctx.class_names:
+                return Raise(exc_type=None, message=None, value=_lower_expr(ctx, node.exc))
             msg = _lower_expr(ctx, node.exc.args[0]) if node.exc.args else None
             return Raise(exc_type=etype, message=msg)
         if isinstance(node.exc, ast.Name):
+            if node.exc.id in ctx.class_names:
+                return Raise(exc_type=None, message=None, value=New(class_name=node.exc.id, args=[]))
+            if node.exc.id not in BUILTIN_EXCEPTIONS:
+                return Raise(exc_type=None, message=None, value=_lower_expr(ctx, node.exc))
             return Raise(exc_type=node.exc.id, message=None)
         raise NotImplementedError("Only simple 'raise Name(...)' supported in v1")
 
@@ -270,8 +691,14 @@ def _lower_stmt(ctx: _LowerCtx, node: ast.stmt) -> Stmt:
         for h in node.handlers:
             if h.type is None:
                 handlers.append(ExceptHandler(type_name=None, varname=h.name, body=[_lower_stmt(ctx, s) for s in h.body]))
-            elif isinstance(h.type, ast.Name):
-                handlers.append(ExceptHandler(type_name=h.type.id, varname=h.name, body=[_lower_stmt(ctx, s) for s in h.body]))
+            elif isinstance(h.type, ast.Name) or _dotted(h.type) in ctx.class_names:
+                type_name = _dotted(h.type) or ""
+                handlers.append(ExceptHandler(type_name=ctx.type_names.get(type_name, type_name), varname=h.name,
+                                              body=[_lower_stmt(ctx, s) for s in h.body]))
+            elif (isinstance(h.type, ast.Attribute) and isinstance(h.type.value, ast.Name)
+                    and h.type.value.id in ctx.asyncio_names and h.type.attr in _ASYNCIO_EXCEPTIONS):
+                handlers.append(ExceptHandler(type_name=_ASYNCIO_EXCEPTIONS[h.type.attr], varname=h.name,
+                                              body=[_lower_stmt(ctx, s) for s in h.body]))
             else:
                 raise NotImplementedError("Only simple 'except Name' supported in v1")
         return Try(
@@ -285,8 +712,38 @@ def _lower_stmt(ctx: _LowerCtx, node: ast.stmt) -> Stmt:
 
 def _lower_expr(ctx: _LowerCtx, node: ast.expr) -> Expr:
     if isinstance(node, ast.Name):
+        if (node.id in _BUILTIN_VALUES and node.id not in ctx.func_params and node.id not in ctx.class_names
+                and not any(node.id in names for names in ctx.local_scopes)):
+            return Name(id=_BUILTIN_VALUES[node.id])
         return Name(id=node.id)
 
+    if isinstance(node, ast.Lambda):
+        if node.args.vararg or node.args.kwarg or node.args.kwonlyargs:
+            raise NotImplementedError("lambda supports positional parameters only")
+        params, defaults, _, _ = _lower_func_args(ctx, node.args)
+        ctx.local_scopes.append(_local_names(node.args, [node.body]))
+        body = _lower_expr(ctx, node.body)
+        ctx.local_scopes.pop()
+        return Lambda(params=params, defaults=defaults, body=body)
+
+    if isinstance(node, (ast.ListComp, ast.SetComp, ast.GeneratorExp)):
+        gens = _lower_comprehensions(ctx, node.generators)
+        kind = {ast.ListComp: ListComp, ast.SetComp: SetComp, ast.GeneratorExp: GeneratorExp}[type(node)]
+        return kind(elt=_lower_expr(ctx, node.elt), generators=gens)
+
+    if isinstance(node, ast.DictComp):
+        gens = _lower_comprehensions(ctx, node.generators)
+        return DictComp(key=_lower_expr(ctx, node.key), value=_lower_expr(ctx, node.value), generators=gens)
+
+    if isinstance(node, ast.Await):
+        return Await(value=_lower_expr(ctx, node.value))
+
+    if isinstance(node, ast.Yield):
+        return Yield(value=_lower_expr(ctx, node.value) if node.value is not None else None)
+
+    if isinstance(node, ast.YieldFrom):
+        return YieldFrom(value=_lower_expr(ctx, node.value))
+
     if isinstance(node, ast.Constant):
         return Const(value=node.value)
 
@@ -316,6 +773,8 @@ def _lower_expr(ctx: _LowerCtx, node: ast.expr) -> Expr:
         if isinstance(node.op, ast.Not):
             return UnaryNot(value=_lower_expr(ctx, node.operand))
         if isinstance(node.op, ast.USub):
+            if isinstance(node.operand, ast.Constant) and type(node.operand.value) in (int, float):
+                return Const(-node.operand.value)  # keeps the sign of -0.0, which 0 - 0.0 drops
             return BinOp(left=Const(0), op='-', right=_lower_expr(ctx, node.operand))
         if isinstance(node.op, ast.UAdd):
             return _lower_expr(ctx, node.operand)
@@ -326,11 +785,21 @@ def _lower_expr(ctx: _LowerCtx, node: ast.expr) -> Expr:
 
     if isinstance(node, ast.Call):
         if isinstance(node.func, ast.Attribute):
+            path = _dotted(node.func)
+            if path in ctx.class_names:
+                return New(class_name=path, args=_lower_call_args(ctx, node, ctx.signature(path, "__init__")))
+            if path in ctx.func_params:
+                return Call(func=path, args=_lower_call_args(ctx, node, (ctx.func_params[path], path in ctx.func_kwargs)))
             obj = _lower_expr(ctx, node.func.value)
             attr = node.func.attr
-            if attr in _BUILTIN_METHODS:
+            if attr in _BUILTIN_METHODS and _dotted(node.func.value) not in ctx.namespaces:
+                func = _BUILTIN_METHODS[attr]
                 args = _lower_args(ctx, node.args)
-                return Call(func=_BUILTIN_METHODS[attr], args=[obj] + args)
+                if func in _BUILTIN_KEYWORDS:
+                    return Call(func=func, args=_with_builtin_keywords(ctx, func, [obj] + args, node.keywords))
+                return Call(func=func, args=[obj] + args)
+            if isinstance(obj, Call) and obj.func == "super":
+                return _lower_super_call(ctx, obj, attr, node)
             args = _lower_args(ctx, node.args)
             return MethodCall(obj=obj, method=attr, args=args)
 
@@ -342,44 +811,56 @@ def _lower_expr(ctx: _LowerCtx, node: ast.expr) -> Expr:
                     raise NotImplementedError(f"{fname}() takes exactly one argument")
                 return Call(func=_SINGLE_ARG_BUILTINS[fname], args=[_lower_expr(ctx, node.args[0])])
 
+            if fname == "sorted":
+                if len(node.args) != 1:
+                    raise NotImplementedError("sorted() takes exactly one positional argument")
+                args = [_lower_expr(ctx, node.args[0])]
+                return Call(func="__sorted__", args=_with_builtin_keywords(ctx, "__sorted__", args, node.keywords))
+
+            if fname == "sum":
+                if not 1 <= len(node.args) <= 2:
+                    raise NotImplementedError("sum() takes one iterable and an optional start")
+                args = [_lower_expr(ctx, a) for a in node.args]
+                for kw in node.keywords:
+                    if kw.arg != "start" or len(args) != 1:
+                        raise NotImplementedError(f"Unsupported keyword argument for builtin: {kw.arg or '**'}")
+                    args.append(_lower_expr(ctx, kw.value))
+                return Call(func="__sum__", args=args)
+
+            if fname == "divmod":
+                if len(node.args) != 2 or node.keywords:
+                    raise NotImplementedError("divmod() takes exactly two arguments")
+                return Call(func="__divmod__", args=[_lower_expr(ctx, a) for a in node.args])
+
+            if fname == "enumerate":
+                if not 1 <= len(node.args) <= 2:
+                    raise NotImplementedError("enumerate() takes one iterable and an optional start")
+                args = [_lower_expr(ctx, a) for a in node.args]
+                for kw in node.keywords:
+                    if kw.arg != "start" or len(args) != 1:
+                        raise NotImplementedError(f"Unsupported keyword argument for builtin: {kw.arg or '**'}")
+                    args.append(_lower_expr(ctx, kw.value))
+                return Call(func="__enumerate__", args=args)
+
+            if fname in ("min", "max"):
+                args = _lower_args(ctx, node.args)
+                pairs: List[Tuple[str, Expr]] = []
+                for kw in node.keywords:
+                    if kw.arg not in ("key", "default"):
+                        raise NotImplementedError(f"Unsupported keyword argument for builtin: {kw.arg or '**'}")
+                    pairs.append((kw.arg, _lower_expr(ctx, kw.value)))
+                if pairs:
+                    args.append(KwargPairs(pairs=pairs))
+                return Call(func=_VARIADIC_BUILTINS[fname], args=args)
+
             if fname in _VARIADIC_BUILTINS:
                 return Call(func=_VARIADIC_BUILTINS[fname], args=_lower_args(ctx, node.args))
 
             if fname in ctx.class_names:
-                return New(class_name=fname, args=_lower_args(ctx, node.args))
-
-            params = ctx.func_params.get(fname, [])
-            final_args: List[Expr] = []
-            pos_index = 0
-            for a in node.args:
-                if isinstance(a, ast.Starred):
-                    final_args.append(Starred(_lower_expr(ctx, a.value)))
-                else:
-                    final_args.append(_lower_expr(ctx, a))
-                    pos_index += 1
-            kw_pairs: List[Tuple[str, Expr]] = []
-            kw_exps: List[Expr] = []
-            if node.keywords:
-                for kw in node.keywords:
-                    if kw.arg is None:
-                        kw_exps.append(_lower_expr(ctx, kw.value))
-                    else:
-                        if kw.arg in params:
-                            idx = params.index(kw.arg)
-                            while len(final_args) <= idx:
-                                final_args.append(Undef())
-                            if not isinstance(final_args[idx], Undef):
-                                raise NotImplementedError(f"Multiple values for argument '{kw.arg}'")
-                            final_args[idx] = _lower_expr(ctx, kw.value)
-                        else:
-                            kw_pairs.append((kw.arg, _lower_expr(ctx, kw.value)))
-            while final_args and isinstance(final_args[-1], Undef):
-                final_args.pop()
-            if kw_pairs:
-                final_args.append(KwargPairs(pairs=kw_pairs))
-            for ex in kw_exps:
-                final_args.append(KwargExp(value=ex))
-            return Call(func=fname, args=final_args)
+                return New(class_name=fname, args=_lower_call_args(ctx, node, ctx.signature(fname, "__init__")))
+
+            signature = (ctx.func_params[fname], fname in ctx.func_kwargs) if fname in ctx.func_params else None
+            return Call(func=fname, args=_lower_call_args(ctx, node, signature))
 
     if isinstance(node, ast.Compare):
         ops = []
@@ -407,20 +888,22 @@ def _lower_expr(ctx: _LowerCtx, node: ast.expr) -> Expr:
         return Subscript(value=_lower_expr(ctx, node.value), index=_lower_expr(ctx, sl))
 
     if isinstance(node, ast.JoinedStr):
-        parts = []
+        parts: List[object] = []
         for v in node.values:
             if isinstance(v, ast.Constant) and isinstance(v.value, str):
-                parts.append(Const(v.value))
+                parts.append(v.value)
             elif isinstance(v, ast.FormattedValue):
-                inner = _lower_expr(ctx, v.value)
-                parts.append(Call(func="__str__", args=[inner]))
+                conversion = chr(v.conversion) if v.conversion > 0 else None
+                spec: Optional[Expr] = None
+                if v.format_spec is not None:
+                    spec = _lower_expr(ctx, v.format_spec)
+                    if isinstance(spec, Const) and spec.value == "":
+                        spec = None
+                parts.append(FormattedValue(value=_lower_expr(ctx, v.value), conversion=conversion, spec=spec))
             else:
                 raise NotImplementedError(f"Unsupported f-string piece: {type(v).__name__}")
-        if not parts:
-            return Const("")
-        expr = parts[0]
-        for p in parts[1:]:
-            expr = BinOp(left=expr, op="+", right=p)
-        return expr
+        if all(isinstance(p, str) for p in parts):
+            return Const("".join(parts))  # type: ignore[arg-type]
+        return FString(parts=parts)
 
     raise NotImplementedError(f"Unsupported expression: {type(node).__name__}")
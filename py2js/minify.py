@@ -0,0 +1,184 @@
+"""Compact JavaScript output for `--minify`.
+
+    function average($a) {                 function average($a){let $b;$b=0;for(const $0 of py_iter($a)){...
+      let $b;                        =>
+      $b = 0;
+      for (const __py_it_1 of py_iter($a)) {
+
+The emitted code and the runtime are tokenized (strings, template literals,
+regular expressions and comments are recognized) and written back without
+comments, indentation or optional spaces. A line break is kept only where it
+may end a statement, so automatic semicolon insertion sees the same code.
+Emitter and pass temporaries (`__py_*`) get short `$0`, `$1`, ... names; the
+locals of Python functions are shortened on the IR beforehand (see
+passes/rename.py).
+"""
+import re
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional
+
+_IDENT = re.compile(r"[A-Za-z_$#\u0080-\uffff][\w$\u0080-\uffff]*")
+_NUMBER = re.compile(r"0[xXbBoO][\da-fA-F_]+n?|(?:\d[\d_]*\.?[\d_]*|\.\d[\d_]*)(?:[eE][+-]?\d+)?n?")
+_PUNCT = sorted(
+    ">>>= ... === !== **= <<= >>= >>> &&= ||= ??= => == != <= >= && || ?? ?. ++ -- += -= *= /= %= &= |= ^= "
+    "** << >> { } ( ) [ ] ; , < > + - * / % & | ^ ! ~ ? : = . @".split(),
+    key=len, reverse=True)
+# after these a `/` starts a regular expression rather than a division
+_REGEX_AFTER = {"return", "typeof", "instanceof", "in", "of", "new", "delete", "void", "throw", "case", "do",
+                "else", "yield", "await"}
+_TEMPORARY = re.compile(r"__py_\w+")
+TEMPORARIES = "<temporaries>"  # name-map key of the renamed temporaries
+
+
+class Token(NamedTuple):
+    kind: str   # "ident", "number", "string", "template", "regex" or "punct"
+    text: str
+    newline: bool  # a line break precedes the token
+    start: int = 0  # offset in the source
+
+
+def _template_chunk(src: str, i: int) -> int:
+    """End of the template text starting at `i`: just after the closing backtick or a `${`."""
+    while i < len(src):
+        c = src[i]
+        if c == "\\":
+            i += 2
+        elif c == "`":
+            return i + 1
+        elif c == "$" and src.startswith("${", i):
+            return i + 2
+        else:
+            i += 1
+    raise ValueError("unterminated template literal")
+
+
+def tokenize(src: str) -> List[Token]:
+    tokens: List[Token] = []
+    braces: List[bool] = []  # for each open `{`: does it open a template substitution?
+    i, newline = 0, False
+    while i < len(src):
+        c = src[i]
+        if c in " \t\r\n\ufeff":
+            newline = newline or c == "\n"
+            i += 1
+            continue
+        if src.startswith("//", i):
+            end = src.find("\n", i)
+            i = len(src) if end < 0 else end
+            continue
+        if src.startswith("/*", i):
+            end = src.index("*/", i + 2) + 2
+            newline = newline or "\n" in src[i:end]
+            i = end
+            continue
+        start = i
+        if c in "'\"":
+            i += 1
+            while src[i] != c:
+                i += 2 if src[i] == "\\" else 1
+            i += 1
+            kind = "string"
+        elif c == "`" or (c == "}" and braces and braces[-1]):
+            if c == "}":
+                braces.pop()
+            i = _template_chunk(src, i + 1)
+            if src.endswith("${", 0, i):
+                braces.append(True)
+            kind = "template"
+        elif c == "/" and _regex_allowed(tokens):
+            i += 1
+            in_class = False
+            while in_class or src[i] != "/":
+                if src[i] == "\\":
+                    i += 1
+                elif src[i] == "[":
+                    in_class = True
+                elif src[i] == "]":
+                    in_class = False
+                i += 1
+            i += 1
+            while i < len(src) and (src[i].isalnum() or src[i] == "_"):
+                i += 1
+            kind = "regex"
+        elif c.isdigit() or (c == "." and src[i + 1:i + 2].isdigit()):
+            i = _NUMBER.match(src, i).end()  # type: ignore[union-attr]
+            kind = "number"
+        elif _IDENT.match(src, i):
+            i = _IDENT.match(src, i).end()  # type: ignore[union-attr]
+            kind = "ident"
+        else:
+            op = next((p for p in _PUNCT if src.startswith(p, i)), None)
+            if op is None:
+                raise ValueError(f"unexpected character {c!r} at offset {i}")
+            i += len(op)
+            kind = "punct"
+            if op == "{":
+                braces.append(False)
+            elif op == "}" and braces:
+                braces.pop()
+        tokens.append(Token(kind, src[start:i], newline, start))
+        newline = False
+    return tokens
+
+
+def _regex_allowed(tokens: List[Token]) -> bool:
+    if not tokens:
+        return True
+    prev = tokens[-1]
+    if prev.kind == "ident":
+        return prev.text in _REGEX_AFTER
+    if prev.kind == "punct":
+        return prev.text not in (")", "]")
+    return prev.kind == "template" and prev.text.endswith("${")
+
+
+def _ends_statement(prev: Token) -> bool:
+    return prev.kind in ("ident", "number", "string", "regex") or prev.text in (")", "]", "}", "++", "--") or (
+        prev.kind == "template" and prev.text.endswith("`"))
+
+
+def _starts_statement(tok: Token) -> bool:
+    if tok.kind == "ident":
+        return tok.text not in ("else", "catch", "finally", "in", "of", "instanceof")
+    return tok.kind != "punct" or tok.text in ("(", "[", "{", "++", "--", "+", "-", "!", "~", "/")
+
+
+def _word(ch: str) -> bool:
+    return ch.isalnum() or ch in "_$#" or ch >= "\u0080"
+
+
+def join(tokens: List[Token]) -> str:
+    out: List[str] = []
+    prev: Optional[Token] = None
+    for tok in tokens:
+        if prev is not None:
+            a, b = prev.text[-1], tok.text[0]
+            if tok.newline and _ends_statement(prev) and _starts_statement(tok):
+                out.append("\n")
+            elif (_word(a) and _word(b)) or (prev.kind == "number" and b == ".") or (a in "+-" and b == a) or (
+                    a == "/" and b in "/*"):
+                out.append(" ")
+        out.append(tok.text)
+        prev = tok
+    return "".join(out)
+
+
+def minify_js(src: str, temporaries: Optional[Dict[str, str]] = None) -> str:
+    """Compact `src`. With `temporaries`, `__py_*` variables are renamed too and the dict
+    receives {short: original}."""
+    tokens = tokenize(src)
+    if temporaries is not None:
+        short: Dict[str, str] = {}
+        for i, tok in enumerate(tokens):
+            if tok.kind == "ident" and _TEMPORARY.fullmatch(tok.text) and not (
+                    i and tokens[i - 1].text in (".", "?.")):
+                if tok.text not in short:
+                    short[tok.text] = f"${len(short)}"
+                    temporaries[short[tok.text]] = tok.text
+                tokens[i] = tok._replace(text=short[tok.text])
+    return join(tokens)
+
+
+@lru_cache(maxsize=None)
+def minify_runtime(src: str) -> str:
+    return minify_js(src)
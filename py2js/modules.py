@@ -0,0 +1,328 @@
+"""Multi-module projects: one ES module per Python module.
+
+    app/main.py                           out/main.mjs
+        from geometry import area             import "./pyrt.mjs";
+        print(area(2))               =>       import { area } from "./geometry.mjs";
+    app/geometry.py                           py_print(area(2));
+        def area(r): ...                  out/geometry.mjs
+        def unused(): ...                     function area(r) { ... }
+                                              export { area };
+
+An `import` or `from ... import` of a module in the project tree (`a/b.py` or
+`a/b/__init__.py` under the root, or a relative import) becomes an ES import;
+other imports keep their single-file meaning (runtime modules such as `math`,
+no-ops otherwise). Modules are lowered and emitted dependencies first, so
+calls into an imported module see its signatures (keyword arguments,
+constructors, dataclass fields, base classes) and subclasses see the layout
+of imported classes.
+
+By default every module-level name is exported. In whole-program mode a
+module exports only the names other modules use, through `from m import x`
+or as `m.x` on an imported module (any other use of the module object keeps
+all of it), and unused definitions are dropped even at -O0.
+
+Attributes of an imported project module cannot be assigned or deleted
+(`config.DEBUG = True`): ES module namespaces are read-only, so this is
+rejected when the project is compiled.
+
+Import cycles are allowed; definitions of a module later in the cycle are
+imported without their signatures. ES imports are hoisted, so an import inside
+a function or an `if` runs when the importing module is loaded.
+"""
+import ast
+import json
+import os
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from .emit_js import Emitter
+from .ir import Module, Import, ImportFrom, Function, ClassDef
+from .lowering import lower_module, _LowerCtx
+from .minify import TEMPORARIES, minify_js, minify_runtime
+from .passes import PassManager, remove_unused_definitions, shorten_locals
+from .passes.visit import bound_names, walk_stmts
+
+RUNTIME_FILE = "pyrt.mjs"
+NAME_MAP_FILE = "names.json"
+
+
+@dataclass
+class Binding:
+    local: str           # bound name, dotted for `import a.b`
+    module: str          # project module it comes from
+    name: Optional[str]  # imported definition; None binds the module itself
+
+
+@dataclass
+class SourceModule:
+    name: str  # dotted; a package is named after its directory
+    path: Path
+    is_package: bool
+    source: str
+    tree: ast.Module
+    bindings: List[Binding] = field(default_factory=list)
+
+    @property
+    def out_path(self) -> str:
+        parts = self.name.split(".") + (["__init__"] if self.is_package else [])
+        return "/".join(parts) + ".mjs"
+
+
+class Project:
+    def __init__(self, entry: Path, root: Optional[Path] = None) -> None:
+        entry = entry.resolve()
+        self.root = (root or entry.parent).resolve()
+        rel = entry.relative_to(self.root).with_suffix("")
+        if rel.name == "__init__":
+            raise ValueError("the entry point must be a module, not a package")
+        self.entry = ".".join(rel.parts)
+        self.modules: Dict[str, SourceModule] = {}
+        self._load()
+
+    # -- discovery ------------------------------------------------------
+    def _find(self, name: str) -> Optional[Tuple[Path, bool]]:
+        if not name:
+            return None
+        base = self.root.joinpath(*name.split("."))
+        if base.with_name(base.name + ".py").is_file():
+            return base.with_name(base.name + ".py"), False
+        if (base / "__init__.py").is_file():
+            return base / "__init__.py", True
+        return None
+
+    def _exists(self, name: str) -> bool:
+        return name in self.modules or self._find(name) is not None
+
+    def _load(self) -> None:
+        queue = deque([self.entry])
+        while queue:
+            name = queue.popleft()
+            if name in self.modules:
+                continue
+            found = self._find(name)
+            if found is None:
+                raise ImportError(f"No module named {name!r} under {self.root}")
+            path, is_package = found
+            src = path.read_text(encoding="utf-8")
+            mod = SourceModule(name, path, is_package, src, ast.parse(src, str(path)))
+            self.modules[name] = mod
+            for node in ast.walk(mod.tree):
+                if isinstance(node, ast.Import):
+                    mod.bindings += self._import(node.names)
+                elif isinstance(node, ast.ImportFrom):
+                    mod.bindings += self._import_from(mod, node.module or "", node.level, node.names)
+            queue.extend(b.module for b in mod.bindings)
+
+    def _import(self, aliases: List[ast.alias]) -> List[Binding]:
+        out: List[Binding] = []
+        for a in aliases:
+            if not self._exists(a.name):
+                continue
+            if a.asname:
+                out.append(Binding(a.asname, a.name, None))
+                continue
+            parts = a.name.split(".")
+            for i in range(1, len(parts) + 1):  # `import a.b` binds `a` and loads both
+                prefix = ".".join(parts[:i])
+                if self._exists(prefix):
+                    out.append(Binding(prefix, prefix, None))
+        return out
+
+    def _import_from(self, mod: SourceModule, module: str, level: int, aliases: List[ast.alias]) -> List[Binding]:
+        base = module
+        if level:
+            package = mod.name.split(".") if mod.is_package else mod.name.split(".")[:-1]
+            if level - 1 > len(package) or (level - 1 == len(package) and not module):
+                raise ImportError(f"{mod.name}: attempted relative import beyond top-level package")
+            base = ".".join(package[:len(package) - level + 1] + ([module] if module else []))
+        out: List[Binding] = []
+        for a in aliases:
+            local = a.asname or a.name
+            if self._exists(f"{base}.{a.name}" if base else a.name):
+                out.append(Binding(local, f"{base}.{a.name}" if base else a.name, None))
+            elif self._exists(base):
+                out.append(Binding(local, base, a.name))
+            elif level:
+                raise ImportError(f"{mod.name}: no module named {'.' * level}{module}")
+        return out
+
+    def order(self) -> List[str]:
+        """Modules in dependency order (imported before importing, as far as cycles allow)."""
+        done: List[str] = []
+        seen: Set[str] = set()
+
+        def visit(name: str) -> None:
+            seen.add(name)
+            for b in self.modules[name].bindings:
+                if b.module not in seen:
+                    visit(b.module)
+            done.append(name)
+        visit(self.entry)
+        return done
+
+    # -- analysis -------------------------------------------------------
+    def _used_names(self) -> Tuple[Dict[str, Set[str]], Set[str]]:
+        """Names each module's importers use, and the modules whose object escapes as a whole."""
+        used: Dict[str, Set[str]] = {name: set() for name in self.modules}
+        whole: Set[str] = set()
+        for mod in self.modules.values():
+            namespaces = {b.local: b.module for b in mod.bindings if b.name is None}
+            for b in mod.bindings:
+                if b.name is not None:
+                    used[b.module].add(b.name)
+            roots = {local.split(".")[0] for local in namespaces}
+            parents = {child: node for node in ast.walk(mod.tree) for child in ast.iter_child_nodes(node)}
+            for node in ast.walk(mod.tree):
+                if not (isinstance(node, ast.Name) and node.id in roots):
+                    continue
+                path, cur = node.id, node
+                while True:
+                    parent = parents.get(cur)
+                    if isinstance(parent, ast.Attribute) and parent.value is cur:
+                        if f"{path}.{parent.attr}" in namespaces:
+                            path, cur = f"{path}.{parent.attr}", parent
+                            continue
+                        if path in namespaces:
+                            if not isinstance(parent.ctx, ast.Load):
+                                # an ES module namespace is read-only
+                                raise NotImplementedError(
+                                    f"{mod.name}: cannot assign or delete {path}.{parent.attr}; "
+                                    f"attributes of module {namespaces[path]!r} are read-only")
+                            used[namespaces[path]].add(parent.attr)
+                    elif path in namespaces:
+                        whole.add(namespaces[path])
+                    break
+        return used, whole
+
+    # -- compilation ----------------------------------------------------
+    def compile(self, opt_level: int = 1, whole_program: bool = False, int_mode: str = "fast",
+                exceptions: str = "cheap", minify: bool = False,
+                name_map: Optional[Dict[str, Dict[str, Dict[str, str]]]] = None) -> Dict[str, str]:
+        """Output path (relative to the output directory) -> JavaScript, runtime included.
+        With `minify`, `name_map` receives each module's map of shortened names (see cli.transpile)."""
+        order = self.order()
+        lowered: Dict[str, Tuple[Module, _LowerCtx]] = {}
+        for name in order:
+            imports = [(b.local, lowered[b.module][1], b.name) for b in self.modules[name].bindings
+                       if b.module in lowered]
+            mod, ctx = lower_module(self.modules[name].source, imports)
+            self._strip_imports(self.modules[name], mod)
+            lowered[name] = (mod, ctx)
+
+        used, whole = self._used_names()
+        for name in order:
+            mod, _ = lowered[name]
+            source = self.modules[name]
+            defined = {s.name for s in mod.body if isinstance(s, (Function, ClassDef))}
+            defined |= {n for n in bound_names(mod.body) if not n.startswith("__py_")}
+            reexported = {b.local for b in source.bindings if "." not in b.local}
+            for n in sorted(used[name] - defined - reexported):
+                if any(b.module == name and b.name == n for m in self.modules.values() for b in m.bindings):
+                    raise ImportError(f"cannot import name {n!r} from {name!r}")
+            exports = used[name] & (defined | reexported)
+            if not whole_program or name in whole:
+                exports |= defined
+            mod.exports = sorted(exports)
+
+        runtime = (Path(__file__).parent / "runtime" / "pyrt.js").read_text(encoding="utf-8")
+        out: Dict[str, str] = {RUNTIME_FILE: minify_runtime(runtime) if minify else runtime}
+        maps = name_map if name_map is not None else {}
+        emitters: Dict[str, Emitter] = {}
+        for name in order:
+            mod, _ = lowered[name]
+            mod = PassManager.for_level(opt_level).run(mod)
+            if whole_program and opt_level == 0:
+                mod = remove_unused_definitions(mod)
+            source = self.modules[name]
+            names: Dict[str, Dict[str, str]] = {}
+            if minify:
+                mod = shorten_locals(mod, names)
+            em = Emitter(int_mode=int_mode, exceptions=exceptions, esm=True,
+                         module_name="__main__" if name == self.entry else name)
+            for b in source.bindings:
+                if b.module not in emitters:
+                    continue
+                classes = sorted(lowered[b.module][1].class_names) if b.name is None else [b.name]
+                for cls in classes:
+                    em.adopt(b.local if b.name is not None else f"{b.local}.{cls}", emitters[b.module], cls)
+            body = em.emit_module(mod)
+            emitters[name] = em
+            declared = em.module_bindings() | {s.name for s in mod.body if isinstance(s, (Function, ClassDef))}
+            exports = [n for n in mod.exports if n in declared or n in {b.local for b in source.bindings}]
+            js = "\n".join(self._imports(source) + [body] + (
+                [f"export {{ {', '.join(exports)} }};"] if exports else [])) + "\n"
+            if minify:
+                temporaries: Dict[str, str] = {}
+                js = minify_js(js, temporaries) + "\n"
+                if temporaries:
+                    names[TEMPORARIES] = temporaries
+                maps[source.out_path] = names
+            out[source.out_path] = js
+        return out
+
+    def _strip_imports(self, source: SourceModule, mod: Module) -> None:
+        """Drop the names bound by ES imports from the module's import statements."""
+        for n in walk_stmts(mod.body):
+            if isinstance(n, Import):
+                keep = [(name, asname) for name, asname in zip(n.names, n.asnames)
+                        if not self._import([ast.alias(name, asname)])]
+                n.names, n.asnames = [k[0] for k in keep], [k[1] for k in keep]
+            elif isinstance(n, ImportFrom):
+                keep = [(name, asname) for name, asname in zip(n.names, n.asnames)
+                        if not self._import_from(source, n.module, n.level, [ast.alias(name, asname)])]
+                n.names, n.asnames = [k[0] for k in keep], [k[1] for k in keep]
+
+    def _imports(self, source: SourceModule) -> List[str]:
+        here = os.path.dirname(source.out_path)
+
+        def spec(path: str) -> str:
+            rel = os.path.relpath(path, here or ".").replace(os.sep, "/")
+            return rel if rel.startswith("../") else "./" + rel
+
+        lines = [f'import "{spec(RUNTIME_FILE)}";']
+        named: Dict[str, List[str]] = {}
+        namespaces: Dict[str, str] = {}
+        for b in source.bindings:
+            if b.name is None:
+                namespaces.setdefault(b.local, b.module)
+            else:
+                entry = b.name if b.name == b.local else f"{b.name} as {b.local}"
+                if entry not in named.setdefault(b.module, []):
+                    named[b.module].append(entry)
+        for module, entries in named.items():
+            lines.append(f'import {{ {", ".join(entries)} }} from "{spec(self.modules[module].out_path)}";')
+        dotted_roots = {local.split(".")[0] for local in namespaces if "." in local}
+        for local, module in namespaces.items():
+            ident = local if local.split(".")[0] not in dotted_roots else "__py_mod_" + local.replace(".", "_")
+            lines.append(f'import * as {ident} from "{spec(self.modules[module].out_path)}";')
+
+        def tree(path: str) -> str:
+            children = sorted({local[len(path) + 1:].split(".")[0] for local in namespaces
+                               if local.startswith(path + ".")})
+            if not children:
+                return "__py_mod_" + path.replace(".", "_")
+            own = ["..." + "__py_mod_" + path.replace(".", "_")] if path in namespaces else []
+            return "{" + ", ".join(own + [f"{c}: {tree(f'{path}.{c}')}" for c in children]) + "}"
+        for root in sorted(dotted_roots):
+            lines.append(f"const {root} = {tree(root)};")
+        return lines
+
+
+def build(entry: Path, out_dir: Path, root: Optional[Path] = None, opt_level: int = 1,
+          whole_program: bool = False, int_mode: str = "fast", exceptions: str = "cheap",
+          minify: bool = False) -> List[Path]:
+    """Compile the project that `entry` belongs to into `out_dir`; returns the files written.
+    A minified build also writes the shortened names of every module to NAME_MAP_FILE."""
+    name_map: Dict[str, Dict[str, Dict[str, str]]] = {}
+    files = Project(entry, root).compile(opt_level, whole_program, int_mode, exceptions, minify, name_map)
+    if minify:
+        files[NAME_MAP_FILE] = json.dumps(name_map, indent=1, sort_keys=True) + "\n"
+    written: List[Path] = []
+    for rel, js in files.items():
+        path = out_dir / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(js, encoding="utf-8")
+        written.append(path)
+    return written
@@ -0,0 +1,15 @@
+"""IR-to-IR optimization passes run between lowering and emission."""
+from .strbuilder import string_builders
+from .inline import inline_calls
+from .fold import fold_constants, propagate_constants
+from .licm import hoist_invariants
+from .tuples import unpack_tuples
+from .dce import remove_unreachable, remove_unused_definitions
+from .rename import shorten_locals
+from .manager import PassManager, OPT_LEVELS
+
+__all__ = [
+    "string_builders", "inline_calls", "fold_constants", "propagate_constants",
+    "hoist_invariants", "unpack_tuples", "remove_unreachable", "remove_unused_definitions", "shorten_locals",
+    "PassManager", "OPT_LEVELS",
+]
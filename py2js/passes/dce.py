@@ -0,0 +1,105 @@
+"""Dead-code elimination: unreachable statements and unreferenced definitions.
+
+`remove_unreachable` splices `if`/`while` statements whose test is a literal
+(usually left behind by fold.py) into the branch that runs, and drops
+statements after `return`, `raise`, `break` and `continue` in the same block.
+
+`remove_unused_definitions` drops module-level functions and classes that no
+code reachable from the module body refers to, by name, call, instantiation,
+base class or exception type. Definitions whose defaults or class attributes
+are not literals are kept, since evaluating them may have side effects. Names
+in `Module.exports` are used by other modules and always kept.
+"""
+from typing import Dict, List, Set
+
+from ..ir import (
+    Module, Stmt, If, While, For, With, Try, Block, Function, ClassDef, Return, MultiReturn, Raise, Break, Continue,
+    Name, Const, Call, New,
+)
+from .visit import walk
+
+_TERMINATORS = (Return, MultiReturn, Raise, Break, Continue)
+
+
+def _block(stmts: List[Stmt]) -> List[Stmt]:
+    out: List[Stmt] = []
+    for s in stmts:
+        if isinstance(s, If) and isinstance(s.test, Const):
+            out.extend(_block(s.body if s.test.value else s.orelse))
+        elif isinstance(s, While) and isinstance(s.test, Const) and not s.test.value:
+            out.extend(_block(s.orelse))
+        else:
+            _descend(s)
+            out.append(s)
+        if out and isinstance(out[-1], _TERMINATORS):
+            break
+    return out
+
+
+def _descend(s: Stmt) -> None:
+    if isinstance(s, Function):
+        s.body = _block(s.body)
+    elif isinstance(s, ClassDef):
+        for m in s.methods:
+            m.body = _block(m.body)
+    elif isinstance(s, (If, While, For)):
+        s.body = _block(s.body)
+        s.orelse = _block(s.orelse)
+    elif isinstance(s, (With, Block)):
+        s.body = _block(s.body)
+    elif isinstance(s, Try):
+        s.body = _block(s.body)
+        for h in s.handlers:
+            h.body = _block(h.body)
+        s.orelse = _block(s.orelse)
+        s.finalbody = _block(s.finalbody)
+
+
+def remove_unreachable(mod: Module) -> Module:
+    mod.body = _block(mod.body)
+    return mod
+
+
+def _references(node: object) -> Set[str]:
+    out: Set[str] = set()
+    for n in walk(node):
+        if isinstance(n, Name):
+            out.add(n.id)
+        elif isinstance(n, Call):
+            out.add(n.func)
+        elif isinstance(n, New):
+            out.add(n.class_name)
+        elif isinstance(n, ClassDef):
+            out.update(n.bases)
+        elif isinstance(n, Raise) and n.exc_type:
+            out.add(n.exc_type)
+        elif isinstance(n, Try):
+            out.update(h.type_name for h in n.handlers if h.type_name)
+    return out
+
+
+def _removable(s: Stmt) -> bool:
+    if isinstance(s, ClassDef):
+        return all(_removable(m) for m in s.methods) and all(isinstance(v, Const) for _, v in s.class_attrs)
+    return isinstance(s, Function) and all(d is None or isinstance(d, Const) for d in s.defaults)
+
+
+def remove_unused_definitions(mod: Module) -> Module:
+    defs: Dict[str, List[Stmt]] = {}
+    for s in mod.body:
+        if isinstance(s, (Function, ClassDef)):
+            defs.setdefault(s.name, []).append(s)
+    candidates = {name: ss[0] for name, ss in defs.items() if len(ss) == 1 and _removable(ss[0])}
+    live: Set[str] = set(mod.exports)
+    for s in mod.body:
+        if not (isinstance(s, (Function, ClassDef)) and candidates.get(s.name) is s):
+            live |= _references(s)
+    pending = [name for name in candidates if name in live]
+    while pending:
+        for ref in _references(candidates[pending.pop()]):
+            if ref in candidates and ref not in live:
+                live.add(ref)
+                pending.append(ref)
+    mod.body = [s for s in mod.body if not (isinstance(s, (Function, ClassDef))
+                                            and candidates.get(s.name) is s and s.name not in live)]
+    return mod
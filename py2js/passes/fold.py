@@ -0,0 +1,208 @@
+"""Constant folding and propagation of never-reassigned module constants.
+
+    SECONDS = 60 * 60 * 24        SECONDS = 86400
+    DEBUG = False           =>    DEBUG = False
+    if DEBUG and n > 1:           if False:
+        ...                           ...
+
+Folding evaluates operators on literal operands with Python's own semantics
+(`-7 // 2 == -4`, `-7 % 3 == 2`, `"ab" * 2`), so the result is what CPython
+would print. Nothing is folded when Python would raise (division by zero,
+mixed str/int), when an int leaves JS's exactly representable range, when a
+float is not finite, when an exponent is above 64, or when a string would grow
+past a small size limit.
+bool operands are left to the runtime.
+
+A module-level `NAME = <literal>` is propagated when NAME is bound nowhere
+else in the module: no other assignment, loop or `with` target, parameter,
+import or definition with that name, in any scope.
+"""
+import math
+import operator
+from typing import Callable, Dict, List, Optional
+
+from ..ir import (
+    Module, Expr, Assign, UnpackAssign, For, With, Try, Function, ClassDef, Import, ImportFrom,
+    Name, Const, BinOp, BoolOp, UnaryNot, Compare, CompareChain, Lambda, InlineLet, Comprehension,
+)
+from .visit import walk_stmts, target_names, map_exprs
+
+_MAX_SAFE_INT = 2 ** 53
+_MAX_STR = 256
+_MAX_PROPAGATED_STR = 64
+_MAX_EXPONENT = 64
+
+_BINOPS: Dict[str, Callable[[object, object], object]] = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+    "//": operator.floordiv,
+    "%": operator.mod,
+    "**": operator.pow,
+}
+
+_CMPOPS: Dict[str, Callable[[object, object], bool]] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "in": lambda a, b: a in b,
+    "not in": lambda a, b: a not in b,
+}
+
+
+def _literal(e: Expr) -> bool:
+    return isinstance(e, Const) and type(e.value) in (int, float, str)
+
+
+def _representable(v: object) -> bool:
+    if type(v) is int:
+        return -_MAX_SAFE_INT <= v <= _MAX_SAFE_INT  # type: ignore[operator]
+    if type(v) is float:
+        return math.isfinite(v)  # type: ignore[arg-type]
+    if type(v) is str:
+        return len(v) <= _MAX_STR  # type: ignore[arg-type]
+    return type(v) is bool
+
+
+def _cmp_ok(op: str, a: object, b: object) -> bool:
+    if op in ("in", "not in"):
+        return type(a) is str and type(b) is str
+    numbers = (int, float)
+    return (type(a) in numbers and type(b) in numbers) or (type(a) is str and type(b) is str)
+
+
+def _fold_binop(e: BinOp) -> Expr:
+    if not (_literal(e.left) and _literal(e.right)):
+        return e
+    a, b = e.left.value, e.right.value  # type: ignore[attr-defined]
+    if e.op == "%" and type(a) is str:
+        return e  # printf-style formatting
+    if e.op == "*" and isinstance(b, str) and isinstance(a, int) and a * len(b) > _MAX_STR:
+        return e
+    if e.op == "*" and isinstance(a, str) and isinstance(b, int) and b * len(a) > _MAX_STR:
+        return e
+    if e.op == "**" and not (type(b) is int and abs(b) <= _MAX_EXPONENT):
+        return e
+    try:
+        v = _BINOPS[e.op](a, b)
+    except (ArithmeticError, TypeError, ValueError):
+        return e
+    return Const(v) if _representable(v) else e
+
+
+def _fold_compare(left: Expr, ops: List[str], comparators: List[Expr]) -> Optional[Const]:
+    operands = [left] + comparators
+    if not all(_literal(x) for x in operands):
+        return None
+    values = [x.value for x in operands]  # type: ignore[attr-defined]
+    for op, a, b in zip(ops, values, values[1:]):
+        if op not in _CMPOPS or not _cmp_ok(op, a, b):
+            return None
+    return Const(all(_CMPOPS[op](a, b) for op, a, b in zip(ops, values, values[1:])))
+
+
+def _fold_boolop(e: BoolOp) -> Expr:
+    values = list(e.values)
+    while len(values) > 1 and isinstance(values[0], Const):
+        truthy = bool(values[0].value)
+        if truthy == (e.op == "or"):
+            return values[0]  # `0 and x`, `1 or x` short-circuit here
+        values.pop(0)
+    if len(values) == 1:
+        return values[0]
+    e.values = values
+    return e
+
+
+def _fold(e: Expr) -> Expr:
+    if isinstance(e, BinOp):
+        return _fold_binop(e)
+    if isinstance(e, UnaryNot) and isinstance(e.value, Const):
+        return Const(not e.value.value)
+    if isinstance(e, Compare):
+        return _fold_compare(e.left, [e.op], [e.right]) or e
+    if isinstance(e, CompareChain):
+        return _fold_compare(e.left, e.ops, e.comparators) or e
+    if isinstance(e, BoolOp):
+        return _fold_boolop(e)
+    if isinstance(e, InlineLet) and not e.bindings:
+        return e.body
+    return e
+
+
+def fold_constants(mod: Module) -> Module:
+    map_exprs(mod, _fold)
+    return mod
+
+
+# -- propagation ----------------------------------------------------------
+def _binding_counts(mod: Module) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+
+    def bind(name: Optional[str]) -> None:
+        if name:
+            counts[name] = counts.get(name, 0) + 1
+
+    for n in walk_stmts(mod.body):
+        if isinstance(n, Assign):
+            bind(n.name)
+        elif isinstance(n, (For, Comprehension)):
+            for t in target_names(n.target):
+                bind(t)
+        elif isinstance(n, UnpackAssign):
+            for t in n.targets + [n.starred_name]:
+                bind(t)
+        elif isinstance(n, With):
+            for it in n.items:
+                bind(it.optional_vars)
+        elif isinstance(n, Try):
+            for h in n.handlers:
+                bind(h.varname)
+        elif isinstance(n, (Function, Lambda)):
+            for p in n.params:
+                bind(p)
+            if isinstance(n, Function):
+                for name in (n.name, n.vararg, n.kwarg):
+                    bind(name)
+        elif isinstance(n, ClassDef):
+            bind(n.name)
+        elif isinstance(n, Import):
+            for name in n.names:
+                bind(name.split(".")[0])
+        elif isinstance(n, ImportFrom):
+            for name in n.names:
+                bind(name)
+        elif isinstance(n, InlineLet):
+            for name, _ in n.bindings:
+                bind(name)
+    return counts
+
+
+def _propagatable(v: object) -> bool:
+    if isinstance(v, str):
+        return len(v) <= _MAX_PROPAGATED_STR
+    return v is None or type(v) in (bool, int, float)
+
+
+def propagate_constants(mod: Module) -> Module:
+    counts = _binding_counts(mod)
+    for i, s in enumerate(mod.body):
+        if not (isinstance(s, Assign) and isinstance(s.value, Const) and counts.get(s.name) == 1):
+            continue
+        if not _propagatable(s.value.value):
+            continue
+        name, value = s.name, s.value.value
+
+        def replace(e: Expr) -> Expr:
+            if isinstance(e, Name) and e.id == name:
+                return Const(value)
+            return e
+        # Earlier top-level statements run before the assignment; definitions run their bodies later.
+        for j, other in enumerate(mod.body):
+            if j > i or isinstance(other, (Function, ClassDef)):
+                map_exprs(other, replace)
+    return mod
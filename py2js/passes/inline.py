@@ -0,0 +1,200 @@
+"""Inline calls to small module-level functions.
+
+    def sq(x):                    def sq(x):
+        return x * x                  return x * x
+    total = sq(a) + sq(b + 1)  => total = a * a + (t = b + 1, t * t)
+
+A function qualifies when its body is a single `return` of a small expression
+(see `budget`), it is not a generator or async, it is never recursive, never
+used as a value and never rebound. Method calls are left to V8, which inlines
+monomorphic `self.method()` calls itself; inlining them here measured no faster.
+
+Arguments that are not literals are bound to temporaries (InlineLet) in call
+order, so side effects happen once and before the body, as in a call. Call
+sites are skipped when they pass keywords, `*`/`**` splats or too many
+arguments, when a default is not a literal, when the caller binds a name the
+body reads as a global, and inside lambdas.
+"""
+import copy
+from typing import Dict, List, Optional, Tuple
+
+from ..ir import (
+    Module, Stmt, Expr, Function, ClassDef, Return, ExprStmt, Call, MethodCall, New, Name,
+    Const, Undef, Starred, KwargPairs, KwargExp, KwargBind, TupleLit, Lambda, InlineLet, Yield, YieldFrom, Await,
+    ListComp, SetComp, DictComp, GeneratorExp,
+)
+from .visit import walk, walk_stmts, bound_names, stored_names, loaded_names, target_names, map_exprs
+
+_COMPREHENSIONS = (ListComp, SetComp, DictComp, GeneratorExp)
+_NOT_INLINABLE = (Lambda, Yield, YieldFrom, Await, InlineLet) + _COMPREHENSIONS
+
+
+def _return_expr(fn: Function) -> Optional[Expr]:
+    body = fn.body
+    if body and isinstance(body[0], ExprStmt) and isinstance(body[0].expr, Const):
+        body = body[1:]  # docstring
+    if len(body) == 1 and isinstance(body[0], Return):
+        return body[0].value if body[0].value is not None else Const(None)
+    return None
+
+
+class _Callee:
+    def __init__(self, fn: Function, expr: Expr) -> None:
+        self.fn = fn
+        self.expr = expr
+        self.params = fn.params
+        self.defaults = fn.defaults
+        self.free = loaded_names(expr) - set(fn.params) - ({fn.vararg} if fn.vararg else set())
+        self.has_calls = any(isinstance(n, (Call, MethodCall, New)) for n in walk(expr))
+
+
+class _Inliner:
+    def __init__(self, mod: Module, budget: int) -> None:
+        self.mod = mod
+        self.budget = budget
+        self.counter = 0
+        self.functions: Dict[str, _Callee] = {}
+        self.active: List[_Callee] = []  # callees being expanded; stops mutual recursion
+
+    # -- candidates -----------------------------------------------------
+    def _small(self, fn: Function) -> Optional[Expr]:
+        if fn.is_generator or fn.is_async or fn.kwarg:
+            return None
+        expr = _return_expr(fn)
+        if expr is None:
+            return None
+        nodes = list(walk(expr))
+        if len(nodes) > self.budget or any(isinstance(n, _NOT_INLINABLE) for n in nodes):
+            return None
+        if any(isinstance(n, Call) and n.func == "super" for n in nodes):
+            return None
+        return expr
+
+    def collect(self) -> None:
+        body = self.mod.body
+        defs: Dict[str, int] = {}
+        for s in body:
+            if isinstance(s, (Function, ClassDef)):
+                defs[s.name] = defs.get(s.name, 0) + 1
+        stored = bound_names(body)
+        values = {n.id for n in walk_stmts(body) if isinstance(n, Name)}
+        for s in body:
+            if not isinstance(s, Function) or defs[s.name] > 1 or s.name in stored or s.name in values:
+                continue
+            expr = self._small(s)
+            if expr is None or any(isinstance(n, Call) and n.func == s.name for n in walk(expr)):
+                continue
+            callee = _Callee(s, copy.deepcopy(expr))
+            if s.name not in callee.free:
+                self.functions[s.name] = callee
+
+    # -- traversal ------------------------------------------------------
+    def run(self) -> Module:
+        self.collect()
+        if self.functions:
+            self._stmts(self.mod.body, frozenset())
+        return self.mod
+
+    def _stmts(self, stmts: List[Stmt], shadow: frozenset) -> None:
+        for s in stmts:
+            self._node(s, shadow)
+
+    def _node(self, node: object, shadow: frozenset) -> None:
+        if isinstance(node, Function):
+            local = set(node.params) | stored_names(node) | {node.vararg, node.kwarg} - {None}
+            self._stmts(node.body, frozenset(shadow | local))
+            return
+        if isinstance(node, ClassDef):
+            for m in node.methods:
+                local = set(m.params) | stored_names(m) | {m.vararg, m.kwarg} - {None}
+                self._stmts(m.body, frozenset(shadow | local))
+            return
+        self._fields(node, shadow)
+
+    def _fields(self, node: object, shadow: frozenset) -> None:
+        for name, value in list(vars(node).items()):
+            if isinstance(value, list):
+                for i, item in enumerate(value):
+                    if isinstance(item, Expr):
+                        value[i] = self._expr(item, shadow)
+                    elif isinstance(item, tuple):
+                        value[i] = tuple(self._expr(x, shadow) if isinstance(x, Expr) else x for x in item)
+                    elif hasattr(item, "__dataclass_fields__"):
+                        self._node(item, shadow)
+            elif isinstance(value, Expr):
+                setattr(node, name, self._expr(value, shadow))
+            elif hasattr(value, "__dataclass_fields__"):
+                self._node(value, shadow)
+
+    def _expr(self, e: Expr, shadow: frozenset) -> Expr:
+        if isinstance(e, Lambda):
+            return e
+        if isinstance(e, _COMPREHENSIONS):
+            inner = shadow
+            for g in e.generators:
+                g.iter = self._expr(g.iter, inner)
+                inner = inner | set(target_names(g.target))
+                g.ifs = [self._expr(c, inner) for c in g.ifs]
+            for attr in ("elt", "key", "value"):
+                if hasattr(e, attr):
+                    setattr(e, attr, self._expr(getattr(e, attr), inner))
+            return e
+        self._fields(e, shadow)
+        if isinstance(e, Call):
+            callee = self.functions.get(e.func)
+            if callee is not None and e.func not in shadow:
+                return self._inline(callee, e.args, shadow) or e
+        return e
+
+    # -- substitution ---------------------------------------------------
+    def _inline(self, callee: _Callee, args: List[Expr], shadow: frozenset) -> Optional[Expr]:
+        if callee.free & shadow or callee in self.active:
+            return None
+        if any(isinstance(a, (Starred, KwargPairs, KwargExp, KwargBind)) for a in args):
+            return None
+        params, defaults = callee.params, callee.defaults
+        if len(args) > len(params) and not callee.fn.vararg:
+            return None
+        actual: List[Expr] = []
+        for i, p in enumerate(params):
+            a = args[i] if i < len(args) else Undef()
+            if isinstance(a, Undef):
+                d = defaults[i]
+                if not isinstance(d, Const):
+                    return None
+                a = Const(d.value)
+            actual.append(a)
+        names = list(params)
+        if callee.fn.vararg:
+            names.append(callee.fn.vararg)
+            actual.append(TupleLit(elts=list(args[len(params):])))
+
+        needs_temps = callee.has_calls or any(not isinstance(a, (Const, Name)) for a in actual)
+        bindings: List[Tuple[str, Expr]] = []
+        subst: Dict[str, Expr] = {}
+        for name, a in zip(names, actual):
+            if isinstance(a, Const) or (isinstance(a, Name) and not needs_temps):
+                subst[name] = a
+                continue
+            self.counter += 1
+            tmp = f"__py_inl_{self.counter}"
+            bindings.append((tmp, a))
+            subst[name] = Name(tmp)
+
+        body = copy.deepcopy(callee.expr)
+
+        def replace(x: Expr) -> Expr:
+            if isinstance(x, Name) and x.id in subst:
+                return copy.deepcopy(subst[x.id])
+            return x
+        body = replace(body)
+        map_exprs(body, replace)
+        self.active.append(callee)
+        body = self._expr(body, shadow)  # calls the callee makes are inlined too
+        self.active.pop()
+        return InlineLet(bindings=bindings, body=body)
+
+
+def inline_calls(mod: Module, budget: int = 12) -> Module:
+    """Inline single-expression functions whose body has at most `budget` nodes."""
+    return _Inliner(mod, budget).run()
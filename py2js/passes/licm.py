@@ -0,0 +1,269 @@
+"""Loop-invariant code motion for `len()`, attribute loads and numeric arithmetic.
+
+    while i < len(items):                 __py_licm_1 = len(items)
+        total += self.scale * items[i] => while i < __py_licm_1:
+        i += 1                                total += __py_licm_2 * items[i]   # self.scale
+                                              i += 1
+
+Two kinds of expression move out of a loop into a temporary assigned just
+before it:
+
+* In a `while` test, in positions evaluated on every test (not the right
+  side of `and`/`or` or later links of a comparison chain): `len(x)`,
+  `obj.attr` and numeric arithmetic over those and literals. The test runs
+  at least once, so evaluating them early raises the same errors.
+* Anywhere in the loop body, `self.attr` loads in a method. Reading an
+  attribute of `this` cannot raise, so it is safe even if the body never runs.
+
+An expression is invariant when none of the names it reads is rebound in the
+loop and nothing in the loop can change the object it reads:
+
+* `obj.attr` requires that the loop assigns no attribute of that name on any
+  object, and makes no calls that could run user code (functions, methods,
+  constructors, lambdas, `next()`, `await`, `yield`).
+* `len(x)` additionally requires that every list mutated in the loop
+  (`append`, `pop`, `sort`) is a local that cannot alias `x`. Such a local
+  is only ever bound to a fresh literal or comprehension, and is never
+  copied, stored or passed anywhere that could keep a reference to it.
+
+Dunder hooks that builtins call implicitly (`__str__` when printing,
+`__lt__` when sorting, `__iter__`/`__next__` of iterated objects) are assumed
+not to mutate loop state.
+"""
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from ..ir import (
+    Module, Stmt, Expr, Assign, AssignAttr, UnpackAssign, For, While, If, With, Try, Block, Function,
+    ClassDef, Return, Name, Const, BinOp, Compare, CompareChain, BoolOp, UnaryNot, Call, MethodCall, New,
+    Attribute, Subscript, Slice, Lambda, InlineLet, Await, Yield, YieldFrom, KwargPairs, KwargExp,
+    Comprehension, ListLit, DictLit, ListComp, SetComp, DictComp,
+)
+from .visit import walk, walk_stmts, stored_names, bound_names, target_names, map_exprs, field_names
+
+_MUTATING = {"__list_append__", "__list_pop__", "__list_sort__"}
+# builtins whose receiver may be a user object with a method of the same name
+_RECEIVER_METHODS = _MUTATING | {
+    "__str_upper__", "__str_lower__", "__str_split__", "__str_join__", "__str_startswith__",
+    "__str_endswith__", "__str_replace__", "__str_find__",
+    "__dict_items__", "__dict_keys__", "__dict_values__", "__dict_get__",
+}
+# builtins that neither run user callables nor return or keep a reference to their arguments
+_NON_ALIASING = {"print", "__len__", "__str__", "__repr__", "__sorted__", "__any__", "__all__",
+                 "__iter__", "__enumerate__", "__zip__"}
+_FRESH = (ListLit, DictLit, ListComp, SetComp, DictComp)
+_ARITH = ("+", "-", "*", "/", "//", "%")
+
+
+def _is_builtin(func: str, user: Set[str]) -> bool:
+    return func not in user and (func in ("print", "range") or (func.startswith("__") and func.endswith("__")))
+
+
+class _Effects:
+    def __init__(self) -> None:
+        self.unknown = False          # may run arbitrary user code
+        self.mutated: Set[str] = set()  # unaliased locals whose list is mutated
+        self.attrs: Set[str] = set()    # attribute names assigned on any object
+
+
+def _effects(nodes: List[object], fresh: Set[str], user: Set[str]) -> _Effects:
+    fx = _Effects()
+    for root in nodes:
+        for n in walk(root, into_functions=False):
+            if isinstance(n, (Function, ClassDef, Lambda, MethodCall, New, Await, Yield, YieldFrom, KwargExp)):
+                fx.unknown = True
+            elif isinstance(n, AssignAttr):
+                fx.attrs.add(n.attr)
+            elif isinstance(n, KwargPairs) and any(k == "key" for k, _ in n.pairs):
+                fx.unknown = True
+            elif isinstance(n, Call):
+                if not _is_builtin(n.func, user) or n.func == "__next__":
+                    fx.unknown = True
+                elif n.func in _RECEIVER_METHODS:
+                    recv = n.args[0] if n.args else None
+                    if isinstance(recv, Name) and recv.id in fresh:
+                        if n.func in _MUTATING:
+                            fx.mutated.add(recv.id)
+                    elif not (isinstance(recv, Const) and n.func not in _MUTATING):
+                        fx.unknown = True
+    return fx
+
+
+def _other_bindings(stmts: List[Stmt]) -> Set[str]:
+    """Names bound in `stmts` by anything other than a plain assignment."""
+    out: Set[str] = set()
+    for n in walk_stmts(stmts, into_functions=False):
+        if isinstance(n, For):
+            out.update(target_names(n.target))
+        elif isinstance(n, UnpackAssign):
+            out.update(t for t in n.targets + [n.starred_name] if t)
+        elif isinstance(n, With):
+            out.update(it.optional_vars for it in n.items if it.optional_vars)
+        elif isinstance(n, Try):
+            out.update(h.varname for h in n.handlers if h.varname)
+        elif isinstance(n, (Function, ClassDef)):
+            out.add(n.name)
+        elif isinstance(n, InlineLet):
+            out.update(name for name, _ in n.bindings)
+    return out
+
+
+def _fresh_locals(stmts: List[Stmt], params: Set[str], user: Set[str]) -> Set[str]:
+    """Names only ever bound to new containers whose reference is never copied or passed on."""
+    fresh: Dict[str, bool] = {}
+    for n in walk_stmts(stmts, into_functions=False):
+        if isinstance(n, Assign):
+            fresh[n.name] = fresh.get(n.name, True) and isinstance(n.value, _FRESH)
+    names = {name for name, ok in fresh.items() if ok} - _other_bindings(stmts) - params
+    for n in walk_stmts(stmts):
+        for field, index, name in _name_children(n):
+            if name in names and not _safe_use(n, field, index, user):
+                names.discard(name)
+    return names
+
+
+def _name_children(n: object) -> Iterator[Tuple[str, int, str]]:
+    """(field, list index, name) for each Name directly under `n`."""
+    for name in field_names(type(n)) or ():
+        value = getattr(n, name)
+        for index, item in enumerate(value if isinstance(value, list) else [value]):
+            for x in (item if isinstance(item, tuple) else (item,)):
+                if isinstance(x, Name):
+                    yield name, index, x.id
+
+
+def _safe_use(parent: object, field: str, index: int, user: Set[str]) -> bool:
+    if isinstance(parent, Call) and _is_builtin(parent.func, user):
+        if parent.func in _RECEIVER_METHODS:
+            return index == 0
+        return parent.func in _NON_ALIASING
+    if isinstance(parent, (Subscript, Slice)):
+        return field == "value"
+    if isinstance(parent, (For, Comprehension)):
+        return field == "iter"
+    return isinstance(parent, (Compare, CompareChain, Return))
+
+
+def _map_tree(e: Expr, fn: Callable[[Expr], Expr]) -> Expr:
+    map_exprs(e, fn, into_functions=False)
+    return fn(e)
+
+
+class _LICM:
+    def __init__(self, mod: Module) -> None:
+        self.mod = mod
+        self.counter = 0
+        self.user = {n.name for n in walk_stmts(mod.body) if isinstance(n, (Function, ClassDef))}
+        self.user |= bound_names(mod.body)
+
+    def run(self) -> Module:
+        fresh = _fresh_locals(self.mod.body, set(), self.user)
+        self.mod.body = self._block(self.mod.body, None, fresh)
+        return self.mod
+
+    def _function(self, fn: Function, self_name: Optional[str]) -> None:
+        params = set(fn.params) | {fn.vararg, fn.kwarg} - {None}
+        fresh = _fresh_locals(fn.body, params, self.user)
+        fn.body = self._block(fn.body, self_name, fresh)
+
+    def _block(self, stmts: List[Stmt], self_name: Optional[str], fresh: Set[str]) -> List[Stmt]:
+        out: List[Stmt] = []
+        for s in stmts:
+            if isinstance(s, (For, While)):
+                out.extend(self._loop(s, self_name, fresh))
+            out.append(s)
+            if isinstance(s, Function):
+                self._function(s, None)
+            elif isinstance(s, ClassDef):
+                for m in s.methods:
+                    self._function(m, m.params[0] if m.params else None)
+            elif isinstance(s, (If, While, For)):
+                s.body = self._block(s.body, self_name, fresh)
+                s.orelse = self._block(s.orelse, self_name, fresh)
+            elif isinstance(s, (With, Block)):
+                s.body = self._block(s.body, self_name, fresh)
+            elif isinstance(s, Try):
+                s.body = self._block(s.body, self_name, fresh)
+                for h in s.handlers:
+                    h.body = self._block(h.body, self_name, fresh)
+                s.orelse = self._block(s.orelse, self_name, fresh)
+                s.finalbody = self._block(s.finalbody, self_name, fresh)
+        return out
+
+    # -- one loop -------------------------------------------------------
+    def _loop(self, loop: Union[For, While], self_name: Optional[str], fresh: Set[str]) -> List[Stmt]:
+        """Rewrite `loop` in place; returns the temporaries to assign before it."""
+        repeated: List[object] = list(loop.body)
+        if isinstance(loop, While):
+            repeated.append(loop.test)
+        written = stored_names(loop)
+        fx = _effects(repeated, fresh, self.user)
+
+        def invariant(e: Expr) -> bool:
+            if isinstance(e, Const):
+                return True
+            if isinstance(e, Name):
+                return e.id not in written
+            if isinstance(e, Attribute):
+                return not fx.unknown and e.attr not in fx.attrs and invariant(e.value)
+            if isinstance(e, Call) and e.func == "__len__" and len(e.args) == 1 and isinstance(e.args[0], Name):
+                target = e.args[0].id
+                return not fx.unknown and target not in written and target not in fx.mutated
+            if isinstance(e, BinOp):
+                return e.op in _ARITH and _numeric(e) and invariant(e.left) and invariant(e.right)
+            return False
+
+        hoisted: List[Tuple[Expr, str]] = []
+
+        def hoist(e: Expr) -> Expr:
+            for known, tmp in hoisted:
+                if known == e:
+                    return Name(tmp)
+            self.counter += 1
+            tmp = f"__py_licm_{self.counter}"
+            hoisted.append((e, tmp))
+            return Name(tmp)
+
+        if isinstance(loop, While):
+            loop.test = self._hoist_test(loop.test, invariant, hoist)
+        if self_name is not None:
+            def self_load(e: Expr) -> Expr:
+                if (isinstance(e, Attribute) and isinstance(e.value, Name) and e.value.id == self_name
+                        and invariant(e)):
+                    return hoist(e)
+                return e
+            for s in loop.body:
+                map_exprs(s, self_load, into_functions=False)
+            if isinstance(loop, While):
+                loop.test = _map_tree(loop.test, self_load)
+        return [Assign(name=tmp, value=e) for e, tmp in hoisted]
+
+    def _hoist_test(self, e: Expr, invariant: Callable[[Expr], bool], hoist: Callable[[Expr], Expr]) -> Expr:
+        """Hoist invariant subexpressions that every evaluation of the test computes."""
+        if not isinstance(e, (Const, Name)) and invariant(e):
+            return hoist(e)
+        if isinstance(e, (BinOp, Compare)):
+            e.left = self._hoist_test(e.left, invariant, hoist)
+            e.right = self._hoist_test(e.right, invariant, hoist)
+        elif isinstance(e, CompareChain):
+            e.left = self._hoist_test(e.left, invariant, hoist)
+            e.comparators[0] = self._hoist_test(e.comparators[0], invariant, hoist)
+        elif isinstance(e, BoolOp):
+            e.values[0] = self._hoist_test(e.values[0], invariant, hoist)
+        elif isinstance(e, UnaryNot):
+            e.value = self._hoist_test(e.value, invariant, hoist)
+        return e
+
+
+def _numeric(e: Expr) -> bool:
+    """True when `e` certainly evaluates to a number (so hoisting shares no mutable object)."""
+    if isinstance(e, Const):
+        return type(e.value) in (int, float)
+    if isinstance(e, Call):
+        return e.func == "__len__"
+    if isinstance(e, BinOp):
+        return e.op in _ARITH and _numeric(e.left) and _numeric(e.right)
+    return False
+
+
+def hoist_invariants(mod: Module) -> Module:
+    return _LICM(mod).run()
@@ -0,0 +1,56 @@
+"""Runs the IR passes selected by an optimization level, timing each one."""
+import time
+from functools import partial
+from typing import Callable, List, Tuple
+
+from ..ir import Module
+from .dce import remove_unreachable, remove_unused_definitions
+from .fold import fold_constants, propagate_constants
+from .inline import inline_calls
+from .licm import hoist_invariants
+from .strbuilder import string_builders
+from .tuples import unpack_tuples
+
+Pass = Callable[[Module], Module]
+
+OPT_LEVELS = (0, 1, 2)
+
+
+class PassManager:
+    def __init__(self, passes: List[Tuple[str, Pass]]) -> None:
+        self.passes = passes
+        self.timings: List[Tuple[str, float]] = []  # (pass name, seconds), in run order
+
+    @classmethod
+    def for_level(cls, level: int) -> "PassManager":
+        if level not in OPT_LEVELS:
+            raise ValueError(f"Unknown optimization level: {level}")
+        if level == 0:
+            return cls([])
+        constants: List[Tuple[str, Pass]] = [
+            ("fold", fold_constants),
+            ("propagate", propagate_constants),
+            ("fold", fold_constants),
+            ("unreachable", remove_unreachable),
+        ]
+        passes = list(constants)
+        # Larger bodies are left to V8, which inlines small monomorphic callees itself: inlining
+        # them here only grew the caller and measured slower. -O2 adds a round for calls that
+        # constant propagation exposes.
+        for _ in range(level):
+            passes.append(("inline", partial(inline_calls, budget=12)))
+            passes += constants
+        passes += [
+            ("tuples", unpack_tuples),
+            ("licm", hoist_invariants),
+            ("unused-defs", remove_unused_definitions),
+            ("string-builders", string_builders),
+        ]
+        return cls(passes)
+
+    def run(self, mod: Module) -> Module:
+        for name, fn in self.passes:
+            t0 = time.perf_counter()
+            mod = fn(mod)
+            self.timings.append((name, time.perf_counter() - t0))
+        return mod
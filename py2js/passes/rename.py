@@ -0,0 +1,143 @@
+"""Short names for function locals, used by `--minify`.
+
+    def average(values):               def average($a):
+        total = 0                          $b = 0
+        for v in values:          =>       for $c in $a:
+            total += v                         $b += $c
+        return total / len(values)         return $b / len($a)
+
+Parameters, assigned names, loop/with/except targets, comprehension variables,
+lambda parameters and pass temporaries of each function are renamed to
+`$`-names, which no Python identifier can clash with. A nested function
+continues the numbering of the one around it, so it never hides a name it
+reads from there. Module-level names, the names of functions and classes
+(reprs show them) and keyword names are kept.
+"""
+from typing import Dict, Iterator, List, Optional
+
+from ..ir import (
+    Module, Function, ClassDef, Assign, UnpackAssign, For, WithItem, ExceptHandler, StrBuilderInit,
+    StrBuilderAppend, StrBuilderValue, Name, Call, Lambda, InlineLet, Comprehension,
+)
+from .visit import children, target_names
+
+_ALPHABET = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def short_name(i: int) -> str:
+    out = ""
+    while True:
+        out = _ALPHABET[i % len(_ALPHABET)] + out
+        i = i // len(_ALPHABET) - 1
+        if i < 0:
+            return "$" + out
+
+
+def _scope(node: object) -> Iterator[object]:
+    """`node` and what it contains, without the bodies of nested functions and classes."""
+    yield node
+    for child in children(node):
+        if isinstance(child, (Function, ClassDef)):
+            yield child
+        else:
+            yield from _scope(child)
+
+
+def _target(target: object, env: Dict[str, str]) -> object:
+    if isinstance(target, str):
+        return env.get(target, target)
+    return [_target(t, env) for t in target]  # type: ignore[union-attr]
+
+
+def _locals(fn: Function) -> List[str]:
+    names = [p for p in fn.params + [fn.vararg, fn.kwarg] if p]
+    defined = set()
+    for s in fn.body:
+        for n in _scope(s):
+            if isinstance(n, (Function, ClassDef)):
+                defined.add(n.name)
+            elif isinstance(n, Assign):
+                names.append(n.name)
+            elif isinstance(n, UnpackAssign):
+                names.extend(t for t in n.targets + [n.starred_name] if t)
+            elif isinstance(n, (For, Comprehension)):
+                names.extend(target_names(n.target))
+            elif isinstance(n, WithItem) and n.optional_vars:
+                names.append(n.optional_vars)
+            elif isinstance(n, ExceptHandler) and n.varname:
+                names.append(n.varname)
+            elif isinstance(n, InlineLet):
+                names.extend(name for name, _ in n.bindings)
+            elif isinstance(n, Lambda):
+                names.extend(n.params)
+            elif isinstance(n, StrBuilderInit):
+                names.append(n.builder)
+    return [n for n in dict.fromkeys(names) if n not in defined]
+
+
+class _Renamer:
+    def __init__(self, name_map: Dict[str, Dict[str, str]]) -> None:
+        self.name_map = name_map
+
+    def function(self, fn: Function, env: Dict[str, str], start: int, qualname: str) -> None:
+        # defaults are evaluated where the function is defined
+        for d in fn.defaults:
+            if d is not None:
+                self.node(d, env, start, qualname)
+        inner = dict(env)
+        own: Dict[str, str] = {}
+        for i, name in enumerate(_locals(fn)):
+            inner[name] = own[name] = short_name(start + i)
+        if own:
+            self.name_map[qualname] = {short: name for name, short in own.items()}
+        fn.params = [inner.get(p, p) for p in fn.params]
+        fn.vararg = inner.get(fn.vararg, fn.vararg) if fn.vararg else None
+        fn.kwarg = inner.get(fn.kwarg, fn.kwarg) if fn.kwarg else None
+        for s in fn.body:
+            self.node(s, inner, start + len(own), qualname)
+
+    def node(self, n: object, env: Dict[str, str], start: int, qualname: str) -> None:
+        if isinstance(n, Function):
+            self.function(n, env, start, f"{qualname}.{n.name}" if qualname else n.name)
+            return
+        if isinstance(n, ClassDef):
+            for _, value in n.class_attrs:
+                self.node(value, env, start, qualname)
+            for m in n.methods:
+                self.function(m, env, start, f"{qualname}.{n.name}.{m.name}" if qualname else f"{n.name}.{m.name}")
+            return
+        if not env:
+            for child in children(n):
+                self.node(child, env, start, qualname)
+            return
+        if isinstance(n, Name):
+            n.id = env.get(n.id, n.id)
+        elif isinstance(n, Call):
+            n.func = env.get(n.func, n.func)
+        elif isinstance(n, Assign):
+            n.name = env.get(n.name, n.name)
+        elif isinstance(n, UnpackAssign):
+            n.targets = [env.get(t, t) if t else t for t in n.targets]
+            n.starred_name = env.get(n.starred_name, n.starred_name) if n.starred_name else None
+        elif isinstance(n, (For, Comprehension)):
+            n.target = _target(n.target, env)  # type: ignore[assignment]
+        elif isinstance(n, WithItem) and n.optional_vars:
+            n.optional_vars = env.get(n.optional_vars, n.optional_vars)
+        elif isinstance(n, ExceptHandler) and n.varname:
+            n.varname = env.get(n.varname, n.varname)
+        elif isinstance(n, InlineLet):
+            n.bindings = [(env.get(name, name), value) for name, value in n.bindings]
+        elif isinstance(n, Lambda):
+            n.params = [env.get(p, p) for p in n.params]
+        elif isinstance(n, (StrBuilderInit, StrBuilderAppend, StrBuilderValue)):
+            n.builder = env.get(n.builder, n.builder)
+        for child in children(n):
+            self.node(child, env, start, qualname)
+
+
+def shorten_locals(mod: Module, name_map: Optional[Dict[str, Dict[str, str]]] = None) -> Module:
+    """Rename function locals; `name_map` receives {qualified function name: {short: original}}."""
+    renamer = _Renamer(name_map if name_map is not None else {})
+    for s in mod.body:
+        renamer.node(s, {}, 0, "")
+    return mod
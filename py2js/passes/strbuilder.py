@@ -0,0 +1,209 @@
+"""Rewrite string accumulation in loops into array-backed builders.
+
+    out = ""                      out = ""
+    for x in xs:          =>      sb = [out]
+        out += f"{x},"            for x in xs: sb.push(`${x},`)
+                                  out = sb.join("")
+
+A variable qualifies when it is known to hold a str before the loop, every
+assignment to it inside the loop is `v = v + piece`, and it is not otherwise
+read inside the loop except by a `return` (where the builder is joined on
+the way out). Loops nested in a `try` of the same scope are left alone, as
+are names read by nested functions.
+"""
+from typing import List, Optional
+
+from ..ir import (
+    Module, Stmt, Expr, Assign, BinOp, Const, Call, Name, For, While, If, With, Try, Block,
+    Function, ClassDef, Lambda, Return, FString, StrBuilderInit, StrBuilderAppend, StrBuilderValue,
+)
+from .visit import walk, walk_stmts, stored_names, map_exprs
+
+_STR_RESULT_CALLS = {
+    "__str__", "__repr__", "__str_upper__", "__str_lower__", "__str_replace__",
+}
+
+
+def is_str_expr(e: Expr) -> bool:
+    """True when `e` can only evaluate to a str (or raise)."""
+    if isinstance(e, Const):
+        return isinstance(e.value, str)
+    if isinstance(e, (FString, StrBuilderValue)):
+        return True
+    if isinstance(e, Call):
+        if e.func == "__str_join__":
+            return bool(e.args) and is_str_expr(e.args[0])  # any other receiver may have its own join()
+        return e.func in _STR_RESULT_CALLS
+    if isinstance(e, BinOp) and e.op == "+":
+        return is_str_expr(e.left) or is_str_expr(e.right)
+    return False
+
+
+def _accumulated(s: Stmt) -> Optional[str]:
+    if (isinstance(s, Assign) and isinstance(s.value, BinOp) and s.value.op == "+"
+            and isinstance(s.value.left, Name) and s.value.left.id == s.name):
+        return s.name
+    return None
+
+
+class _StringBuilders:
+    def __init__(self) -> None:
+        self._counter = 0
+
+    def run(self, mod: Module) -> Module:
+        shared = _names_read_in_functions(mod.body)
+        mod.body = self._block(mod.body, shared, in_try=False)
+        return mod
+
+    # -- scopes ---------------------------------------------------------
+    def _function(self, fn: Function) -> None:
+        shared = _names_read_in_functions(fn.body)
+        fn.body = self._block(fn.body, shared, in_try=False)
+
+    def _block(self, stmts: List[Stmt], shared: set[str], in_try: bool) -> List[Stmt]:
+        out: List[Stmt] = []
+        for s in stmts:
+            if isinstance(s, (For, While)) and not in_try:
+                out.extend(self._loop(s, out, shared))
+                continue
+            self._descend(s, shared, in_try)
+            out.append(s)
+        return out
+
+    def _descend(self, s: Stmt, shared: set[str], in_try: bool) -> None:
+        if isinstance(s, Function):
+            self._function(s)
+        elif isinstance(s, ClassDef):
+            for m in s.methods:
+                self._function(m)
+        elif isinstance(s, (For, While, If)):
+            s.body = self._block(s.body, shared, in_try)
+            s.orelse = self._block(s.orelse, shared, in_try)
+        elif isinstance(s, (With, Block)):
+            s.body = self._block(s.body, shared, in_try)
+        elif isinstance(s, Try):
+            s.body = self._block(s.body, shared, True)
+            for h in s.handlers:
+                h.body = self._block(h.body, shared, True)
+            s.orelse = self._block(s.orelse, shared, True)
+            s.finalbody = self._block(s.finalbody, shared, True)
+
+    # -- loops ----------------------------------------------------------
+    def _loop(self, loop: Stmt, before: List[Stmt], shared: set[str]) -> List[Stmt]:
+        candidates = []
+        for n in walk(loop, into_functions=False):
+            name = _accumulated(n) if isinstance(n, Stmt) else None
+            if name and name not in candidates and name not in shared:
+                candidates.append(name)
+        rewritten = [v for v in candidates if _is_str_before(v, before) and _only_accumulates(v, loop)]
+        self._descend(loop, shared, in_try=False)
+        if not rewritten:
+            return [loop]
+        pre: List[Stmt] = []
+        post: List[Stmt] = []
+        for v in rewritten:
+            self._counter += 1
+            sb = f"__py_sb_{self._counter}"
+            _rewrite(loop, v, sb)
+            pre.append(StrBuilderInit(builder=sb, value=Name(v)))
+            post.append(Assign(name=v, value=StrBuilderValue(builder=sb)))
+        return pre + [loop] + post
+
+
+def _names_read_in_functions(stmts: List[Stmt]) -> set[str]:
+    out: set[str] = set()
+    for n in walk_stmts(stmts, into_functions=False):
+        if isinstance(n, (Function, Lambda)):
+            out |= {x.id for x in walk(n) if isinstance(x, Name)}
+        elif isinstance(n, ClassDef):
+            for m in n.methods:
+                out |= {x.id for x in walk(m) if isinstance(x, Name)}
+    return out
+
+
+def _is_str_before(v: str, before: List[Stmt]) -> bool:
+    for s in reversed(before):
+        if isinstance(s, Assign) and s.name == v:
+            return is_str_expr(s.value)
+        if v in stored_names(s):
+            return False
+    return False
+
+
+def _only_accumulates(v: str, loop: Stmt) -> bool:
+    """Every store to v in the loop is `v = v + x`, and every other read of v is a return value."""
+    for n in walk(loop, into_functions=False):
+        if not isinstance(n, Stmt):
+            continue
+        if _accumulated(n) == v:
+            rhs = n.value.right  # type: ignore[attr-defined]
+            if any(isinstance(x, Name) and x.id == v for x in walk(rhs)):
+                return False
+            continue
+        if v in stored_names(n) and not isinstance(n, (For, While, If, With, Try, Block)):
+            return False
+        if isinstance(n, (For, With, Try)) and v in _own_targets(n):
+            return False
+        if isinstance(n, Return):
+            continue
+        for child in _own_exprs(n):
+            if any(isinstance(x, Name) and x.id == v for x in walk(child)):
+                return False
+    return True
+
+
+def _own_targets(s: Stmt) -> set[str]:
+    if isinstance(s, For):
+        return stored_names(For(target=s.target, iter=s.iter, body=[], orelse=[]))
+    if isinstance(s, With):
+        return {it.optional_vars for it in s.items if it.optional_vars}
+    if isinstance(s, Try):
+        return {h.varname for h in s.handlers if h.varname}
+    return set()
+
+
+def _own_exprs(s: Stmt) -> List[object]:
+    """Expressions evaluated by the statement itself, excluding nested statement bodies."""
+    if isinstance(s, (If, While)):
+        return [s.test]
+    if isinstance(s, For):
+        return [s.iter]
+    if isinstance(s, With):
+        return [it.context_expr for it in s.items]
+    if isinstance(s, (Try, Block, Function, ClassDef)):
+        return []
+    return [s]
+
+
+def _rewrite(loop: Stmt, v: str, sb: str) -> None:
+    def block(stmts: List[Stmt]) -> List[Stmt]:
+        out: List[Stmt] = []
+        for s in stmts:
+            if _accumulated(s) == v:
+                piece = s.value.right  # type: ignore[attr-defined]
+                out.append(StrBuilderAppend(builder=sb, value=piece, checked=not is_str_expr(piece)))
+                continue
+            if isinstance(s, Return) and s.value is not None:
+                s.value = _replace_reads(s.value, v, sb)
+            for attr in ("body", "orelse", "finalbody"):
+                if hasattr(s, attr) and not isinstance(s, (Function, ClassDef)):
+                    setattr(s, attr, block(getattr(s, attr)))
+            if isinstance(s, Try):
+                for h in s.handlers:
+                    h.body = block(h.body)
+            out.append(s)
+        return out
+
+    loop.body = block(loop.body)  # type: ignore[attr-defined]
+    loop.orelse = block(loop.orelse)  # type: ignore[attr-defined]
+
+
+def _replace_reads(e: Expr, v: str, sb: str) -> Expr:
+    holder = Return(value=e)
+    map_exprs(holder, lambda x: StrBuilderValue(builder=sb) if isinstance(x, Name) and x.id == v else x,
+              into_functions=False)
+    return holder.value  # type: ignore[return-value]
+
+
+def string_builders(mod: Module) -> Module:
+    return _StringBuilders().run(mod)
@@ -0,0 +1,192 @@
+"""Tuple-free parallel assignment and multiple return values.
+
+    a, b = b, a               =>  __py_par_1 = a; a = b; b = __py_par_1
+
+    def divmod2(n, d):            def divmod2(n, d):
+        return n // d, n % d  =>      return py_mret(n // d, n % d)
+    q, r = divmod2(7, 2)          divmod2(7, 2); q = py_mret_buf[0]; r = py_mret_buf[1]
+
+Lowering turns `t1, t2 = value` into `__py_unpack_tmp = value` followed by
+one `tN = __py_unpack_tmp[i]` per target. When the value is a tuple or list
+literal of the right length, the elements are evaluated in order into
+temporaries (only those a later store could clobber, and never literals) and
+assigned directly.
+
+A function's tuple result does not escape when every call to it is the value
+of such an unpacking with as many targets as the tuple has items. If, in
+addition, every `return` in it returns a 2- to 4-item tuple literal and no
+path falls off the end, its returns write the items into a shared buffer
+(py_mret) that the call site reads immediately. Generators, async functions,
+functions that return through a `finally` (which could overwrite the buffer
+before the call site reads it) and functions that are rebound, used as
+values or exported to other modules keep returning tuples.
+"""
+from typing import Dict, List, Optional, Set
+
+from ..ir import (
+    Module, Stmt, Expr, Assign, AssignAttr, ExprStmt, If, For, While, With, Try, Block, Function, ClassDef,
+    Return, Raise, MultiReturn, Name, Attribute, Const, Call, Subscript, TupleLit, ListLit, Starred, InlineLet,
+    ReturnSlot,
+)
+from .visit import walk, walk_stmts, bound_names
+
+_UNPACK_TMP = "__py_unpack_tmp"
+_MAX_RETURN_VALUES = 4  # arity of py_mret
+
+
+def _unpack_value(b: Block) -> Optional[Expr]:
+    """The unpacked value when `b` is exactly a lowered `t1, ..., tn = value`."""
+    body = b.body
+    if len(body) < 3 or not (isinstance(body[0], Assign) and body[0].name == _UNPACK_TMP):
+        return None
+    for i, s in enumerate(body[1:]):
+        if not isinstance(s, (Assign, AssignAttr)):
+            return None
+        v = s.value
+        if not (isinstance(v, Subscript) and isinstance(v.value, Name) and v.value.id == _UNPACK_TMP
+                and isinstance(v.index, Const) and v.index.value == i):
+            return None
+    return body[0].value
+
+
+def _always_returns(stmts: List[Stmt]) -> bool:
+    if not stmts:
+        return False
+    last = stmts[-1]
+    if isinstance(last, (Return, Raise)):
+        return True
+    if isinstance(last, If):
+        return _always_returns(last.body) and _always_returns(last.orelse)
+    if isinstance(last, Block):
+        return _always_returns(last.body)
+    return False
+
+
+def _returns_before_finally(stmts: List[Stmt]) -> bool:
+    """Whether a `return` in `stmts` runs a `finally` block before the caller resumes."""
+    for t in walk_stmts(stmts, into_functions=False):
+        if isinstance(t, Try) and t.finalbody:
+            guarded = t.body + [s for h in t.handlers for s in h.body] + t.orelse
+            if any(isinstance(n, Return) for n in walk_stmts(guarded, into_functions=False)):
+                return True
+    return False
+
+
+def _plain_target(obj: Expr) -> bool:
+    """Whether evaluating the object of an attribute target runs no code."""
+    return all(isinstance(n, (Name, Attribute)) for n in walk(obj))
+
+
+class _Tuples:
+    def __init__(self, mod: Module) -> None:
+        self.mod = mod
+        self.counter = 0
+        self.multi: Dict[str, int] = {}  # function name -> number of returned values
+        self.multi_defs: Set[int] = set()
+
+    def collect(self) -> None:
+        body = self.mod.body
+        counts: Dict[str, int] = {}
+        for s in body:
+            if isinstance(s, (Function, ClassDef)):
+                counts[s.name] = counts.get(s.name, 0) + 1
+        rebound = bound_names(body) | {n.id for n in walk_stmts(body) if isinstance(n, Name)} | set(self.mod.exports)
+        sizes: Dict[str, int] = {}
+        for s in body:
+            if (not isinstance(s, Function) or counts[s.name] > 1 or s.name in rebound
+                    or s.is_generator or s.is_async or not _always_returns(s.body)
+                    or _returns_before_finally(s.body)):
+                continue
+            returns = [n for n in walk_stmts(s.body, into_functions=False) if isinstance(n, Return)]
+            lens = {len(r.value.elts) if isinstance(r.value, TupleLit) and not any(
+                isinstance(x, Starred) for x in r.value.elts) else -1 for r in returns}
+            if len(lens) == 1 and 2 <= min(lens) <= _MAX_RETURN_VALUES:
+                sizes[s.name] = lens.pop()
+
+        unpacked: Dict[int, bool] = {}  # id(call) -> unpacked into matching targets
+        for n in walk_stmts(body):
+            if isinstance(n, Block):
+                value = _unpack_value(n)
+                if isinstance(value, Call) and value.func in sizes:
+                    unpacked[id(value)] = len(n.body) - 1 == sizes[value.func]
+        for n in walk_stmts(body):
+            if isinstance(n, Call) and n.func in sizes and not unpacked.get(id(n)):
+                del sizes[n.func]
+        self.multi = sizes
+        self.multi_defs = {id(s) for s in body if isinstance(s, Function) and s.name in sizes}
+
+    def run(self) -> Module:
+        self.collect()
+        self.mod.body = self._block(self.mod.body)
+        return self.mod
+
+    # -- statements -----------------------------------------------------
+    def _block(self, stmts: List[Stmt], multi: bool = False) -> List[Stmt]:
+        out: List[Stmt] = []
+        for s in stmts:
+            if isinstance(s, Block) and _unpack_value(s) is not None:
+                out.append(self._unpack(s))
+            elif isinstance(s, Return) and isinstance(s.value, TupleLit) and multi:
+                out.append(MultiReturn(values=s.value.elts))
+            else:
+                self._descend(s, multi)
+                out.append(s)
+        return out
+
+    def _descend(self, s: Stmt, multi: bool) -> None:
+        if isinstance(s, Function):
+            s.body = self._block(s.body, id(s) in self.multi_defs)
+        elif isinstance(s, ClassDef):
+            for m in s.methods:
+                m.body = self._block(m.body)
+        elif isinstance(s, (If, For, While)):
+            s.body = self._block(s.body, multi)
+            s.orelse = self._block(s.orelse, multi)
+        elif isinstance(s, (With, Block)):
+            s.body = self._block(s.body, multi)
+        elif isinstance(s, Try):
+            s.body = self._block(s.body, multi)
+            for h in s.handlers:
+                h.body = self._block(h.body, multi)
+            s.orelse = self._block(s.orelse, multi)
+            s.finalbody = self._block(s.finalbody, multi)
+
+    def _unpack(self, b: Block) -> Block:
+        value = _unpack_value(b)
+        targets = b.body[1:]
+        pre: List[Stmt] = []
+        if isinstance(value, InlineLet) and isinstance(value.body, (TupleLit, ListLit)):
+            pre = [Assign(name=name, value=v) for name, v in value.bindings]
+            value = value.body
+        if isinstance(value, Call) and self.multi.get(value.func) == len(targets):
+            slots: List[Stmt] = []
+            if not all(isinstance(t, Assign) or _plain_target(t.obj) for t in targets):  # type: ignore[attr-defined]
+                # a target's object could call another py_mret function before its slot is read
+                slots = [Assign(name=self._fresh(), value=ReturnSlot(index=i)) for i in range(len(targets))]
+            for i, t in enumerate(targets):
+                t.value = Name(slots[i].name) if slots else ReturnSlot(index=i)  # type: ignore
+            return Block(body=[ExprStmt(expr=value)] + slots + targets)
+        if not (isinstance(value, (TupleLit, ListLit)) and len(value.elts) == len(targets)
+                and not any(isinstance(x, Starred) for x in value.elts)):
+            return b
+        for i, (t, elt) in enumerate(zip(targets, value.elts)):
+            earlier = {x.name for x in targets[:i] if isinstance(x, Assign)}
+            if isinstance(elt, Const) or (isinstance(elt, Name) and elt.id not in earlier):
+                direct = elt
+            else:
+                direct = self._temp(pre, elt)
+            t.value = direct  # type: ignore[attr-defined]
+        return Block(body=pre + targets)
+
+    def _temp(self, pre: List[Stmt], value: Expr) -> Name:
+        tmp = self._fresh()
+        pre.append(Assign(name=tmp, value=value))
+        return Name(tmp)
+
+    def _fresh(self) -> str:
+        self.counter += 1
+        return f"__py_par_{self.counter}"
+
+
+def unpack_tuples(mod: Module) -> Module:
+    return _Tuples(mod).run()
@@ -0,0 +1,123 @@
+"""Generic traversal helpers over the IR dataclasses."""
+from dataclasses import fields, is_dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from ..ir import Stmt, Expr, Name, Function, Assign, For, UnpackAssign, With, Try, ClassDef, Lambda, InlineLet
+
+
+_FIELDS: Dict[type, Optional[Tuple[str, ...]]] = {}
+
+
+def field_names(cls: type) -> Optional[Tuple[str, ...]]:
+    """Field names of an IR dataclass, None for other types; `fields()` is too slow to call per node."""
+    try:
+        return _FIELDS[cls]
+    except KeyError:
+        names = tuple(f.name for f in fields(cls)) if is_dataclass(cls) else None
+        _FIELDS[cls] = names
+        return names
+
+
+def _is_node(x: object) -> bool:
+    return field_names(type(x)) is not None
+
+
+def children(node: object) -> Iterator[object]:
+    """Yield the IR nodes directly contained in `node` (statements, expressions, helpers)."""
+    for name in field_names(type(node)) or ():
+        value = getattr(node, name)
+        if isinstance(value, list):
+            for item in value:
+                if isinstance(item, tuple):
+                    yield from (x for x in item if _is_node(x))
+                elif _is_node(item):
+                    yield item
+        elif _is_node(value):
+            yield value
+
+
+def walk(node: object, into_functions: bool = True) -> Iterator[object]:
+    """Pre-order walk; with into_functions=False nested function and class bodies are skipped."""
+    yield node
+    for child in children(node):
+        if not into_functions and isinstance(child, (Function, ClassDef, Lambda)):
+            yield child
+            continue
+        yield from walk(child, into_functions)
+
+
+def walk_stmts(stmts: List[Stmt], into_functions: bool = True) -> Iterator[object]:
+    for s in stmts:
+        yield from walk(s, into_functions)
+
+
+def loaded_names(node: object, into_functions: bool = True) -> set[str]:
+    return {n.id for n in walk(node, into_functions) if isinstance(n, Name)}
+
+
+def stored_names(node: object, into_functions: bool = False) -> set[str]:
+    """Names bound by assignments, loop targets, with/except targets and definitions."""
+    out: set[str] = set()
+    for n in walk(node, into_functions):
+        if isinstance(n, Assign):
+            out.add(n.name)
+        elif isinstance(n, For):
+            out.update(target_names(n.target))
+        elif isinstance(n, UnpackAssign):
+            out.update(t for t in n.targets if t)
+        elif isinstance(n, With):
+            out.update(it.optional_vars for it in n.items if it.optional_vars)
+        elif isinstance(n, Try):
+            out.update(h.varname for h in n.handlers if h.varname)
+        elif isinstance(n, InlineLet):
+            out.update(name for name, _ in n.bindings)
+        elif isinstance(n, (Function, ClassDef)) and n is not node:
+            out.add(n.name)
+    return out
+
+
+def bound_names(stmts: List[Stmt]) -> set[str]:
+    """Variables bound by `stmts` in their own scope (nested defs and except targets aside)."""
+    stmts = [st for st in stmts if not isinstance(st, (Function, ClassDef))]
+    out: set[str] = set()
+    for st in stmts:
+        out |= stored_names(st)
+    for n in walk_stmts(stmts, into_functions=False):
+        if isinstance(n, Try):
+            out -= {h.varname for h in n.handlers}
+    return out
+
+
+def target_names(target: object) -> List[str]:
+    """Flatten a loop target (a name or nested lists of names)."""
+    if isinstance(target, str):
+        return [target]
+    out: List[str] = []
+    for t in target:  # type: ignore[union-attr]
+        out.extend(target_names(t))
+    return out
+
+
+def map_exprs(node: object, fn: Callable[[Expr], Expr], into_functions: bool = True) -> None:
+    """Rewrite expressions in place, bottom-up: every Expr field/list item is replaced by fn(expr)."""
+    for name in field_names(type(node)) or ():
+        value = getattr(node, name)
+        if isinstance(value, list):
+            for i, item in enumerate(value):
+                if isinstance(item, tuple):
+                    value[i] = tuple(_map_one(x, fn, into_functions) for x in item)
+                else:
+                    value[i] = _map_one(item, fn, into_functions)
+        else:
+            setattr(node, name, _map_one(value, fn, into_functions))
+
+
+def _map_one(value: object, fn: Callable[[Expr], Expr], into_functions: bool) -> object:
+    if not _is_node(value):
+        return value
+    if isinstance(value, (Function, ClassDef, Lambda)) and not into_functions:
+        return value
+    map_exprs(value, fn, into_functions)
+    if isinstance(value, Expr):
+        return fn(value)
+    return value
@@ -0,0 +1,245 @@
+// Warm worker pool for `py2js run-server`: runs transpiled programs without starting node.
+//
+//   node pool.js [--workers N] [--memory MB]
+//
+// stdin:  one job per line, {"id": ..., "js": "<program without the runtime>", "timeout": MS}
+// stdout: one result per line, {"id": ..., "ok": bool, "stdout": ..., "stderr": ...,
+//                               "error": null | {"type", "message", "stack"}, "ms": N}
+//
+// Each worker process compiles pyrt.js once and runs every job in a fresh vm context with the
+// runtime loaded into it, one job at a time. A job is finished when its script, its timers
+// and its promises are done. A job that runs past its timeout fails with TimeoutError; if the
+// worker does not get control back (a loop in a timer callback) it is terminated and replaced.
+// --memory caps each worker's heap: a job that exhausts it fails with MemoryError and its
+// worker is replaced. Workers are processes rather than threads because a worker thread
+// that reaches its heap limit can take the whole process down with it. Results come back in
+// completion order, not submission order.
+//
+// The context cannot compile code from strings, and no object of this realm is reachable from
+// it: `process`, `console` and the timers are built inside the context by SHIMS and reach the
+// worker only through a function kept in their closure, which takes and returns primitives.
+// That makes escaping harder, but vm is not a security boundary: when jobs are untrusted, run
+// the server inside OS-level isolation (a container, a VM or an unprivileged sandboxed user).
+"use strict";
+const fs = require("fs");
+const os = require("os");
+const path = require("path");
+const readline = require("readline");
+const vm = require("vm");
+const { fork } = require("child_process");
+
+// extra time a worker gets to report a timeout itself before it is terminated
+const GRACE_MS = 250;
+
+// Runs inside each context; `host(kind, a, b)` is its only way out and returns nothing.
+const SHIMS = `(function (host) {
+  "use strict";
+  const listeners = { exit: [], uncaughtExceptionMonitor: [] };
+  const timers = new Map();
+  let seq = 0;
+  const stream = function (kind) {
+    return { isTTY: false, write: function (s) { host(kind, String(s)); return true; } };
+  };
+  const line = function (kind, args) { host(kind, Array.prototype.join.call(args, " ") + "\\n"); };
+  globalThis.process = {
+    stdout: stream("stdout"),
+    stderr: stream("stderr"),
+    argv: ["node", "main.js"],
+    env: {},
+    on: function (event, fn) { (listeners[event] = listeners[event] || []).push(fn); return this; },
+  };
+  globalThis.console = {
+    log: function () { line("stdout", arguments); },
+    error: function () { line("stderr", arguments); },
+  };
+  globalThis.setTimeout = function (fn, ms) {
+    const id = ++seq;
+    const args = Array.prototype.slice.call(arguments, 2);
+    timers.set(id, function () { fn.apply(null, args); });
+    host("timer", id, Number(ms) || 0);
+    return id;
+  };
+  globalThis.clearTimeout = function (id) { if (timers.delete(id)) host("clear", id); };
+  globalThis.queueMicrotask = function (fn) { Promise.resolve().then(function () { fn(); }); };
+  return {
+    fire: function (id) { const fn = timers.get(id); timers.delete(id); if (fn) fn(); },
+    emit: function (event, code) { for (const fn of listeners[event] || []) fn(code); },
+  };
+})`;
+
+function describe(e) {
+  if (e && e.code === "ERR_SCRIPT_EXECUTION_TIMEOUT") return { type: "TimeoutError", message: e.message, stack: null };
+  try {
+    const type = (e && (e.pyType || e.name)) || "Error";
+    const message = e && e.message !== undefined ? String(e.message) : String(e);
+    // frames of the program and the runtime, not of this file, the shims or node internals
+    const stack = (e && e.stack) ? String(e.stack).split("\n").filter(function (line) {
+      return !/^\s+at .*(pool\.js|shims\.js|node:|<anonymous>)/.test(line);
+    }).join("\n") : null;
+    return { type: String(type), message: message, stack: stack };
+  } catch (_) {
+    return { type: "Error", message: "uncaught exception", stack: null };
+  }
+}
+
+function runJob(shims, runtime, job) {
+  return new Promise(function (resolve) {
+    const out = { stdout: [], stderr: [] };
+    const timers = new Map();
+    let hooks = null;
+    let failed = null;
+    let done = false;
+    const check = function () {
+      if (failed !== null || timers.size === 0) finish();
+    };
+    const fail = function (e) {
+      if (failed === null) failed = e;
+      setImmediate(check);
+    };
+    // called from the context: takes primitives, returns nothing and never throws
+    const host = function (kind, a, b) {
+      try {
+        if (kind === "stdout" || kind === "stderr") {
+          out[kind].push(String(a));
+        } else if (kind === "timer" && !done) {
+          const id = Number(a);
+          timers.set(id, setTimeout(function () {
+            timers.delete(id);
+            try {
+              hooks.fire(id);
+            } catch (e) {
+              fail(e);
+            }
+            setImmediate(check);
+          }, Number(b)));
+        } else if (kind === "clear") {
+          clearTimeout(timers.get(Number(a)));
+          timers.delete(Number(a));
+        }
+      } catch (_) {}
+    };
+    const context = vm.createContext({}, { codeGeneration: { strings: false, wasm: false } });
+    hooks = shims.runInContext(context)(host);
+    runtime.runInContext(context);
+    const t0 = process.hrtime.bigint();
+    const deadline = setTimeout(function () {
+      fail({ code: "ERR_SCRIPT_EXECUTION_TIMEOUT", message: "Script execution timed out after " + job.timeout + "ms" });
+    }, job.timeout);
+    const finish = function () {
+      if (done) return;
+      done = true;
+      const ms = Number(process.hrtime.bigint() - t0) / 1e6;
+      clearTimeout(deadline);
+      for (const handle of timers.values()) clearTimeout(handle);
+      process.removeListener("unhandledRejection", fail);
+      try {
+        if (failed !== null) hooks.emit("uncaughtExceptionMonitor", 1);
+        hooks.emit("exit", failed === null ? 0 : 1);
+      } catch (_) {}
+      resolve({
+        id: job.id,
+        ok: failed === null,
+        stdout: out.stdout.join(""),
+        stderr: out.stderr.join(""),
+        error: failed === null ? null : describe(failed),
+        ms: ms,
+      });
+    };
+    process.on("unhandledRejection", fail);
+    try {
+      new vm.Script(job.js, { filename: "main.js" }).runInContext(context, { timeout: job.timeout, displayErrors: false });
+    } catch (e) {
+      fail(e);
+    }
+    setImmediate(check);
+  });
+}
+
+function work() {
+  const shims = new vm.Script(SHIMS, { filename: "shims.js" });
+  const runtime = new vm.Script(fs.readFileSync(path.join(__dirname, "pyrt.js"), "utf8"), { filename: "pyrt.js" });
+  process.on("message", function (job) {
+    runJob(shims, runtime, job).then(function (result) { process.send(result); });
+  });
+}
+
+function option(name, fallback) {
+  const i = process.argv.indexOf(name);
+  return i === -1 ? fallback : Number(process.argv[i + 1]);
+}
+
+function main() {
+  const size = Math.max(1, option("--workers", os.cpus().length));
+  const memory = option("--memory", 0);
+  const queue = [];
+  const slots = [];
+  let closing = false;
+
+  const reply = function (result) { process.stdout.write(JSON.stringify(result) + "\n"); };
+
+  const spawn = function () {
+    const slot = { worker: null, job: null, timer: null, failure: null };
+    const execArgv = memory > 0 ? ["--max-old-space-size=" + memory] : [];
+    slot.worker = fork(__filename, ["--worker"], { execArgv: execArgv, stdio: ["ignore", "ignore", "ignore", "ipc"] });
+    slot.worker.on("message", function (result) {
+      clearTimeout(slot.timer);
+      slot.job = null;
+      reply(result);
+      dispatch(slot);
+    });
+    slot.worker.on("exit", function (code, signal) {
+      clearTimeout(slot.timer);
+      if (slot.job !== null) {
+        // V8 aborts the process when the heap limit is reached
+        const failure = slot.failure || (signal === "SIGABRT" || code === 134
+          ? { type: "MemoryError", message: "job exceeded the " + memory + " MB heap limit", stack: null }
+          : { type: "SystemError", message: "worker exited with " + (signal || code), stack: null });
+        reply({ id: slot.job.id, ok: false, stdout: "", stderr: "", error: failure, ms: 0 });
+      }
+      slots.splice(slots.indexOf(slot), 1);
+      if (!closing || queue.length > 0) dispatch(spawn());
+      else if (idle()) shutdown();
+    });
+    slots.push(slot);
+    return slot;
+  };
+
+  // once stdin is closed and every job has been answered, stop the workers and let node exit
+  const idle = function () { return slots.every(function (s) { return s.job === null; }); };
+  const shutdown = function () {
+    for (const s of slots.slice()) s.worker.kill();
+  };
+
+  const dispatch = function (slot) {
+    if (queue.length === 0) {
+      if (closing && idle()) shutdown();
+      return;
+    }
+    const job = queue.shift();
+    slot.job = job;
+    slot.failure = null;
+    slot.timer = setTimeout(function () {
+      slot.failure = { type: "TimeoutError", message: "job did not finish within " + job.timeout + "ms", stack: null };
+      slot.worker.kill("SIGKILL");
+    }, job.timeout + GRACE_MS);
+    slot.worker.send(job);
+  };
+
+  for (let i = 0; i < size; i++) spawn();
+  const lines = readline.createInterface({ input: process.stdin });
+  lines.on("line", function (line) {
+    if (line.trim() === "") return;
+    const job = JSON.parse(line);
+    job.timeout = job.timeout || 5000;
+    queue.push(job);
+    const free = slots.find(function (s) { return s.job === null; });
+    if (free) dispatch(free);
+  });
+  lines.on("close", function () {
+    closing = true;
+    if (queue.length === 0 && idle()) shutdown();
+  });
+}
+
+if (process.argv.includes("--worker")) work();
+else main();
@@ -2,63 +2,329 @@
 function __reg(name, fn) { if (!globalThis[name]) globalThis[name] = fn; return globalThis[name]; }
 
 // ---- Exceptions ----
-__reg("PyError", class PyError extends Error { constructor(pyType, message){ super(message||""); this.pyType=pyType||"Exception"; this.name=this.pyType; }});
+// Python's builtin exception hierarchy (name -> base). User exception classes are added by
+// py_exc_register; matching is a lookup in the precomputed set of a type's ancestors.
+__reg("py_exc_bases", {
+  BaseException: null, SystemExit: "BaseException", KeyboardInterrupt: "BaseException",
+  GeneratorExit: "BaseException", CancelledError: "BaseException", Exception: "BaseException",
+  ArithmeticError: "Exception", FloatingPointError: "ArithmeticError", OverflowError: "ArithmeticError",
+  ZeroDivisionError: "ArithmeticError", AssertionError: "Exception", AttributeError: "Exception",
+  BufferError: "Exception", EOFError: "Exception", ImportError: "Exception", ModuleNotFoundError: "ImportError",
+  LookupError: "Exception", IndexError: "LookupError", KeyError: "LookupError", MemoryError: "Exception",
+  NameError: "Exception", UnboundLocalError: "NameError", OSError: "Exception", FileExistsError: "OSError",
+  FileNotFoundError: "OSError", PermissionError: "OSError", TimeoutError: "OSError", ReferenceError: "Exception",
+  RuntimeError: "Exception", NotImplementedError: "RuntimeError", RecursionError: "RuntimeError",
+  StopIteration: "Exception", StopAsyncIteration: "Exception", SyntaxError: "Exception", SystemError: "Exception",
+  TypeError: "Exception", ValueError: "Exception", UnicodeError: "ValueError", Warning: "Exception",
+  InvalidStateError: "Exception", QueueEmpty: "Exception", QueueFull: "Exception",
+});
+__reg("py_exc_mro", new Map());  // type name -> Set of itself and all its bases
+__reg("py_exc_ancestors", function (name) {
+  let mro = py_exc_mro.get(name);
+  if (mro === undefined) {
+    const base = Object.prototype.hasOwnProperty.call(py_exc_bases, name) ? py_exc_bases[name] : "Exception";
+    mro = new Set();
+    // a user class with several bases lists them all; its ancestors are the union
+    for (const b of base === null ? [] : Array.isArray(base) ? base : [base]) {
+      for (const a of py_exc_ancestors(b)) mro.add(a);
+    }
+    mro.add(name);
+    py_exc_mro.set(name, mro);
+  }
+  return mro;
+});
+__reg("py_exc_register", function (cls, name, ...bases) {
+  py_exc_bases[name] = bases.length === 1 ? bases[0] : bases;
+  py_exc_mro.delete(name);
+  cls.__pytype__ = name;
+});
+// Types swallowed by each running try statement, innermost last; null for a try whose
+// handlers may re-raise. Raising a type the innermost try swallows cannot end up uncaught,
+// so no stack trace is captured for it.
+__reg("py_catching", [null]);
+__reg("py_catch_enter", function (types) { py_catching.push(types); return py_catching.length - 1; });
+__reg("py_caught_here", function (pyType) {
+  const types = py_catching[py_catching.length - 1];
+  if (types === null) return false;
+  const mro = py_exc_ancestors(pyType);
+  for (let i = 0; i < types.length; i++) if (mro.has(types[i])) return true;
+  return false;
+});
+__reg("PyError", class PyError extends Error {
+  constructor(pyType, message) {
+    pyType = pyType || "Exception";
+    if (py_caught_here(pyType)) {
+      const limit = Error.stackTraceLimit;
+      Error.stackTraceLimit = 0;
+      super(message || "");
+      Error.stackTraceLimit = limit;
+    } else super(message || "");
+    this.pyType = pyType;
+    this.name = pyType;
+  }
+});
+// Base class for user exceptions deriving from the builtin `name`; `new` takes Python's arguments.
+__reg("py_exc_classes", new Map());
+__reg("py_exc_class", function (name) {
+  let cls = py_exc_classes.get(name);
+  if (cls === undefined) {
+    cls = class extends PyError {
+      constructor(...args) {
+        super(new.target.__pytype__ || name,
+              args.length === 0 ? "" : args.length === 1 ? py_str(args[0]) : py_repr(py_tuple_from_array(args)));
+        this.args = py_tuple_from_array(args);
+      }
+    };
+    cls.__pytype__ = name;
+    py_exc_classes.set(name, cls);
+  }
+  return cls;
+});
 __reg("py_raise", function (pyType, message) { throw new PyError(pyType, message); });
 __reg("py_wrap_error", function (e) {
   if (e instanceof PyError) return e;
   const pe = new PyError("Exception", (e && e.message) ? e.message : String(e));
   if (e && e.stack) pe.stack = e.stack; return pe;
 });
-__reg("py_exc_match", function (err, typeName) { if (!err) return false; return err.pyType === typeName || typeName === "Exception"; });
+__reg("py_exc_match", function (err, typeName) { return !!err && py_exc_ancestors(err.pyType).has(typeName); });
 
 // ---- Tuple helpers ----
 __reg("py_tuple", function () { return { __tuple__: true, items: Array.prototype.slice.call(arguments) }; });
 __reg("py_tuple_from_array", function (arr) { return { __tuple__: true, items: Array.prototype.slice.call(arr) }; });
 __reg("py_is_tuple", function (x) { return !!(x && x.__tuple__ === true); });
 __reg("py_tuple_items", function (t) { if (!py_is_tuple(t)) throw new PyError("TypeError", "expected tuple"); return t.items; });
+// Functions whose tuple result is always unpacked right away return it through this buffer.
+__reg("py_mret_buf", [null, null, null, null]);
+__reg("py_mret", function (a, b, c, d) { const r = py_mret_buf; r[0] = a; r[1] = b; r[2] = c; r[3] = d; });
+
+// ---- Set helpers ----
+// A JS Set compares by identity, so each set also indexes its tuples by value: a tuple
+// is only added when no equal one is there yet.
+__reg("py_object_ids", { ids: new WeakMap(), next: 0 });
+__reg("py_hash_key", function (x) {
+  if (x === null || x === undefined) return "N";
+  const t = typeof x;
+  if (t === "number" || t === "bigint") return "n" + String(x);
+  if (t === "boolean") return x ? "n1" : "n0";
+  if (t === "string") return "s" + JSON.stringify(x);
+  if (py_is_tuple(x)) return "t(" + x.items.map(py_hash_key).join(",") + ")";
+  if (Array.isArray(x) || x instanceof Set || py_is_dict(x)) throw new PyError("TypeError", "unhashable type: '" + py_type_name(x) + "'");
+  let id = py_object_ids.ids.get(x);
+  if (id === undefined) py_object_ids.ids.set(x, id = ++py_object_ids.next);
+  return "o" + id;
+});
+__reg("py_set_add", function (s, x) {
+  if (py_is_tuple(x)) {
+    const index = s.__py_tuples || (s.__py_tuples = new Map());
+    const k = py_hash_key(x);
+    if (index.has(k)) return;
+    index.set(k, x);
+  } else if (Array.isArray(x) || x instanceof Set || py_is_dict(x)) {
+    throw new PyError("TypeError", "unhashable type: '" + py_type_name(x) + "'");
+  }
+  s.add(x);
+});
+__reg("py_set_has", function (s, x) {
+  if (py_is_tuple(x)) return !!s.__py_tuples && s.__py_tuples.has(py_hash_key(x));
+  return s.has(x);
+});
 
 // ---- kwargs merge ----
-var py_kwargs_merge = globalThis.py_kwargs_merge || function (dst, src) {
+__reg("py_kwargs_merge", function (dst, src) {
   if (src == null) return;
   for (const k in src) {
     if (Object.prototype.hasOwnProperty.call(src, k)) dst[k] = src[k];
   }
-};
-globalThis.py_kwargs_merge = py_kwargs_merge;
+});
+// Arguments for a callee whose keyword arguments could not be matched to parameters statically.
+__reg("py_bind_kwargs", function (args, kwargs, params, takesKwargs) {
+  const out = args.slice(), rest = {};
+  for (const k of Object.keys(kwargs)) {
+    const i = params.indexOf(k);
+    if (i < 0) { rest[k] = kwargs[k]; continue; }
+    if (i < args.length) throw new PyError("TypeError", "got multiple values for argument '" + k + "'");
+    while (out.length < i) out.push(undefined);
+    out[i] = kwargs[k];
+  }
+  if (takesKwargs) {
+    while (out.length < params.length) out.push(undefined);
+    out.push(rest);
+  } else {
+    for (const k in rest) throw new PyError("TypeError", "got an unexpected keyword argument '" + k + "'");
+  }
+  return out;
+});
 
 // ---- Truthiness ----
 __reg("py_truth", function (x) {
   if (Array.isArray(x) || typeof x === "string") return x.length !== 0;
   if (py_is_tuple(x)) return x.items.length !== 0;
+  if (x instanceof Set) return x.size !== 0;
   if (x === null || x === undefined) return false;
   if (typeof x === "number") return x !== 0;
   if (typeof x === "boolean") return x;
+  if (typeof x === "bigint") return x !== 0n;
   if (typeof x === "object") return true;
   return !!x;
 });
 
 // ---- Arithmetic & operations ----
-__reg("py_floor_div", function (a, b) { const q = a / b; return (q >= 0) ? Math.floor(q) : Math.ceil(q - 1e-15); });
+// ints are JS numbers. In exact int mode (py2js --int-mode exact) an int result that leaves
+// the range numbers hold exactly (|n| <= 2**53 - 1) is recomputed as a BigInt, and BigInt
+// results that fit again turn back into numbers, so ordinary arithmetic never sees a BigInt.
+// Integral floats cannot be told apart from ints and are promoted the same way.
+__reg("py_int_mode", { exact: false });
+__reg("py_set_int_exact", function (on) { py_int_mode.exact = !!on; });
+__reg("py_int_norm", function (b) {
+  return (b >= -9007199254740991n && b <= 9007199254740991n) ? Number(b) : b;
+});
+// both operands are ints; true when `r`, their number result, may have lost precision
+__reg("py_int_overflow", function (a, b, r) {
+  return !Number.isSafeInteger(r) && py_int_mode.exact && Number.isSafeInteger(a) && Number.isSafeInteger(b);
+});
+// +, - and * where an operand is a BigInt or the number result overflowed
+__reg("py_big_arith", function (op, a, b) {
+  if (typeof a === "boolean") a = +a;
+  if (typeof b === "boolean") b = +b;
+  if ((typeof a === "number" && !Number.isInteger(a)) || (typeof b === "number" && !Number.isInteger(b))) {
+    a = Number(a); b = Number(b);
+    return op === "+" ? a + b : op === "-" ? a - b : a * b;
+  }
+  const x = BigInt(a), y = BigInt(b);
+  return py_int_norm(op === "+" ? x + y : op === "-" ? x - y : x * y);
+});
+__reg("py_is_num", function (x) { return typeof x === "number" || typeof x === "bigint" || typeof x === "boolean"; });
+// CPython's float_divmod: fmod, then move the remainder to the divisor's sign
+__reg("py_float_divmod", function (a, b) {
+  let mod = a % b, div = (a - mod) / b;
+  if (mod) {
+    if ((b < 0) !== (mod < 0)) { mod += b; div -= 1; }
+  } else mod = b < 0 ? -0 : 0;
+  let floordiv;
+  if (div) {
+    floordiv = Math.floor(div);
+    if (div - floordiv > 0.5) floordiv += 1;
+  } else floordiv = a / b < 0 ? -0 : 0;
+  return [floordiv, mod];
+});
+__reg("py_big_divmod", function (a, b, op) {
+  const x = BigInt(a), y = BigInt(b);
+  if (y === 0n) throw new PyError("ZeroDivisionError", op === "%" ? "integer modulo by zero" : "integer division or modulo by zero");
+  let q = x / y, r = x % y;
+  if (r !== 0n && (r < 0n) !== (y < 0n)) { q -= 1n; r += y; }
+  return [py_int_norm(q), py_int_norm(r)];
+});
+// [a // b, a % b] for any pair of numbers, ints, BigInts or bools
+__reg("py_divmod_pair", function (a, b, op) {
+  if (!py_is_num(a) || !py_is_num(b)) {
+    throw new PyError("TypeError", "unsupported operand type(s) for " + op + ": '" + py_type_name(a) + "' and '" + py_type_name(b) + "'");
+  }
+  if (typeof a === "boolean") a = +a;
+  if (typeof b === "boolean") b = +b;
+  const ints = (typeof a === "bigint" || Number.isInteger(a)) && (typeof b === "bigint" || Number.isInteger(b));
+  if (ints && (typeof a === "bigint" || typeof b === "bigint")) {
+    return py_big_divmod(a, b, op);
+  }
+  a = Number(a); b = Number(b);
+  if (b === 0) {
+    if (ints) return py_big_divmod(a, b, op);
+    throw new PyError("ZeroDivisionError", op === "%" ? "float modulo" : op === "//" ? "float floor division by zero" : "float divmod()");
+  }
+  return py_float_divmod(a, b);
+});
+__reg("py_floor_div", function (a, b) {
+  if (typeof a === "number" && typeof b === "number" && b !== 0) {
+    const m = a % b, q = (m !== 0 && (m < 0) !== (b < 0)) ? (a - m) / b - 1 : (a - m) / b;
+    if (Number.isSafeInteger(q)) return q;
+  }
+  return py_divmod_pair(a, b, "//")[0];
+});
+__reg("py_mod", function (a, b) {
+  if (typeof a === "number" && typeof b === "number" && b !== 0) {
+    const m = a % b;
+    return (m !== 0 && (m < 0) !== (b < 0)) ? m + b : m;
+  }
+  if (typeof a === "string") throw new PyError("NotImplementedError", "printf-style string formatting is not supported; use an f-string");
+  return py_divmod_pair(a, b, "%")[1];
+});
+__reg("py_divmod", function (a, b) { return py_tuple_from_array(py_divmod_pair(a, b, "divmod()")); });
+__reg("py_truediv", function (a, b) {
+  if (!py_is_num(a) || !py_is_num(b)) {
+    throw new PyError("TypeError", "unsupported operand type(s) for /: '" + py_type_name(a) + "' and '" + py_type_name(b) + "'");
+  }
+  if (Number(b) === 0) throw new PyError("ZeroDivisionError", "division by zero");
+  if ((typeof a === "bigint" || typeof b === "bigint") && Number.isInteger(Number(a)) && Number.isInteger(Number(b))) {
+    const x = BigInt(a), y = BigInt(b);
+    if (x % y === 0n) return Number(x / y);
+  }
+  return Number(a) / Number(b);
+});
+__reg("py_pow", function (a, b) {
+  if (typeof a === "boolean") a = +a;
+  if (typeof b === "boolean") b = +b;
+  if (!py_is_num(a) || !py_is_num(b)) {
+    throw new PyError("TypeError", "unsupported operand type(s) for ** or pow(): '" + py_type_name(a) + "' and '" + py_type_name(b) + "'");
+  }
+  const ints = (typeof a === "bigint" || Number.isInteger(a)) && (typeof b === "bigint" || Number.isInteger(b));
+  if (ints && b >= 0) {
+    if (typeof a === "number" && typeof b === "number") {
+      const r = a ** b;
+      if (Number.isSafeInteger(r) || !py_int_mode.exact || !Number.isSafeInteger(a)) return r;
+    }
+    return py_int_norm(BigInt(a) ** BigInt(b));
+  }
+  const x = Number(a), y = Number(b);
+  if (x === 0 && y < 0) throw new PyError("ZeroDivisionError", "0.0 cannot be raised to a negative power");
+  if (x < 0 && !Number.isInteger(y)) throw new PyError("ValueError", "complex results are not supported");
+  const r = x ** y;
+  if (r === Infinity || r === -Infinity) {
+    if (Number.isFinite(x) && Number.isFinite(y)) throw new PyError("OverflowError", "(34, 'Numerical result out of range')");
+  }
+  return r;
+});
 
 __reg("py_add", (function(){
   function base(a, b) {
     const aIsStr = (typeof a === "string"), bIsStr = (typeof b === "string");
-    const aIsNum = (typeof a === "number"), bIsNum = (typeof b === "number");
     if (aIsStr && bIsStr) return a + b;
-    if (aIsNum && bIsNum) return a + b;
+    if (typeof a === "bigint" || typeof b === "bigint") {
+      if (py_is_num(a) && py_is_num(b)) return py_big_arith("+", a, b);
+    }
     if (aIsStr || bIsStr) throw new PyError("TypeError", "can only concatenate str with str");
     throw new PyError("TypeError", "unsupported operand type(s) for +");
   }
   return function(a, b){
+    if (typeof a === "number" && typeof b === "number") {
+      const r = a + b;
+      return py_int_overflow(a, b, r) ? py_big_arith("+", a, b) : r;
+    }
     if (Array.isArray(a) && Array.isArray(b)) return a.concat(b);
     if (py_is_tuple(a) && py_is_tuple(b)) return py_tuple_from_array(a.items.concat(b.items));
     return base(a, b);
   };
 })());
 
+__reg("py_sub", function (a, b) {
+  if (typeof a === "number" && typeof b === "number") {
+    const r = a - b;
+    return py_int_overflow(a, b, r) ? py_big_arith("-", a, b) : r;
+  }
+  if (py_is_num(a) && py_is_num(b)) return py_big_arith("-", a, b);
+  if (a instanceof Set && b instanceof Set) {
+    const out = new Set();
+    for (const x of a) if (!py_set_has(b, x)) py_set_add(out, x);
+    return out;
+  }
+  throw new PyError("TypeError", "unsupported operand type(s) for -: '" + py_type_name(a) + "' and '" + py_type_name(b) + "'");
+});
+
 __reg("py_mul", function(a, b){
   const aNum = typeof a === "number", bNum = typeof b === "number";
-  if (aNum && bNum) return a * b;
+  if (aNum && bNum) {
+    const r = a * b;
+    return py_int_overflow(a, b, r) ? py_big_arith("*", a, b) : r;
+  }
+  if ((typeof a === "bigint" || typeof b === "bigint") && py_is_num(a) && py_is_num(b)) return py_big_arith("*", a, b);
   if (typeof a === "string" && bNum) return a.repeat(b);
   if (typeof b === "string" && aNum) return b.repeat(a);
   if (Array.isArray(a) && bNum) { const out=[]; for(let i=0;i<b;i++) out.push(...a); return out; }
@@ -80,6 +346,7 @@ __reg("py_eq", function (a, b) {
     return true;
   }
   const ta = typeof a, tb = typeof b;
+  if (ta === "bigint" || tb === "bigint") return (ta === "number" || ta === "bigint") && (tb === "number" || tb === "bigint") && a == b;
   if (ta !== tb) return false;
   if (ta === "string" || ta === "number" || ta === "boolean") return a === b;
   if (Array.isArray(a) && Array.isArray(b)) {
@@ -87,6 +354,11 @@ __reg("py_eq", function (a, b) {
     for (let i = 0; i < a.length; i++) if (!py_eq(a[i], b[i])) return false;
     return true;
   }
+  if (a instanceof Set || b instanceof Set) {
+    if (!(a instanceof Set && b instanceof Set) || a.size !== b.size) return false;
+    for (const x of a) if (!py_set_has(b, x)) return false;
+    return true;
+  }
   if (ta === "object") {
     const ak = Object.keys(a), bk = Object.keys(b);
     if (ak.length !== bk.length) return false;
@@ -103,25 +375,26 @@ __reg("py_len", function (x) {
   if (Array.isArray(x)) return x.length;
   if (py_is_tuple(x)) return x.items.length;
   if (typeof x === "string") return x.length;
+  if (x instanceof Set) return x.size;
   if (x && typeof x === "object") return Object.keys(x).length;
-  throw new Error("len() unsupported for this type in v1");
+  throw new PyError("TypeError", "object of type '" + py_type_name(x) + "' has no len()");
 });
 
 __reg("py_getitem", function (obj, key) {
   if (Array.isArray(obj) || typeof obj === "string" || py_is_tuple(obj)) {
     const arr = py_is_tuple(obj) ? obj.items : obj;
     const n = arr.length;
-    if (typeof key !== "number") throw new Error("TypeError: indices must be integers");
+    if (typeof key !== "number") throw new PyError("TypeError", py_type_name(obj) + " indices must be integers or slices, not " + py_type_name(key));
     let idx = key; if (idx < 0) idx = n + idx;
-    if (idx < 0 || idx >= n) throw new Error("IndexError");
+    if (idx < 0 || idx >= n) throw new PyError("IndexError", (typeof obj === "string" ? "string" : py_type_name(obj)) + " index out of range");
     return arr[idx];
   }
   if (obj && typeof obj === "object") {
     const k = String(key);
-    if (!(k in obj)) throw new Error("KeyError: " + k);
+    if (!(k in obj)) throw new PyError("KeyError", py_repr(key));
     return obj[k];
   }
-  throw new Error("TypeError: object is not subscriptable");
+  throw new PyError("TypeError", "'" + py_type_name(obj) + "' object is not subscriptable");
 });
 
 __reg("py_in", function (val, container) {
@@ -138,6 +411,7 @@ __reg("py_in", function (val, container) {
     if (typeof val !== "string") return false;
     return container.indexOf(val) !== -1;
   }
+  if (container instanceof Set) return py_set_has(container, val);
   if (container && typeof container === "object") {
     const k = String(val);
     return Object.prototype.hasOwnProperty.call(container, k);
@@ -145,40 +419,150 @@ __reg("py_in", function (val, container) {
   return false;
 });
 
+__reg("py_is_dict", function (x) {
+  if (!x || typeof x !== "object" || Array.isArray(x)) return false;
+  const proto = Object.getPrototypeOf(x);
+  return proto === Object.prototype || proto === null;
+});
+
+// Iteration hands out JS iterables: arrays and strings are iterated in place (strings by
+// code point), dicts lazily by key, and user classes through __iter__/__next__.
 __reg("py_iter", function (container) {
-  if (Array.isArray(container)) return container;
+  if (Array.isArray(container) || typeof container === "string") return container;
   if (py_is_tuple(container)) return container.items;
-  if (typeof container === "string") return container.split("");
-  if (container && typeof container === "object") return Object.keys(container);
-  throw new Error("TypeError: object is not iterable");
+  if (container && typeof container === "object") {
+    if (typeof container[Symbol.iterator] === "function") return container;
+    if (typeof container.__iter__ === "function") {
+      const it = container.__iter__();
+      if (it && typeof it.__next__ === "function") return py_iter_protocol(it);
+      if (it !== container) return py_iter(it);
+      throw new PyError("TypeError", "iter() returned non-iterator");
+    }
+    if (py_is_dict(container)) return py_dict_keys_iter(container);
+  }
+  throw new PyError("TypeError", "object is not iterable");
+});
+// Runtime iterators built on function* are handed out through py_resumable: a JS for..of
+// calls return() when it is left early, which would close the iterator for good, while a
+// Python iterator stays usable after a break.
+__reg("py_resumable", function (it) {
+  return {
+    [Symbol.iterator]() { return this; },
+    next() { return it.next(); },
+  };
+});
+__reg("py_dict_keys_iter", function (d) {
+  return py_resumable((function* () {
+    for (const k in d) if (Object.prototype.hasOwnProperty.call(d, k)) yield k;
+  })());
+});
+__reg("py_iter_protocol", function (it) {
+  return {
+    [Symbol.iterator]() { return this; },
+    next() {
+      try { return { value: it.__next__(), done: false }; }
+      catch (e) { if (e instanceof PyError && py_exc_match(e, "StopIteration")) return { value: undefined, done: true }; throw e; }
+    },
+  };
+});
+__reg("py_iterator", function (x) { return py_iter(x)[Symbol.iterator](); });
+
+// ---- generators ----
+// Generator functions compile to function*; the JS generator is wrapped so Python code
+// sees send/throw/close and StopIteration carrying the return value. The wrapper has no
+// `return` method, so leaving a for loop early keeps the generator resumable, as in Python.
+__reg("py_stop_iteration", function (value) {
+  const e = new PyError("StopIteration", value === undefined || value === null ? "" : py_str(value));
+  e.value = value === undefined ? null : value;
+  return e;
+});
+__reg("PyGenerator", class PyGenerator {
+  constructor(gen, name) { this._gen = gen; this._name = name; this._started = false; }
+  [Symbol.iterator]() { return this; }
+  next(v) {
+    this._started = true;
+    const r = this._gen.next(v === undefined ? null : v);
+    if (r.done && r.value === undefined) r.value = null;
+    return r;
+  }
+  __iter__() { return this; }
+  __next__() { return this.send(null); }
+  send(v) {
+    if (!this._started && v !== null && v !== undefined) throw new PyError("TypeError", "can't send non-None value to a just-started generator");
+    const r = this.next(v);
+    if (r.done) throw py_stop_iteration(r.value);
+    return r.value;
+  }
+  throw(e) {
+    this._started = true;
+    const r = this._gen.throw(e);
+    if (r.done) throw py_stop_iteration(r.value);
+    return r.value;
+  }
+  close() { this._gen.return(undefined); return null; }
+  __repr__() { return "<generator object " + this._name + ">"; }
+});
+__reg("py_generator", function (gen, name) { return new PyGenerator(gen, name); });
+// `yield from x`: delegate straight to the underlying generator so sends, throws and the
+// return value pass through.
+__reg("py_yield_from", function (x) { return x instanceof PyGenerator ? x._gen : py_iter(x); });
+__reg("py_next", function (it, dflt) {
+  const hasDefault = arguments.length > 1;
+  if (it && typeof it.__next__ === "function") {
+    if (!hasDefault) return it.__next__();
+    try { return it.__next__(); }
+    catch (e) { if (e instanceof PyError && py_exc_match(e, "StopIteration")) return dflt; throw e; }
+  }
+  if (it && typeof it.next === "function") {
+    const r = it.next();
+    if (!r.done) return r.value;
+    if (hasDefault) return dflt;
+    throw py_stop_iteration(r.value);
+  }
+  throw new PyError("TypeError", "object is not an iterator");
 });
 
 __reg("py_to_array", function (x) {
   if (Array.isArray(x)) return x;
   if (py_is_tuple(x)) return x.items.slice();
-  if (typeof x === "string") return x.split("");
-  throw new PyError("TypeError", "can only unpack iterable (list/tuple/str) with *");
+  if (typeof x === "string") return Array.from(x);
+  return Array.from(py_iter(x));
 });
 
 // ---- range ----
 __reg("py_range", function (start, stop, step) {
   if (stop === undefined) { stop = start; start = 0; }
   if (step === undefined) step = 1;
-  if (step === 0) throw new Error("ValueError: range() arg 3 must not be zero");
+  if (step === 0) throw new PyError("ValueError", "range() arg 3 must not be zero");
   const out = [];
   if (step > 0) for (let i = start; i < stop; i += step) out.push(i);
   else for (let i = start; i > stop; i += step) out.push(i);
   return out;
 });
 
+__reg("py_index", function (x) {
+  if (typeof x === "boolean") return +x;
+  if (typeof x === "bigint") throw new PyError("IndexError", "cannot fit 'int' into an index-sized integer");
+  if (typeof x !== "number" || !Number.isInteger(x)) throw new PyError("TypeError", "'" + py_type_name(x) + "' object cannot be interpreted as an integer");
+  return x;
+});
+
+// Unpacking into exactly n targets; lists come back as-is, tuples as their item array.
+__reg("py_unpack", function (x, n) {
+  const arr = Array.isArray(x) ? x : py_is_tuple(x) ? x.items : py_to_array(x);
+  if (arr.length < n) throw new PyError("ValueError", "not enough values to unpack (expected " + n + ", got " + arr.length + ")");
+  if (arr.length > n) throw new PyError("ValueError", "too many values to unpack (expected " + n + ")");
+  return arr;
+});
+
 // ---- slicing ----
 __reg("py_slice", function (seq, start, stop, step) {
   let s = (step == null) ? 1 : Number(step);
-  if (Number.isNaN(s)) throw new Error("TypeError: slice step must be a number");
-  if (s === 0) throw new Error("ValueError: slice step cannot be zero");
+  if (Number.isNaN(s)) throw new PyError("TypeError", "slice indices must be integers or None");
+  if (s === 0) throw new PyError("ValueError", "slice step cannot be zero");
   const arr = py_is_tuple(seq) ? seq.items
             : (typeof seq === "string" ? seq.split("") : (Array.isArray(seq) ? seq : null));
-  if (!arr) throw new Error("TypeError: object is not subscriptable by slice");
+  if (!arr) throw new PyError("TypeError", "'" + py_type_name(seq) + "' object is not subscriptable");
   const res = _slice_array_normalized(arr, start, stop, s);
   if (typeof seq === "string") return res.join("");
   if (py_is_tuple(seq)) return py_tuple_from_array(res);
@@ -190,7 +574,7 @@ __reg("_slice_array_normalized", function (arr, start, stop, step) {
   const hasStop  = !(stop  == null);
   let lo = step > 0 ? (hasStart ? Number(start) : 0)     : (hasStart ? Number(start) : n - 1);
   let hi = step > 0 ? (hasStop  ? Number(stop)  : n)     : (hasStop  ? Number(stop)  : -1);
-  if (Number.isNaN(lo) || Number.isNaN(hi)) throw new Error("TypeError: slice indices must be integers or None");
+  if (Number.isNaN(lo) || Number.isNaN(hi)) throw new PyError("TypeError", "slice indices must be integers or None");
   if (hasStart && lo < 0) lo += n;
   if (hasStop  && hi < 0) hi += n;
   if (lo < -1) lo = -1; if (lo > n) lo = n;
@@ -202,8 +586,36 @@ __reg("_slice_array_normalized", function (arr, start, stop, step) {
 });
 
 // ---- list methods ----
-__reg("py_list_append", function(lst, x){ if (!Array.isArray(lst)) throw new PyError("TypeError", "append() on non-list"); lst.push(x); return null; });
-__reg("py_list_pop", function(lst){ if (!Array.isArray(lst)) throw new PyError("TypeError", "pop() on non-list"); if (lst.length === 0) throw new PyError("IndexError", "pop from empty list"); return lst.pop(); });
+// Non-list receivers (user classes) get their own method called.
+__reg("py_list_append", function(lst, x){ if (!Array.isArray(lst)) return py_call_method(lst, "append", [x]); lst.push(x); return null; });
+__reg("py_list_sort", function(lst, key, reverse){ if (!Array.isArray(lst)) return py_call_method(lst, "sort", Array.prototype.slice.call(arguments, 1)); py_sort_array(lst, key, reverse); return null; });
+__reg("py_list_pop", function(lst){ if (!Array.isArray(lst)) return py_call_method(lst, "pop", Array.prototype.slice.call(arguments, 1)); if (lst.length === 0) throw new PyError("IndexError", "pop from empty list"); return lst.pop(); });
+
+// ---- dict methods ----
+// Non-dict receivers (user classes) get their own method called.
+__reg("py_dict_items", function (d) {
+  if (!py_is_dict(d)) return py_call_method(d, "items", []);
+  const out = [];
+  for (const k in d) out.push(py_tuple_from_array([k, d[k]]));
+  return out;
+});
+__reg("py_dict_keys", function (d) {
+  if (!py_is_dict(d)) return py_call_method(d, "keys", []);
+  return Object.keys(d);
+});
+__reg("py_dict_values", function (d) {
+  if (!py_is_dict(d)) return py_call_method(d, "values", []);
+  return Object.values(d);
+});
+__reg("py_dict_get", function (d, key, dflt) {
+  if (!py_is_dict(d)) return py_call_method(d, "get", Array.prototype.slice.call(arguments, 1));
+  const k = String(key);
+  return Object.prototype.hasOwnProperty.call(d, k) ? d[k] : (dflt === undefined ? null : dflt);
+});
+__reg("py_call_method", function (obj, name, args) {
+  if (obj == null || typeof obj[name] !== "function") throw new PyError("AttributeError", "'" + py_type_name(obj) + "' object has no attribute '" + name + "'");
+  return obj[name].apply(obj, args);
+});
 
 // ---- string methods ----
 __reg("py_str_upper", function (s) { if (typeof s !== "string") throw new PyError("TypeError", "upper() arg must be str"); return s.toUpperCase(); });
@@ -214,100 +626,815 @@ __reg("py_str_split", function (s, sep) {
   if (typeof sep !== "string") throw new PyError("TypeError", "sep must be str");
   return s.split(sep);
 });
-__reg("py_str_join", function(sep, iterable){ if (typeof sep !== "string") throw new PyError("TypeError","sep must be str"); const arr = py_to_array(iterable); return arr.map(x => (typeof x === "string" ? x : py_str(x))).join(sep); });
+__reg("py_str_join", function (sep, iterable) {
+  if (typeof sep !== "string") {
+    if (sep && typeof sep.join === "function") return sep.join.apply(sep, Array.prototype.slice.call(arguments, 1));
+    throw new PyError("TypeError", "sep must be str");
+  }
+  let out = "", first = true;
+  for (const x of py_iter(iterable)) {
+    if (!first) out += sep;
+    out += (typeof x === "string" ? x : py_str(x));
+    first = false;
+  }
+  return out;
+});
 __reg("py_str_startswith", function(s, prefix){ if (typeof s !== "string" || typeof prefix !== "string") throw new PyError("TypeError","startswith expects str"); return s.startsWith(prefix); });
 __reg("py_str_endswith", function(s, suffix){ if (typeof s !== "string" || typeof suffix !== "string") throw new PyError("TypeError","endswith expects str"); return s.endsWith(suffix); });
 __reg("py_str_replace", function(s, oldv, newv){ if (typeof s !== "string" || typeof oldv !== "string" || typeof newv !== "string") throw new PyError("TypeError","replace expects str"); return s.split(oldv).join(newv); });
 __reg("py_str_find", function(s, sub){ if (typeof s !== "string" || typeof sub !== "string") throw new PyError("TypeError","find expects str"); return s.indexOf(sub); });
 
+// ---- string builders (accumulate-in-loop rewrites) ----
+__reg("py_sb_push", function (sb, x) {
+  if (typeof x !== "string") throw new PyError("TypeError", "can only concatenate str with str");
+  sb.push(x);
+});
+__reg("py_sb_value", function (sb) {
+  if (sb.length > 1) { const s = sb.join(""); sb.length = 1; sb[0] = s; }
+  return sb[0];
+});
+
 // ---- with-statement helpers ----
 __reg("py_with_enter", function(mgr){ if (!mgr || typeof mgr.__enter__ !== "function" || typeof mgr.__exit__ !== "function") throw new PyError("TypeError","context manager requires __enter__ and __exit__"); return mgr.__enter__(); });
 __reg("py_with_exit", function(mgr){ try { mgr.__exit__(null, null, null); } catch(e) { throw e; } });
+__reg("py_with_aenter", async function(mgr){ if (!mgr || typeof mgr.__aenter__ !== "function" || typeof mgr.__aexit__ !== "function") throw new PyError("TypeError","asynchronous context manager requires __aenter__ and __aexit__"); return await mgr.__aenter__(); });
+__reg("py_with_aexit", async function(mgr){ await mgr.__aexit__(null, null, null); });
+
+// ---- async ----
+// `async for` accepts JS async iterables, user classes with __aiter__/__anext__, and
+// plain iterables.
+__reg("py_aiter", function (x) {
+  if (x && typeof x[Symbol.asyncIterator] === "function") return x;
+  if (x && typeof x.__aiter__ === "function") {
+    const it = x.__aiter__();
+    return {
+      [Symbol.asyncIterator]() { return this; },
+      async next() {
+        try { return { value: await it.__anext__(), done: false }; }
+        catch (e) { if (e instanceof PyError && py_exc_match(e, "StopAsyncIteration")) return { value: undefined, done: true }; throw e; }
+      },
+    };
+  }
+  return py_iter(x);
+});
 
-// ---- super() minimal support -----
-__reg("py_super", function (self, base) {
-  const proxy = {}; const proto = base && base.prototype;
-  if (!proto) return proxy;
-  for (const k of Object.getOwnPropertyNames(proto)) {
-    if (k === "constructor") continue;
-    if (typeof proto[k] === "function") proxy[k] = function(){ return proto[k].apply(self, arguments); }
+// Cancellation. Each call of an async def gets a record {outer, task}: `outer` is the record
+// of the coroutine that was running when it was called, and create_task() sets `task`. Every
+// await resumes through py_co_resume, which makes the record current again and raises
+// CancelledError in a coroutine whose task was cancelled while it was suspended.
+__reg("py_co_state", { current: null, records: new WeakMap() });  // coroutine -> its record
+__reg("py_co_enter", function () {
+  const co = { outer: py_co_state.current, task: null, _wake: null };
+  py_co_state.current = co;
+  return co;
+});
+// called with the coroutine once its body first suspends (or finishes)
+__reg("py_co_start", function (co, aw) {
+  py_co_state.current = co.outer;
+  py_co_state.records.set(aw, co);
+  return aw;
+});
+__reg("py_co_task", function (co) {
+  for (; co !== null; co = co.outer) if (co.task !== null) return co.task;
+  return null;
+});
+// asyncio.sleep registers `wake` (which rejects it early) with the task of the running
+// coroutine. A coroutine runs up to its first await when it is called, before create_task()
+// gives it a task, so without a task yet the wake is left on each record of the chain; the
+// task made for one of them takes it over. `wake.holders` lists where it is registered.
+__reg("py_co_wait", function (wake) {
+  wake.holders = [];
+  for (let co = py_co_state.current; co !== null; co = co.outer) {
+    if (co.task !== null) { co.task._wake = wake; wake.holders.push(co.task); return; }
+    co._wake = wake;
+    wake.holders.push(co);
+  }
+});
+__reg("py_co_release", function (wake) {
+  for (const h of wake.holders) if (h._wake === wake) h._wake = null;
+});
+__reg("py_co_resume", function (co, value) {
+  py_co_state.current = co;
+  if (co !== null) {
+    const task = py_co_task(co);
+    if (task !== null && task._must_cancel) {
+      task._must_cancel = false;
+      throw new PyError("CancelledError", "");
+    }
+  }
+  return value;
+});
+
+// asyncio on top of the Node event loop: coroutines are promises, tasks are thenables.
+// A task cancelled in asyncio.sleep gets CancelledError there at once and ends as its
+// coroutine does. Otherwise the task is rejected at once and the coroutine gets
+// CancelledError when its pending await completes.
+__reg("PyTask", class PyTask {
+  constructor(aw) {
+    this._done = false; this._result = null; this._error = null; this._cancelled = false;
+    this._must_cancel = false; this._wake = null;
+    const co = py_co_state.records.get(aw);
+    if (co !== undefined) {
+      co.task = this;
+      if (co._wake !== null) { this._wake = co._wake; this._wake.holders.push(this); }
+    }
+    const self = this;
+    const cancel = new Promise(function (_, reject) { self._reject = reject; });
+    this._promise = Promise.race([Promise.resolve(aw), cancel]).then(
+      function (v) { self._done = true; self._cancelled = false; self._result = v === undefined ? null : v; return self._result; },
+      function (e) { self._done = true; self._error = e; throw e; });
+    this._promise.catch(function () {});
+  }
+  then(onValue, onError) { return this._promise.then(onValue, onError); }
+  done() { return this._done; }
+  cancelled() { return this._cancelled; }
+  cancel() {
+    if (this._done) return false;
+    this._cancelled = true;
+    if (this._wake !== null) { this._wake(new PyError("CancelledError", "")); return true; }
+    this._must_cancel = true;
+    this._reject(new PyError("CancelledError", ""));
+    return true;
+  }
+  result() {
+    if (!this._done) throw new PyError("InvalidStateError", "Result is not set.");
+    if (this._error) throw this._error;
+    return this._result;
+  }
+  __repr__() { return "<Task " + (this._cancelled ? "cancelled" : this._done ? "finished" : "pending") + ">"; }
+});
+
+__reg("PyAsyncQueue", class PyAsyncQueue {
+  constructor(maxsize) {
+    this._maxsize = maxsize > 0 ? maxsize : 0;
+    this._items = []; this._head = 0;
+    this._getters = []; this._putters = []; this._joiners = [];
+    this._unfinished = 0;
+  }
+  qsize() { return this._items.length - this._head; }
+  empty() { return this.qsize() === 0; }
+  full() { return this._maxsize > 0 && this.qsize() >= this._maxsize; }
+  put_nowait(x) {
+    if (this.full()) throw new PyError("QueueFull", "");
+    this._items.push(x);
+    this._unfinished++;
+    if (this._getters.length) this._getters.shift()();
+    return null;
+  }
+  get_nowait() {
+    if (this.empty()) throw new PyError("QueueEmpty", "");
+    const x = this._items[this._head];
+    this._items[this._head++] = undefined;
+    if (this._head > 1024 && this._head * 2 > this._items.length) { this._items = this._items.slice(this._head); this._head = 0; }
+    if (this._putters.length) this._putters.shift()();
+    return x;
+  }
+  async put(x) {
+    while (this.full()) { const q = this; await new Promise(function (r) { q._putters.push(r); }); }
+    return this.put_nowait(x);
+  }
+  async get() {
+    while (this.empty()) { const q = this; await new Promise(function (r) { q._getters.push(r); }); }
+    return this.get_nowait();
+  }
+  task_done() {
+    if (this._unfinished <= 0) throw new PyError("ValueError", "task_done() called too many times");
+    if (--this._unfinished === 0) for (const r of this._joiners.splice(0)) r();
+    return null;
+  }
+  async join() {
+    if (this._unfinished > 0) { const q = this; await new Promise(function (r) { q._joiners.push(r); }); }
+    return null;
+  }
+});
+
+__reg("PyAsyncSemaphore", class PyAsyncSemaphore {
+  constructor(value) {
+    if (value === undefined || value === null) value = 1;
+    if (value < 0) throw new PyError("ValueError", "Semaphore initial value must be >= 0");
+    this._value = value; this._waiters = [];
+  }
+  locked() { return this._value === 0; }
+  async acquire() {
+    if (this._value > 0 && this._waiters.length === 0) { this._value--; return true; }
+    const s = this;
+    await new Promise(function (r) { s._waiters.push(r); });
+    return true;
+  }
+  release() {
+    // a waiting acquire() takes the permit directly
+    if (this._waiters.length) this._waiters.shift()();
+    else this._value++;
+    return null;
+  }
+  async __aenter__() { await this.acquire(); return null; }
+  async __aexit__() { this.release(); return false; }
+});
+
+__reg("py_asyncio", {
+  run: async function (coro) { const v = await coro; return v === undefined ? null : v; },
+  gather: function () {
+    return Promise.all(Array.prototype.slice.call(arguments)).then(function (vs) {
+      return vs.map(function (v) { return v === undefined ? null : v; });
+    });
+  },
+  sleep: function (delay, result) {
+    return new Promise(function (resolve, reject) {
+      const timer = setTimeout(function () {
+        py_co_release(wake);
+        resolve(result === undefined ? null : result);
+      }, Math.max(0, delay * 1000));
+      const wake = function (e) { clearTimeout(timer); py_co_release(wake); reject(e); };
+      py_co_wait(wake);
+    });
+  },
+  create_task: function (coro) { return new PyTask(coro); },
+  ensure_future: function (aw) { return aw instanceof PyTask ? aw : new PyTask(aw); },
+  wait_for: function (aw, timeout) {
+    if (timeout === undefined || timeout === null) return Promise.resolve(aw);
+    // a coroutine runs as a task, so that the timeout can cancel it
+    if (!(aw instanceof PyTask) && py_co_state.records.has(aw)) aw = new PyTask(aw);
+    let timer;
+    const expired = new Promise(function (_, reject) {
+      timer = setTimeout(function () {
+        if (aw instanceof PyTask) aw.cancel();
+        reject(new PyError("TimeoutError", ""));
+      }, Math.max(0, timeout * 1000));
+    });
+    return Promise.race([Promise.resolve(aw), expired]).finally(function () { clearTimeout(timer); });
+  },
+  Queue: function (maxsize) { return new PyAsyncQueue(maxsize); },
+  Semaphore: function (value) { return new PyAsyncSemaphore(value); },
+});
+
+// ---- super() -----
+// Fallback where native `super.m()` is not valid JS (generator bodies, nested functions):
+// resolves `m` on the prototype chain above `cls` once per class and method name.
+__reg("py_super_methods", new Map());  // class -> Map of method name -> function
+__reg("py_super_method", function (cls, name) {
+  let methods = py_super_methods.get(cls);
+  if (!methods) py_super_methods.set(cls, methods = new Map());
+  let fn = methods.get(name);
+  if (fn === undefined) {
+    const proto = Object.getPrototypeOf(cls.prototype);
+    fn = proto ? proto[name] : undefined;
+    if (typeof fn !== "function") throw new PyError("AttributeError", "'super' object has no attribute '" + name + "'");
+    methods.set(name, fn);
+  }
+  return fn;
+});
+
+// ---- class attributes ----
+// Class attributes live on the class (as statics). Instances read them through the class, so
+// rebinding `Cls.attr` is seen everywhere, and assigning one on an instance shadows it.
+__reg("py_class_attrs", function (cls, names) {
+  for (const name of names) {
+    Object.defineProperty(cls.prototype, name, {
+      get() { return this.constructor[name]; },
+      set(v) { Object.defineProperty(this, name, {value: v, writable: true, enumerable: true, configurable: true}); },
+      configurable: true,
+    });
   }
-  return proxy;
 });
 
 // ---- math shim (extended) ----
-__reg("py_math_floor", Math.floor);
-__reg("py_math_ceil",  Math.ceil);
-__reg("py_math_sqrt",  Math.sqrt);
-__reg("py_math_pow",   Math.pow);
-__reg("py_math_abs",   Math.abs);
-
-// ---- builtins: sorted, min, max, sum, zip ----
-__reg("py_sorted", function (iterable) {
-  const arr = py_to_array(iterable).slice();
-  arr.sort(function (a, b) {
-    if (typeof a === "number" && typeof b === "number") return a - b;
-    const sa = String(a), sb = String(b);
-    return sa < sb ? -1 : sa > sb ? 1 : 0;
-  });
+// BigInt ints (exact int mode) are taken as doubles; floor and ceil return an int that a
+// double cannot hold exactly as a BigInt in exact int mode
+__reg("py_math_real", function (x) { return typeof x === "bigint" ? Number(x) : x; });
+__reg("py_math_int", function (r) {
+  return py_int_mode.exact && Number.isFinite(r) && !Number.isSafeInteger(r) ? BigInt(r) : r;
+});
+__reg("py_math_floor", function (x) { return typeof x === "bigint" ? x : py_math_int(Math.floor(x)); });
+__reg("py_math_ceil",  function (x) { return typeof x === "bigint" ? x : py_math_int(Math.ceil(x)); });
+__reg("py_math_sqrt",  function (x) { return Math.sqrt(py_math_real(x)); });
+__reg("py_math_pow",   function (x, y) { return Math.pow(py_math_real(x), py_math_real(y)); });
+__reg("py_math_abs",   function (x) { return Math.abs(py_math_real(x)); });
+// exact float summation (Shewchuk's algorithm, as CPython's math.fsum)
+__reg("py_math_fsum", function (iterable) {
+  const partials = [];
+  let special = 0, nan = false;
+  for (let x of py_iter(iterable)) {
+    if (typeof x === "boolean") x = +x;
+    if (typeof x !== "number") throw new PyError("TypeError", "must be real number, not " + py_type_name(x));
+    if (x !== x) { nan = true; continue; }
+    if (!isFinite(x)) { special += x; continue; }
+    let i = 0;
+    for (let j = 0; j < partials.length; j++) {
+      let y = partials[j];
+      if (Math.abs(x) < Math.abs(y)) { const t = x; x = y; y = t; }
+      const hi = x + y;
+      const lo = y - (hi - x);
+      if (lo !== 0) partials[i++] = lo;
+      x = hi;
+    }
+    if (!isFinite(x)) throw new PyError("OverflowError", "intermediate overflow in fsum");
+    partials.length = i;
+    partials.push(x);
+  }
+  if (nan) return NaN;
+  if (special !== 0) {
+    if (special !== special) throw new PyError("ValueError", "-inf + inf in fsum");
+    return special;
+  }
+  let n = partials.length, hi = 0;
+  if (n > 0) {
+    hi = partials[--n];
+    let lo = 0;
+    while (n > 0) {
+      const x = hi, y = partials[--n];
+      hi = x + y;
+      const yr = hi - x;
+      lo = y - yr;
+      if (lo !== 0) break;
+    }
+    // round-half-even correction across the remaining partials
+    if (n > 0 && ((lo < 0 && partials[n - 1] < 0) || (lo > 0 && partials[n - 1] > 0))) {
+      const y = lo * 2, x = hi + y, yr = x - hi;
+      if (y === yr) hi = x;
+    }
+  }
+  return hi;
+});
+
+__reg("py_math", {
+  floor: py_math_floor, ceil: py_math_ceil, sqrt: py_math_sqrt, pow: py_math_pow,
+  abs: py_math_abs, fsum: py_math_fsum, pi: Math.PI, e: Math.E, inf: Infinity, nan: NaN,
+});
+
+// ---- builtins: sorted, min, max, sum, any, all, enumerate, zip ----
+__reg("py_type_name", function (x) {
+  if (x === null || x === undefined) return "NoneType";
+  if (typeof x === "boolean") return "bool";
+  if (typeof x === "number") return Number.isInteger(x) ? "int" : "float";
+  if (typeof x === "bigint") return "int";
+  if (typeof x === "string") return "str";
+  if (Array.isArray(x)) return "list";
+  if (py_is_tuple(x)) return "tuple";
+  if (x instanceof Set) return "set";
+  if (x instanceof PyError) return x.pyType;
+  if (py_is_dict(x)) return "dict";
+  if (typeof x === "function") return "function";
+  return (x.constructor && x.constructor.name) || "object";
+});
+
+// Python ordering (the `<` used by sort/min/max): numbers and bools numerically, str by
+// code unit, lists and tuples lexicographically, user classes through __lt__.
+__reg("py_cmp", function (a, b) {
+  const ta = typeof a, tb = typeof b;
+  if ((ta === "number" || ta === "boolean") && (tb === "number" || tb === "boolean")) {
+    const x = +a, y = +b;
+    return x < y ? -1 : x > y ? 1 : 0;
+  }
+  if (py_is_num(a) && py_is_num(b)) return a < b ? -1 : a > b ? 1 : 0;
+  if (ta === "string" && tb === "string") return a < b ? -1 : a > b ? 1 : 0;
+  const aList = Array.isArray(a), bList = Array.isArray(b);
+  if ((aList && bList) || (py_is_tuple(a) && py_is_tuple(b))) {
+    const A = aList ? a : a.items, B = bList ? b : b.items;
+    const n = Math.min(A.length, B.length);
+    for (let i = 0; i < n; i++) if (!py_eq(A[i], B[i])) return py_cmp(A[i], B[i]);
+    return A.length < B.length ? -1 : A.length > B.length ? 1 : 0;
+  }
+  if (a && typeof a.__lt__ === "function") {
+    if (py_truth(a.__lt__(b))) return -1;
+    if (b && typeof b.__lt__ === "function" && py_truth(b.__lt__(a))) return 1;
+    return 0;
+  }
+  throw new PyError("TypeError", "'<' not supported between instances of '" + py_type_name(a) + "' and '" + py_type_name(b) + "'");
+});
+
+// Stable in-place sort with Python semantics. Keys are computed once per element
+// (decorate-sort-undecorate); all-number keys are sorted through typed arrays.
+__reg("py_sort_array", function (arr, key, reverse) {
+  const n = arr.length;
+  reverse = py_truth(reverse);
+  if (n < 2) return arr;
+  const keys = (key == null) ? arr : new Array(n);
+  if (key != null) for (let i = 0; i < n; i++) keys[i] = key(arr[i]);
+  let kind = typeof keys[0];
+  for (let i = 0; i < n && kind !== null; i++) {
+    const k = keys[i];
+    if (typeof k !== kind || (kind === "number" && k !== k)) kind = null;
+  }
+  if (kind !== "number" && kind !== "string") kind = null;
+  if (key == null && kind !== null) {
+    if (kind === "number") {
+      const t = Float64Array.from(arr);
+      t.sort();
+      for (let i = 0; i < n; i++) arr[i] = t[reverse ? n - 1 - i : i];
+    } else {
+      arr.sort();
+      if (reverse) arr.reverse();
+    }
+    return arr;
+  }
+  const idx = new Uint32Array(n);
+  for (let i = 0; i < n; i++) idx[i] = i;
+  if (kind === "number") {
+    const k = Float64Array.from(keys);
+    idx.sort(reverse ? function (i, j) { return (k[j] - k[i]) || (i - j); }
+                     : function (i, j) { return (k[i] - k[j]) || (i - j); });
+  } else {
+    idx.sort(reverse ? function (i, j) { return py_cmp(keys[j], keys[i]) || (i - j); }
+                     : function (i, j) { return py_cmp(keys[i], keys[j]) || (i - j); });
+  }
+  const copy = arr.slice();
+  for (let i = 0; i < n; i++) arr[i] = copy[idx[i]];
   return arr;
 });
-__reg("py_min", function () {
-  let items;
-  if (arguments.length === 1) items = py_to_array(arguments[0]);
-  else items = Array.prototype.slice.call(arguments);
-  if (items.length === 0) throw new PyError("ValueError", "min() arg is an empty sequence");
-  let best = items[0];
-  for (let i = 1; i < items.length; i++) if (items[i] < best) best = items[i];
-  return best;
+__reg("py_sorted", function (iterable, key, reverse) {
+  const arr = Array.isArray(iterable) ? iterable.slice() : Array.from(py_iter(iterable));
+  return py_sort_array(arr, key, reverse);
 });
-__reg("py_max", function () {
-  let items;
-  if (arguments.length === 1) items = py_to_array(arguments[0]);
-  else items = Array.prototype.slice.call(arguments);
-  if (items.length === 0) throw new PyError("ValueError", "max() arg is an empty sequence");
-  let best = items[0];
-  for (let i = 1; i < items.length; i++) if (items[i] > best) best = items[i];
+// min/max/sum consume their input in a single pass; key is called once per element.
+__reg("py_minmax", function (name, sign, items, kw) {
+  const key = kw && kw.key != null ? kw.key : null;
+  const hasDefault = !!kw && Object.prototype.hasOwnProperty.call(kw, "default");
+  let src = items;
+  if (items.length === 1) src = py_iter(items[0]);
+  else if (items.length === 0) throw new PyError("TypeError", name + " expected at least 1 argument, got 0");
+  else if (hasDefault) throw new PyError("TypeError", "Cannot specify a default for " + name + "() with multiple positional arguments");
+  let best, bestKey, empty = true;
+  if (key === null && Array.isArray(src)) {
+    const n = src.length;
+    let i = 0;
+    if (n > 0) { best = src[0]; empty = false; i = 1; }
+    // numeric fast path: plain comparisons until a non-number shows up
+    if (typeof best === "number") {
+      for (; i < n; i++) {
+        const x = src[i];
+        if (typeof x !== "number") break;
+        if (sign < 0 ? x < best : x > best) best = x;
+      }
+    }
+    for (; i < n; i++) if (py_cmp(src[i], best) * sign > 0) best = src[i];
+  } else {
+    for (const x of src) {
+      const k = key === null ? x : key(x);
+      if (empty || py_cmp(k, bestKey) * sign > 0) { best = x; bestKey = k; }
+      empty = false;
+    }
+  }
+  if (empty) {
+    if (hasDefault) return kw["default"];
+    throw new PyError("ValueError", name + "() arg is an empty sequence");
+  }
   return best;
 });
-__reg("py_sum", function (iterable) {
-  const arr = py_to_array(iterable);
-  let total = 0;
-  for (let i = 0; i < arr.length; i++) total += arr[i];
+__reg("py_min", function () { return py_minmax("min", -1, arguments, null); });
+__reg("py_max", function () { return py_minmax("max", 1, arguments, null); });
+__reg("py_min_kw", function (kw) { return py_minmax("min", -1, Array.prototype.slice.call(arguments, 1), kw); });
+__reg("py_max_kw", function (kw) { return py_minmax("max", 1, Array.prototype.slice.call(arguments, 1), kw); });
+__reg("py_sum_add", function (total, x) {
+  return py_add(typeof total === "boolean" ? +total : total, typeof x === "boolean" ? +x : x);
+});
+__reg("py_sum", function (iterable, start) {
+  if (start === undefined) start = 0;
+  if (typeof start === "string") throw new PyError("TypeError", "sum() can't sum strings [use ''.join(seq) instead]");
+  let total = start;
+  const src = py_iter(iterable);
+  if (typeof total === "number" || typeof total === "boolean") {
+    total = +total;
+    if (Array.isArray(src)) {
+      const n = src.length;
+      let i = 0;
+      const exact = py_int_mode.exact;
+      for (; i < n; i++) {
+        const x = src[i];
+        let t;
+        if (typeof x === "number") t = total + x;
+        else if (typeof x === "boolean") t = total + x;
+        else break;
+        if (exact && !Number.isSafeInteger(t) && Number.isInteger(t)) break;
+        total = t;
+      }
+      for (; i < n; i++) total = py_add(total, src[i]);
+      return total;
+    }
+    for (const x of src) total = py_sum_add(total, x);
+    return total;
+  }
+  for (const x of src) total = py_add(total, x);
   return total;
 });
+__reg("py_any", function (iterable) {
+  for (const x of py_iter(iterable)) if (py_truth(x)) return true;
+  return false;
+});
+__reg("py_all", function (iterable) {
+  for (const x of py_iter(iterable)) if (!py_truth(x)) return false;
+  return true;
+});
+__reg("py_enumerate", function (iterable, start) {
+  let n = start === undefined ? 0 : py_index(start);
+  const it = py_iterator(iterable);
+  return py_resumable((function* () {
+    for (let r = it.next(); !r.done; r = it.next()) yield py_tuple_from_array([n++, r.value]);
+  })());
+});
 __reg("py_zip", function () {
   const iters = [];
-  for (let i = 0; i < arguments.length; i++) iters.push(py_to_array(arguments[i]));
-  const minLen = iters.length === 0 ? 0 : Math.min.apply(null, iters.map(function(a){ return a.length; }));
-  const out = [];
-  for (let i = 0; i < minLen; i++) {
-    const row = [];
-    for (let j = 0; j < iters.length; j++) row.push(iters[j][i]);
-    out.push(py_tuple_from_array(row));
+  for (let i = 0; i < arguments.length; i++) iters.push(py_iterator(arguments[i]));
+  return py_resumable((function* () {
+    if (iters.length === 0) return;
+    for (;;) {
+      const row = new Array(iters.length);
+      for (let j = 0; j < iters.length; j++) {
+        const r = iters[j].next();
+        if (r.done) return;
+        row[j] = r.value;
+      }
+      yield { __tuple__: true, items: row };
+    }
+  })());
+});
+
+// ---- stringify & print (with __repr__ support) ----
+// Single-pass serializer: appends x to `out` and returns the extended string. `quote` selects
+// repr() formatting for strings; `seen` holds the containers on the current path (cycles).
+__reg("py_repr_into", function (out, x, quote, seen) {
+  if (typeof x === "string") return out + (quote ? py_str_quote(x) : x);
+  if (typeof x === "number") return out + String(x);
+  if (x === true) return out + "True";
+  if (x === false) return out + "False";
+  if (x === null || x === undefined) return out + "None";
+  if (x instanceof PyError) return out + x.pyType + ": " + (x.message || "");
+  if (typeof x !== "object") return out + String(x);
+  const isTuple = py_is_tuple(x), isList = Array.isArray(x), isSet = x instanceof Set;
+  if (isSet && x.size === 0) return out + "set()";
+  if (!isTuple && !isList && !isSet) {
+    // str() uses __str__ only for the object itself; elements of containers (seen !== null) use __repr__
+    const hook = (!quote && seen === null && typeof x.__str__ === "function") ? x.__str__ : x.__repr__;
+    if (typeof hook === "function") {
+      try { return out + hook.call(x); } catch (_) {}
+    }
+  }
+  if (seen === null) seen = [];
+  else if (seen.indexOf(x) !== -1) return out + (isList ? "[...]" : isTuple ? "(...)" : "{...}");
+  seen.push(x);
+  if (isList || isTuple) {
+    const arr = isTuple ? x.items : x;
+    out += isTuple ? "(" : "[";
+    for (let i = 0; i < arr.length; i++) {
+      if (i > 0) out += ", ";
+      out = py_repr_into(out, arr[i], quote, seen);
+    }
+    out += isTuple ? (arr.length === 1 ? ",)" : ")") : "]";
+  } else if (isSet) {
+    out += "{";
+    let first = true;
+    for (const v of x) {
+      if (!first) out += ", ";
+      first = false;
+      out = py_repr_into(out, v, quote, seen);
+    }
+    out += "}";
+  } else {
+    out += "{";
+    let first = true;
+    for (const k in x) {
+      if (!Object.prototype.hasOwnProperty.call(x, k)) continue;
+      if (!first) out += ", ";
+      first = false;
+      out = py_repr_into((quote ? out + py_str_quote(k) : out + k) + ": ", x[k], quote, seen);
+    }
+    out += "}";
   }
+  seen.pop();
   return out;
 });
+__reg("py_str_quote", function (s) {
+  const q = (s.indexOf("'") !== -1 && s.indexOf('"') === -1) ? '"' : "'";
+  let out = q;
+  for (let i = 0; i < s.length; i++) {
+    const ch = s[i], c = s.charCodeAt(i);
+    if (ch === q || ch === "\\") out += "\\" + ch;
+    else if (ch === "\n") out += "\\n";
+    else if (ch === "\r") out += "\\r";
+    else if (ch === "\t") out += "\\t";
+    else if (c < 0x20 || c === 0x7f) out += "\\x" + (c < 16 ? "0" : "") + c.toString(16);
+    else out += ch;
+  }
+  return out + q;
+});
+__reg("py_str", function (x) { return typeof x === "string" ? x : py_repr_into("", x, false, null); });
+__reg("py_repr", function (x) { return py_repr_into("", x, true, null); });
 
-// ---- stringify & print (with __repr__ support) ----
-__reg("py_str", function (x) {
-  if (x instanceof PyError) return x.pyType + ": " + (x.message || "");
-  if (x === true) return "True";
-  if (x === false) return "False";
-  if (x === null || x === undefined) return "None";
-  if (py_is_tuple(x)) {
-    const arr = x.items.map(py_str);
-    return "(" + (arr.length === 1 ? arr[0] + "," : arr.join(", ")) + ")";
+__reg("py_ascii", function (x) {
+  return py_repr(x).replace(/[^\x00-\x7f]/gu, function (ch) {
+    const c = ch.codePointAt(0);
+    if (c <= 0xff) return "\\x" + c.toString(16).padStart(2, "0");
+    if (c <= 0xffff) return "\\u" + c.toString(16).padStart(4, "0");
+    return "\\U" + c.toString(16).padStart(8, "0");
+  });
+});
+
+// ---- format(): f-string placeholders and format specs ----
+// [[fill]align][sign][z][#][0][width][grouping][.precision][type], parsed once per site.
+__reg("py_format_spec", (function () {
+  const SPEC_RE = /^(?:([\s\S])?([<>=^]))?([+\- ])?(z)?(#)?(0)?(\d+)?([_,])?(?:\.(\d+))?([bcdeEfFgGnosxX%])?$/;
+  const cache = new Map();
+  return function (spec) {
+    if (typeof spec !== "string") throw new PyError("TypeError", "format spec must be str");
+    let c = cache.get(spec);
+    if (c) return c;
+    const m = SPEC_RE.exec(spec);
+    if (!m) throw new PyError("ValueError", "Invalid format specifier '" + spec + "'");
+    c = {
+      spec: spec,
+      fill: m[1] !== undefined ? m[1] : (m[6] ? "0" : " "),
+      align: m[2] || null,
+      zero: !!m[6],
+      sign: m[3] || "-",
+      z: !!m[4],
+      alt: !!m[5],
+      width: m[7] ? parseInt(m[7], 10) : 0,
+      grouping: m[8] || "",
+      precision: m[9] !== undefined ? parseInt(m[9], 10) : -1,
+      type: m[10] || "",
+    };
+    if (cache.size < 1024) cache.set(spec, c);
+    return c;
+  };
+})());
+__reg("py_format", (function () {
+  function group(digits, sep, every) {
+    let out = "";
+    for (let i = 0; i < digits.length; i++) {
+      if (i > 0 && (digits.length - i) % every === 0) out += sep;
+      out += digits[i];
+    }
+    return out;
+  }
+  function pad(body, prefix, sp, defaultAlign) {
+    const n = sp.width - body.length - prefix.length;
+    if (n <= 0) return prefix + body;
+    const fill = sp.fill.repeat(n), align = sp.align || defaultAlign;
+    if (align === "<") return prefix + body + fill;
+    if (align === ">") return fill + prefix + body;
+    if (align === "=") return prefix + fill + body;
+    const left = sp.fill.repeat(n >> 1);
+    return left + prefix + body + sp.fill.repeat(n - left.length);
+  }
+  function exponent(str, upper) {
+    // JS writes 1.5e+2; Python writes 1.5e+02
+    const out = str.replace(/e([+-])(\d)$/, "e$10$2");
+    return upper ? out.toUpperCase() : out;
+  }
+  // toFixed and toExponential round a tie away from zero; Python rounds it to even. A tie is
+  // found by formatting one more digit: it ends in 5 and is exactly the value of `a` (>= 0).
+  function exactly(a, digits, exp10) {
+    let m = a, shift = 0;
+    while (!Number.isInteger(m)) { m *= 2; shift++; }  // a === m / 2**shift
+    let lhs = BigInt(m), rhs = BigInt(digits) << BigInt(shift);
+    if (exp10 >= 0) rhs *= 10n ** BigInt(exp10); else lhs *= 10n ** BigInt(-exp10);
+    return lhs === rhs;
+  }
+  function fixed(a, p) {
+    const s = a.toFixed(p);
+    if (p >= 100 || a >= 1e21) return s;
+    const t = a.toFixed(p + 1);
+    if (t[t.length - 1] !== "5" || !exactly(a, t.replace(".", ""), -(p + 1))) return s;
+    const down = t.slice(0, p === 0 ? -2 : -1);  // 2.5 -> 2, 0.125 -> 0.12
+    return (down.charCodeAt(down.length - 1) - 48) % 2 === 0 ? down : s;
+  }
+  function expo(a, p) {
+    const s = a.toExponential(p);
+    if (p >= 100 || a === 0) return s;
+    const [mant, e] = a.toExponential(p + 1).split("e");
+    if (mant[mant.length - 1] !== "5" || !exactly(a, mant.replace(".", ""), parseInt(e, 10) - (p + 1))) return s;
+    const down = mant.slice(0, p === 0 ? -2 : -1);
+    return (down.charCodeAt(down.length - 1) - 48) % 2 === 0 ? down + "e" + e : s;
+  }
+  function general(x, p, alt) {
+    if (p === 0) p = 1;
+    if (x === 0) return alt ? (0).toFixed(p - 1) : "0";
+    const exp = parseInt(expo(x, p - 1).split("e")[1], 10);
+    let out = (exp >= -4 && exp < p) ? fixed(x, p - 1 - exp) : exponent(expo(x, p - 1), false);
+    if (!alt) out = out.replace(/\.0+(?=e|$)|(\.\d*?)0+(?=e|$)/, "$1");
+    return out;
+  }
+  function formatNumber(x, sp) {
+    let type = sp.type;
+    const isInt = typeof x === "bigint" || Number.isInteger(x);
+    if (isInt && sp.precision >= 0 && (type === "" || "nbcdoxX".indexOf(type) !== -1)) {
+      throw new PyError("ValueError", "Precision not allowed in integer format specifier");
+    }
+    if (type === "" || type === "n") type = isInt && sp.precision < 0 ? "d" : (type === "n" ? "g" : "");
+    if ("bcdoxX".indexOf(type) !== -1 && !isInt) {
+      throw new PyError("ValueError", "Unknown format code '" + type + "' for object of type 'float'");
+    }
+    if (typeof x === "bigint" && "bdoxX".indexOf(type) === -1) x = Number(x);
+    const neg = x < 0 || Object.is(x, -0);
+    let a = typeof x === "bigint" ? (neg ? -x : x) : Math.abs(x), body, prefix = "";
+    if (typeof a === "number" && !Number.isFinite(a)) {
+      body = Number.isNaN(a) ? "nan" : "inf";
+      if (type === "E" || type === "F" || type === "G") body = body.toUpperCase();
+    } else if (type === "d") body = String(a);
+    else if (type === "b" || type === "o" || type === "x" || type === "X") {
+      body = a.toString(type === "b" ? 2 : type === "o" ? 8 : 16);
+      if (type === "X") body = body.toUpperCase();
+      if (sp.alt) prefix = "0" + type;
+    } else if (type === "c") body = String.fromCodePoint(a);
+    else if (type === "f" || type === "F") body = fixed(a, sp.precision < 0 ? 6 : sp.precision);
+    else if (type === "e" || type === "E") body = exponent(expo(a, sp.precision < 0 ? 6 : sp.precision), type === "E");
+    else if (type === "g" || type === "G") {
+      body = general(a, sp.precision < 0 ? 6 : sp.precision, sp.alt);
+      if (type === "G") body = body.toUpperCase();
+    } else if (type === "%") body = fixed(a * 100, sp.precision < 0 ? 6 : sp.precision) + "%";
+    else body = sp.precision < 0 ? String(a) : general(a, sp.precision, sp.alt);
+    if (sp.alt && type === "f" && body.indexOf(".") === -1) body += ".";
+    if (sp.grouping && (typeof a === "bigint" || Number.isFinite(a))) {
+      const every = ("boxX".indexOf(type) !== -1) ? 4 : 3;
+      const dot = body.search(/[.eE%]/);
+      const intPart = dot === -1 ? body : body.slice(0, dot);
+      body = group(intPart, sp.grouping, every) + (dot === -1 ? "" : body.slice(dot));
+    }
+    const isZero = Number(body.replace(/[^0-9.]/g, "")) === 0;
+    const sign = (neg && !(sp.z && isZero)) ? "-" : (sp.sign === "+" ? "+" : sp.sign === " " ? " " : "");
+    return pad(body, sign + prefix, sp, sp.zero ? "=" : ">");
   }
-  if (Array.isArray(x)) return "[" + x.map(py_str).join(", ") + "]";
-  if (typeof x === "object") {
-    if (typeof x.__repr__ === "function") {
-      try { return x.__repr__(); } catch (_) {}
+  return function (value, sp) {
+    if (sp.spec === "") return py_str(value);
+    if (value && typeof value === "object" && typeof value.__format__ === "function") return value.__format__(sp.spec);
+    if (typeof value === "boolean") value = value ? 1 : 0;
+    if (typeof value === "number" || typeof value === "bigint") return formatNumber(value, sp);
+    if (typeof value === "string") {
+      if (sp.type !== "" && sp.type !== "s") {
+        throw new PyError("ValueError", "Unknown format code '" + sp.type + "' for object of type 'str'");
+      }
+      if (sp.sign !== "-" || sp.align === "=") throw new PyError("ValueError", "Sign not allowed in string format specifier");
+      return pad(sp.precision >= 0 ? value.slice(0, sp.precision) : value, "", sp, "<");
+    }
+    throw new PyError("TypeError", "unsupported format string passed to " + (value === null ? "NoneType" : typeof value) + ".__format__");
+  };
+})());
+
+// ---- buffered stdio ----
+// stdout is collected into large chunks and written with process.stdout.write; it is flushed
+// at exit, before an uncaught exception is reported, and on sys.stdout.flush(). Without a
+// Node process (e.g. in a browser) complete lines go to console.log instead.
+__reg("py_make_writer", function (stream, buffered) {
+  const w = { buf: "", lineBuffered: null };
+  w.write = function (s) {
+    if (typeof s !== "string") throw new PyError("TypeError", "write() argument must be str");
+    w.buf += s;
+    if (w.lineBuffered === null) {
+      const target = (typeof process !== "undefined") ? process[stream] : null;
+      w.lineBuffered = !buffered || !target || !!target.isTTY;
+    }
+    if (w.buf.length >= 65536 || (w.lineBuffered && s.indexOf("\n") !== -1)) w.flush();
+    return s.length;
+  };
+  w.flush = function (final) {
+    if (w.buf.length === 0) return null;
+    const target = (typeof process !== "undefined") ? process[stream] : null;
+    if (target && typeof target.write === "function") {
+      target.write(w.buf);
+      w.buf = "";
+      return null;
     }
-    const parts = [];
-    for (const k in x) if (Object.prototype.hasOwnProperty.call(x, k)) parts.push(k + ": " + py_str(x[k]));
-    return "{" + parts.join(", ") + "}";
+    const cut = final ? w.buf.length : w.buf.lastIndexOf("\n") + 1;
+    if (cut === 0) return null;
+    let text = w.buf.slice(0, cut);
+    w.buf = w.buf.slice(cut);
+    if (text.endsWith("\n")) text = text.slice(0, -1);
+    (stream === "stderr" ? console.error : console.log)(text);
+    return null;
+  };
+  return w;
+});
+__reg("py_stdout", py_make_writer("stdout", true));
+__reg("py_stderr", py_make_writer("stderr", false));
+__reg("py_sys", { stdout: py_stdout, stderr: py_stderr });
+__reg("py_install_stdio_hooks", function () {
+  // once per pair of writers: shared by every bundle in global mode, one per bundle in lexical mode
+  if (py_stdout.hooked || typeof process === "undefined" || typeof process.on !== "function") return;
+  py_stdout.hooked = true;
+  const flushAll = function () { py_stdout.flush(true); py_stderr.flush(true); };
+  process.on("exit", flushAll);
+  process.on("uncaughtExceptionMonitor", flushAll);
+});
+py_install_stdio_hooks();
+
+__reg("py_print", function () {
+  let line = "";
+  for (let i = 0; i < arguments.length; i++) {
+    if (i > 0) line += " ";
+    line = py_repr_into(line, arguments[i], false, null);
+  }
+  py_stdout.write(line + "\n");
+});
+__reg("py_print_kw", function (kw) {
+  const sep = (kw.sep == null) ? " " : kw.sep;
+  const end = (kw.end == null) ? "\n" : kw.end;
+  if (typeof sep !== "string") throw new PyError("TypeError", "sep must be None or a string");
+  if (typeof end !== "string") throw new PyError("TypeError", "end must be None or a string");
+  const file = (kw.file == null) ? py_stdout : kw.file;
+  let line = "";
+  for (let i = 1; i < arguments.length; i++) {
+    if (i > 1) line += sep;
+    line = py_repr_into(line, arguments[i], false, null);
   }
-  return String(x);
+  file.write(line + end);
+  if (py_truth(kw.flush) && typeof file.flush === "function") file.flush();
 });
-__reg("py_print", function () { const out = []; for (let i = 0; i < arguments.length; i++) out.push(py_str(arguments[i])); console.log(out.join(" ")); });
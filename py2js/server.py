@@ -0,0 +1,222 @@
+"""Execution service: run Python programs in warm Node workers over a local socket.
+
+    py2js run-server --port 8765
+    client:  {"id": 1, "source": "print(6 * 7)", "timeout": 2}
+    server:  {"id": 1, "ok": true, "stdout": "42\\n", "stderr": "", "error": null, "ms": 0.4}
+
+Requests and responses are one JSON object per line; a connection handles its
+requests in order and connections are served concurrently. Each program is
+transpiled in-process and run by runtime/pool.js, which keeps worker
+processes with pyrt.js compiled and gives every job a fresh vm context, so a
+job costs a context and the runtime's registrations instead of a node start.
+
+A job that raises, runs past its timeout (the request's "timeout" in seconds,
+at most the server's) or exhausts its worker's heap gets "ok": false and an
+"error" of {"type", "message", "stack"}: the Python exception type,
+TimeoutError or MemoryError, and the JS stack if there is one. Programs that
+fail to transpile (SyntaxError, NotImplementedError, RecursionError on deeply
+nested source) report the exception the same way without running.
+
+Isolation: vm contexts are not a security boundary. The workers make escaping
+harder (contexts cannot compile code from strings and hold no objects of the
+worker's realm, and programs may not use attributes such as `constructor`,
+`prototype` or `__proto__`), but a job runs in the same process as the pool
+worker. Before serving untrusted code, run the server under OS-level
+isolation: a container or VM, or an unprivileged user with no network and a
+read-only file system.
+"""
+import functools
+import itertools
+import json
+import os
+import socket
+import socketserver
+import subprocess
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from .emit_js import Emitter
+from .ir import Attribute, AssignAttr, MethodCall, Module
+from .lowering import lower
+from .passes import PassManager
+from .passes.visit import walk_stmts
+
+POOL = Path(__file__).parent / "runtime" / "pool.js"
+
+Address = Union[Tuple[str, int], str]
+
+
+def _failure(kind: str, message: str) -> Dict[str, Any]:
+    return {"ok": False, "stdout": "", "stderr": "", "ms": 0.0,
+            "error": {"type": kind, "message": message, "stack": None}}
+
+
+# JS properties that lead from a value to its constructor, its prototype or its caller
+BLOCKED_ATTRIBUTES = frozenset({
+    "constructor", "prototype", "__proto__", "caller", "callee", "arguments",
+    "__defineGetter__", "__defineSetter__", "__lookupGetter__", "__lookupSetter__",
+})
+
+
+def check_attributes(mod: Module) -> None:
+    """Refuse programs that use any of BLOCKED_ATTRIBUTES."""
+    for node in walk_stmts(mod.body):
+        if isinstance(node, (Attribute, AssignAttr)):
+            name = node.attr
+        elif isinstance(node, MethodCall):
+            name = node.method
+        else:
+            continue
+        if name in BLOCKED_ATTRIBUTES:
+            raise NotImplementedError(f"Attribute not allowed in run-server programs: {name}")
+
+
+@functools.lru_cache(maxsize=256)
+def compile_program(py_src: str, opt_level: int = 1, int_mode: str = "fast", exceptions: str = "cheap") -> str:
+    """The program part of `py_src` without the runtime, which the workers already have."""
+    mod = lower(py_src)
+    check_attributes(mod)
+    mod = PassManager.for_level(opt_level).run(mod)
+    return Emitter(int_mode=int_mode, exceptions=exceptions).emit_module(mod)
+
+
+class WorkerPool:
+    """A runtime/pool.js process with `workers` warm workers of `memory_mb` heap each."""
+
+    def __init__(self, workers: Optional[int] = None, memory_mb: int = 128, node: str = "node"):
+        self.workers = workers or os.cpu_count() or 1
+        self._proc = subprocess.Popen(
+            [node, str(POOL), "--workers", str(self.workers), "--memory", str(memory_mb)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, encoding="utf-8")
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._pending: Dict[int, Tuple[threading.Event, list]] = {}
+        self._closed = False
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    def run(self, js: str, timeout: float = 5.0) -> Dict[str, Any]:
+        """Run a transpiled program (without the runtime) and wait for its result."""
+        done, box = threading.Event(), []
+        with self._lock:
+            if self._closed:
+                return _failure("SystemError", "worker pool is not running")
+            job_id = next(self._ids)
+            self._pending[job_id] = (done, box)
+            self._proc.stdin.write(json.dumps({"id": job_id, "js": js, "timeout": max(1, int(timeout * 1000))}) + "\n")
+            self._proc.stdin.flush()
+        done.wait()
+        return box[0]
+
+    def _read(self) -> None:
+        for line in self._proc.stdout:
+            result = json.loads(line)
+            with self._lock:
+                done, box = self._pending.pop(result.pop("id"))
+            box.append(result)
+            done.set()
+        with self._lock:
+            self._closed = True
+            pending, self._pending = self._pending, {}
+        for done, box in pending.values():
+            box.append(_failure("SystemError", "worker pool exited"))
+            done.set()
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._proc.stdin.close()
+        self._proc.wait()
+        self._reader.join()
+
+    def __enter__(self) -> "WorkerPool":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("a request must be a JSON object")
+                result = self.server.execute(request)
+                if "id" in request:
+                    result["id"] = request["id"]
+            except (TypeError, ValueError) as e:
+                result = _failure("ValueError", f"bad request: {e}")
+            self.wfile.write((json.dumps(result) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+class RunServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    """Serves run requests on a TCP address; `timeout` is the longest a job may take, in seconds."""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: Address, pool: WorkerPool, opt_level: int = 1, int_mode: str = "fast",
+                 exceptions: str = "cheap", timeout: float = 5.0):
+        self.pool = pool
+        self.options = (opt_level, int_mode, exceptions)
+        self.job_timeout = timeout
+        super().__init__(address, _Handler)
+
+    def execute(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        source = request.get("source")
+        if not isinstance(source, str):
+            raise ValueError('"source" must be a string')
+        timeout = float(request.get("timeout", self.job_timeout))
+        if not timeout > 0:
+            raise ValueError('"timeout" must be positive')
+        try:
+            js = compile_program(source, *self.options)
+        except Exception as e:  # e.g. RecursionError on deeply nested source
+            return _failure(type(e).__name__, str(e))
+        return self.pool.run(js, min(timeout, self.job_timeout))
+
+
+if hasattr(socket, "AF_UNIX"):
+    class UnixRunServer(RunServer):
+        """RunServer on a Unix domain socket; `address` is its path."""
+        address_family = socket.AF_UNIX
+        allow_reuse_address = False
+
+
+class Client:
+    """A connection to a run server: `Client(("127.0.0.1", 8765)).run("print(1)")`."""
+
+    def __init__(self, address: Address):
+        if isinstance(address, str):
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.connect(address)
+        self._file = self._sock.makefile("rwb")
+
+    def run(self, source: str, timeout: Optional[float] = None, **fields: Any) -> Dict[str, Any]:
+        request = dict(fields, source=source)
+        if timeout is not None:
+            request["timeout"] = timeout
+        self._file.write((json.dumps(request) + "\n").encode("utf-8"))
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("run server closed the connection")
+        return json.loads(line)
+
+    def close(self) -> None:
+        self._file.close()
+        self._sock.close()
+
+    def __enter__(self) -> "Client":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
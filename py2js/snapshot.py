@@ -0,0 +1,81 @@
+"""Node startup snapshots: start a program with the runtime already loaded.
+
+    py2js snapshot app.py -o app.blob      =>      node --snapshot-blob app.blob
+
+`node --build-snapshot` runs an entry script and saves the resulting heap in a
+blob; starting node from the blob skips parsing and running the runtime's
+registrations. The entry script holds the runtime and the program's leading
+definitions (functions, classes with literal class attributes, imports,
+literal assignments and docstrings), which run once while the blob is built. The rest of the module body becomes the deserialize
+main function and runs on every start. Module-level names it assigns are
+declared in the entry script, so the functions in the snapshot see them.
+
+If a function, class or import comes after the first other statement, only
+the runtime goes into the snapshot. A blob runs only on the node binary that
+built it.
+"""
+import subprocess
+import tempfile
+from pathlib import Path
+
+from .emit_js import Emitter
+from .ir import Module, Stmt, Function, ClassDef, Import, ImportFrom, Assign, ExprStmt, Const
+from .lexical import lexical_bundle, lexical_runtime
+from .lowering import lower
+from .minify import minify_js, minify_runtime
+from .passes import PassManager, shorten_locals
+from .passes.visit import walk_stmts
+
+RUNTIME = Path(__file__).parent / "runtime" / "pyrt.js"
+
+
+def _definition(s: Stmt) -> bool:
+    # JS evaluates default arguments on each call, so only class attributes run at definition
+    if isinstance(s, ClassDef):
+        return all(isinstance(v, Const) for _, v in s.class_attrs)
+    if isinstance(s, Assign):
+        return isinstance(s.value, Const)
+    if isinstance(s, ExprStmt):
+        return isinstance(s.expr, Const)
+    return isinstance(s, (Function, Import, ImportFrom))
+
+
+def definitions_end(mod: Module) -> int:
+    """Number of leading statements of `mod` that can run while the snapshot is built."""
+    end = 0
+    while end < len(mod.body) and _definition(mod.body[end]):
+        end += 1
+    if any(isinstance(n, (Function, ClassDef, Import, ImportFrom))
+           for n in walk_stmts(mod.body[end:], into_functions=False)):
+        return 0
+    return end
+
+
+def snapshot_entry(py_src: str, opt_level: int = 1, int_mode: str = "fast", exceptions: str = "cheap",
+                   definitions: bool = True, minify: bool = False, runtime_scope: str = "global") -> str:
+    """The `--build-snapshot` entry script for `py_src`; see the module docstring."""
+    mod = PassManager.for_level(opt_level).run(lower(py_src))
+    if minify:
+        mod = shorten_locals(mod)
+    split = definitions_end(mod) if definitions else 0
+    setup, main = Emitter(int_mode=int_mode, exceptions=exceptions).emit_module_split(mod, split)
+    program = f'{setup}\nrequire("v8").startupSnapshot.setDeserializeMainFunction(() => {{\n{main}\n}});\n'
+    runtime = RUNTIME.read_text(encoding="utf-8")
+    if runtime_scope == "lexical":
+        runtime = lexical_runtime(runtime)
+    if minify:
+        runtime, program = minify_runtime(runtime), minify_js(program, {})
+    if runtime_scope == "lexical":
+        return lexical_bundle(runtime, program)
+    return runtime + ("\n" if minify else "\n\n") + program + ("\n" if minify else "")
+
+
+def build_snapshot(entry_js: str, blob: Path, node: str = "node") -> None:
+    """Run `entry_js` under `node --build-snapshot` and write the snapshot to `blob`."""
+    with tempfile.TemporaryDirectory() as tmp:
+        entry = Path(tmp) / "entry.js"
+        entry.write_text(entry_js, encoding="utf-8")
+        p = subprocess.run([node, "--snapshot-blob", str(blob), "--build-snapshot", str(entry)],
+                           stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    if p.returncode != 0:
+        raise RuntimeError(f"{node} --build-snapshot failed:\n{p.stdout}")
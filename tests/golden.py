@@ -5,26 +5,41 @@ import subprocess as sp, sys, pathlib
 ROOT   = pathlib.Path(__file__).resolve().parents[1]
 EX     = ROOT / "examples"
 GOLDEN = ROOT / "tests" / "golden"
-OUTJS  = ROOT / "out.js"
+OUTDIR = ROOT / "out_project"
+sys.path.insert(0, str(ROOT / "tools"))
+from harness import norm, run_cases
 
 CASES = [p.name for p in EX.glob("*.py")]
+# multi-module projects: examples/<name>/main.py, built with `py2js build`
+PROJECTS = [p.parent.name for p in EX.glob("*/main.py")]
 
 def run(cmd):
   p = sp.run(cmd, stdout=sp.PIPE, stderr=sp.STDOUT, text=True, cwd=ROOT)
   return p.returncode, p.stdout
 
-def norm(s: str) -> str:
-  return "\n".join(line.rstrip() for line in s.replace("\r\n","\n").replace("\r","\n").split("\n")).strip()
+def outputs():
+  """name -> combined stdout and stderr; single files run in-process through tools/harness.py."""
+  got = {}
+  for r in run_cases({ex: (EX/ex).read_text(encoding="utf-8") for ex in sorted(CASES)}):
+    if r["error"] and r["error"].startswith("transpile:"):
+      print(f"TRANSPILE FAIL {r['name']}: {r['error']}"); sys.exit(1)
+    got[r["name"]] = r["out"] + (r["error"] or "")
+  for ex in sorted(PROJECTS):
+    code, _ = run([sys.executable, "-m", "py2js.cli", "build", str(EX/ex/"main.py"), "-o", str(OUTDIR/ex),
+                   "--whole-program"])
+    if code != 0:
+      print(f"TRANSPILE FAIL {ex}"); sys.exit(code)
+    got[ex] = run(["node", str(OUTDIR/ex/"main.mjs")])[1]
+  return got
 
 def main():
   fails = []
-  for ex in sorted(CASES):
-    code, _ = run([sys.executable, "-m", "py2js.cli", str(EX/ex), "-o", str(OUTJS)])
-    if code != 0:
-      print(f"TRANSPILE FAIL {ex}"); sys.exit(code)
-    code, out = run(["node", str(OUTJS)])
+  for ex, out in outputs().items():
+    golden = GOLDEN / (ex.replace(".py", "") + ".out")
+    if not golden.exists():
+      print(f"SKIP {ex} (no golden)"); continue
     got = norm(out)
-    exp = norm((GOLDEN / ex.replace(".py",".out")).read_text(encoding="utf-8"))
+    exp = norm(golden.read_text(encoding="utf-8"))
     if got != exp:
       print(f"FAIL {ex}"); fails.append((ex, exp, got))
     else:
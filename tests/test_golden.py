@@ -1,28 +1,342 @@
+import json
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
 from py2js.cli import transpile
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+from harness import GOLDEN, example_sources, has_js, norm, run_cases  # noqa: E402
+
 
 def test_smoke():
     py = "a = 5 // 2\nprint(a)\n"
-    out = transpile(py)
+    out = transpile(py, opt_level=0)
     assert "py_floor_div(5, 2)" in out
-    assert "console.log(a)" in out
+    assert "py_print(a)" in out
     assert "let a =" in out
 
 
 def js_contains(js, s):
-    assert s in js, f"Missing: {s}"
+    assert has_js(js, s), f"Missing: {s}"
 
 
 def test_dict_in_len():
     py = 'd={"a":1,"b":2}\nprint(len(d),"a" in d,"z" in d)\n'
-    out = transpile(py)
+    out = transpile(py, opt_level=0)
     js_contains(out, "py_len")
     js_contains(out, "py_in")
-    js_contains(out, "({\"a\": 1, \"b\": 2})")
+    js_contains(out, "({'a': 1, 'b': 2})")
 
 
 def test_function_return():
     py = 'def add(x,y):\n    return x+y\nprint(add(2,3))\n'
-    out = transpile(py)
+    out = transpile(py, opt_level=0)
     js_contains(out, "function add(x, y)")
-    js_contains(out, "console.log(add(2, 3))")
+    js_contains(out, "py_print(add(2, 3))")
+
+
+def test_fstring_template_literal():
+    py = 'x = 1.5\nprint(f"x={x:.2f} y={x:.2f}!")\n'
+    out = transpile(py, opt_level=0)
+    assert out.count("py_format_spec('.2f')") == 1
+    js_contains(out, "`x=${py_format(x, __py_fmt_1)} y=${py_format(x, __py_fmt_1)}!`")
+
+
+def test_min_max_keywords():
+    py = 'words = ["a", "bb"]\nprint(min(words, key=len), max([], default=0), sum(words, start=""))\n'
+    out = transpile(py, opt_level=0)
+    js_contains(out, "py_min_kw({key: py_len}, words)")
+    js_contains(out, "py_max_kw({default: 0}, [])")
+    js_contains(out, "py_sum(words, '')")
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="needs node")
+def test_locals_shadow_builtin_values():
+    py = (
+        "def count(len):\n    return len + 1\n"
+        "def fmt(str):\n    return str * 2\n"
+        "def bump():\n    repr = 5\n    return repr + 1\n"
+        "def loop(xs):\n    for len in xs:\n        pass\n    return len\n"
+        "def keyed(words):\n    return sorted(words, key=len)\n"
+        "suffix = lambda str: str + 'x'\n"
+        "print(count(2), fmt('ab'), bump(), loop([3, 4]), keyed([[1, 2], [3]]), suffix('a'))\n"
+    )
+    out = transpile(py, opt_level=0)
+    assert "py_len, 1" not in out and "py_str, 2" not in out
+    js_contains(out, "py_sorted(words, py_len)")
+    result, = run_cases({"shadow.py": py}, jobs=1)
+    assert result["error"] is None
+    assert result["out"] == "3 abab 6 4 [[3], [1, 2]] ax\n"
+
+
+def test_for_tuple_targets_no_tuples():
+    py = 'd = {"a": 1}\nfor k, v in d.items():\n    print(k, v)\nfor i, x in enumerate([5]):\n    print(i, x)\n'
+    out = transpile(py, opt_level=0)
+    js_contains(out, "const __py_keys_2 = py_is_dict(__py_d_1) ? Object.keys(__py_d_1) : null;")
+    js_contains(out, "v = __py_keys_2 ? __py_d_1[__py_it_3] : py_unpack(__py_it_3, 2)[1];")
+    js_contains(out, "i = __py_n_4++;")
+
+
+def test_generator_fused_into_sum():
+    py = 'xs = [1, 2]\nprint(sum(x * x for x in xs))\n'
+    out = transpile(py, opt_level=0)
+    js_contains(out, "let __py_acc_1 = 0;")
+    js_contains(out, "const __py_v_2 = py_mul(x, x);")
+    assert "function*" not in out.split("let xs")[1]
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="needs node")
+def test_join_fused_only_for_str_receivers():
+    py = (
+        "class Glue:\n    def join(self, items):\n        return sum(items)\n"
+        "xs = [1, 2, 3]\nsep = '+'\n"
+        "print(Glue().join(x * x for x in xs), sep.join(str(x) for x in xs), '-'.join(str(x) for x in xs))\n"
+    )
+    out = transpile(py, opt_level=0)
+    assert out.count("let __py_acc") == 1
+    for level in (0, 2):
+        result, = run_cases({"join.py": py}, opt_level=level, jobs=1)
+        assert result["error"] is None
+        assert result["out"] == "14 1+2+3 1-2-3\n"
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="needs node")
+def test_set_comprehension_dedupes_tuples():
+    py = "t = {(1, 2) for _ in range(3)}\nprint(len(t), (1, 2) in t, (2, 1) in t, len({x % 3 for x in range(9)}))\n"
+    for level in (0, 1):
+        result, = run_cases({"sets.py": py}, opt_level=level, jobs=1)
+        assert result["error"] is None
+        assert result["out"] == "1 True False 3\n"
+
+
+def test_generator_function():
+    py = 'def gen(n, step=1):\n    i = 0\n    while i < n:\n        yield i\n        i += step\n    return i\n'
+    out = transpile(py, opt_level=0)
+    js_contains(out, "if (arguments.length <= 1 || step === undefined) step = 1;\n  return py_generator((function* () {")
+    js_contains(out, "    let i;\n")
+    js_contains(out, "      yield i;")
+    js_contains(out, "}).call(this), 'gen');")
+
+
+def test_async_main_awaits_run():
+    py = 'import asyncio\nasync def main():\n    await asyncio.sleep(0)\n    return 1\nprint(asyncio.run(main()))\n'
+    out = transpile(py, opt_level=0)
+    js_contains(out, "(async () => {")
+    js_contains(out, "  function main() {\n    const __py_co = py_co_enter();\n"
+                     "    return py_co_start(__py_co, (async () => {\n")
+    js_contains(out, "      py_co_resume(__py_co, await asyncio.sleep(0));")
+    js_contains(out, "py_print(py_co_resume(null, await asyncio.run(main())));")
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="needs node")
+def test_cancelled_coroutines_stop():
+    py = (
+        "import asyncio\n"
+        "async def step(log):\n    await asyncio.sleep(0.05)\n    log.append('step')\n"
+        "async def busy(log):\n    await step(log)\n    await step(log)\n    log.append('busy finished')\n"
+        "async def slow():\n    await asyncio.sleep(0.05)\n    print('slow finished')\n"
+        "async def main():\n    log = []\n    t = asyncio.create_task(busy(log))\n    await asyncio.sleep(0)\n"
+        "    t.cancel()\n    try:\n        await t\n    except asyncio.CancelledError:\n        print('cancelled', t.cancelled())\n"
+        "    try:\n        await asyncio.wait_for(slow(), 0.01)\n    except asyncio.TimeoutError:\n        print('timed out')\n"
+        "    await asyncio.sleep(0.1)\n    print(log)\n"
+        "asyncio.run(main())\nprint('end')\n"
+    )
+    result, = run_cases({"cancel.py": py}, jobs=1)
+    assert result["error"] is None
+    assert result["out"] == "cancelled True\ntimed out\n[]\nend\n"
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="needs node")
+def test_cancel_reaches_coroutine_sleeping_before_its_task(tmp_path):
+    # slow() is already in asyncio.sleep when create_task()/wait_for() wrap it
+    py = (
+        "import asyncio\n"
+        "async def slow():\n    try:\n        await asyncio.sleep(5)\n"
+        "    except asyncio.CancelledError:\n        print('cancelled')\n        raise\n"
+        "async def main():\n    t = asyncio.create_task(slow())\n    await asyncio.sleep(0.01)\n    t.cancel()\n"
+        "    try:\n        await t\n    except asyncio.CancelledError:\n        print('main saw cancel', t.cancelled())\n"
+        "    try:\n        await asyncio.wait_for(slow(), 0.01)\n    except asyncio.TimeoutError:\n        print('timed out')\n"
+        "    print('end main')\n"
+        "asyncio.run(main())\n"
+    )
+    (tmp_path / "cancel.js").write_text(transpile(py), encoding="utf-8")
+    p = subprocess.run(["node", "cancel.js"], cwd=tmp_path, capture_output=True, text=True, timeout=3)
+    assert p.returncode == 0, p.stderr
+    assert p.stdout == "cancelled\nmain saw cancel True\ncancelled\ntimed out\nend main\n"
+
+
+def test_int_ops_and_exact_mode():
+    py = 'def f(a, b, n):\n    return a % 10, a % b, a ** b, divmod(a, b), a - b, a / b, n + 2 ** 64\n'
+    out = transpile(py, opt_level=0)
+    js_contains(out, '(typeof a === "number" && a >= 0 ? a % 10 : py_mod(a, 10))')
+    js_contains(out, "py_mod(a, b), py_pow(a, b), py_divmod(a, b), (a - b), (a / b)")
+    assert "py_set_int_exact" not in out.split("function f")[1]
+    out = transpile(py, opt_level=0, int_mode="exact")
+    js_contains(out, "py_set_int_exact(true);\nfunction f")
+    js_contains(out, "py_sub(a, b), py_truediv(a, b), py_add(n, py_pow(2, 64))")
+    out = transpile("print(18446744073709551616, 9007199254740991)\n", opt_level=0, int_mode="exact")
+    js_contains(out, "py_print(18446744073709551616n, 9007199254740991);")
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="needs node")
+def test_exact_mode_math():
+    py = "import math\nprint(math.sqrt(2 ** 60), math.floor(2.0 ** 60 / 3) + 1, math.ceil(2.0 ** 60 / 3) - 1)\n"
+    result, = run_cases({"math.py": py}, opt_level=1, jobs=1, int_mode="exact")
+    assert result["error"] is None
+    assert result["out"] == "1073741824 384307168202282305 384307168202282303\n"
+
+
+def test_exception_classes_and_cheap_raises():
+    py = (
+        "class AppError(ValueError):\n    pass\n"
+        "class Bad(AppError):\n    def __init__(self, msg, n):\n        self.n = n\n"
+        "try:\n    raise Bad('x', 1)\nexcept (AppError):\n    pass\n"
+        "try:\n    f()\nexcept KeyError:\n    raise\n"
+    )
+    out = transpile(py, opt_level=0)
+    js_contains(out, "class AppError extends py_exc_class('ValueError') {\n}\npy_exc_register(AppError, 'AppError', 'ValueError');")
+    js_contains(out, "class Bad extends AppError {\n  constructor(msg, n) {\n    super(...arguments);\n    this.n = n;")
+    js_contains(out, "const __py_catch_4 = ['AppError'];")
+    js_contains(out, "py_catch_enter(__py_catch_4);\n  try {\n    throw new Bad('x', 1);")
+    js_contains(out, "py_catch_enter(null);")
+    js_contains(out, "throw __py_err_")
+    out = transpile(py, opt_level=0, exceptions="traced")
+    assert "py_catch_enter" not in out.split("class AppError")[1]
+    out = transpile("class E(ValueError, KeyError):\n    pass\n", opt_level=0)
+    js_contains(out, "py_exc_register(E, 'E', 'ValueError', 'KeyError');")
+    with pytest.raises(NotImplementedError, match="first base"):
+        transpile("class M:\n    pass\nclass E(M, KeyError):\n    pass\nraise E()\n")
+
+
+def test_native_super_calls():
+    py = (
+        "class A:\n    def __init__(self, x, y=0, **kw):\n        self.x = x\n"
+        "    def f(self, n):\n        return n\n    def g(self):\n        yield 1\n"
+        "class B(A):\n    def f(self, n):\n        return super().f(n) + 1\n"
+        "    def g(self):\n        yield from super().g()\n"
+        "class C(B):\n    def __init__(self, *a, **kw):\n        super().__init__(*a, **kw)\n"
+        "    def f(self, n):\n        return super(B, self).f(n)\n"
+        "b = B(1, y=2)\n"
+    )
+    out = transpile(py, opt_level=0)
+    js_contains(out, "class B extends A {\n  f(n) {\n    return py_add(super.f(n), 1);")
+    js_contains(out, "py_yield_from(py_super_method(B, 'g').call(this))")
+    js_contains(out, "super(...py_bind_kwargs([...py_to_array(a)], __py_kwargs_")
+    js_contains(out, "['x', 'y'], true));")
+    js_contains(out, "return py_super_method(B, 'f').call(this, n);")
+    js_contains(out, "new B(1, 2, ({}))")
+    assert "constructor() {}" not in out.split("class B")[1]
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="needs node")
+def test_forwarding_constructor_binds_arguments():
+    py = (
+        "class A:\n    def __init__(self, x, y=0):\n        self.x = x\n        self.y = y\n"
+        "class B(A):\n    def __init__(self, *args, **kw):\n        super().__init__(*args, **kw)\n"
+        "def f(n, *a, **kw):\n    print(n, a, len(kw))\n"
+        "for b in [B(2), B(y=1, x=2), B(1, y=2), B(3, 4)]:\n    print(b.x, b.y)\n"
+        "f(1)\nf(1, 2)\nf(n=1)\nf(*[1, 2], k=3)\n"
+    )
+    for level in (0, 1, 2):
+        result, = run_cases({"fwd.py": py}, opt_level=level, jobs=1)
+        assert result["error"] is None
+        assert result["out"] == "2 0\n2 1\n1 2\n3 4\n1 () 0\n1 (2,) 0\n1 () 0\n1 (2,) 1\n"
+
+
+def test_fixed_shape_classes():
+    py = (
+        "class A:\n    kind = 'a'\n    def __init__(self, x):\n        self.x = x\n        if x:\n            self.y = 1\n"
+        "    def later(self):\n        self.z = 2\n"
+        "class S:\n    __slots__ = ('a', 'b')\n    def __init__(self):\n        self.b = 1\n"
+        "class B(A):\n    def more(self):\n        self.w = 0\n"
+        "from dataclasses import dataclass\n"
+        "@dataclass\nclass P:\n    x: int\n    y: int = 0\n"
+    )
+    out = transpile(py, opt_level=0)
+    js_contains(out, "class A {\n  static kind = 'a';\n  constructor(x) {\n    this.x = x;\n"
+                     "    this.y = undefined;\n    this.z = undefined;\n    if (")
+    js_contains(out, "py_class_attrs(A, ['kind']);")
+    js_contains(out, "constructor() {\n    this.a = undefined;\n    this.b = undefined;\n    this.b = 1;")
+    js_contains(out, "class B extends A {\n  constructor(...args) {\n    super(...args);\n    this.w = undefined;")
+    js_contains(out, "constructor(x, y) {\n    if (arguments.length <= 1 || y === undefined) y = 0;\n"
+                     "    this.x = x;\n    this.y = y;\n  }\n  __repr__() {\n    return `P(x=${py_repr(this.x)}")
+
+
+def test_slots_are_enforced_in_methods():
+    head = "class S:\n    __slots__ = ('a',)\n    def __init__(self):\n        self.a = 1\n"
+    transpile(head + "class T(S):\n    __slots__ = ['b']\n    def f(self):\n        self.a = 2\n        self.b = 2\n")
+    transpile(head + "class D(S):\n    def f(self):\n        self.c = 3\n")  # D instances have a __dict__
+    with pytest.raises(NotImplementedError, match="'c' is not in __slots__"):
+        transpile(head + "class T(S):\n    __slots__ = ()\n    def f(self):\n        self.c = 3\n")
+    with pytest.raises(NotImplementedError, match="'r' is not in __slots__"):
+        transpile(head + "    def f(self):\n        self.r = 2\n")
+
+
+def test_dataclass_options_without_effect_are_rejected():
+    head = "from dataclasses import dataclass\n"
+    transpile(head + "@dataclass(eq=True, slots=False, repr=False)\nclass E:\n    x: int\n")
+    for option in ("eq=False", "slots=True"):
+        with pytest.raises(NotImplementedError, match=option):
+            transpile(head + f"@dataclass({option})\nclass E:\n    x: int\n")
+
+
+def test_import_aliases():
+    py = "import math as m\nfrom math import sqrt as root\nprint(m.floor(2.5), root(4))\n"
+    out = transpile(py, opt_level=0)
+    js_contains(out, "let m = py_math;")
+    js_contains(out, "let root = py_math_sqrt;")
+
+
+def test_minify():
+    py = "def greet(name):\n    for c in name:\n        print(c)\n# done\ngreet('ab')\n"
+    names = {}
+    out = transpile(py, opt_level=1, minify=True, name_map=names)
+    body = out[out.index("function greet"):]
+    assert body == "function greet($a){let $b;for(const $0 of py_iter($a)){$b=$0;py_print($b);}}\ngreet('ab');"
+    assert "// " not in out
+    assert names["greet"] == {"$a": "name", "$b": "c"}
+    assert names["<temporaries>"]["$0"].startswith("__py_")
+    assert len(out) < len(transpile(py, opt_level=1)) * 0.8
+
+
+def test_lexical_runtime_scope():
+    out = transpile("def py_add(a, b):\n    return a\nprint(py_add(1, 2) + 3)\n", opt_level=0,
+                    runtime_scope="lexical")
+    assert out.startswith("(function () {\n")
+    js_contains(out, "const py_add = (function(){")
+    js_contains(out, "const py_print = function () {")
+    assert out.count('__reg("') == 0
+    js_contains(out, "\n(function () {\nfunction py_add(a, b) {")
+    assert out.endswith("\n})();\n})();\n")
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="needs node")
+def test_lexical_runtime_scope_leaves_no_globals(tmp_path):
+    py = "class P:\n    def __init__(self, x):\n        self.x = x\nprint([P(i).x for i in range(3)], {1: 2})\n"
+    for i, scope in enumerate(("lexical", "lexical", "global")):
+        (tmp_path / f"b{i}.js").write_text(transpile(py, runtime_scope=scope), encoding="utf-8")
+    probe = (
+        "const before = new Set(Object.getOwnPropertyNames(globalThis));\n"
+        "const leaked = () => Object.getOwnPropertyNames(globalThis).filter(k => !before.has(k));\n"
+        "require('./b0.js'); require('./b1.js'); const lexical = leaked();\n"
+        "require('./b2.js'); const global = leaked();\n"
+        "process.on('exit', () => console.error(JSON.stringify([lexical, global.includes('py_add')])));\n"
+    )
+    (tmp_path / "probe.js").write_text(probe, encoding="utf-8")
+    p = subprocess.run(["node", "probe.js"], cwd=tmp_path, capture_output=True, text=True)
+    assert p.returncode == 0, p.stderr
+    assert p.stdout == "[0, 1, 2] {1: 2}\n" * 3  # each lexical bundle flushes its own stdout
+    assert json.loads(p.stderr) == [[], True]
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="needs node")
+def test_examples_match_goldens():
+    sources = {name: src for name, src in example_sources().items()
+               if (GOLDEN / name.replace(".py", ".out")).exists()}
+    for r in run_cases(sources, jobs=2):
+        assert r["error"] is None, r["error"]
+        assert norm(r["out"]) == norm((GOLDEN / r["name"].replace(".py", ".out")).read_text(encoding="utf-8"))
@@ -0,0 +1,89 @@
+from pathlib import Path
+
+import pytest
+
+from py2js.modules import Project
+
+EXAMPLE = Path(__file__).resolve().parents[1] / "examples" / "project" / "main.py"
+
+
+def write(root: Path, files: dict) -> Path:
+    for name, src in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(src, encoding="utf-8")
+    return root / "main.py"
+
+
+def test_modules_import_each_other():
+    out = Project(EXAMPLE).compile()
+    assert set(out) == {"pyrt.mjs", "main.mjs", "inventory/__init__.mjs", "inventory/errors.mjs",
+                        "inventory/models.mjs", "inventory/pricing.mjs", "inventory/report.mjs"}
+    main = out["main.mjs"]
+    assert main.startswith('import "./pyrt.mjs";\n')
+    assert 'import { OutOfStock as Unavailable } from "./inventory/errors.mjs";' in main
+    assert 'import * as pricing from "./inventory/pricing.mjs";' in main
+    assert "const inventory = {...__py_mod_inventory, report: __py_mod_inventory_report};" in main
+    assert 'import { CURRENCY } from "./__init__.mjs";' in out["inventory/report.mjs"]
+    # signatures and layouts of imported classes are known
+    assert "new Item('pen', 2, 10)" in main
+    assert "pricing.with_tax(100, 50)" in main
+    assert "class Perishable extends Item {" in main
+    assert "if (py_exc_match(__py_err_" in main and "'OutOfStock')" in main
+
+
+def test_default_build_exports_every_definition():
+    out = Project(EXAMPLE).compile()
+    assert out["inventory/pricing.mjs"].endswith("export { discount, line_total, with_tax };\n")
+    assert "export { InventoryError, OutOfStock, UnknownItem };" in out["inventory/errors.mjs"]
+
+
+def test_whole_program_drops_unused_exports():
+    for level in (0, 1):
+        out = Project(EXAMPLE).compile(opt_level=level, whole_program=True)
+        pricing = out["inventory/pricing.mjs"]
+        assert "function discount" not in pricing
+        assert pricing.endswith("export { line_total, with_tax };\n")
+        errors = out["inventory/errors.mjs"]
+        assert "UnknownItem" not in errors and "class InventoryError" in errors
+        assert "export { OutOfStock };" in errors
+        assert "function restock" not in out["inventory/models.mjs"]
+        assert "function header" not in out["inventory/report.mjs"]
+        assert "export" not in out["main.mjs"]
+
+
+def test_whole_program_keeps_module_objects_that_escape(tmp_path):
+    entry = write(tmp_path, {
+        "main.py": "import util\nm = util\nprint(m.one())\n",
+        "util.py": "def one():\n    return 1\ndef two():\n    return 2\n",
+    })
+    out = Project(entry).compile(whole_program=True)
+    assert "export { one, two };" in out["util.mjs"]
+
+
+def test_stores_to_module_attributes_are_rejected(tmp_path):
+    for store in ("config.DEBUG = True", "config.N += 1", "config.N, x = 1, 2"):
+        entry = write(tmp_path, {
+            "main.py": f"import config\n{store}\nprint(config.debug())\n",
+            "config.py": "DEBUG = False\nN = 0\ndef debug():\n    return DEBUG\n",
+        })
+        with pytest.raises(NotImplementedError, match="attributes of module 'config' are read-only"):
+            Project(entry).compile()
+
+
+def test_exported_functions_keep_returning_tuples(tmp_path):
+    entry = write(tmp_path, {
+        "main.py": "from pair import pair\nprint(pair())\n",
+        "pair.py": "def pair():\n    return 1, 2\na, b = pair()\n",
+    })
+    out = Project(entry).compile(whole_program=True)
+    assert "py_mret" not in out["pair.mjs"]
+
+
+def test_minified_build_records_names():
+    names = {}
+    out = Project(EXAMPLE).compile(minify=True, name_map=names)
+    assert "import*as $0 from\"./inventory/__init__.mjs\";" in out["main.mjs"]
+    assert "__py_" not in out["main.mjs"]
+    assert names["inventory/models.mjs"]["Item.__init__"]["$b"] == "name"
+    assert names["main.mjs"]["<temporaries>"]["$0"] == "__py_mod_inventory"
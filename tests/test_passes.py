@@ -0,0 +1,177 @@
+import sys
+from pathlib import Path
+
+from py2js.emit_js import Emitter
+from py2js.lowering import lower
+from py2js.passes import PassManager, inline_calls, shorten_locals, string_builders
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+from harness import has_js  # noqa: E402
+
+
+def body(py: str) -> str:
+    return Emitter().emit_module(string_builders(lower(py)))
+
+
+def test_string_builder_in_loop():
+    js = body('out = ""\nfor x in [1, 2]:\n    out += f"{x},"\nprint(out)\n')
+    assert has_js(js, "let __py_sb_1 = [out];")
+    assert has_js(js, "__py_sb_1.push(`${py_str(x)},`);")
+    assert has_js(js, "out = py_sb_value(__py_sb_1);")
+    assert "py_add(out" not in js
+
+
+def test_string_builder_checks_unknown_pieces():
+    js = body('out = ""\nfor x in ["a", "b"]:\n    out += x\n')
+    assert has_js(js, "py_sb_push(__py_sb_1, x);")
+    js = body('out = ""\nfor x in ["a", "b"]:\n    out += sep.join(x)\n    out += "-".join(x)\n')
+    assert has_js(js, "py_sb_push(__py_sb_1, py_str_join(sep, x));")
+    assert has_js(js, "__py_sb_1.push(py_str_join('-', x));")
+
+
+def test_string_builder_skips_reads_and_try():
+    js = body('out = ""\nfor x in ["a"]:\n    out += x\n    print(out)\n')
+    assert "__py_sb" not in js
+    js = body('try:\n    out = ""\n    for x in ["a"]:\n        out += x\nexcept TypeError:\n    pass\n')
+    assert "__py_sb" not in js
+    js = body('n = 0\nfor x in [1]:\n    n += x\n')
+    assert "__py_sb" not in js
+
+
+def test_inline_small_functions_not_methods():
+    src = (
+        "def sq(x):\n    return x * x\n"
+        "def fact(n):\n    return n and n * fact(n - 1) or 1\n"
+        "class P:\n    def __init__(self, x):\n        self.x = x\n"
+        "    def value(self):\n        return self.x\n"
+        "    def twice(self):\n        return self.value() + self.value()\n"
+        "print(sq(3), sq(len('ab')), fact(3))\n"
+    )
+    js = Emitter().emit_module(inline_calls(lower(src)))
+    assert "py_print(py_mul(3, 3), (__py_inl_" in js
+    assert "fact((n - 1))" in js
+    assert "return py_add(this.value(), this.value());" in js
+    js = body(src)
+    assert "sq(3)" in js
+
+
+def optimized(py: str, level: int = 1) -> str:
+    return Emitter().emit_module(PassManager.for_level(level).run(lower(py)))
+
+
+def test_fold_follows_python_semantics():
+    js = optimized('print(60 * 60 * 24, -7 // 2, -7 % 3, 1 / 0, "ab" * 2, "a" + 1, 99999999 * 99999999)\n')
+    assert "py_print(86400, -4, 2, (1 / 0), 'abab', py_add('a', 1), py_mul(99999999, 99999999));" in js
+    js = optimized('print(3 < 4 <= 4, not "", 0 and f(), None or "x")\n')
+    assert "py_print(true, true, 0, 'x');" in js
+    js = optimized("print(2 ** 10, 2 ** -2, 0 ** -1, 2 ** 64, 10 ** 100)\n")
+    assert "py_print(1024, 0.25, py_pow(0, -1), py_pow(2, 64), py_pow(10, 100));" in js
+
+
+def test_propagate_constants_and_remove_dead_code():
+    src = (
+        "DEBUG = False\nN = 10\nM = 1\nM = 2\n"
+        "def log(x):\n    print(x)\n"
+        "def unused():\n    return log(N)\n"
+        "def f(n):\n    return n + N\n    print('after return')\n"
+        "if DEBUG:\n    log(M)\n"
+        "print(f(M), N)\n"
+    )
+    js = optimized(src, level=0)
+    assert "function unused" in js and "if (py_truth(DEBUG))" in js
+    js = optimized(src)
+    assert "if (" not in js and "after return" not in js
+    assert "function log" not in js and "function unused" not in js
+    assert "py_print(py_add(M, 10), 10);" in js
+
+
+def test_licm_hoists_len_and_self_attributes():
+    js = optimized(
+        "def drain(items):\n    out = []\n    i = 0\n    while i < len(items):\n"
+        "        out.append(items[i])\n        i += 1\n    return out\n"
+        "class S:\n    def total(self, xs):\n        t = 0\n        for x in xs:\n"
+        "            t += self.scale * x\n        return t\n"
+        "print(drain([1]), S().total([]))\n"
+    )
+    assert has_js(js, "__py_licm_1 = py_len(items);\n  while ((i < __py_licm_1)) {")
+    assert has_js(js, "__py_licm_2 = this.scale;") and has_js(js, "py_mul(__py_licm_2, x)")
+
+
+def test_licm_respects_mutation_and_aliasing():
+    src = (
+        "def f(items):\n    alias = items\n    i = 0\n    while i < len(items):\n"
+        "        alias.append(i)\n        i += 1\n"
+        "def g(n):\n    acc = []\n    while len(acc) < n:\n        acc.append(0)\n"
+        "def h(xs, n):\n    acc = [0]\n    keep(acc)\n    while len(xs) < n:\n        acc.append(0)\n"
+        "def keep(v):\n    return v\n"
+        "class S:\n    def a(self, xs):\n        other = self\n        for x in xs:\n"
+        "            print(self.scale)\n            other.scale = x\n"
+        "    def b(self, xs):\n        for x in xs:\n            print(self.scale)\n            self.reset()\n"
+        "    def reset(self):\n        self.scale = 0\n"
+        "print(f, g, h, S)\n"
+    )
+    js = optimized(src)
+    assert "__py_licm" not in js
+    assert js.count("py_len(") == 3
+
+
+def test_parallel_assignment_without_tuples():
+    js = optimized("def f(a, b, xs):\n    a, b = b, a\n    a, b = xs[0], a + b\n    return a\nprint(f)\n")
+    assert has_js(js, "__py_par_1 = a;\n  a = b;\n  b = __py_par_1;")
+    assert has_js(js, "__py_par_2 = py_getitem(xs, 0);\n  __py_par_3 = py_add(a, b);\n  a = __py_par_2;\n  b = __py_par_3;")
+    assert "py_tuple" not in js
+
+
+def test_multi_return_only_when_unpacked():
+    src = (
+        "def qr(n, d):\n    if d:\n        return n // d, n % d\n    return 0, 0\n"
+        "def kept(n):\n    return n, n\n"
+        "def short(n):\n    if n:\n        return n, n\n"
+        "q, r = qr(7, 2)\n"
+        "a, b = kept(1)\nt = kept(2)\n"
+        "c, d = short(1)\n"
+        "print(q, r, a, b, t, c, d)\n"
+    )
+    js = optimized(src)
+    assert js.count("return py_mret(") == 2
+    assert "qr(7, 2);\nlet q = py_mret_buf[0];\nlet r = py_mret_buf[1];" in js
+    assert "return py_tuple(n, n);" in js
+    assert "__py_unpack_tmp = short(1);" in js
+
+
+def test_multi_return_copies_slots_before_calling_targets():
+    src = (
+        "class H:\n    pass\nh = H()\n"
+        "def pair(x):\n    print(x)\n    return x, x * 10\n"
+        "def get():\n    a, b = pair(100)\n    return h\n"
+        "get().x, y = pair(1)\nh.z, w = pair(2)\n"
+    )
+    js = optimized(src)
+    assert has_js(js, "pair(1);\nlet __py_par_1 = py_mret_buf[0];\nlet __py_par_2 = py_mret_buf[1];\nget().x = __py_par_1;")
+    assert "h.z = py_mret_buf[0];" in js
+
+
+def test_multi_return_not_through_finally():
+    src = (
+        "def g(i):\n    print(i)\n    return i * 10, i * 20\n"
+        "def f(i):\n    try:\n        return i, i + 1\n    finally:\n        x, y = g(i)\n"
+        "a, b = f(1)\nprint(a, b)\n"
+    )
+    js = optimized(src)
+    assert "return py_tuple(i, py_add(i, 1));" in js
+    assert "return py_mret(" in js
+
+
+def test_shorten_locals_keeps_module_names():
+    src = (
+        "total = 0\n"
+        "def average(values):\n    s = 0\n    for v in values:\n        s += v\n"
+        "    def scale(k):\n        return k * s\n    return scale(len(values))\n"
+        "print(average([1, 2]), total)\n"
+    )
+    names = {}
+    js = Emitter().emit_module(shorten_locals(lower(src), names))
+    assert "function average($a) {" in js
+    assert "function scale($d) {\n    return py_mul($d, $b);" in js
+    assert "let total = 0;" in js and "average([1, 2])" in js
+    assert names == {"average": {"$a": "values", "$b": "s", "$c": "v"}, "average.scale": {"$d": "k"}}
@@ -0,0 +1,95 @@
+import shutil
+import socket
+import threading
+
+import pytest
+
+from py2js.server import Client, RunServer, WorkerPool, compile_program
+
+pytestmark = pytest.mark.skipif(shutil.which("node") is None, reason="needs node")
+
+
+@pytest.fixture(scope="module")
+def address():
+    with WorkerPool(workers=2, memory_mb=64) as pool:
+        server = RunServer(("127.0.0.1", 0), pool, timeout=2.0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield server.server_address
+        server.shutdown()
+        server.server_close()
+
+
+def test_runs_programs_in_fresh_contexts(address):
+    with Client(address) as client:
+        first = client.run("x = 40\nprint(x + 2)\n", id=7)
+        second = client.run("print(x)\n")
+    assert first == {"id": 7, "ok": True, "stdout": "42\n", "stderr": "", "error": None, "ms": first["ms"]}
+    assert not second["ok"] and "x" in second["error"]["message"]
+
+
+def test_exceptions_keep_earlier_output(address):
+    with Client(address) as client:
+        r = client.run("print('before')\nraise KeyError('k')\n")
+    assert not r["ok"] and r["stdout"] == "before\n"
+    assert r["error"]["type"] == "KeyError" and r["error"]["message"] == "k"
+    assert "main.js:2" in r["error"]["stack"]
+
+
+def test_transpile_errors_do_not_run(address):
+    with Client(address) as client:
+        r = client.run("def f(:\n")
+    assert not r["ok"] and r["error"]["type"] == "SyntaxError"
+    with Client(address) as client:
+        deep = client.run("x = 1" + " + 1" * 3000 + "\nprint(x)\n")
+        after = client.run("print(2)\n")
+    assert deep["error"]["type"] == "RecursionError" and after["stdout"] == "2\n"
+
+
+def test_timeouts(address):
+    with Client(address) as client:
+        spin = client.run("while True:\n    pass\n", timeout=0.2)
+        # a loop in a timer callback is out of vm's reach, so its worker is replaced
+        late = client.run("import asyncio\nasync def main():\n    await asyncio.sleep(0.01)\n"
+                          "    while True:\n        pass\nasyncio.run(main())\n", timeout=0.2)
+        after = client.run("print('still here')\n")
+    assert spin["error"]["type"] == "TimeoutError" and late["error"]["type"] == "TimeoutError"
+    assert after["stdout"] == "still here\n"
+
+
+def test_memory_limit(address):
+    with Client(address) as client:
+        r = client.run("xs = [1]\nwhile True:\n    xs = xs + xs\n")
+        after = client.run("print(1)\n")
+    assert r["error"]["type"] == "MemoryError"
+    assert after["ok"]
+
+
+def test_async_programs_finish_with_their_timers(address):
+    src = ("import asyncio\nasync def tick(n):\n    await asyncio.sleep(0.01 * n)\n    print('tick', n)\n"
+           "async def main():\n    await asyncio.gather(tick(2), tick(1))\nasyncio.run(main())\n")
+    with Client(address) as client:
+        r = client.run(src)
+    assert r["stdout"] == "tick 1\ntick 2\n"
+
+
+def test_bad_requests(address):
+    with socket.create_connection(address) as sock:
+        f = sock.makefile("rwb")
+        f.write(b'not json\n{"source": 3}\n')
+        f.flush()
+        assert b'"bad request' in f.readline() and b'"bad request' in f.readline()
+
+
+def test_programs_cannot_reach_the_worker(address):
+    escape = "x = [1]\na = x.constructor.constructor\ng = a('return process')\nprint(g().pid)\n"
+    with Client(address) as client:
+        r = client.run(escape)
+    assert r["error"]["type"] == "NotImplementedError" and "constructor" in r["error"]["message"]
+    # below the attribute check: the shims hold no worker objects and strings do not compile
+    with WorkerPool(workers=1) as pool:
+        r = pool.run("py_print(process.on.constructor('return process')().pid);")
+        timer = pool.run("py_print(typeof setTimeout(function () {}, 0));")
+        runtime = pool.run(compile_program("print(sorted([3, 1, 2]))\n"))
+    assert r["error"]["type"] == "EvalError"
+    assert timer["stdout"] == "number\n" and runtime["stdout"] == "[1, 2, 3]\n"
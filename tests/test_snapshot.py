@@ -0,0 +1,47 @@
+import re
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from py2js.snapshot import build_snapshot, snapshot_entry
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+from harness import js_pattern  # noqa: E402
+
+PROGRAM = (
+    "import math\n"
+    "LIMIT = 3\n"
+    "def scaled(x):\n    return x * LIMIT + math.floor(total)\n"
+    "class Box:\n    kind = 'box'\n    def __init__(self, n):\n        self.n = n\n"
+    "total = 0.5\n"
+    "for i in range(LIMIT):\n    total += scaled(i)\n"
+    "print(total, Box(1).kind)\n"
+)
+
+
+def test_definitions_run_while_building():
+    program = snapshot_entry(PROGRAM, opt_level=0).split("\n\n\n")[-1]
+    setup, main = program.split('require("v8").startupSnapshot.setDeserializeMainFunction(() => {\n')
+    assert setup.startswith("let i, total;\n") and "let LIMIT = 3;" in setup and setup.endswith("total = 0.5;\n")
+    assert "function scaled(x) {" in setup and "class Box {" in setup
+    assert re.match(js_pattern("for (let __py_i_1 = 0, "), main)
+    assert main.endswith("\n});\n")
+
+
+def test_later_definitions_keep_only_the_runtime():
+    src = "print(1)\ndef f():\n    return 2\nprint(f())\n"
+    setup, main = snapshot_entry(src, opt_level=0).split('require("v8").startupSnapshot.setDeserializeMainFunction(() => {\n')
+    assert "function f()" in main and "function f()" not in setup
+    program = snapshot_entry(PROGRAM, opt_level=0, definitions=False)
+    assert "function scaled" in program.split("setDeserializeMainFunction")[1]
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="needs node")
+def test_blob_runs(tmp_path):
+    blob = tmp_path / "prog.blob"
+    build_snapshot(snapshot_entry(PROGRAM), blob)
+    out = subprocess.run(["node", "--snapshot-blob", str(blob)], stdout=subprocess.PIPE, text=True, check=True)
+    assert out.stdout == "12.5 box\n"
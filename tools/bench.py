@@ -0,0 +1,59 @@
+# flake8: noqa
+"""Time benchmarks/*.py under node at each -O level.
+
+  python tools/bench.py [-n REPEAT] [--int-mode MODE] [--exceptions MODE] [--minify] [--runtime-scope SCOPE] [NAME ...]
+"""
+import argparse, subprocess as sp, sys, tempfile, time, pathlib
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+BENCH = ROOT / "benchmarks"
+sys.path.insert(0, str(ROOT))
+from py2js.cli import transpile
+from py2js.emit_js import INT_MODES, EXCEPTION_MODES
+from py2js.lexical import RUNTIME_SCOPES
+
+LEVELS = (0, 1, 2)
+
+def time_node(js_path, repeat):
+  best = None
+  out = ""
+  for _ in range(repeat):
+    t0 = time.perf_counter()
+    p = sp.run(["node", str(js_path)], stdout=sp.PIPE, stderr=sp.STDOUT, text=True)
+    dt = time.perf_counter() - t0
+    if p.returncode != 0:
+      print(p.stdout); sys.exit(p.returncode)
+    out = p.stdout
+    best = dt if best is None else min(best, dt)
+  return best, out
+
+def main():
+  ap = argparse.ArgumentParser()
+  ap.add_argument("-n", "--repeat", type=int, default=3)
+  ap.add_argument("--int-mode", choices=INT_MODES, default="fast")
+  ap.add_argument("--exceptions", choices=EXCEPTION_MODES, default="cheap")
+  ap.add_argument("--minify", action="store_true")
+  ap.add_argument("--runtime-scope", choices=RUNTIME_SCOPES, default="global")
+  ap.add_argument("names", nargs="*")
+  args = ap.parse_args()
+  cases = sorted(BENCH.glob("*.py"))
+  if args.names:
+    cases = [c for c in cases if c.stem in args.names]
+  print(f"{'benchmark':<20}" + "".join(f"{'-O' + str(o):>10}" for o in LEVELS))
+  with tempfile.TemporaryDirectory() as tmp:
+    for case in cases:
+      src = case.read_text(encoding="utf-8")
+      times, outputs = [], set()
+      for o in LEVELS:
+        js = pathlib.Path(tmp) / f"{case.stem}_O{o}.js"
+        js.write_text(transpile(src, o, int_mode=args.int_mode, exceptions=args.exceptions,
+                                  minify=args.minify, runtime_scope=args.runtime_scope), encoding="utf-8")
+        dt, out = time_node(js, args.repeat)
+        times.append(dt)
+        outputs.add(out)
+      if len(outputs) != 1:
+        print(f"{case.stem}: output differs between -O levels"); sys.exit(1)
+      print(f"{case.stem:<20}" + "".join(f"{t:>9.3f}s" for t in times))
+
+if __name__ == "__main__":
+  main()
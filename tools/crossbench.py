@@ -0,0 +1,114 @@
+# flake8: noqa
+"""Run benchmarks/corpus/*.py under CPython and, transpiled, under node.
+
+  python tools/crossbench.py [-n REPEAT] [-O LEVEL] [--int-mode MODE] [--history FILE]
+                             [--no-history] [--threshold FRACTION] [--check] [NAME ...]
+
+For each benchmark the outputs must match. The best wall time of REPEAT runs and the peak
+RSS of each runtime are reported, with the speedup of node over CPython. Every run is
+appended to a JSON history (benchmarks/history.json by default); a node time more than
+--threshold slower than the last comparable run (same -O level, int mode and node version)
+with that benchmark is flagged as a regression, and --check makes that an error.
+"""
+import argparse, datetime, json, os, subprocess as sp, sys, tempfile, time, pathlib
+
+ROOT    = pathlib.Path(__file__).resolve().parents[1]
+CORPUS  = ROOT / "benchmarks" / "corpus"
+HISTORY = ROOT / "benchmarks" / "history.json"
+sys.path.insert(0, str(ROOT))
+from py2js.cli import transpile
+from py2js.emit_js import INT_MODES
+
+def norm(s: str) -> str:
+  return "\n".join(line.rstrip() for line in s.replace("\r\n","\n").split("\n")).strip()
+
+def measure(cmd):
+  """(seconds, peak RSS in MB or None, output) of one run of `cmd`."""
+  t0 = time.perf_counter()
+  p = sp.Popen(cmd, stdout=sp.PIPE, stderr=sp.STDOUT, text=True, cwd=ROOT)
+  out = p.stdout.read()
+  if hasattr(os, "wait4"):
+    _, status, usage = os.wait4(p.pid, 0)
+    code = os.waitstatus_to_exitcode(status)
+    rss = usage.ru_maxrss / 1024  # KiB on Linux
+  else:
+    code, rss = p.wait(), None
+  dt = time.perf_counter() - t0
+  p.stdout.close()
+  if code != 0:
+    print(out); sys.exit(f"{' '.join(map(str, cmd))} exited with {code}")
+  return dt, rss, out
+
+def best_of(cmd, repeat):
+  runs = [measure(cmd) for _ in range(repeat)]
+  rss = [r for _, r, _ in runs if r is not None]
+  return min(dt for dt, _, _ in runs), (max(rss) if rss else None), runs[-1][2]
+
+def version(cmd):
+  return sp.run(cmd, stdout=sp.PIPE, text=True).stdout.strip()
+
+def load_history(path):
+  return json.loads(path.read_text(encoding="utf-8")) if path.exists() else []
+
+def previous(history, entry, name):
+  """Results for `name` in the latest run with the same settings, if any."""
+  for old in reversed(history):
+    if all(old.get(k) == entry[k] for k in ("opt_level", "int_mode", "node")) and name in old["results"]:
+      return old["results"][name]
+  return None
+
+def mb(x):
+  return f"{x:>8.1f}" if x is not None else f"{'-':>8}"
+
+def main():
+  ap = argparse.ArgumentParser()
+  ap.add_argument("-n", "--repeat", type=int, default=3)
+  ap.add_argument("-O", dest="opt_level", type=int, default=1)
+  ap.add_argument("--int-mode", choices=INT_MODES, default="fast")
+  ap.add_argument("--history", default=str(HISTORY))
+  ap.add_argument("--no-history", action="store_true", help="do not record this run")
+  ap.add_argument("--threshold", type=float, default=0.10)
+  ap.add_argument("--check", action="store_true", help="exit with an error on a regression")
+  ap.add_argument("names", nargs="*")
+  args = ap.parse_args()
+  cases = sorted(CORPUS.glob("*.py"))
+  if args.names:
+    cases = [c for c in cases if c.stem in args.names]
+  history_path = pathlib.Path(args.history)
+  history = load_history(history_path)
+  entry = {
+    "date": datetime.datetime.now().isoformat(timespec="seconds"),
+    "commit": version(["git", "-C", str(ROOT), "rev-parse", "--short", "HEAD"]) or None,
+    "opt_level": args.opt_level,
+    "int_mode": args.int_mode,
+    "python": sys.version.split()[0],
+    "node": version(["node", "--version"]),
+    "results": {},
+  }
+  regressions = []
+  print(f"{'benchmark':<18}{'cpython':>9}{'node':>9}{'speedup':>9}{'py MB':>8}{'js MB':>8}")
+  with tempfile.TemporaryDirectory() as tmp:
+    for case in cases:
+      js = pathlib.Path(tmp) / f"{case.stem}.js"
+      js.write_text(transpile(case.read_text(encoding="utf-8"), args.opt_level, int_mode=args.int_mode),
+                    encoding="utf-8")
+      py_t, py_rss, py_out = best_of([sys.executable, str(case)], args.repeat)
+      js_t, js_rss, js_out = best_of(["node", str(js)], args.repeat)
+      if norm(py_out) != norm(js_out):
+        print(f"{case.stem}: output differs\n--- cpython\n{py_out}\n--- node\n{js_out}"); sys.exit(1)
+      entry["results"][case.stem] = {"cpython_s": round(py_t, 4), "node_s": round(js_t, 4),
+                                     "cpython_mb": py_rss and round(py_rss, 1), "node_mb": js_rss and round(js_rss, 1)}
+      flag = ""
+      before = previous(history, entry, case.stem)
+      if before and js_t > before["node_s"] * (1 + args.threshold):
+        flag = f"  REGRESSION: node {before['node_s']:.3f}s -> {js_t:.3f}s"
+        regressions.append(case.stem)
+      print(f"{case.stem:<18}{py_t:>8.3f}s{js_t:>8.3f}s{py_t / js_t:>8.2f}x{mb(py_rss)}{mb(js_rss)}{flag}")
+  if not args.no_history:
+    history.append(entry)
+    history_path.write_text(json.dumps(history, indent=1) + "\n", encoding="utf-8")
+  if regressions and args.check:
+    sys.exit(f"regressions: {', '.join(regressions)}")
+
+if __name__ == "__main__":
+  main()
@@ -5,9 +5,13 @@ import subprocess as sp, sys, pathlib
 ROOT   = pathlib.Path(__file__).resolve().parents[1]
 EX     = ROOT / "examples"
 GOLDEN = ROOT / "tests" / "golden"
-OUTJS  = ROOT / "out.js"
+OUTDIR = ROOT / "out_project"
+sys.path.insert(0, str(ROOT / "tools"))
+from harness import norm, run_cases
 
 CASES = [p.name for p in EX.glob("*.py")]
+# multi-module projects: examples/<name>/main.py, built with `py2js build`
+PROJECTS = [p.parent.name for p in EX.glob("*/main.py")]
 
 def run(cmd):
   p = sp.run(cmd, stdout=sp.PIPE, stderr=sp.STDOUT, text=True, cwd=ROOT)
@@ -15,16 +19,18 @@ def run(cmd):
     print(p.stdout); sys.exit(p.returncode)
   return p.stdout
 
-def norm(s: str) -> str:
-  return "\n".join(line.rstrip() for line in s.replace("\r\n","\n").replace("\r","\n").split("\n")).strip()
-
 def main():
   GOLDEN.mkdir(parents=True, exist_ok=True)
-  for ex in sorted(CASES):
-    print(f"[gen] {ex}")
-    run([sys.executable, "-m", "py2js.cli", str(EX/ex), "-o", str(OUTJS)])
-    out = run(["node", str(OUTJS)])
-    (GOLDEN / (ex.replace(".py", ".out"))).write_text(norm(out) + "\n", encoding="utf-8")
+  for r in run_cases({ex: (EX/ex).read_text(encoding="utf-8") for ex in sorted(CASES)}):
+    print(f"[gen] {r['name']}")
+    if r["error"]:
+      print(r["out"] + r["error"]); sys.exit(1)
+    (GOLDEN / (r["name"].replace(".py", ".out"))).write_text(norm(r["out"]) + "\n", encoding="utf-8")
+  for name in sorted(PROJECTS):
+    print(f"[gen] {name}/")
+    run([sys.executable, "-m", "py2js.cli", "build", str(EX/name/"main.py"), "-o", str(OUTDIR/name), "--whole-program"])
+    out = run(["node", str(OUTDIR/name/"main.mjs")])
+    (GOLDEN / f"{name}.out").write_text(norm(out) + "\n", encoding="utf-8")
 
 if __name__ == "__main__":
   main()
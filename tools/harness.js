@@ -0,0 +1,130 @@
+// Runs transpiled programs in isolated vm contexts, spread over worker threads.
+//
+//   node tools/harness.js < job.json > results.json
+//
+// job.json: {"runtime": "<pyrt.js>", "cases": [{"name": ..., "js": ...}], "jobs": N, "timeout": MS}
+// results:  [{"name": ..., "out": "<stdout and stderr>", "ms": N, "error": null | "<uncaught>"}]
+//
+// Each worker compiles the runtime once and runs it in a fresh context per case. The context
+// gets a `process` with captured stdout/stderr and the exit hooks the runtime installs, and
+// timers on a virtual clock: `asyncio.sleep` does not wait, and a case is finished when its
+// script, its timers and its promises are done. `ms` covers the program itself, not the
+// runtime's setup.
+"use strict";
+const vm = require("vm");
+const os = require("os");
+const { Worker, isMainThread, parentPort, workerData } = require("worker_threads");
+
+function makeSandbox(out) {
+  const listeners = { exit: [], uncaughtExceptionMonitor: [] };
+  // virtual clock: timers fire in order of their due time as soon as nothing else is left to run
+  const timers = { now: 0, seq: 0, pending: new Map() };
+  const stream = { isTTY: false, write: function (s) { out.push(String(s)); return true; } };
+  const sandbox = {
+    process: {
+      stdout: stream,
+      stderr: stream,
+      argv: ["node", "main.js"],
+      env: {},
+      on: function (event, fn) { (listeners[event] = listeners[event] || []).push(fn); return this; },
+    },
+    console: {
+      log: function () { out.push(Array.prototype.join.call(arguments, " ") + "\n"); },
+      error: function () { out.push(Array.prototype.join.call(arguments, " ") + "\n"); },
+    },
+    setTimeout: function (fn, ms) {
+      const id = ++timers.seq;
+      const args = Array.prototype.slice.call(arguments, 2);
+      timers.pending.set(id, { due: timers.now + Math.max(0, Number(ms) || 0), fn: fn, args: args });
+      return id;
+    },
+    clearTimeout: function (id) { timers.pending.delete(id); },
+    queueMicrotask: queueMicrotask,
+  };
+  return { sandbox, listeners, timers };
+}
+
+function emit(listeners, event, arg) {
+  for (const fn of listeners[event] || []) fn(arg);
+}
+
+function turn() {
+  return new Promise(function (resolve) { setImmediate(resolve); });
+}
+
+async function settle(timers) {
+  // a macrotask turn drains the promise jobs; then the earliest timer (first set on a tie) fires
+  await turn();
+  while (timers.pending.size > 0) {
+    let next = null;
+    for (const [id, t] of timers.pending) if (next === null || t.due < next[1].due) next = [id, t];
+    timers.pending.delete(next[0]);
+    timers.now = next[1].due;
+    next[1].fn.apply(null, next[1].args);
+    await turn();
+  }
+}
+
+async function runCase(runtime, c, timeout) {
+  const out = [];
+  const { sandbox, listeners, timers } = makeSandbox(out);
+  const context = vm.createContext(sandbox);
+  let error = null;
+  let failed = null;
+  const onRejection = function (reason) { failed = failed || reason; };
+  process.on("unhandledRejection", onRejection);
+  runtime.runInContext(context);
+  const t0 = process.hrtime.bigint();
+  try {
+    new vm.Script(c.js, { filename: c.name }).runInContext(context, { timeout: timeout });
+    await settle(timers);
+  } catch (e) {
+    failed = e;
+  }
+  const ms = Number(process.hrtime.bigint() - t0) / 1e6;
+  process.removeListener("unhandledRejection", onRejection);
+  if (failed !== null) {
+    emit(listeners, "uncaughtExceptionMonitor", failed);
+    error = String((failed && failed.stack) || failed);
+  }
+  emit(listeners, "exit", failed === null ? 0 : 1);
+  return { name: c.name, out: out.join(""), ms: ms, error: error };
+}
+
+async function work(data) {
+  const runtime = new vm.Script(data.runtime, { filename: "pyrt.js" });
+  const results = [];
+  for (const c of data.cases) results.push(await runCase(runtime, c, data.timeout));
+  return results;
+}
+
+function main() {
+  const chunks = [];
+  process.stdin.on("data", function (d) { chunks.push(d); });
+  process.stdin.on("end", async function () {
+    const job = JSON.parse(Buffer.concat(chunks).toString("utf8"));
+    const jobs = Math.max(1, Math.min(job.jobs || os.cpus().length, job.cases.length));
+    const timeout = job.timeout || 10000;
+    let results;
+    if (jobs === 1) {
+      results = await work({ runtime: job.runtime, cases: job.cases, timeout: timeout });
+    } else {
+      // every worker takes every jobs-th case, so slow and fast cases are mixed evenly
+      const parts = await Promise.all(Array.from({ length: jobs }, function (_, w) {
+        const cases = job.cases.filter(function (_, i) { return i % jobs === w; });
+        return new Promise(function (resolve, reject) {
+          const worker = new Worker(__filename, { workerData: { runtime: job.runtime, cases: cases, timeout: timeout } });
+          worker.once("message", resolve);
+          worker.once("error", reject);
+        });
+      }));
+      const byName = new Map();
+      for (const part of parts) for (const r of part) byName.set(r.name, r);
+      results = job.cases.map(function (c) { return byName.get(c.name); });
+    }
+    process.stdout.write(JSON.stringify(results));
+  });
+}
+
+if (isMainThread) main();
+else work(workerData).then(function (results) { parentPort.postMessage(results); });
@@ -0,0 +1,112 @@
+# flake8: noqa
+"""Transpile examples in-process and run them all in one node process (tools/harness.js).
+
+  python tools/harness.py [-O LEVEL] [-j JOBS] [--int-mode MODE] [--exceptions MODE]
+                          [--times FILE] [--slowest N] [NAME ...]
+
+Each case runs in its own vm context; worker threads run them in parallel. Outputs are
+compared with tests/golden and the run time of each case is reported (--times writes
+{name: ms} as JSON). tests/golden.py and tools/gen_golden.py use run_cases().
+"""
+import argparse, json, os, re, subprocess as sp, sys, time, pathlib
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT    = pathlib.Path(__file__).resolve().parents[1]
+EX      = ROOT / "examples"
+GOLDEN  = ROOT / "tests" / "golden"
+RUNNER  = ROOT / "tools" / "harness.js"
+RUNTIME = ROOT / "py2js" / "runtime" / "pyrt.js"
+sys.path.insert(0, str(ROOT))
+from py2js.cli import transpile
+from py2js.emit_js import INT_MODES, EXCEPTION_MODES
+
+def norm(s: str) -> str:
+  return "\n".join(line.rstrip() for line in s.replace("\r\n","\n").replace("\r","\n").split("\n")).strip()
+
+def js_pattern(expected: str) -> str:
+  """A regex for the JS `expected` in which each numbered temporary (`__py_sb_1`) matches
+  any number, the same one wherever it repeats, so tests survive renumbering."""
+  parts, groups, pos = [], {}, 0
+  for m in re.finditer(r"__py_([a-z_]+?)_\d+\b", expected):
+    parts.append(re.escape(expected[pos:m.start()]))
+    if m.group(0) in groups:
+      parts.append(f"(?P={groups[m.group(0)]})")
+    else:
+      groups[m.group(0)] = f"t{len(groups)}"
+      parts.append(f"(?P<{groups[m.group(0)]}>__py_{m.group(1)}_\\d+)")
+    pos = m.end()
+  parts.append(re.escape(expected[pos:]))
+  return "".join(parts)
+
+def has_js(js: str, expected: str) -> bool:
+  return re.search(js_pattern(expected), js) is not None
+
+def _body(args):
+  src, opt_level, int_mode, exceptions = args
+  return transpile(src, opt_level, int_mode=int_mode, exceptions=exceptions, runtime=False)
+
+def run_cases(sources, opt_level=1, jobs=None, int_mode="fast", exceptions="cheap", timeout=10000):
+  """{name: Python source} -> [{"name", "out", "ms", "error"}], in the order of `sources`.
+  A case that fails to transpile gets its exception as "error" and no output."""
+  jobs = jobs or os.cpu_count() or 1
+  names = list(sources)
+  work = [(sources[n], opt_level, int_mode, exceptions) for n in names]
+  bodies = []
+  if jobs > 1 and len(work) > jobs:
+    with ProcessPoolExecutor(jobs) as pool:
+      futures = [pool.submit(_body, w) for w in work]
+      for f in futures:
+        bodies.append(f.exception() or f.result())
+  else:
+    for w in work:
+      try:
+        bodies.append(_body(w))
+      except Exception as e:
+        bodies.append(e)
+  failed = {n: b for n, b in zip(names, bodies) if isinstance(b, Exception)}
+  cases = [{"name": n, "js": b} for n, b in zip(names, bodies) if n not in failed]
+  job = {"runtime": RUNTIME.read_text(encoding="utf-8"), "cases": cases, "jobs": jobs, "timeout": timeout}
+  p = sp.run(["node", str(RUNNER)], input=json.dumps(job), stdout=sp.PIPE, text=True, encoding="utf-8")
+  if p.returncode != 0:
+    raise RuntimeError(f"{RUNNER.name} exited with {p.returncode}")
+  results = {r["name"]: r for r in json.loads(p.stdout)}
+  for n, e in failed.items():
+    results[n] = {"name": n, "out": "", "ms": 0.0, "error": f"transpile: {e!r}"}
+  return [results[n] for n in names]
+
+def example_sources(names=()):
+  cases = sorted(EX.glob("*.py"))
+  if names:
+    cases = [c for c in cases if c.stem in names or c.name in names]
+  return {c.name: c.read_text(encoding="utf-8") for c in cases}
+
+def main():
+  ap = argparse.ArgumentParser()
+  ap.add_argument("-O", dest="opt_level", type=int, default=1)
+  ap.add_argument("-j", "--jobs", type=int, default=None, help="worker processes and threads (default: CPU count)")
+  ap.add_argument("--int-mode", choices=INT_MODES, default="fast")
+  ap.add_argument("--exceptions", choices=EXCEPTION_MODES, default="cheap")
+  ap.add_argument("--times", help="write {case: ms} to this JSON file")
+  ap.add_argument("--slowest", type=int, default=5, help="list the N slowest cases")
+  ap.add_argument("names", nargs="*")
+  args = ap.parse_args()
+  t0 = time.perf_counter()
+  sources = {n: s for n, s in example_sources(args.names).items() if (GOLDEN / n.replace(".py", ".out")).exists()}
+  results = run_cases(sources, args.opt_level, args.jobs, args.int_mode, args.exceptions)
+  fails = []
+  for r in results:
+    exp = norm((GOLDEN / r["name"].replace(".py", ".out")).read_text(encoding="utf-8"))
+    if r["error"] or norm(r["out"]) != exp:
+      fails.append(r)
+      print(f"FAIL {r['name']}")
+      print("Expected:\n" + exp)
+      print("Got:\n" + norm(r["out"]) + ("\n" + r["error"] if r["error"] else ""))
+  for r in sorted(results, key=lambda r: -r["ms"])[:args.slowest]:
+    print(f"{r['name']:<28}{r['ms']:>9.2f} ms")
+  if args.times:
+    pathlib.Path(args.times).write_text(json.dumps({r["name"]: round(r["ms"], 3) for r in results}, indent=1) + "\n")
+  print(f"{len(results) - len(fails)}/{len(results)} passed in {time.perf_counter() - t0:.2f}s")
+  sys.exit(1 if fails else 0)
+
+if __name__ == "__main__":
+  main()